@@ -1,24 +1,70 @@
 import * as net from 'net';
 import { Config } from './config/Config';
+import {
+    LEGACY_PROTOCOL_VERSION,
+    PROTOCOL_VERSION,
+    HELLO_COMMAND,
+    SUBSCRIBE_COMMAND,
+    FLAG_COMPRESSED,
+    COMPRESSION_ZLIB,
+    DEFAULT_COMPRESSION_THRESHOLD,
+    FrameDecoder,
+    encodeFrame,
+    compressPayload,
+    decompressPayload
+} from './Protocol';
 
 interface LogEntry {
     type: 'log' | 'warn' | 'error';
     message: string;
     stack?: string;
     date: Date;
+    seq?: number;
 }
 
 interface Command {
+    id?: number | string;
     type: string;
     params: any;
 }
 
 interface CommandResponse {
+    id?: number | string;
     status: string;
     result?: any;
     error?: string;
+    // 桥接端处理该请求的耗时（毫秒），供客户端区分编辑器耗时与传输耗时
+    handler_ms?: number;
 }
 
+// 每个客户端连接的协议状态
+interface ConnectionState {
+    protocol: number;
+    decoder: FrameDecoder;
+    // 协商压缩后负载达到该字节数才压缩，0 表示不压缩
+    compressThreshold: number;
+    // 已订阅的事件分组，例如 'scene'
+    subscriptions: Set<string>;
+}
+
+// 推送给订阅者的事件帧
+interface EventFrame {
+    event: string;
+    data?: any;
+    generation: number;
+}
+
+// 流式命令用于发送中间结果帧的回调
+type StreamEmitter = (chunk: any) => Promise<void>;
+
+// 流式返回时每帧的默认条目数
+const DEFAULT_LOG_PAGE_SIZE = 1000;
+const DEFAULT_NODE_PAGE_SIZE = 500;
+
+// 转发给订阅者的场景广播消息
+// 添加、删除节点时编辑器会对父节点广播 scene:change-node
+const SCENE_BROADCASTS = ['scene:ready', 'scene:close', 'scene:change-node'];
+
 // 场景脚本接口类型定义
 interface ExecuteSceneScriptOptions {
     name: string;
@@ -26,16 +72,132 @@ interface ExecuteSceneScriptOptions {
     args?: any[];
 }
 
+// 场景脚本批量调用中单个条目的结果
+interface SceneScriptBatchOutput {
+    result?: any;
+    error?: string;
+}
+
+// 可以合并到一次 execute-scene-script 调用中的命令及其场景脚本方法
+const SCENE_SCRIPT_COMMANDS: { [type: string]: string } = {
+    GET_SCENE_INFO: 'getSceneInfo',
+    LIST_SCENE_NODES: 'listSceneNodes',
+    QUERY_SCENE_NODES: 'queryNodes',
+    HASH_SCENE_NODES: 'hashNodes'
+};
+
+function waitForDrain(socket: net.Socket): Promise<void> {
+    return new Promise((resolve) => {
+        const done = () => {
+            socket.removeListener('drain', done);
+            socket.removeListener('close', done);
+            resolve();
+        };
+        socket.once('drain', done);
+        socket.once('close', done);
+    });
+}
+
+/**
+ * 解析节点分页游标 "<场景代数>:<下标路径>"，格式无效时返回 null
+ */
+function parseNodeCursor(cursor: string): { generation: number, path: string } | null {
+    const match = /^(\d+):(.*)$/.exec(cursor);
+    return match ? { generation: Number(match[1]), path: match[2] } : null;
+}
+
+/**
+ * 给场景脚本返回的下一页游标加上生成它时的场景代数
+ */
+function stampNodeCursor(result: any, generation: number): any {
+    if (result && result.success && result.data && typeof result.data.nextCursor === 'string') {
+        result.data.nextCursor = `${generation}:${result.data.nextCursor}`;
+    }
+    return result;
+}
+
+/**
+ * 将命令参数转换为场景脚本方法的参数
+ */
+function sceneScriptArgs(type: string, params: any): any[] {
+    if (type === 'LIST_SCENE_NODES' && params && (params.limit || params.format)) {
+        // 场景脚本只使用游标中的下标路径，场景代数由 checkNodeCursor 检查
+        const cursor = params.cursor ? parseNodeCursor(String(params.cursor)) : null;
+        return [{ cursor: cursor ? cursor.path : '', limit: Number(params.limit) || 0, format: params.format }];
+    }
+    if (type === 'QUERY_SCENE_NODES') {
+        return [params || {}];
+    }
+    if (type === 'HASH_SCENE_NODES') {
+        return [{ known: Array.isArray(params && params.known) ? params.known : [] }];
+    }
+    return [];
+}
+
+/**
+ * 自 start（process.hrtime() 的返回值）以来经过的毫秒数
+ */
+function elapsedMs(start: [number, number]): number {
+    const [seconds, nanoseconds] = process.hrtime(start);
+    return Math.round((seconds * 1e3 + nanoseconds / 1e6) * 1000) / 1000;
+}
+
+function createEpoch(): string {
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+}
+
+function logKey(log: LogEntry): string {
+    return `${log.type}|${String(log.date)}|${log.message}`;
+}
+
+/**
+ * QUERY_LOGS 的过滤条件：日志类型、模块标签 `[module]` 和搜索词（空格分隔，全部匹配）
+ */
+function logFilter(params: any): (log: LogEntry) => boolean {
+    const showLogs = params.show_logs !== false;
+    const showWarnings = params.show_warnings !== false;
+    const showErrors = params.show_errors !== false;
+    const modulePattern = params.module_filter ? `[${params.module_filter}]` : '';
+    const terms: string[] = params.search_term ? params.search_term.toLowerCase().split(' ') : [];
+
+    return (log: LogEntry) => {
+        const type = log.type.toLowerCase();
+        if (!((showLogs && type === 'log') || (showWarnings && type === 'warn') || (showErrors && type === 'error'))) {
+            return false;
+        }
+        if (modulePattern && !log.message.includes(modulePattern)) {
+            return false;
+        }
+        if (terms.length > 0) {
+            const content = log.message.toLowerCase();
+            return terms.every((term) => content.includes(term));
+        }
+        return true;
+    };
+}
+
 export class LogBridge {
     private static instance: LogBridge;
     private server!: net.Server;
     private isRunning: boolean = false;
     private commandHandlers: Map<string, (params: any) => Promise<any>> = new Map();
+    // 支持分帧流式返回的命令处理器
+    private streamHandlers: Map<string, (params: any, emit: StreamEmitter) => Promise<any>> = new Map();
+    // 增量日志查询的游标状态
+    private logEpoch: string = createEpoch();
+    private logHistoryLength: number = 0;
+    private logHistoryHead: string | null = null;
+    // 订阅了事件的连接
+    private subscribers: Map<net.Socket, ConnectionState> = new Map();
+    // 场景事件计数，每次场景变化加一，客户端可据此判断缓存是否过期；节点分页游标也带有该值
+    private sceneGeneration: number = 0;
+    private broadcastListeners: Array<[string, (...args: any[]) => void]> = [];
 
     private constructor() {
         this.setupCommandHandlers();
         this.startTcpServer();
         this.setupLogListener();
+        this.setupSceneListener();
     }
 
     public static getInstance(): LogBridge {
@@ -59,13 +221,34 @@ export class LogBridge {
         this.commandHandlers.set('OPEN_SCENE', this.handleOpenScene.bind(this));
         this.commandHandlers.set('GET_SCENE_INFO', this.handleGetSceneInfo.bind(this));
         this.commandHandlers.set('LIST_SCENE_NODES', this.handleListSceneNodes.bind(this));
+        this.commandHandlers.set('QUERY_SCENE_NODES', this.handleQuerySceneNodes.bind(this));
+        this.commandHandlers.set('HASH_SCENE_NODES', this.handleHashSceneNodes.bind(this));
+
+        // 批量命令
+        this.commandHandlers.set('BATCH', this.handleBatch.bind(this));
+
+        // 流式命令：请求参数带 stream: true 时按帧分批返回结果
+        this.streamHandlers.set('QUERY_LOGS', this.streamQueryLogs.bind(this));
+        this.streamHandlers.set('LIST_SCENE_NODES', this.streamListSceneNodes.bind(this));
+        this.streamHandlers.set('HASH_SCENE_NODES', this.streamHashSceneNodes.bind(this));
     }
 
     private startTcpServer() {
         this.server = net.createServer((socket) => {
             console.log('Client connected to Cocos MCP bridge');
+            const state: ConnectionState = {
+                protocol: LEGACY_PROTOCOL_VERSION,
+                decoder: new FrameDecoder(),
+                compressThreshold: 0,
+                subscriptions: new Set()
+            };
 
             socket.on('data', async (data) => {
+                if (state.protocol > LEGACY_PROTOCOL_VERSION) {
+                    this.handleFramedData(socket, state, data);
+                    return;
+                }
+
                 try {
                     // 处理可能的ping命令（简单字符串，不是JSON）
                     const message = data.toString().trim();
@@ -80,7 +263,28 @@ export class LogBridge {
 
                     // 处理JSON命令
                     const command: Command = JSON.parse(message);
+                    if (command.type === HELLO_COMMAND) {
+                        // 协商帧协议：应答仍为裸 JSON，之后该连接切换到帧模式
+                        const requested = Number(command.params?.protocol) || LEGACY_PROTOCOL_VERSION;
+                        const response: CommandResponse = {
+                            status: 'success',
+                            result: { protocol: Math.min(requested, PROTOCOL_VERSION) }
+                        };
+                        // 客户端声明支持 zlib 时启用压缩，阈值以客户端为准
+                        const codecs = command.params?.compression;
+                        if (response.result.protocol > LEGACY_PROTOCOL_VERSION &&
+                            Array.isArray(codecs) && codecs.includes(COMPRESSION_ZLIB)) {
+                            response.result.compression = COMPRESSION_ZLIB;
+                            state.compressThreshold = Number(command.params.compress_threshold) || DEFAULT_COMPRESSION_THRESHOLD;
+                        }
+                        socket.write(JSON.stringify(response));
+                        state.protocol = response.result.protocol;
+                        return;
+                    }
+
+                    const started = process.hrtime();
                     const response = await this.executeCommand(command);
+                    response.handler_ms = elapsedMs(started);
                     socket.write(JSON.stringify(response));
                 } catch (error: any) {
                     const errorResponse: CommandResponse = {
@@ -92,6 +296,7 @@ export class LogBridge {
             });
 
             socket.on('close', () => {
+                this.subscribers.delete(socket);
                 console.log('Client disconnected from Cocos MCP bridge');
             });
 
@@ -111,6 +316,106 @@ export class LogBridge {
         });
     }
 
+    /**
+     * 处理帧模式下收到的数据
+     * 每个请求独立执行，完成后立即写回并带上请求 id，允许乱序完成
+     */
+    private handleFramedData(socket: net.Socket, state: ConnectionState, data: Buffer) {
+        let frames;
+        try {
+            frames = state.decoder.push(data);
+        } catch (error: any) {
+            // 帧头损坏后无法再同步数据流，只能断开连接
+            console.error(`Invalid frame from client: ${error.message}`);
+            socket.destroy();
+            return;
+        }
+
+        for (const frame of frames) {
+            let payload = frame.payload;
+            if (frame.flags & FLAG_COMPRESSED) {
+                try {
+                    payload = decompressPayload(payload);
+                } catch (error: any) {
+                    console.error(`Invalid compressed frame from client: ${error.message}`);
+                    socket.destroy();
+                    return;
+                }
+            }
+            this.handleFrame(socket, state, payload);
+        }
+    }
+
+    private async handleFrame(socket: net.Socket, state: ConnectionState, payload: Buffer) {
+        const started = process.hrtime();
+        let command: Command | undefined;
+        let response: CommandResponse;
+        try {
+            command = JSON.parse(payload.toString('utf8'));
+            if (command!.type === SUBSCRIBE_COMMAND) {
+                response = { status: 'success', result: this.handleSubscribe(socket, state, command!.params || {}) };
+            } else if (command!.params && command!.params.stream === true && this.streamHandlers.has(command!.type)) {
+                response = await this.executeStream(socket, state, command!);
+            } else {
+                response = await this.executeCommand(command!);
+            }
+        } catch (error: any) {
+            response = {
+                status: 'error',
+                error: `Error processing command: ${error.message}`
+            };
+        }
+        if (command && command.id !== undefined) {
+            response.id = command.id;
+        }
+        // 流式命令的耗时包含等待客户端读取（drain）的时间
+        response.handler_ms = elapsedMs(started);
+        this.writeFrame(socket, state, response);
+    }
+
+    /**
+     * 写出一帧，返回 false 表示 socket 缓冲区已满，调用方应等待 drain
+     * 协商了压缩的连接上，较大的负载以 zlib 压缩后发送
+     */
+    private writeFrame(socket: net.Socket, state: ConnectionState, response: CommandResponse | EventFrame): boolean {
+        if (socket.destroyed) {
+            return false;
+        }
+        const [body, flags] = compressPayload(Buffer.from(JSON.stringify(response), 'utf8'), state.compressThreshold);
+        const [header, payload] = encodeFrame(body, flags);
+        // 合并帧头和负载为一次系统调用
+        socket.cork();
+        socket.write(header);
+        const flushed = socket.write(payload);
+        socket.uncork();
+        return flushed;
+    }
+
+    /**
+     * 执行流式命令：中间结果以 status 为 partial 的帧发送，
+     * 返回值作为最终帧。写缓冲区满时暂停生成，保持两端内存占用有界。
+     */
+    private async executeStream(socket: net.Socket, state: ConnectionState, command: Command): Promise<CommandResponse> {
+        const handler = this.streamHandlers.get(command.type)!;
+        const emit: StreamEmitter = async (chunk: any) => {
+            if (socket.destroyed) {
+                throw new Error('Client disconnected');
+            }
+            const flushed = this.writeFrame(socket, state, { id: command.id, status: 'partial', result: chunk });
+            if (!flushed) {
+                await waitForDrain(socket);
+            }
+        };
+
+        try {
+            const result = await handler(command.params, emit);
+            return { status: 'success', result };
+        } catch (error: any) {
+            console.error(`Error streaming command: ${error.message}`);
+            return { status: 'error', error: error.message };
+        }
+    }
+
     private setupLogListener() {
         // 监听编辑器日志消息，但不再广播，由客户端查询获取
         Editor.Message.addBroadcastListener('console:log', (log: LogEntry) => {
@@ -119,6 +424,52 @@ export class LogBridge {
         });
     }
 
+    /**
+     * 订阅事件分组，之后该连接会收到对应的事件帧，直到连接关闭
+     */
+    private handleSubscribe(socket: net.Socket, state: ConnectionState, params: any): any {
+        const events: string[] = Array.isArray(params.events) ? params.events : [];
+        for (const event of events) {
+            state.subscriptions.add(String(event));
+        }
+        if (state.subscriptions.size > 0) {
+            this.subscribers.set(socket, state);
+        }
+        return {
+            events: Array.from(state.subscriptions),
+            generation: this.sceneGeneration
+        };
+    }
+
+    private setupSceneListener() {
+        for (const message of SCENE_BROADCASTS) {
+            const listener = (...args: any[]) => {
+                this.sceneGeneration++;
+                this.publishEvent('scene', {
+                    event: message,
+                    data: { uuid: typeof args[0] === 'string' ? args[0] : undefined },
+                    generation: this.sceneGeneration
+                });
+            };
+            Editor.Message.addBroadcastListener(message, listener);
+            this.broadcastListeners.push([message, listener]);
+        }
+    }
+
+    /**
+     * 将事件帧写给订阅了该分组的所有连接
+     * 事件很小，不等待 drain；连接过慢时由 socket 自身缓冲
+     */
+    private publishEvent(group: string, frame: EventFrame) {
+        for (const [socket, state] of this.subscribers) {
+            if (socket.destroyed) {
+                this.subscribers.delete(socket);
+            } else if (state.subscriptions.has(group)) {
+                this.writeFrame(socket, state, frame);
+            }
+        }
+    }
+
     private async executeCommand(command: Command): Promise<CommandResponse> {
         try {
             const { type, params = {} } = command;
@@ -147,52 +498,26 @@ export class LogBridge {
 
     private async handleQueryLogs(params: any): Promise<any> {
         try {
-            const showLogs = params.show_logs !== false;
-            const showWarnings = params.show_warnings !== false;
-            const showErrors = params.show_errors !== false;
-            const searchTerm = params.search_term || '';
-            const moduleFilter = params.module_filter || '';
-
-            // 直接使用 Editor.Logger.query() API 获取日志列表
-            console.log('Querying logs with Editor.Logger.query()...');
-            // @ts-ignore - Editor.Logger 是 Cocos Creator 编辑器 API
-            const logs = await Editor.Logger.query() || [];
-            console.log(`Found ${logs.length} logs`);
-
-            // 根据类型过滤
-            let filteredLogs = logs.filter((log: LogEntry) => {
-                const type = log.type.toLowerCase();
-                return (
-                    (showLogs && type === 'log') ||
-                    (showWarnings && type === 'warn') ||
-                    (showErrors && type === 'error')
-                );
-            });
-
-            // 根据模块过滤
-            if (moduleFilter) {
-                console.log(`Filtering logs by module: "${moduleFilter}"`);
-                const modulePattern = `[${moduleFilter}]`;
-                filteredLogs = filteredLogs.filter((log: LogEntry) => {
-                    return log.message.includes(modulePattern);
-                });
-                console.log(`Found ${filteredLogs.length} logs matching module filter`);
+            const incremental = params.since !== undefined;
+            const { logs, since } = await this.readLogs(params);
+            const matches = logFilter(params);
+
+            // 逐条过滤，不为每个过滤条件生成中间数组
+            const filteredLogs: LogEntry[] = [];
+            for (let index = since; index < logs.length; index++) {
+                if (matches(logs[index])) {
+                    filteredLogs.push(incremental ? { ...logs[index], seq: index } : logs[index]);
+                }
             }
+            console.log(`Found ${filteredLogs.length} logs matching filters`);
 
-            // 根据搜索词过滤
-            if (searchTerm) {
-                console.log(`Filtering logs by search term: "${searchTerm}"`);
-                const terms = searchTerm.toLowerCase().split(' ');
-                const searchResults = filteredLogs.filter((log: LogEntry) => {
-                    const content = log.message.toLowerCase();
-                    return terms.every((term: string) => content.includes(term));
-                });
-                console.log(`Found ${searchResults.length} logs matching search term`);
+            if (incremental) {
                 return {
-                    logs: searchResults
+                    logs: filteredLogs,
+                    epoch: this.logEpoch,
+                    next_seq: logs.length
                 };
             }
-
             return {
                 logs: filteredLogs
             };
@@ -203,11 +528,51 @@ export class LogBridge {
         }
     }
 
+    /**
+     * 读取控制台历史并返回查询的起始位置
+     * 增量查询从游标开始；客户端的 epoch 与当前不一致时说明历史已被清空，从头返回
+     */
+    private async readLogs(params: any): Promise<{ logs: LogEntry[]; since: number }> {
+        // 直接使用 Editor.Logger.query() API 获取日志列表
+        console.log('Querying logs with Editor.Logger.query()...');
+        // @ts-ignore - Editor.Logger 是 Cocos Creator 编辑器 API
+        const logs: LogEntry[] = await Editor.Logger.query() || [];
+        console.log(`Found ${logs.length} logs`);
+        this.refreshLogEpoch(logs);
+
+        let since = 0;
+        if (params.since !== undefined && params.epoch === this.logEpoch) {
+            since = Math.max(0, Math.min(Number(params.since) || 0, logs.length));
+        }
+        return { logs, since };
+    }
+
+    /**
+     * 检测控制台历史是否在桥接之外被清空（长度变短或首条日志变化），
+     * 如果是则开始新的 epoch，使客户端的增量游标失效
+     */
+    private refreshLogEpoch(logs: LogEntry[]) {
+        const head = logs.length > 0 ? logKey(logs[0]) : null;
+        if (logs.length < this.logHistoryLength ||
+            (this.logHistoryHead !== null && head !== this.logHistoryHead)) {
+            this.resetLogEpoch();
+        }
+        this.logHistoryLength = logs.length;
+        this.logHistoryHead = head;
+    }
+
+    private resetLogEpoch() {
+        this.logEpoch = createEpoch();
+        this.logHistoryLength = 0;
+        this.logHistoryHead = null;
+    }
+
     private async handleClearLogs(params: any): Promise<any> {
         try {
             console.log('Clearing logs with Editor.Logger.clear()...');
             // @ts-ignore - Editor.Logger 是 Cocos Creator 编辑器 API
             await Editor.Logger.clear();
+            this.resetLogEpoch();
             
             return {
                 message: 'Console logs cleared successfully'
@@ -262,26 +627,272 @@ export class LogBridge {
         }
     }
 
+    /**
+     * 检查节点分页游标：游标中的下标路径只对生成它时的场景结构有效，场景变化后拒绝旧游标
+     * @returns 游标无效或已过期时的失败结果，否则为 null
+     */
+    private checkNodeCursor(params: any): any {
+        if (!params || !params.cursor) {
+            return null;
+        }
+        const cursor = parseNodeCursor(String(params.cursor));
+        if (!cursor) {
+            return { success: false, message: `无效的分页游标: ${params.cursor}` };
+        }
+        if (cursor.generation !== this.sceneGeneration) {
+            return { success: false, message: '分页游标已过期：场景在分页期间发生了变化，请从第一页重新获取' };
+        }
+        return null;
+    }
+
     /**
      * 处理列出场景节点命令
      */
     private async handleListSceneNodes(params: any): Promise<any> {
         try {
-            // 调用场景脚本的 listSceneNodes 方法
+            const rejected = this.checkNodeCursor(params);
+            if (rejected) {
+                return rejected;
+            }
+            const generation = this.sceneGeneration;
+
+            // 调用场景脚本的 listSceneNodes 方法，传入 limit 时只返回一页
             const result = await Editor.Message.request('scene', 'execute-scene-script', {
                 name: 'cocos-mcp',
                 method: 'listSceneNodes',
-                args: []
+                args: sceneScriptArgs('LIST_SCENE_NODES', params)
             });
 
-            return result;
+            return stampNodeCursor(result, generation);
         } catch (error: any) {
             console.error(`Error listing scene nodes: ${error.message}`);
             throw error;
         }
     }
 
+    /**
+     * 处理查询场景节点命令：过滤和字段投影都在场景脚本中完成，只有匹配的节点会传回
+     */
+    private async handleQuerySceneNodes(params: any): Promise<any> {
+        try {
+            const result = await Editor.Message.request('scene', 'execute-scene-script', {
+                name: 'cocos-mcp',
+                method: 'queryNodes',
+                args: sceneScriptArgs('QUERY_SCENE_NODES', params)
+            });
+
+            return result;
+        } catch (error: any) {
+            console.error(`Error querying scene nodes: ${error.message}`);
+            throw error;
+        }
+    }
+
+    /**
+     * 处理场景结构哈希命令：哈希在场景脚本中计算，调用方已有的子树不再展开
+     */
+    private async handleHashSceneNodes(params: any): Promise<any> {
+        try {
+            const result = await Editor.Message.request('scene', 'execute-scene-script', {
+                name: 'cocos-mcp',
+                method: 'hashNodes',
+                args: sceneScriptArgs('HASH_SCENE_NODES', params)
+            });
+
+            return result;
+        } catch (error: any) {
+            console.error(`Error hashing scene nodes: ${error.message}`);
+            throw error;
+        }
+    }
+
+    /**
+     * 流式查询日志：按 page_size 分帧发送，增量模式下每帧都带有 epoch 和 next_seq
+     */
+    private async streamQueryLogs(params: any, emit: StreamEmitter): Promise<any> {
+        const pageSize = Number(params.page_size) || DEFAULT_LOG_PAGE_SIZE;
+        const incremental = params.since !== undefined;
+        const { logs, since } = await this.readLogs(params);
+        const matches = logFilter(params);
+        let page: LogEntry[] = [];
+        let count = 0;
+
+        // 边过滤边分页，只保留当前一页，不先生成完整的结果
+        const flush = async () => {
+            const chunk: any = { logs: page };
+            if (incremental) {
+                chunk.epoch = this.logEpoch;
+                chunk.next_seq = page[page.length - 1].seq! + 1;
+            }
+            count += page.length;
+            page = [];
+            await emit(chunk);
+        };
+        for (let index = since; index < logs.length; index++) {
+            if (!matches(logs[index])) {
+                continue;
+            }
+            page.push(incremental ? { ...logs[index], seq: index } : logs[index]);
+            if (page.length >= pageSize) {
+                await flush();
+            }
+        }
+        if (page.length > 0) {
+            await flush();
+        }
+
+        if (incremental) {
+            return { epoch: this.logEpoch, next_seq: logs.length, count };
+        }
+        return { count };
+    }
+
+    /**
+     * 流式列出场景节点：每页一次场景脚本调用，编辑器端同样不需要物化整棵树
+     */
+    private async streamListSceneNodes(params: any, emit: StreamEmitter): Promise<any> {
+        const limit = Number(params.page_size) || DEFAULT_NODE_PAGE_SIZE;
+        let cursor: string | null = params.cursor || '';
+        let nodeCount = 0;
+
+        while (cursor !== null) {
+            const page = await this.handleListSceneNodes({ cursor, limit, format: params.format });
+            if (!page || !page.success) {
+                throw new Error((page && page.message) || 'Failed to list scene nodes');
+            }
+            const { nextCursor, ...chunk } = page.data;
+            nodeCount += chunk.nodeCount;
+            await emit(chunk);
+            cursor = nextCursor;
+        }
+
+        return { success: true, data: { nodeCount } };
+    }
+
+    /**
+     * 流式返回场景结构哈希：子树哈希需要遍历整棵树，因此只调用一次场景脚本，再按 page_size 分帧发送节点
+     */
+    private async streamHashSceneNodes(params: any, emit: StreamEmitter): Promise<any> {
+        const pageSize = Number(params.page_size) || DEFAULT_NODE_PAGE_SIZE;
+        const result = await this.handleHashSceneNodes(params);
+        if (!result || !result.success) {
+            throw new Error((result && result.message) || 'Failed to hash scene nodes');
+        }
+        const { nodes, ...summary } = result.data;
+
+        for (let start = 0; start < nodes.length; start += pageSize) {
+            await emit({ nodes: nodes.slice(start, start + pageSize) });
+        }
+
+        return { success: true, data: summary };
+    }
+
+    /**
+     * 处理批量命令
+     * 在一次往返中执行多个命令，每个条目单独返回状态。
+     * 相邻的场景命令会合并为一次 execute-scene-script 调用。
+     */
+    private async handleBatch(params: any): Promise<any> {
+        const commands: Command[] = Array.isArray(params.commands) ? params.commands : [];
+        const parallel = params.parallel === true;
+        const results: CommandResponse[] = new Array(commands.length);
+
+        const isSceneCommand = (command: Command) => !!SCENE_SCRIPT_COMMANDS[command.type];
+        const runSingle = async (index: number) => {
+            const command = commands[index];
+            if (!command || typeof command.type !== 'string') {
+                results[index] = { status: 'error', error: 'Invalid batch item' };
+            } else if (command.type === 'BATCH') {
+                results[index] = { status: 'error', error: 'Nested BATCH commands are not supported' };
+            } else {
+                results[index] = await this.executeCommand(command);
+            }
+        };
+
+        if (parallel) {
+            // 所有场景命令合并为一次调用，其余命令并发执行
+            const sceneIndices: number[] = [];
+            const otherIndices: number[] = [];
+            commands.forEach((command, index) => {
+                (command && isSceneCommand(command) ? sceneIndices : otherIndices).push(index);
+            });
+            await Promise.all([
+                this.runSceneScriptGroup(commands, sceneIndices, results),
+                ...otherIndices.map(runSingle)
+            ]);
+        } else {
+            // 按顺序执行，只合并相邻的场景命令以保持执行顺序
+            let index = 0;
+            while (index < commands.length) {
+                const group: number[] = [];
+                while (index < commands.length && commands[index] && isSceneCommand(commands[index])) {
+                    group.push(index++);
+                }
+                if (group.length > 0) {
+                    await this.runSceneScriptGroup(commands, group, results);
+                } else {
+                    await runSingle(index++);
+                }
+            }
+        }
+
+        return { results };
+    }
+
+    /**
+     * 通过一次 execute-scene-script 调用执行一组场景命令
+     */
+    private async runSceneScriptGroup(commands: Command[], indices: number[], results: CommandResponse[]) {
+        // 游标已过期的分页请求直接返回失败结果，其余命令照常合并
+        const generation = this.sceneGeneration;
+        const isListing = (index: number) => commands[index].type === 'LIST_SCENE_NODES';
+        indices = indices.filter((index) => {
+            const rejected = isListing(index) ? this.checkNodeCursor(commands[index].params) : null;
+            if (rejected) {
+                results[index] = { status: 'success', result: rejected };
+            }
+            return !rejected;
+        });
+
+        if (indices.length === 0) {
+            return;
+        }
+        if (indices.length === 1) {
+            results[indices[0]] = await this.executeCommand(commands[indices[0]]);
+            return;
+        }
+
+        const calls = indices.map((index) => ({
+            method: SCENE_SCRIPT_COMMANDS[commands[index].type],
+            args: sceneScriptArgs(commands[index].type, commands[index].params || {})
+        }));
+        try {
+            const outputs: SceneScriptBatchOutput[] = await Editor.Message.request('scene', 'execute-scene-script', {
+                name: 'cocos-mcp',
+                method: 'runBatch',
+                args: [calls]
+            });
+            indices.forEach((commandIndex, n) => {
+                const output = outputs[n] || { error: 'Missing scene script result' };
+                results[commandIndex] = output.error !== undefined
+                    ? { status: 'error', error: output.error }
+                    : { status: 'success',
+                        result: isListing(commandIndex) ? stampNodeCursor(output.result, generation) : output.result };
+            });
+        } catch (error: any) {
+            console.error(`Error running scene script batch: ${error.message}`);
+            for (const commandIndex of indices) {
+                results[commandIndex] = { status: 'error', error: error.message };
+            }
+        }
+    }
+
     public destroy() {
+        for (const [message, listener] of this.broadcastListeners) {
+            Editor.Message.removeBroadcastListener(message, listener);
+        }
+        this.broadcastListeners = [];
+        this.subscribers.clear();
         if (this.server && this.isRunning) {
             this.server.close();
             this.isRunning = false;
@@ -0,0 +1,136 @@
+/**
+ * TCP 桥的线协议
+ *
+ * 版本 0 为旧的裸 JSON 模式；版本 1 在每条消息前加上固定长度的帧头，
+ * 接收方可以一次性读取完整负载并只解析一次。
+ *
+ * 帧格式（大端序）：
+ *   magic(2B 'CM') | version(1B) | flags(1B) | length(4B uint32) | payload
+ *
+ * 压缩在 HELLO 中协商：客户端列出支持的算法和压缩阈值，桥接端选中后
+ * 双方都可以把不小于阈值的负载以 zlib 流发送并设置 FLAG_COMPRESSED，
+ * 小消息保持原样。帧头中的长度始终是线上的字节数。
+ */
+import * as zlib from 'zlib';
+
+export const LEGACY_PROTOCOL_VERSION = 0;
+export const PROTOCOL_VERSION = 1;
+
+export const HELLO_COMMAND = 'HELLO';
+// 仅帧模式可用：订阅后桥接端会主动推送事件帧 { event, data, generation }，事件帧不带 id
+export const SUBSCRIBE_COMMAND = 'SUBSCRIBE';
+
+// 帧标志位
+export const FLAG_COMPRESSED = 0x01;
+const KNOWN_FLAGS = FLAG_COMPRESSED;
+
+export const COMPRESSION_ZLIB = 'zlib';
+// 客户端未给出阈值时使用
+export const DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024;
+
+export const FRAME_MAGIC = 'CM';
+export const FRAME_HEADER_SIZE = 8;
+export const MAX_FRAME_SIZE = 256 * 1024 * 1024;
+
+export interface Frame {
+    version: number;
+    flags: number;
+    payload: Buffer;
+}
+
+/**
+ * 将负载编码为带帧头的 Buffer 列表，调用方可以直接依次写入 socket
+ */
+export function encodeFrame(payload: Buffer, flags: number = 0): Buffer[] {
+    const header = Buffer.alloc(FRAME_HEADER_SIZE);
+    header.write(FRAME_MAGIC, 0, 'ascii');
+    header.writeUInt8(PROTOCOL_VERSION, 2);
+    header.writeUInt8(flags, 3);
+    header.writeUInt32BE(payload.length, 4);
+    return [header, payload];
+}
+
+/**
+ * 负载不小于阈值时压缩，返回 [负载, 帧标志]；阈值为 0 或压缩后没有变小时保持原样
+ */
+export function compressPayload(payload: Buffer, threshold: number): [Buffer, number] {
+    if (threshold <= 0 || payload.length < threshold) {
+        return [payload, 0];
+    }
+    // 级别 1 最快，重复度高的 JSON 仍有约 10 倍压缩率
+    const compressed = zlib.deflateSync(payload, { level: 1 });
+    if (compressed.length >= payload.length) {
+        return [payload, 0];
+    }
+    return [compressed, FLAG_COMPRESSED];
+}
+
+/**
+ * 解压收到的负载，解压后的大小同样受 MAX_FRAME_SIZE 限制
+ */
+export function decompressPayload(payload: Buffer): Buffer {
+    return zlib.inflateSync(payload, { maxOutputLength: MAX_FRAME_SIZE });
+}
+
+/**
+ * 增量帧解码器
+ * 缓存收到的数据块，只有在凑齐完整帧之后才拼接一次
+ */
+export class FrameDecoder {
+    private chunks: Buffer[] = [];
+    private buffered: number = 0;
+
+    public push(data: Buffer): Frame[] {
+        this.chunks.push(data);
+        this.buffered += data.length;
+
+        const frames: Frame[] = [];
+        while (this.buffered >= FRAME_HEADER_SIZE) {
+            const header = this.peek(FRAME_HEADER_SIZE);
+            if (header.toString('ascii', 0, 2) !== FRAME_MAGIC) {
+                throw new Error('Invalid frame magic');
+            }
+            const version = header.readUInt8(2);
+            const flags = header.readUInt8(3);
+            const length = header.readUInt32BE(4);
+            if (version < 1 || version > PROTOCOL_VERSION) {
+                throw new Error(`Unsupported protocol version: ${version}`);
+            }
+            if (flags & ~KNOWN_FLAGS) {
+                throw new Error(`Unknown frame flags: ${flags}`);
+            }
+            if (length > MAX_FRAME_SIZE) {
+                throw new Error(`Frame too large: ${length} bytes`);
+            }
+            if (this.buffered < FRAME_HEADER_SIZE + length) {
+                break;
+            }
+
+            const frame = this.take(FRAME_HEADER_SIZE + length);
+            frames.push({ version, flags, payload: frame.subarray(FRAME_HEADER_SIZE) });
+        }
+        return frames;
+    }
+
+    private peek(size: number): Buffer {
+        if (this.chunks[0].length < size) {
+            this.chunks = [Buffer.concat(this.chunks)];
+        }
+        return this.chunks[0].subarray(0, size);
+    }
+
+    private take(size: number): Buffer {
+        if (this.chunks[0].length < size) {
+            this.chunks = [Buffer.concat(this.chunks)];
+        }
+        const head = this.chunks[0];
+        const frame = head.subarray(0, size);
+        if (head.length === size) {
+            this.chunks.shift();
+        } else {
+            this.chunks[0] = head.subarray(size);
+        }
+        this.buffered -= size;
+        return frame;
+    }
+}
@@ -6,7 +6,7 @@ module.paths.push(join(Editor.App.path, 'node_modules'));
 
 // 导入Cocos Creator引擎模块
 // @ts-ignore - cc模块在运行时可用
-import { director, Node, Vec3 } from 'cc';
+import { director, Node, Vec3, js } from 'cc';
 
 /**
  * 场景脚本加载时触发的函数
@@ -110,10 +110,14 @@ export const methods = {
     },
 
     /**
-     * 列出场景中的所有节点
+     * 列出场景中的节点
+     * 不传参数时返回全部节点；传入 limit 时按先序遍历分页返回，
+     * nextCursor 为下一页的游标，没有更多节点时为 null。
+     * format 为 'columns' 时以列数组 columns 代替逐个节点的对象 nodes
+     * @param options 分页参数 { cursor?: string, limit?: number, format?: string }
      * @returns 节点列表
      */
-    listSceneNodes() {
+    listSceneNodes(options?: { cursor?: string, limit?: number, format?: string }) {
         try {
             const scene = director.getScene();
             if (!scene) {
@@ -123,6 +127,19 @@ export const methods = {
                 };
             }
 
+            if (options && (options.limit || options.format === COLUMNS_FORMAT)) {
+                const listing = createNodeListing(options.format);
+                const next = collectNodePage(scene, parseCursor(options.cursor), options.limit || Infinity, listing);
+                return {
+                    success: true,
+                    data: {
+                        nodeCount: listing.count,
+                        ...listing.output(),
+                        nextCursor: next
+                    }
+                };
+            }
+
             const nodes = collectNodes(scene);
             
             return {
@@ -138,9 +155,202 @@ export const methods = {
                 message: `列出场景节点失败: ${error.message}`
             };
         }
+    },
+
+    /**
+     * 按条件查询场景节点，只返回匹配节点的指定字段
+     * 在场景进程内完成遍历和过滤，不匹配的节点不会被序列化
+     * @param query 查询条件，见 NodeQuery
+     * @returns { total, offset, nodes }，total 为匹配的节点总数
+     */
+    queryNodes(query?: NodeQuery) {
+        try {
+            const scene = director.getScene();
+            if (!scene) {
+                return {
+                    success: false,
+                    message: '当前没有打开的场景'
+                };
+            }
+
+            const options = query || {};
+            const fields = resolveFields(options.fields);
+            const offset = Math.max(0, Number(options.offset) || 0);
+            const limit = Number(options.limit) > 0 ? Number(options.limit) : DEFAULT_QUERY_LIMIT;
+            const nodes: Array<any> = [];
+            let total = 0;
+            walkMatches(scene, compileQuery(options), (node, names) => {
+                if (total >= offset && nodes.length < limit) {
+                    nodes.push(projectNode(node, names, fields));
+                }
+                total++;
+            });
+
+            return {
+                success: true,
+                data: {
+                    total,
+                    offset,
+                    nodeCount: nodes.length,
+                    nodes
+                }
+            };
+        } catch (error: any) {
+            return {
+                success: false,
+                message: `查询场景节点失败: ${error.message}`
+            };
+        }
+    },
+
+    /**
+     * 计算场景的结构哈希，按先序返回节点快照
+     * 每个节点的 hash 覆盖 uuid、名称、active、组件类名和变换，tree 再加上所有子节点的 tree（Merkle 树），
+     * 子树中的任何变化都会改变从它到场景根节点路径上所有节点的 tree。
+     * known 为调用方已有的子树的 tree：这些子树只返回 { uuid, depth, tree, same: true }，不再展开
+     * @param options { known?: string[] }
+     * @returns { name, uuid, nodeCount, reused, tree, nodes }，nodeCount 为场景的节点总数
+     */
+    hashNodes(options?: { known?: string[] }) {
+        try {
+            const scene = director.getScene();
+            if (!scene) {
+                return {
+                    success: false,
+                    message: '当前没有打开的场景'
+                };
+            }
+
+            const hashes = new Map<Node, NodeHash>();
+            const tree = hashSubtree(scene, hashes);
+            const known = new Set<string>((options && options.known) || []);
+            const nodes: Array<any> = [];
+            let reused = 0;
+            const walk = (node: Node, depth: number) => {
+                const hash = hashes.get(node)!;
+                if (known.has(hash.tree)) {
+                    nodes.push({ uuid: node.uuid, depth, tree: hash.tree, same: true });
+                    reused++;
+                    return;
+                }
+                nodes.push({
+                    uuid: node.uuid,
+                    name: node.name,
+                    depth,
+                    active: node.active,
+                    components: componentNames(node),
+                    transform: nodeTransform(node),
+                    hash: hash.own,
+                    tree: hash.tree
+                });
+                for (const child of node.children) {
+                    walk(child, depth + 1);
+                }
+            };
+            walk(scene, 0);
+
+            return {
+                success: true,
+                data: {
+                    name: scene.name,
+                    uuid: scene.uuid,
+                    nodeCount: hashes.size,
+                    reused,
+                    tree,
+                    nodes
+                }
+            };
+        } catch (error: any) {
+            return {
+                success: false,
+                message: `计算场景哈希失败: ${error.message}`
+            };
+        }
+    },
+
+    /**
+     * 在一次场景脚本调用中依次执行多个方法
+     * @param calls 方法名与参数列表
+     * @returns 与调用一一对应的结果，失败的条目包含 error
+     */
+    runBatch(calls: Array<{ method: string, args?: any[] }>): Array<{ result?: any, error?: string }> {
+        const table = methods as { [name: string]: (...args: any[]) => any };
+        return (calls || []).map((call) => {
+            const method = call && table[call.method];
+            if (!method || call.method === 'runBatch') {
+                return { error: `Unknown scene script method: ${call && call.method}` };
+            }
+            try {
+                return { result: method.apply(methods, call.args || []) };
+            } catch (error: any) {
+                return { error: error.message };
+            }
+        });
     }
 };
 
+// 列格式：各字段为平行数组，父子关系由先序顺序和 childCount 确定
+const COLUMNS_FORMAT = 'columns';
+
+/**
+ * 分页收集节点时的输出格式
+ */
+interface NodeListing {
+    count: number;
+    add(node: Node, stack: Node[]): void;
+    output(): any;
+}
+
+/**
+ * 创建节点输出：默认每个节点一个对象，列格式下把各字段写入平行数组，
+ * 避免为每个节点重复键名，位置按 x, y, z 依次展开
+ */
+function createNodeListing(format?: string): NodeListing {
+    if (format === COLUMNS_FORMAT) {
+        const columns = {
+            name: [] as string[],
+            uuid: [] as string[],
+            childCount: [] as number[],
+            active: [] as boolean[],
+            position: [] as number[]
+        };
+        return {
+            get count() {
+                return columns.name.length;
+            },
+            add(node: Node) {
+                columns.name.push(node.name);
+                columns.uuid.push(node.uuid);
+                columns.childCount.push(node.children.length);
+                columns.active.push(node.active);
+                columns.position.push(node.position.x, node.position.y, node.position.z);
+            },
+            output() {
+                return { format: COLUMNS_FORMAT, columns };
+            }
+        };
+    }
+
+    const nodes: Array<any> = [];
+    return {
+        get count() {
+            return nodes.length;
+        },
+        add(node: Node, stack: Node[]) {
+            nodes.push({
+                name: node.name,
+                uuid: node.uuid,
+                path: stack.map((n) => n.name).join('/'),
+                childCount: node.children.length,
+                active: node.active
+            });
+        },
+        output() {
+            return { nodes };
+        }
+    };
+}
+
 /**
  * 计算场景中的节点数量
  * @param node 起始节点
@@ -179,4 +389,306 @@ function collectNodes(node: Node, path: string = ''): Array<any> {
     }
     
     return result;
-} 
\ No newline at end of file
+} 
+
+/**
+ * 解析分页游标
+ * 游标是从场景根节点到下一个节点的子节点下标路径，例如 "0.3.2"，空字符串表示根节点
+ */
+function parseCursor(cursor?: string): number[] {
+    if (!cursor) {
+        return [];
+    }
+    return cursor.split('.').map((part) => {
+        const index = Number(part);
+        if (!Number.isInteger(index) || index < 0) {
+            throw new Error(`无效的分页游标: ${cursor}`);
+        }
+        return index;
+    });
+}
+
+/**
+ * 从游标位置开始按先序遍历收集至多 limit 个节点
+ * 使用下标路径恢复遍历位置，每页的开销与页大小和树深度相关，而不是与偏移量相关
+ * @param scene 场景根节点
+ * @param cursor 下一个节点的下标路径
+ * @param limit 最多返回的节点数量
+ * @param listing 节点输出
+ * @returns 下一页游标，没有更多节点时为 null
+ */
+function collectNodePage(scene: Node, cursor: number[], limit: number, listing: NodeListing): string | null {
+    // stack 为从根到当前节点的节点链，indices 为对应的子节点下标
+    const stack: Node[] = [scene];
+    const indices: number[] = [];
+    for (const index of cursor) {
+        const parent = stack[stack.length - 1];
+        if (index >= parent.children.length) {
+            throw new Error('分页游标已失效，场景结构可能已改变');
+        }
+        stack.push(parent.children[index]);
+        indices.push(index);
+    }
+
+    let done = false;
+    while (!done && listing.count < limit) {
+        const node = stack[stack.length - 1];
+        listing.add(node, stack);
+
+        if (node.children.length > 0) {
+            stack.push(node.children[0]);
+            indices.push(0);
+            continue;
+        }
+
+        // 回溯到下一个存在后续兄弟节点的祖先
+        done = true;
+        while (indices.length > 0) {
+            const index = indices.pop()!;
+            stack.pop();
+            const parent = stack[stack.length - 1];
+            if (index + 1 < parent.children.length) {
+                stack.push(parent.children[index + 1]);
+                indices.push(index + 1);
+                done = false;
+                break;
+            }
+        }
+    }
+
+    return done ? null : indices.join('.');
+}
+
+/**
+ * queryNodes 的查询条件，各条件同时满足才算匹配
+ */
+interface NodeQuery {
+    // 节点路径的 glob，相对于场景根节点（不含场景名），例如 'Canvas/**/Button*'
+    // '*' 匹配一段路径内的任意字符，'?' 匹配单个字符，'**' 匹配任意层级
+    path?: string;
+    // 节点名称的 glob，例如 'Enemy*'
+    name?: string;
+    // 组件类名，例如 'cc.Sprite' 或 'Sprite'
+    component?: string;
+    active?: boolean;
+    // 深度范围，场景根节点的子节点深度为 1
+    minDepth?: number;
+    maxDepth?: number;
+    // 返回的字段，默认为 DEFAULT_QUERY_FIELDS
+    fields?: string[];
+    limit?: number;
+    offset?: number;
+}
+
+interface CompiledQuery {
+    // null 段表示 '**'
+    path: Array<RegExp | null> | null;
+    name: RegExp | null;
+    component: string | null;
+    active: boolean | null;
+    minDepth: number;
+    maxDepth: number;
+}
+
+// 编译后的路径模式中表示 '**'（任意层级）的段
+const ANY_DEPTH = null;
+
+const DEFAULT_QUERY_LIMIT = 100;
+const DEFAULT_QUERY_FIELDS = ['name', 'uuid', 'path'];
+
+// 可投影的字段
+const NODE_FIELDS: { [field: string]: (node: Node, names: string[]) => any } = {
+    name: (node) => node.name,
+    uuid: (node) => node.uuid,
+    path: (node, names) => names.join('/'),
+    depth: (node, names) => names.length - 1,
+    parent: (node) => (node.parent ? node.parent.uuid : null),
+    siblingIndex: (node) => node.getSiblingIndex(),
+    childCount: (node) => node.children.length,
+    active: (node) => node.active,
+    activeInHierarchy: (node) => node.activeInHierarchy,
+    layer: (node) => node.layer,
+    position: (node) => vec3(node.position),
+    worldPosition: (node) => vec3(node.worldPosition),
+    scale: (node) => vec3(node.scale),
+    eulerAngles: (node) => vec3(node.eulerAngles),
+    components: (node) => node.components.map((component: any) => js.getClassName(component))
+};
+
+function vec3(v: Vec3) {
+    return { x: v.x, y: v.y, z: v.z };
+}
+
+/**
+ * 把单段 glob 转换为正则，'*' 不跨越 '/'
+ */
+function globToRegExp(glob: string): RegExp {
+    const source = glob.replace(/[.+^${}()|[\]\\]/g, '\\$&').replace(/\*/g, '[^/]*').replace(/\?/g, '[^/]');
+    return new RegExp(`^${source}$`);
+}
+
+function compileQuery(query: NodeQuery): CompiledQuery {
+    let path: Array<RegExp | null> | null = null;
+    if (query.path) {
+        path = query.path.split('/').filter((segment) => segment.length > 0)
+            .map((segment) => (segment === '**' ? ANY_DEPTH : globToRegExp(segment)));
+    }
+    const component = query.component ? String(query.component) : null;
+    return {
+        path,
+        name: query.name ? globToRegExp(query.name) : null,
+        component: component && !component.includes('.') ? `cc.${component}` : component,
+        active: typeof query.active === 'boolean' ? query.active : null,
+        minDepth: Number(query.minDepth) || 0,
+        maxDepth: query.maxDepth === undefined || query.maxDepth === null ? Infinity : Number(query.maxDepth)
+    };
+}
+
+function resolveFields(fields?: string[]): string[] {
+    if (!fields || fields.length === 0) {
+        return DEFAULT_QUERY_FIELDS;
+    }
+    for (const field of fields) {
+        if (!NODE_FIELDS[field]) {
+            throw new Error(`未知字段 '${field}'，可用字段: ${Object.keys(NODE_FIELDS).join(', ')}`);
+        }
+    }
+    return fields;
+}
+
+/**
+ * 路径段 names[from..] 与模式 patterns[at..] 的匹配结果
+ * 返回 'match' 完全匹配；'prefix' 当前路径还可能是某个匹配路径的前缀，需要继续深入；
+ * 'none' 该子树中不可能有匹配
+ */
+function matchPath(patterns: Array<RegExp | null>, at: number, names: string[], from: number): 'match' | 'prefix' | 'none' {
+    if (from === names.length) {
+        if (at === patterns.length) {
+            return 'match';
+        }
+        // 剩下的模式全部为 '**' 时当前路径已经匹配，但更深的节点也可能匹配
+        return patterns.slice(at).every((p) => p === ANY_DEPTH) ? 'match' : 'prefix';
+    }
+    if (at === patterns.length) {
+        return 'none';
+    }
+    const pattern = patterns[at];
+    if (pattern === ANY_DEPTH) {
+        // '**' 匹配零段，或吞掉当前段后继续作为 '**'
+        const skip = matchPath(patterns, at + 1, names, from);
+        if (skip === 'match') {
+            return 'match';
+        }
+        const consume = matchPath(patterns, at, names, from + 1);
+        return consume === 'match' ? 'match' : (skip === 'prefix' || consume === 'prefix' ? 'prefix' : 'none');
+    }
+    return pattern.test(names[from]) ? matchPath(patterns, at + 1, names, from + 1) : 'none';
+}
+
+function hasComponent(node: Node, className: string): boolean {
+    return node.components.some((component: any) => js.getClassName(component) === className);
+}
+
+/**
+ * 先序遍历场景，对每个匹配节点调用 visit
+ * 超过 maxDepth 或路径模式已不可能匹配的子树直接跳过
+ * @param visit 回调参数 names 为场景名加上从根到该节点的名称
+ */
+function walkMatches(scene: Node, query: CompiledQuery, visit: (node: Node, names: string[]) => void) {
+    const names: string[] = [scene.name];
+
+    const walk = (node: Node) => {
+        const depth = names.length - 1;
+        let state: 'match' | 'prefix' | 'none' = 'match';
+        if (query.path) {
+            state = matchPath(query.path, 0, names, 1);
+            if (state === 'none') {
+                return;
+            }
+        }
+        if (state === 'match' && depth >= query.minDepth && depth >= 1 &&
+            (!query.name || query.name.test(node.name)) &&
+            (query.active === null || node.active === query.active) &&
+            (!query.component || hasComponent(node, query.component))) {
+            visit(node, names);
+        }
+        if (depth >= query.maxDepth) {
+            return;
+        }
+        for (const child of node.children) {
+            names.push(child.name);
+            walk(child);
+            names.pop();
+        }
+    };
+    walk(scene);
+}
+
+/**
+ * 只取出请求的字段
+ */
+function projectNode(node: Node, names: string[], fields: string[]): any {
+    const result: any = {};
+    for (const field of fields) {
+        result[field] = NODE_FIELDS[field](node, names);
+    }
+    return result;
+}
+
+/**
+ * 节点自身的哈希和包含所有子节点的子树哈希
+ */
+interface NodeHash {
+    own: string;
+    tree: string;
+}
+
+// 变换在哈希前保留的小数位，避免浮点误差被当作修改
+const TRANSFORM_PRECISION = 1e4;
+
+function componentNames(node: Node): string[] {
+    return node.components.map((component: any) => js.getClassName(component));
+}
+
+/**
+ * 位置、欧拉角和缩放，依次展开为 9 个数
+ */
+function nodeTransform(node: Node): number[] {
+    const values: number[] = [];
+    for (const v of [node.position, node.eulerAngles, node.scale]) {
+        values.push(v.x, v.y, v.z);
+    }
+    return values.map((value) => Math.round(value * TRANSFORM_PRECISION) / TRANSFORM_PRECISION);
+}
+
+/**
+ * 后序计算子树哈希，结果写入 hashes
+ * @returns 子树哈希
+ */
+function hashSubtree(node: Node, hashes: Map<Node, NodeHash>): string {
+    const own = hashString([node.uuid, node.name, node.active ? 1 : 0,
+        componentNames(node).join(','), nodeTransform(node).join(',')].join('|'));
+    let children = '';
+    for (const child of node.children) {
+        children += hashSubtree(child, hashes) + ',';
+    }
+    const tree = hashString(`${own}:${children}`);
+    hashes.set(node, { own, tree });
+    return tree;
+}
+
+/**
+ * 53 位字符串哈希（cyrb53），以 36 进制返回
+ */
+function hashString(text: string): string {
+    let h1 = 0xdeadbeef;
+    let h2 = 0x41c6ce57;
+    for (let i = 0; i < text.length; i++) {
+        const ch = text.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return (4294967296 * (2097151 & h2) + (h1 >>> 0)).toString(36);
+}
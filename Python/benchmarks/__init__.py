@@ -0,0 +1,5 @@
+"""
+Benchmarks for the Cocos Creator bridge.
+
+Run from the ``Python`` directory, e.g. ``python -m benchmarks.bench_batch``.
+"""
@@ -0,0 +1,71 @@
+"""
+Compare N separate round trips with one BATCH round trip.
+
+The fake editor adds a configurable network round-trip time to every request
+and a configurable execute-scene-script hop to every scene command, grouping
+adjacent scene commands of a batch into one hop like LogBridge does.
+
+Usage:
+    python -m benchmarks.bench_batch [--rtt-ms 2] [--hop-ms 5] [--rounds 50]
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from cocos_connection import CocosConnection
+from benchmarks.fake_editor import FakeEditor
+
+INSPECTION_SEQUENCE = [
+    {"type": "GET_SCENE_INFO"},
+    {"type": "LIST_SCENE_NODES"},
+    {"type": "QUERY_LOGS", "params": {"show_logs": False}},
+]
+
+
+def measure(rounds: int, fn) -> list:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    parser.add_argument("--hop-ms", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    editor = FakeEditor(log_count=100, node_count=50, rtt=args.rtt_ms / 1000,
+                        scene_hop=args.hop_ms / 1000)
+    conn = CocosConnection(host=editor.host, port=editor.start())
+    if not conn.connect():
+        raise SystemExit("Could not connect to the fake editor")
+
+    def separate():
+        for command in INSPECTION_SEQUENCE:
+            conn.send_command(command["type"], command.get("params"))
+
+    def batched():
+        conn.send_batch(INSPECTION_SEQUENCE)
+
+    report = {}
+    for name, fn in (("separate", separate), ("batch", batched)):
+        samples = measure(args.rounds, fn)
+        report[name] = {
+            "mean_ms": round(statistics.mean(samples), 3),
+            "p50_ms": round(statistics.median(samples), 3),
+            "max_ms": round(max(samples), 3),
+        }
+    report["saved_ms"] = round(report["separate"]["mean_ms"] - report["batch"]["mean_ms"], 3)
+    print(json.dumps(report, indent=2))
+    conn.disconnect()
+    editor.stop()
+
+
+if __name__ == "__main__":
+    main()
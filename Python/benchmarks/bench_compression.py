@@ -0,0 +1,86 @@
+"""
+Compare raw and zlib-compressed frames for small and large bridge responses.
+
+Runs the same requests against a fake editor in a child process once with
+compression disabled and once negotiated: ``ping`` (far below the
+threshold, so only negotiation overhead is measured), a full
+``LIST_SCENE_NODES`` listing of a large scene in one response (several
+megabytes of JSON) and the same listing streamed page by page.  Reports
+median latency and bytes received per request.
+
+Usage:
+    python -m benchmarks.bench_compression [--nodes 30000] [--rounds 10] [--pings 500]
+        [--threshold 65536] [--level 1]
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, Any, Callable
+
+from config import config
+from metrics import metrics
+from cocos_connection import CocosConnection
+from benchmarks.bench_suite import FakeEditorProcess
+
+
+def measure(rounds: int, fn: Callable[[], Any]) -> Dict[str, float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(statistics.median(samples), 3), "max_ms": round(max(samples), 3)}
+
+
+def run_mode(port: int, compression: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    config.compression = compression
+    conn = CocosConnection(host="::1", port=port)
+    if not conn.connect():
+        raise SystemExit("Could not connect to the fake editor")
+
+    def full_listing():
+        conn.send_command("LIST_SCENE_NODES")
+
+    def streamed_listing():
+        for _ in conn.stream_command("LIST_SCENE_NODES", {"page_size": config.stream_page_size}):
+            pass
+
+    report: Dict[str, Any] = {"negotiated": conn.compression}
+    for name, command, rounds, fn in (
+            ("ping", "ping", args.pings, lambda: conn.send_command("ping")),
+            ("list_nodes", "LIST_SCENE_NODES", args.rounds, full_listing),
+            ("list_nodes_stream", "LIST_SCENE_NODES", args.rounds, streamed_listing)):
+        metrics.reset()
+        result = measure(rounds, fn)
+        stats = metrics.snapshot()["commands"][command]
+        result["bytes_received"] = stats["bytes_received"] // max(1, stats["requests"])
+        result["parse_ms_p50"] = stats["parse_ms"]["p50"]
+        report[name] = result
+    conn.disconnect()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=30000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--pings", type=int, default=500)
+    parser.add_argument("--threshold", type=int, default=config.compression_threshold)
+    parser.add_argument("--level", type=int, default=config.compression_level)
+    args = parser.parse_args()
+
+    config.compression_threshold = args.threshold
+    config.compression_level = args.level
+    with FakeEditorProcess(["--logs", "100", "--nodes", str(args.nodes)]) as editor:
+        report = {mode: run_mode(editor.port, mode == "zlib", args) for mode in ("raw", "zlib")}
+
+    raw, compressed = report["raw"], report["zlib"]
+    report["ratio"] = {name: round(raw[name]["bytes_received"] / max(1, compressed[name]["bytes_received"]), 2)
+                       for name in ("list_nodes", "list_nodes_stream")}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
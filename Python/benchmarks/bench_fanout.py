@@ -0,0 +1,117 @@
+"""
+Scatter-gather across several fake editors.
+
+Starts ``--editors`` fake editors in child processes, each with its own
+simulated round-trip time (``--rtt-ms`` plus ``--rtt-step-ms`` per editor),
+registers them under the names ``editor0``, ``editor1``, ... and queries
+logs and scene info across all of them, once concurrently through
+``EditorRegistry.gather`` and once one editor after the other.  One extra
+name points at a port nobody listens on, so every round also exercises
+partial-failure reporting.  Reports median wall time per round and the
+per-editor timings of the last concurrent round.
+
+Usage:
+    python -m benchmarks.bench_fanout [--editors 4] [--rounds 20] [--rtt-ms 5] [--rtt-step-ms 5]
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Dict, Any, List, Callable, Awaitable
+
+from config import config
+from editor_registry import EditorRegistry
+import editor_registry
+from tools import log_tools
+from benchmarks.bench_suite import FakeEditorProcess
+
+UNREACHABLE = "unreachable"
+
+
+def free_port() -> int:
+    """A local port that nothing listens on once this returns."""
+    with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as sock:
+        sock.bind(("::1", 0))
+        return sock.getsockname()[1]
+
+
+async def fetch_scene_info(registry: EditorRegistry, name: str) -> Dict[str, Any]:
+    return await registry.connection(name).send_command_async("GET_SCENE_INFO", {})
+
+
+async def measure(rounds: int, fn: Callable[[], Awaitable[Any]]) -> Dict[str, float]:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(statistics.median(samples), 3), "max_ms": round(max(samples), 3)}
+
+
+async def run(registry: EditorRegistry, names: List[str], rounds: int) -> Dict[str, Any]:
+    async def query_logs(name: str) -> Dict[str, Any]:
+        return await log_tools.query_logs(None, limit=50, newest_first=True, editor=name)
+
+    async def sequential(call: Callable[[str], Awaitable[Dict[str, Any]]]) -> None:
+        for name in names:
+            await registry._timed(name, call, config.fanout_timeout)
+
+    # 预热：建立连接并完成首次日志全量同步
+    await registry.gather(query_logs, names)
+
+    report: Dict[str, Any] = {}
+    for label, call in (("query_logs", query_logs),
+                        ("scene_info", lambda name: fetch_scene_info(registry, name))):
+        report[label] = {
+            "concurrent": await measure(rounds, lambda: registry.gather(call, names)),
+            "sequential": await measure(rounds, lambda: sequential(call)),
+        }
+    last = await log_tools.query_logs_all_editors(None, names, limit=50, newest_first=True)
+    report["last_round"] = {
+        "elapsed_ms": last["elapsed_ms"],
+        "failed": last["failed"],
+        "editors": {name: {key: value for key, value in outcome.items() if key != "result"}
+                    for name, outcome in last["editors"].items()},
+        "merged_logs": len(last["logs"]),
+    }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--editors", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--logs", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=5.0)
+    parser.add_argument("--rtt-step-ms", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=2.0, help="Per-editor fan-out timeout")
+    args = parser.parse_args()
+
+    config.fanout_timeout = args.timeout
+    # 不可达的编辑器只测量失败报告，不等待熔断后的重试
+    config.max_retries = 0
+    config.log_history_enabled = False
+    # 每次查询都向编辑器增量同步，而不是直接使用本地镜像
+    config.log_sync_interval = 0
+    with ExitStack() as stack:
+        endpoints = {}
+        for i in range(args.editors):
+            rtt = args.rtt_ms + i * args.rtt_step_ms
+            editor = stack.enter_context(FakeEditorProcess(["--logs", str(args.logs), "--rtt-ms", str(rtt)]))
+            endpoints[f"editor{i}"] = f"::1:{editor.port}"
+        endpoints[UNREACHABLE] = f"::1:{free_port()}"
+        registry = editor_registry._registry = EditorRegistry(endpoints)
+        names = [name for name in registry.names() if name != registry.default]
+        try:
+            report = asyncio.run(run(registry, names, args.rounds))
+        finally:
+            registry.disconnect()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
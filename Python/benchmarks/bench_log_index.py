@@ -0,0 +1,90 @@
+"""
+Compare indexed log queries with the linear scan used by LogBridge.
+
+Builds synthetic console histories, indexes them with LogIndex and runs a set
+of typical ``query_logs`` filters both ways, checking that the results match.
+
+Usage:
+    python -m benchmarks.bench_log_index [--sizes 10000,100000,1000000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from log_index import LogIndex
+from log_mirror import build_filters, matches_filters
+
+MODULES = ["Scene", "Assets", "Builder", "Preview", "Engine", "Animation", "Physics", "UI"]
+WORDS = ["load", "asset", "texture", "missing", "failed", "compile", "script", "node", "prefab",
+         "update", "render", "material", "shader", "import", "timeout", "success", "warning",
+         "component", "reference", "null", "buffer", "memory", "frame", "camera"]
+
+QUERIES = [
+    {"show_logs": False, "show_warnings": False},
+    {"module_filter": "Physics"},
+    {"search_term": "texture"},
+    {"search_term": "fail tex"},
+    {"search_term": "shader", "module_filter": "Engine", "show_logs": False},
+    {"search_term": "uuid-00042"},
+]
+
+
+def make_entries(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    types = ["log"] * 7 + ["warn"] * 2 + ["error"]
+    entries = []
+    for i in range(count):
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 10)))
+        message = f"[{rng.choice(MODULES)}] {words} uuid-{rng.randint(0, 99999):05d}"
+        entries.append({"type": rng.choice(types), "message": message, "date": i})
+    return entries
+
+
+def scan(entries, query):
+    types, module_pattern, terms = build_filters(**query)
+    return [entry for entry in entries if matches_filters(entry, types, module_pattern, terms)]
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = []
+    for size in (int(s) for s in args.sizes.split(",")):
+        entries = make_entries(size)
+        index = LogIndex()
+        started = time.perf_counter()
+        index.on_append(entries)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        for query in QUERIES:
+            expected = scan(entries, query)
+            if index.query(**query) != expected:
+                raise SystemExit(f"Index result mismatch for {query} at {size} entries")
+            report.append({
+                "entries": size,
+                "query": query,
+                "matches": len(expected),
+                "scan_ms": round(timed(lambda: scan(entries, query), args.repeat), 3),
+                "index_ms": round(timed(lambda: index.query(**query), args.repeat), 3),
+                "index_build_ms": round(build_ms, 1),
+            })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
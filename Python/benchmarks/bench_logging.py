@@ -0,0 +1,168 @@
+"""
+Per-request cost of the server's own logging, before and after logging_setup.
+
+"before" replays the log statements a ``list_scene_nodes`` request used to
+make -- eager f-strings of the full params and response at INFO, written
+synchronously by the ``logging.basicConfig`` file handler.  "after" makes
+the statements the request makes now: lazy ``%s`` arguments, ``preview()``
+of the payloads at DEBUG, records handed to the queue listener thread.
+Both write to a temporary log file; the time is what the request thread
+spends in logging, for responses of ``--sizes`` nodes.  "after (DEBUG)"
+enables the payload previews.
+
+With ``--e2e`` it also measures whole ``list_scene_nodes`` requests against
+the fake editor with logging configured by ``setup_logging`` and with
+logging disabled.
+
+Usage:
+    python -m benchmarks.bench_logging [--sizes 10,1000,10000] [--requests 200] [--e2e]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, Any, List, Callable
+
+from config import config
+from logging_setup import preview, setup_logging, shutdown_logging, logging_stats
+
+logger = logging.getLogger("CocosMCP")
+
+
+def scene_response(nodes: int) -> Dict[str, Any]:
+    return {"success": True, "data": {
+        "nodes": [{"name": f"Node{i}", "uuid": f"uuid-{i:08d}", "childCount": i % 4, "active": True,
+                   "position": {"x": i * 1.5, "y": i * 0.5, "z": 0.0}} for i in range(nodes)],
+        "nextCursor": None}}
+
+
+def before_request(params: Dict[str, Any], response: Dict[str, Any]) -> None:
+    # 原来 list_scene_nodes 一次请求的日志语句
+    logging.info("向Cocos Creator发送列出场景节点命令")
+    logger.info(f"Sending command: LIST_SCENE_NODES with params: {params}")
+    logger.info(f"Received complete response ({4096} bytes)")
+    logger.debug(f"Command result: {response}")
+    logging.info(f"Cocos Creator响应: {response}")
+
+
+def after_request(params: Dict[str, Any], response: Dict[str, Any]) -> None:
+    logging.info("向Cocos Creator发送列出场景节点命令")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Sending command: %s with params: %s", "LIST_SCENE_NODES", preview(params))
+    logger.debug("Received complete response (%d bytes)", 4096)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Command result: %s", preview(response))
+        logging.debug("Cocos Creator响应: %s", preview(response))
+
+
+def configure_before(path: str) -> None:
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    handler = logging.FileHandler(path, mode="a", encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+
+def configure_after(path: str, level: str) -> None:
+    config.log_file = path
+    config.log_level = level
+    setup_logging(force=True)
+
+
+def measure(request: Callable[[Dict[str, Any], Dict[str, Any]], None], response: Dict[str, Any],
+            requests: int) -> Dict[str, Any]:
+    params = {"limit": len(response["data"]["nodes"])}
+    samples: List[float] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        request(params, response)
+        samples.append((time.perf_counter() - started) * 1e6)
+    return {"p50_us": round(statistics.median(samples), 1), "max_us": round(max(samples), 1)}
+
+
+def log_bytes(path: str) -> int:
+    # 等队列写完再统计文件大小
+    shutdown_logging()
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+    return os.path.getsize(path) if os.path.exists(path) else 0
+
+
+def run_micro(args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for size in args.sizes:
+        response = scene_response(size)
+        row: Dict[str, Any] = {}
+        for name, configure, request in (
+                ("before", configure_before, before_request),
+                ("after", lambda path: configure_after(path, "INFO"), after_request),
+                ("after (DEBUG)", lambda path: configure_after(path, "DEBUG"), after_request)):
+            path = os.path.join(workdir, f"{size}-{name.replace(' ', '_')}.log")
+            configure(path)
+            result = measure(request, response, args.requests)
+            stats = logging_stats()
+            result["bytes_per_request"] = log_bytes(path) // args.requests
+            if stats["dropped_queue_full"]:
+                result["dropped_queue_full"] = stats["dropped_queue_full"]
+            row[name] = result
+        report[f"{size} nodes"] = row
+    return report
+
+
+def run_e2e(args: argparse.Namespace, workdir: str) -> Dict[str, Any]:
+    from connection_pool import ConnectionPool
+    from tools.scene_tools import SceneTools
+    from benchmarks.bench_suite import FakeEditorProcess
+
+    size = max(args.sizes)
+
+    async def measure_tool(scene_tools: SceneTools) -> Dict[str, Any]:
+        report: Dict[str, Any] = {}
+        for name, disabled in (("logging", False), ("logging disabled", True)):
+            configure_after(os.path.join(workdir, "e2e.log"), "INFO")
+            logging.disable(logging.CRITICAL if disabled else logging.NOTSET)
+            samples = []
+            for _ in range(max(10, args.requests // 10)):
+                started = time.perf_counter()
+                result = await scene_tools.list_scene_nodes(limit=size)
+                samples.append((time.perf_counter() - started) * 1000)
+                assert result.get("success") is not False, result
+            report[name] = {"p50_ms": round(statistics.median(samples), 3)}
+        logging.disable(logging.NOTSET)
+        return report
+
+    with FakeEditorProcess(["--logs", "10", "--nodes", str(size)]) as editor:
+        pool = ConnectionPool(port=editor.port)
+        try:
+            report = asyncio.run(measure_tool(SceneTools(pool)))
+        finally:
+            pool.disconnect()
+    return {f"list_scene_nodes, {size} nodes": report}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[10, 1000, 10000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--e2e", action="store_true", help="Also time whole requests against the fake editor")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        report = {"per_request_logging": run_micro(args, workdir)}
+        if args.e2e:
+            report["end_to_end"] = run_e2e(args, workdir)
+        shutdown_logging()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
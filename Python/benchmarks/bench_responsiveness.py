@@ -0,0 +1,137 @@
+"""
+Responsiveness of the MCP server while slow scene commands are running.
+
+Starts a fake editor whose scene commands take ``--hop-ms`` (a slow
+``execute-scene-script``) and calls the tools through a real ``FastMCP``
+instance, the way the MCP client does.  While ``--scene-calls`` slow scene
+tool calls are in flight, ``connection_status(refresh=True)`` pings the
+editor every few milliseconds; its latency should stay at the round-trip
+time.  For comparison the same is measured with a blocking ``open_scene``
+registered as a plain sync tool, which is how the scene tools used to run:
+FastMCP calls sync tools on the event loop, so every other request waits
+for the slow call.
+
+Also checks that a tool call past its timeout returns an error result, and
+that cancelling a tool call (as the MCP client does when it aborts a
+request) releases its concurrency slot.
+
+Usage:
+    python -m benchmarks.bench_responsiveness [--hop-ms 1000] [--scene-calls 4]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, Any, List
+
+from mcp.server.fastmcp import FastMCP
+
+from config import config
+from cocos_connection import CocosConnection
+import editor_registry
+from editor_registry import EditorRegistry
+from tools import register_all_tools
+from benchmarks.bench_suite import FakeEditorProcess
+
+
+async def status_latencies(mcp: FastMCP, until: "asyncio.Future") -> List[float]:
+    """connection_status latencies (ms), measured at least once and then until ``until`` completes."""
+    samples = []
+    while True:
+        started = time.perf_counter()
+        await mcp.call_tool("connection_status", {"refresh": True})
+        samples.append((time.perf_counter() - started) * 1000)
+        if until.done():
+            return samples
+        await asyncio.sleep(0.01)
+
+
+def summary(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"samples": 0}
+    return {"samples": len(samples), "p50_ms": round(statistics.median(samples), 3),
+            "max_ms": round(max(samples), 3)}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    mcp = FastMCP("bench")
+    register_all_tools(mcp)
+    pool = editor_registry.get_editor_registry().connection()
+    # 建立连接，避免把首次连接计入延迟
+    await mcp.call_tool("connection_status", {"refresh": True})
+    report: Dict[str, Any] = {}
+
+    # 1. 协程工具：慢场景调用进行中时查询连接状态
+    started = time.perf_counter()
+    scene_calls = asyncio.ensure_future(asyncio.gather(*(
+        mcp.call_tool("open_scene", {"scene_uuid": f"scene-{i}"}) for i in range(args.scene_calls))))
+    latencies = await status_latencies(mcp, scene_calls)
+    await scene_calls
+    report["async_tools"] = {
+        "scene_calls_ms": round((time.perf_counter() - started) * 1000, 3),
+        "connection_status": summary(latencies),
+        "concurrency": pool.stats()["concurrency"]["scene"],
+    }
+
+    # 2. 原来的方式：同步工具在事件循环上阻塞调用
+    blocking = FastMCP("blocking")
+
+    conn = CocosConnection(port=pool.port)
+
+    @blocking.tool(name="open_scene_blocking")
+    def open_scene_blocking(scene_uuid: str = "") -> Dict[str, Any]:
+        conn.send_command("OPEN_SCENE", {"sceneUuid": scene_uuid})
+        return {"success": True}
+
+    register_all_tools(blocking)
+    started = time.perf_counter()
+    blocked_call = asyncio.ensure_future(blocking.call_tool("open_scene_blocking", {"scene_uuid": "scene-x"}))
+    latencies = await status_latencies(blocking, blocked_call)
+    await blocked_call
+    conn.disconnect()
+    report["blocking_tool"] = {
+        "scene_call_ms": round((time.perf_counter() - started) * 1000, 3),
+        "connection_status": summary(latencies),
+    }
+
+    # 3. 超时：结果为错误而不是一直等待
+    config.tool_timeouts["get_scene_info"] = args.hop_ms / 4000
+    started = time.perf_counter()
+    result = await mcp.call_tool("get_scene_info", {})
+    report["timeout"] = {"elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+                         "result": json.loads(result[0].text)}
+    del config.tool_timeouts["get_scene_info"]
+
+    # 4. 取消：释放并发名额，其他调用不受影响
+    call = asyncio.ensure_future(mcp.call_tool("list_scene_nodes", {"limit": 5}))
+    await asyncio.sleep(args.hop_ms / 4000)
+    active_before = pool.stats()["concurrency"]["scene"]["active"]
+    call.cancel()
+    await asyncio.gather(call, return_exceptions=True)
+    report["cancel"] = {"active_before": active_before,
+                        "active_after": pool.stats()["concurrency"]["scene"]["active"]}
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--hop-ms", type=float, default=1000.0, help="Duration of every scene command")
+    parser.add_argument("--scene-calls", type=int, default=4)
+    args = parser.parse_args()
+
+    config.log_history_enabled = False
+    config.heartbeat_interval = 0
+    with FakeEditorProcess(["--logs", "100", "--hop-ms", str(args.hop_ms)]) as editor:
+        config.cocos_port = editor.port
+        registry = editor_registry._registry = EditorRegistry()
+        try:
+            report = asyncio.run(run(args))
+        finally:
+            registry.disconnect()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Cost of finding what changed in a scene: snapshot_scene/diff_scene vs. full listings.
+
+"full listing" fetches every node with the fields the diff compares
+(``QUERY_SCENE_NODES``) before and after the edit and compares the two
+listings by uuid.  "snapshot" takes a ``SceneSnapshots`` snapshot after the
+edit (the previous snapshot's subtree hashes are sent along, so unchanged
+subtrees are not transferred) and diffs it against the previous one.  Each
+round edits the fake editor's scene (``FAKE_EDIT_SCENE``: ``--modify`` moved
+nodes, ``--add`` new nodes, ``--remove`` removed subtrees); bytes are what
+the editor sent, times include the fake editor's work, whose hashing is
+pure Python and slower than the scene script's.
+
+Usage:
+    python -m benchmarks.bench_scene_diff [--nodes 10000] [--rounds 5] [--modify 5] [--add 3] [--remove 2]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, Any, List
+
+from connection_pool import ConnectionPool
+from scene_snapshots import SceneSnapshots, diff
+from benchmarks.bench_suite import FakeEditorProcess
+
+FIELDS = ["uuid", "name", "parent", "siblingIndex", "active", "components", "position", "eulerAngles", "scale"]
+
+
+async def bytes_out(pool: ConnectionPool) -> int:
+    return (await pool.send_command_async("FAKE_STATS"))["bytes_out"]
+
+
+async def full_listing(pool: ConnectionPool, nodes: int) -> Dict[str, Dict[str, Any]]:
+    result = await pool.send_command_async("QUERY_SCENE_NODES", {"fields": FIELDS, "limit": nodes * 2})
+    return {node["uuid"]: node for node in result["data"]["nodes"]}
+
+
+def compare_listings(before: Dict[str, Dict[str, Any]], after: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    return {
+        "added": sum(1 for uuid in after if uuid not in before),
+        "removed": sum(1 for uuid in before if uuid not in after),
+        "modified": sum(1 for uuid, node in after.items() if uuid in before and before[uuid] != node),
+    }
+
+
+def summary(samples: List[float]) -> float:
+    return round(statistics.median(samples), 3)
+
+
+async def run(args: argparse.Namespace, port: int) -> Dict[str, Any]:
+    pool = ConnectionPool(port=port)
+    snapshots = SceneSnapshots()
+    edit = {"modify": args.modify, "add": args.add, "remove": args.remove}
+    try:
+        listing = await full_listing(pool, args.nodes)
+        started, sent = time.perf_counter(), await bytes_out(pool)
+        previous = await snapshots.take(pool)
+        first = {"ms": round((time.perf_counter() - started) * 1000, 3),
+                 "bytes": await bytes_out(pool) - sent}
+
+        full_ms, full_bytes, snap_ms, snap_bytes, diff_ms, visited, transferred = [], [], [], [], [], [], []
+        for _ in range(args.rounds):
+            await pool.send_command_async("FAKE_EDIT_SCENE", edit)
+
+            started, sent = time.perf_counter(), await bytes_out(pool)
+            current = await full_listing(pool, args.nodes)
+            compare_listings(listing, current)
+            full_ms.append((time.perf_counter() - started) * 1000)
+            full_bytes.append(await bytes_out(pool) - sent)
+            listing = current
+
+            started, sent = time.perf_counter(), await bytes_out(pool)
+            snapshot = await snapshots.take(pool)
+            snap_bytes.append(await bytes_out(pool) - sent)
+            diff_started = time.perf_counter()
+            result = diff(previous, snapshot)
+            diff_ms.append((time.perf_counter() - diff_started) * 1000)
+            snap_ms.append((time.perf_counter() - started) * 1000)
+            visited.append(result["visited_nodes"])
+            transferred.append(snapshot.transferred)
+            previous = snapshot
+        return {
+            "nodes": len(previous.nodes),
+            "edit": edit,
+            "full listing": {"p50_ms": summary(full_ms), "p50_bytes": int(statistics.median(full_bytes))},
+            "snapshot": {"first_snapshot": first, "p50_ms": summary(snap_ms),
+                         "p50_bytes": int(statistics.median(snap_bytes)),
+                         "p50_transferred_nodes": int(statistics.median(transferred)),
+                         "p50_diff_ms": summary(diff_ms),
+                         "p50_visited_nodes": int(statistics.median(visited))},
+            "last_diff_summary": result["summary"],
+        }
+    finally:
+        pool.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--modify", type=int, default=5)
+    parser.add_argument("--add", type=int, default=3)
+    parser.add_argument("--remove", type=int, default=2)
+    args = parser.parse_args()
+
+    with FakeEditorProcess(["--logs", "10", "--nodes", str(args.nodes)]) as editor:
+        report = asyncio.run(run(args, editor.port))
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
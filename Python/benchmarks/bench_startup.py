@@ -0,0 +1,133 @@
+"""
+Measure MCP server startup: time from process launch to the first tools/list response.
+
+Launches ``server.py`` over stdio the way an MCP client does, sends
+``initialize`` and ``tools/list`` right away and records when each response
+arrives.  Every run is repeated for three editor conditions:
+
+- ``editor``:    the fake editor is listening
+- ``refused``:   nothing listens on the port (connection refused at once)
+- ``blackhole``: the host does not answer at all, so a blocking connect
+  waits for ``connection_timeout``
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--modes editor,refused,blackhole]
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+from benchmarks.bench_suite import FakeEditorProcess
+
+# TEST-NET 文档地址段，不会有主机应答
+BLACKHOLE_HOST = "2001:db8::1"
+
+# 子进程中修改配置后再以 __main__ 运行 server.py
+BOOTSTRAP = (
+    "import os, runpy, sys\n"
+    "from config import config\n"
+    "config.cocos_host = sys.argv[1]\n"
+    "config.cocos_port = int(sys.argv[2])\n"
+    "config.log_file = os.devnull\n"
+    "runpy.run_path('server.py', run_name='__main__')\n"
+)
+
+REQUESTS = [
+    {"jsonrpc": "2.0", "id": 1, "method": "initialize",
+     "params": {"protocolVersion": "2024-11-05", "capabilities": {},
+                "clientInfo": {"name": "bench_startup", "version": "1.0"}}},
+    {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+]
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as sock:
+        sock.bind(("::1", 0))
+        return sock.getsockname()[1]
+
+
+def launch(host: str, port: int, timeout: float) -> Dict[str, Any]:
+    """Start the server once; returns milliseconds to the initialize and tools/list responses."""
+    python_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", BOOTSTRAP, host, str(port)],
+        cwd=python_dir, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL, text=True)
+    result: Dict[str, Any] = {"initialize_ms": None, "tools_list_ms": None, "tools": 0}
+    try:
+        # 客户端不等待服务器就绪，启动后立即发送请求
+        for request in REQUESTS:
+            process.stdin.write(json.dumps(request) + "\n")
+        process.stdin.flush()
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            line = process.stdout.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            elapsed = round((time.perf_counter() - started) * 1000, 1)
+            if message.get("id") == 1:
+                result["initialize_ms"] = elapsed
+            elif message.get("id") == 2:
+                result["tools_list_ms"] = elapsed
+                result["tools"] = len(message.get("result", {}).get("tools", []))
+                break
+    finally:
+        process.stdin.close()
+        try:
+            process.wait(5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    return result
+
+
+def summarize(samples: List[Optional[float]]) -> Dict[str, Any]:
+    values = sorted(value for value in samples if value is not None)
+    if not values:
+        return {"median": None, "min": None, "max": None, "failures": len(samples)}
+    return {"median": round(statistics.median(values), 1), "min": values[0], "max": values[-1],
+            "failures": len(samples) - len(values)}
+
+
+def run_mode(mode: str, runs: int, timeout: float) -> Dict[str, Any]:
+    results = []
+    if mode == "editor":
+        with FakeEditorProcess(["--logs", "100", "--nodes", "50"]) as editor:
+            for _ in range(runs):
+                results.append(launch("::1", editor.port, timeout))
+    else:
+        host = BLACKHOLE_HOST if mode == "blackhole" else "::1"
+        port = 6400 if mode == "blackhole" else free_port()
+        for _ in range(runs):
+            results.append(launch(host, port, timeout))
+    return {
+        "initialize_ms": summarize([r["initialize_ms"] for r in results]),
+        "tools_list_ms": summarize([r["tools_list_ms"] for r in results]),
+        "tools": results[-1]["tools"] if results else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="editor,refused,blackhole")
+    parser.add_argument("--timeout", type=float, default=60.0,
+                        help="Give up on a run after this many seconds")
+    args = parser.parse_args()
+
+    report = {mode: run_mode(mode, args.runs, args.timeout) for mode in args.modes.split(",")}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
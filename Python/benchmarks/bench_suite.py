@@ -0,0 +1,280 @@
+"""
+Benchmark suite driving the connection layer and MCP tools against a fake editor.
+
+Starts ``benchmarks.fake_editor`` in a child process (so its allocations do
+not count towards the client's peak memory), runs each scenario for a
+number of iterations and reports latency percentiles, throughput, bytes
+transferred per operation and the client's peak traced memory.
+
+``--output`` writes the report as JSON; ``--compare`` reads such a baseline
+and flags scenarios whose p50/p99 latency or throughput regressed by more
+than ``--threshold`` percent (exit status 1 with ``--fail-on-regression``).
+
+Usage:
+    python -m benchmarks.bench_suite [--iterations 200] [--logs 5000] [--nodes 2000]
+        [--rtt-ms 0] [--hop-ms 0] [--scenarios ping,get_scene_info]
+        [--output baseline.json] [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, Any, List, Callable, Awaitable, Optional
+
+from config import config
+from cocos_connection import CocosConnection, AsyncCocosConnection
+from benchmarks.bench_batch import INSPECTION_SEQUENCE
+
+BASELINE_VERSION = 1
+
+
+class FakeEditorProcess:
+    """Run the fake editor in a child process."""
+
+    def __init__(self, args: List[str]) -> None:
+        self.args = args
+        self.process: Optional[subprocess.Popen] = None
+        self.port = 0
+
+    def __enter__(self) -> "FakeEditorProcess":
+        python_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_editor", "--port", "0", *self.args],
+            cwd=python_dir, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line.startswith("listening "):
+            self.process.kill()
+            raise SystemExit(f"Fake editor failed to start: {line!r}")
+        self.port = int(line.split()[1])
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.process.terminate()
+        self.process.wait(5)
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of pre-sorted samples."""
+    index = min(len(sorted_samples) - 1, max(0, int(round(fraction * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+class Scenario:
+    """A named operation; ``ops`` is the number of requests one call performs."""
+
+    def __init__(self, name: str, fn: Callable[[], Awaitable[Any]], ops: int = 1) -> None:
+        self.name = name
+        self.fn = fn
+        self.ops = ops
+
+
+class Suite:
+    def __init__(self, args: argparse.Namespace, port: int) -> None:
+        self.args = args
+        self.port = port
+        self.conn = CocosConnection(host=config.cocos_host, port=port)
+        self.async_conn: Optional[AsyncCocosConnection] = None
+        self.mcp = None
+
+    async def setup(self) -> None:
+        if not self.conn.connect():
+            raise SystemExit("Could not connect to the fake editor")
+        self.async_conn = AsyncCocosConnection(config.cocos_host, self.port)
+        # MCP 工具通过全局连接池访问编辑器
+        config.cocos_port = self.port
+        from mcp.server.fastmcp import FastMCP
+        from tools import register_all_tools
+        self.mcp = FastMCP("cocos-mcp-bench")
+        register_all_tools(self.mcp)
+
+    async def teardown(self) -> None:
+        self.conn.disconnect()
+        if self.async_conn:
+            self.async_conn.close()
+        from cocos_connection import get_cocos_connection
+        get_cocos_connection().disconnect()
+
+    def fake_stats(self) -> Dict[str, Any]:
+        return self.conn.send_command("FAKE_STATS")
+
+    def scenarios(self) -> List[Scenario]:
+        conn = self.conn
+        concurrency = self.args.concurrency
+        state: Dict[str, Any] = {}
+
+        def sync(fn: Callable[[], Any]) -> Callable[[], Awaitable[Any]]:
+            async def run():
+                return fn()
+            return run
+
+        def incremental_logs():
+            params = {"since": state.get("next_seq", 0)}
+            if "epoch" in state:
+                params["epoch"] = state["epoch"]
+            result = conn.send_command("QUERY_LOGS", params)
+            state["epoch"], state["next_seq"] = result["epoch"], result["next_seq"]
+
+        async def concurrent_pings():
+            await asyncio.gather(*(self.async_conn.send_command("ping") for _ in range(concurrency)))
+
+        async def tool(name: str, arguments: Dict[str, Any]):
+            return await self.mcp.call_tool(name, arguments)
+
+        return [
+            Scenario("ping", sync(lambda: conn.send_command("ping"))),
+            Scenario("get_scene_info", sync(lambda: conn.send_command("GET_SCENE_INFO"))),
+            Scenario("query_logs_full", sync(lambda: conn.send_command("QUERY_LOGS", {}))),
+            Scenario("query_logs_incremental", sync(incremental_logs)),
+            Scenario("list_scene_nodes", sync(lambda: conn.send_command("LIST_SCENE_NODES", {}))),
+            Scenario("list_scene_nodes_columns",
+                     sync(lambda: conn.send_command("LIST_SCENE_NODES", {"format": "columns"}))),
+            Scenario("stream_scene_nodes",
+                     sync(lambda: sum(1 for _ in conn.stream_command(
+                         "LIST_SCENE_NODES", {"page_size": config.stream_page_size})))),
+            Scenario("batch_inspection", sync(lambda: conn.send_batch(INSPECTION_SEQUENCE))),
+            Scenario("async_ping_concurrent", concurrent_pings, ops=concurrency),
+            Scenario("tool_query_logs", lambda: tool("query_logs", {"limit": 100})),
+            Scenario("tool_get_scene_info", lambda: tool("get_scene_info", {})),
+            Scenario("tool_list_scene_nodes", lambda: tool("list_scene_nodes", {})),
+        ]
+
+    async def run_scenario(self, scenario: Scenario) -> Dict[str, Any]:
+        for _ in range(self.args.warmup):
+            await scenario.fn()
+
+        self.conn.send_command("FAKE_RESET_STATS")
+        samples = []
+        started = time.perf_counter()
+        for _ in range(self.args.iterations):
+            begin = time.perf_counter()
+            await scenario.fn()
+            samples.append((time.perf_counter() - begin) * 1000)
+        elapsed = time.perf_counter() - started
+        stats = self.fake_stats()
+
+        # 单独测量内存，避免 tracemalloc 的开销影响延迟
+        tracemalloc.start()
+        for _ in range(self.args.memory_iterations):
+            await scenario.fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        samples.sort()
+        calls = self.args.iterations
+        return {
+            "iterations": calls,
+            "ops_per_call": scenario.ops,
+            "latency_ms": {
+                "mean": round(statistics.mean(samples), 4),
+                "p50": round(percentile(samples, 0.50), 4),
+                "p90": round(percentile(samples, 0.90), 4),
+                "p99": round(percentile(samples, 0.99), 4),
+                "max": round(samples[-1], 4),
+            },
+            "throughput_ops_s": round(calls * scenario.ops / elapsed, 1),
+            "bytes_in_per_call": stats["bytes_in"] // calls,
+            "bytes_out_per_call": stats["bytes_out"] // calls,
+            "editor_requests_per_call": round(stats["requests"] / calls, 3),
+            "peak_memory_kb": peak // 1024,
+        }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> Dict[str, Any]:
+    """Relative change per scenario; positive latency / negative throughput deltas are regressions."""
+    changes = {}
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous:
+            continue
+        delta = {}
+        for key in ("p50", "p99"):
+            before = previous["latency_ms"][key]
+            delta[f"{key}_pct"] = round((current["latency_ms"][key] - before) / before * 100, 1) if before else 0.0
+        before = previous["throughput_ops_s"]
+        delta["throughput_pct"] = round((current["throughput_ops_s"] - before) / before * 100, 1) if before else 0.0
+        delta["bytes_out_per_call"] = current["bytes_out_per_call"] - previous["bytes_out_per_call"]
+        delta["peak_memory_kb"] = current["peak_memory_kb"] - previous["peak_memory_kb"]
+        if (delta["p50_pct"] > threshold or delta["p99_pct"] > threshold
+                or delta["throughput_pct"] < -threshold):
+            regressions.append(name)
+        changes[name] = delta
+    return {"threshold_pct": threshold, "changes": changes, "regressions": regressions}
+
+
+async def run(args: argparse.Namespace, port: int) -> Dict[str, Any]:
+    suite = Suite(args, port)
+    await suite.setup()
+    try:
+        selected = set(args.scenarios.split(",")) if args.scenarios else None
+        results = {}
+        for scenario in suite.scenarios():
+            if selected is None or scenario.name in selected:
+                results[scenario.name] = await suite.run_scenario(scenario)
+        return results
+    finally:
+        await suite.teardown()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--memory-iterations", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--logs", type=int, default=5000)
+    parser.add_argument("--message-size", type=int, default=80)
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    parser.add_argument("--hop-ms", type=float, default=0.0)
+    parser.add_argument("--write-chunk", type=int, default=0)
+    parser.add_argument("--scenarios", default="", help="Comma-separated subset of scenarios")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    editor_args = ["--logs", str(args.logs), "--message-size", str(args.message_size),
+                   "--nodes", str(args.nodes), "--rtt-ms", str(args.rtt_ms),
+                   "--hop-ms", str(args.hop_ms), "--write-chunk", str(args.write_chunk)]
+    with FakeEditorProcess(editor_args) as editor:
+        scenarios = asyncio.run(run(args, editor.port))
+
+    report: Dict[str, Any] = {
+        "version": BASELINE_VERSION,
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "protocol_version": config.protocol_version,
+            "fake_editor": {"logs": args.logs, "message_size": args.message_size, "nodes": args.nodes,
+                            "rtt_ms": args.rtt_ms, "hop_ms": args.hop_ms, "write_chunk": args.write_chunk},
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+        },
+        "scenarios": scenarios,
+    }
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+
+    if args.fail_on_regression and report.get("comparison", {}).get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,729 @@
+"""
+Fake Cocos Creator editor speaking the LogBridge TCP protocol.
+
+Serves ``ping``, ``QUERY_LOGS`` (including incremental ``since``/``epoch``
+queries), ``CLEAR_LOGS``, ``OPEN_SCENE``, ``GET_SCENE_INFO``,
+``LIST_SCENE_NODES`` (pages, columns and streaming), ``QUERY_SCENE_NODES``,
+``HASH_SCENE_NODES`` (streaming, same hashes as the scene script), ``BATCH`` and
+``SUBSCRIBE`` over both the legacy bare-JSON mode and the framed protocol
+(with or without negotiated compression), so the Python side can be measured without a running editor.
+
+Console history and scene tree are synthetic and deterministic.  Latency is
+simulated per request (``rtt``) and per execute-scene-script call
+(``scene_hop``); ``write_chunk`` splits every response into small writes to
+exercise the readers' reassembly.
+
+The fake also understands ``FAKE_STATS``, ``FAKE_RESET_STATS``,
+``FAKE_ADD_LOGS``, ``FAKE_EMIT_EVENT`` and ``FAKE_EDIT_SCENE``, which the real bridge does not,
+so benchmarks can read byte counters and drive changes when it runs in a
+separate process.
+
+Usage:
+    python -m benchmarks.fake_editor [--port 6400] [--logs 1000] [--nodes 500] [--rtt-ms 0]
+"""
+
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, Any, Optional, List, Tuple
+
+from log_mirror import build_filters, matches_filters
+from protocol import (
+    LEGACY_PROTOCOL_VERSION, PROTOCOL_VERSION, HELLO_COMMAND, SUBSCRIBE_COMMAND,
+    FRAME_HEADER_SIZE, FLAG_COMPRESSED, COMPRESSION_ZLIB, compress_payload, decompress_payload,
+    encode_frame, decode_header
+)
+
+SCENE_COMMANDS = {"GET_SCENE_INFO", "LIST_SCENE_NODES", "QUERY_SCENE_NODES", "HASH_SCENE_NODES"}
+STREAM_COMMANDS = {"QUERY_LOGS", "LIST_SCENE_NODES", "HASH_SCENE_NODES"}
+# 只用于基准测试的控制命令，不计入统计
+CONTROL_COMMANDS = {"FAKE_STATS", "FAKE_RESET_STATS", "FAKE_ADD_LOGS", "FAKE_EMIT_EVENT", "FAKE_EDIT_SCENE"}
+
+DEFAULT_LOG_PAGE_SIZE = 1000
+DEFAULT_NODE_PAGE_SIZE = 500
+
+MODULES = ["Scene", "Assets", "Builder", "Preview", "Engine", "Animation", "Physics", "UI"]
+WORDS = ["load", "asset", "texture", "missing", "failed", "compile", "script", "node", "prefab",
+         "update", "render", "material", "shader", "import", "timeout", "success", "warning"]
+LOG_TYPES = ["log"] * 7 + ["warn"] * 2 + ["error"]
+# 每个节点都有 UITransform，另按下标轮流附加一个组件
+COMPONENTS = ["cc.Sprite", "cc.Label", "cc.Button", "cc.Widget", "cc.Layout"]
+QUERY_FIELDS = {"name", "uuid", "path", "depth", "parent", "siblingIndex", "childCount", "active",
+                "activeInHierarchy", "layer", "position", "worldPosition", "scale", "eulerAngles",
+                "components"}
+
+
+def _imul(a: int, b: int) -> int:
+    return (a * b) & 0xFFFFFFFF
+
+
+# 纯 Python 的哈希比场景脚本慢得多，未变化的节点重复拍快照时直接命中缓存
+@functools.lru_cache(maxsize=1 << 17)
+def _hash_string(text: str) -> str:
+    """cyrb53 like ``hashString`` in the scene script, in base 36."""
+    h1, h2 = 0xDEADBEEF, 0x41C6CE57
+    for ch in text:
+        code = ord(ch)
+        h1 = _imul(h1 ^ code, 2654435761)
+        h2 = _imul(h2 ^ code, 1597334677)
+    h1 = _imul(h1 ^ (h1 >> 16), 2246822507) ^ _imul(h2 ^ (h2 >> 13), 3266489909)
+    h2 = _imul(h2 ^ (h2 >> 16), 2246822507) ^ _imul(h1 ^ (h1 >> 13), 3266489909)
+    value = 4294967296 * (2097151 & h2) + h1
+    digits = ""
+    while True:
+        value, digit = divmod(value, 36)
+        digits = "0123456789abcdefghijklmnopqrstuvwxyz"[digit] + digits
+        if not value:
+            return digits
+
+
+def _js_number(value: float) -> str:
+    """A transform value rounded and printed like the scene script's ``join(',')``."""
+    rounded = math.floor(value * 1e4 + 0.5) / 1e4
+    return str(int(rounded)) if rounded == int(rounded) else repr(rounded)
+
+
+def _elapsed_ms(started: float) -> float:
+    """Handler time reported in responses, like ``handler_ms`` of the bridge."""
+    return round((time.perf_counter() - started) * 1000, 3)
+
+
+class FakeNode:
+    __slots__ = ("name", "uuid", "children", "active", "position", "components")
+
+    def __init__(self, name: str, uuid: str, active: bool, position: Tuple[float, float, float],
+                 components: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.uuid = uuid
+        self.children: List["FakeNode"] = []
+        self.active = active
+        self.position = position
+        self.components = components
+
+
+def _glob(pattern: str) -> "re.Pattern":
+    """Single-segment glob like the scene script's: '*' and '?' never cross '/'."""
+    return re.compile("^" + re.escape(pattern).replace(r"\*", "[^/]*").replace(r"\?", "[^/]") + "$")
+
+
+def _match_path(patterns: List[Optional["re.Pattern"]], names: List[str]) -> bool:
+    """Whether ``names`` matches the path segments; None stands for '**'."""
+    if not patterns:
+        return not names
+    if patterns[0] is None:
+        return _match_path(patterns[1:], names) or (bool(names) and _match_path(patterns, names[1:]))
+    return bool(names) and bool(patterns[0].match(names[0])) and _match_path(patterns[1:], names[1:])
+
+
+class FakeEditor:
+    """Asyncio TCP server emulating LogBridge and the MCP scene script."""
+
+    def __init__(self, host: str = "::1", port: int = 0, log_count: int = 1000,
+                 message_size: int = 80, node_count: int = 500, branching: int = 4,
+                 rtt: float = 0.0, scene_hop: float = 0.0, write_chunk: int = 0,
+                 framed: bool = True, compression: bool = True, seed: int = 7) -> None:
+        self.host = host
+        self.port = port
+        self.message_size = message_size
+        self.node_count = node_count
+        self.branching = branching
+        self.rtt = rtt
+        self.scene_hop = scene_hop
+        self.write_chunk = write_chunk
+        self.framed = framed
+        self.compression = compression
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._rng = random.Random(seed)
+        self._epochs = itertools.count(1)
+        self._subscribers: Dict[asyncio.StreamWriter, set] = {}
+        # 协商了压缩的连接及其压缩阈值
+        self._compress_thresholds: Dict[asyncio.StreamWriter, int] = {}
+        self._generation = 0
+
+        self.logs: List[Dict[str, Any]] = []
+        self.epoch = f"fake-{next(self._epochs)}"
+        self.add_logs(log_count)
+        self._open_scene("fake-scene")
+        self.reset_stats()
+
+    # ------------------------------------------------------------------
+    # Synthetic data
+    # ------------------------------------------------------------------
+
+    def add_logs(self, count: int) -> None:
+        """Append ``count`` console entries."""
+        rng = self._rng
+        for _ in range(count):
+            words = [f"[{rng.choice(MODULES)}]"]
+            length = len(words[0])
+            while length < self.message_size:
+                word = rng.choice(WORDS)
+                words.append(word)
+                length += len(word) + 1
+            self.logs.append({"type": rng.choice(LOG_TYPES), "message": " ".join(words),
+                              "date": 1700000000000 + len(self.logs)})
+
+    def _open_scene(self, uuid: str) -> None:
+        """Build a tree of ``node_count`` nodes, each parent having ``branching`` children."""
+        rng = self._rng
+        root = FakeNode(f"scene-{uuid[:8]}", uuid, True, (0.0, 0.0, 0.0))
+        parents = deque([root])
+        for index in range(1, self.node_count):
+            while len(parents[0].children) >= self.branching:
+                parents.popleft()
+            node = FakeNode(f"Node{index}", f"{uuid[:8]}-{index:08x}", rng.random() > 0.1,
+                            (rng.uniform(-500, 500), rng.uniform(-500, 500), 0.0),
+                            ("cc.UITransform", COMPONENTS[index % len(COMPONENTS)]))
+            parents[0].children.append(node)
+            parents.append(node)
+        self.scene = root
+        self._index_scene()
+
+    def _index_scene(self) -> None:
+        """Flatten the tree in preorder, recording paths and page cursors (child index paths)."""
+        root = self.scene
+        self._flat: List[Tuple[FakeNode, str]] = []
+        self._cursors: Dict[str, int] = {}
+        stack = [(root, root.name, "")]
+        while stack:
+            node, path, cursor = stack.pop()
+            self._cursors[cursor] = len(self._flat)
+            self._flat.append((node, path))
+            for index in range(len(node.children) - 1, -1, -1):
+                child = node.children[index]
+                stack.append((child, f"{path}/{child.name}", f"{cursor}.{index}" if cursor else str(index)))
+        self._cursor_list = list(self._cursors)
+
+    def edit_scene(self, modify: int = 0, add: int = 0, remove: int = 0) -> Dict[str, Any]:
+        """
+        Move ``modify`` random nodes, add ``add`` leaf nodes and remove
+        ``remove`` random subtrees, then publish ``scene:change-node``.
+        """
+        rng = self._rng
+        nodes = [node for node, _ in self._flat[1:]]
+        for node in rng.sample(nodes, min(modify, len(nodes))):
+            node.position = (rng.uniform(-500, 500), rng.uniform(-500, 500), 0.0)
+        uuid = self.scene.uuid
+        for _ in range(add):
+            parent = rng.choice(nodes) if nodes else self.scene
+            index = len(self._flat) + rng.randrange(1 << 24)
+            parent.children.append(FakeNode(f"Added{index}", f"{uuid[:8]}-a{index:08x}", True,
+                                            (rng.uniform(-500, 500), rng.uniform(-500, 500), 0.0),
+                                            ("cc.UITransform",)))
+        removed = 0
+        parents = {child.uuid: node for node, _ in self._flat for child in node.children}
+        for node in rng.sample(nodes, min(remove, len(nodes))):
+            parent = parents.get(node.uuid)
+            # 所在子树可能已被删除
+            if parent is not None and node in parent.children:
+                parent.children.remove(node)
+                removed += 1
+        self._index_scene()
+        self._publish("scene:change-node", uuid)
+        return {"nodes": len(self._flat), "removed": removed}
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def reset_stats(self) -> None:
+        self.connections = 0
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.frames_out = 0
+        self.events = 0
+        self.commands: Counter = Counter()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connections,
+            "requests": self.requests,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "frames_out": self.frames_out,
+            "events": self.events,
+            "commands": dict(self.commands),
+            "logs": len(self.logs),
+            "nodes": len(self._flat),
+        }
+
+    # ------------------------------------------------------------------
+    # Server lifecycle
+    # ------------------------------------------------------------------
+
+    async def serve(self) -> None:
+        """Start listening on the current event loop."""
+        self.loop = asyncio.get_running_loop()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def start(self) -> int:
+        """Run the server on a background thread and return its port."""
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            loop.run_until_complete(self.serve())
+            ready.set()
+            loop.run_forever()
+            # 停止后结束仍在处理的连接
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+
+        threading.Thread(target=run, name="fake-editor", daemon=True).start()
+        ready.wait()
+        return self.port
+
+    def stop(self) -> None:
+        if self.loop and self._server:
+            self.loop.call_soon_threadsafe(self._server.close)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def emit_event(self, name: str, uuid: Optional[str] = None) -> None:
+        """Push a scene event to subscribers (thread-safe)."""
+        self.loop.call_soon_threadsafe(self._publish, name, uuid)
+
+    def _publish(self, name: str, uuid: Optional[str]) -> None:
+        self._generation += 1
+        frame = {"event": name, "data": {"uuid": uuid}, "generation": self._generation}
+        for writer, groups in list(self._subscribers.items()):
+            if writer.is_closing():
+                self._subscribers.pop(writer, None)
+            elif "scene" in groups:
+                self.events += 1
+                self._write_now(writer, self._encode(writer, frame))
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            if await self._serve_legacy(reader, writer):
+                await self._serve_framed(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._subscribers.pop(writer, None)
+            self._compress_thresholds.pop(writer, None)
+            writer.close()
+
+    async def _serve_legacy(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> bool:
+        """Bare-JSON exchanges until the client switches to framing; False on EOF."""
+        while True:
+            data = bytearray()
+            while True:
+                chunk = await reader.read(65536)
+                if not chunk:
+                    return False
+                data += chunk
+                if data.strip() == b"ping":
+                    break
+                try:
+                    command = json.loads(data)
+                    break
+                except ValueError:
+                    continue
+            self.bytes_in += len(data)
+
+            if data.strip() == b"ping":
+                await self._write(writer, json.dumps({"status": "success",
+                                                      "result": {"message": "pong"}}).encode("utf-8"))
+                continue
+            if command.get("type") == HELLO_COMMAND:
+                if not self.framed:
+                    response = {"status": "error", "error": f"Unknown command type: {HELLO_COMMAND}"}
+                    await self._write(writer, json.dumps(response).encode("utf-8"))
+                    continue
+                hello = command.get("params") or {}
+                version = min(int(hello.get("protocol", LEGACY_PROTOCOL_VERSION)), PROTOCOL_VERSION)
+                result: Dict[str, Any] = {"protocol": version}
+                if self.compression and COMPRESSION_ZLIB in (hello.get("compression") or []):
+                    result["compression"] = COMPRESSION_ZLIB
+                    self._compress_thresholds[writer] = int(hello.get("compress_threshold") or 0)
+                await self._write(writer, json.dumps({"status": "success",
+                                                      "result": result}).encode("utf-8"))
+                if version > LEGACY_PROTOCOL_VERSION:
+                    return True
+                continue
+
+            started = time.perf_counter()
+            response = await self._execute(command)
+            response["handler_ms"] = _elapsed_ms(started)
+            await self._write(writer, json.dumps(response).encode("utf-8"))
+
+    async def _serve_framed(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        while True:
+            header = await reader.readexactly(FRAME_HEADER_SIZE)
+            _, flags, length = decode_header(header)
+            payload = await reader.readexactly(length)
+            self.bytes_in += FRAME_HEADER_SIZE + length
+            if flags & FLAG_COMPRESSED:
+                payload = decompress_payload(payload)
+            # 与桥接端一样，每个请求独立处理，允许乱序完成
+            asyncio.ensure_future(self._handle_frame(json.loads(payload), writer))
+
+    async def _handle_frame(self, command: Dict[str, Any], writer: asyncio.StreamWriter) -> None:
+        started = time.perf_counter()
+        params = command.get("params") or {}
+        if command.get("type") == SUBSCRIBE_COMMAND:
+            groups = self._subscribers.setdefault(writer, set())
+            groups.update(params.get("events") or [])
+            response = {"status": "success", "result": {"events": sorted(groups),
+                                                        "generation": self._generation}}
+        elif params.get("stream") is True and command.get("type") in STREAM_COMMANDS:
+            response = await self._stream(command, writer)
+        else:
+            response = await self._execute(command)
+        if "id" in command:
+            response["id"] = command["id"]
+        response["handler_ms"] = _elapsed_ms(started)
+        await self._write_frame(writer, response)
+
+    def _encode(self, writer: asyncio.StreamWriter, message: Dict[str, Any]) -> bytes:
+        payload = json.dumps(message).encode("utf-8")
+        threshold = self._compress_thresholds.get(writer, 0)
+        payload, flags = compress_payload(payload, threshold)
+        return encode_frame(payload, flags)
+
+    def _write_now(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        self.bytes_out += len(data)
+        writer.write(data)
+
+    async def _write(self, writer: asyncio.StreamWriter, data: bytes) -> None:
+        if self.write_chunk <= 0:
+            self._write_now(writer, data)
+            await writer.drain()
+            return
+        # 拆成小块写出，模拟 TCP 分段
+        for start in range(0, len(data), self.write_chunk):
+            self._write_now(writer, data[start:start + self.write_chunk])
+            await writer.drain()
+
+    async def _write_frame(self, writer: asyncio.StreamWriter, response: Dict[str, Any]) -> None:
+        self.frames_out += 1
+        await self._write(writer, self._encode(writer, response))
+
+    # ------------------------------------------------------------------
+    # Commands
+    # ------------------------------------------------------------------
+
+    async def _execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        command_type = command.get("type")
+        if command_type not in CONTROL_COMMANDS:
+            self.requests += 1
+            self.commands[command_type] += 1
+            if self.rtt:
+                await asyncio.sleep(self.rtt)
+        try:
+            result = await self._run(command_type, command.get("params") or {})
+            return {"status": "success", "result": result}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    async def _run(self, command_type: str, params: Dict[str, Any]) -> Any:
+        if command_type == "ping":
+            return {"message": "pong"}
+        if command_type == "QUERY_LOGS":
+            return self._query_logs(params)
+        if command_type == "CLEAR_LOGS":
+            self.logs = []
+            self.epoch = f"fake-{next(self._epochs)}"
+            return {"message": "Console logs cleared successfully"}
+        if command_type == "OPEN_SCENE":
+            if not params.get("sceneUuid"):
+                raise Exception("Missing sceneUuid parameter")
+            await self._scene_hop()
+            self._open_scene(params["sceneUuid"])
+            self._publish("scene:ready", params["sceneUuid"])
+            return {"success": True}
+        if command_type in SCENE_COMMANDS:
+            await self._scene_hop()
+            return self._scene_command(command_type, params)
+        if command_type == "BATCH":
+            return await self._batch(params)
+        if command_type == "FAKE_STATS":
+            return self.stats()
+        if command_type == "FAKE_RESET_STATS":
+            self.reset_stats()
+            return {}
+        if command_type == "FAKE_ADD_LOGS":
+            self.add_logs(int(params.get("count", 1)))
+            return {"logs": len(self.logs)}
+        if command_type == "FAKE_EMIT_EVENT":
+            self._publish(params.get("event", "scene:change-node"), params.get("uuid"))
+            return {}
+        if command_type == "FAKE_EDIT_SCENE":
+            return self.edit_scene(int(params.get("modify", 0)), int(params.get("add", 0)),
+                                   int(params.get("remove", 0)))
+        raise Exception(f"Unknown command type: {command_type}")
+
+    async def _scene_hop(self) -> None:
+        if self.scene_hop:
+            await asyncio.sleep(self.scene_hop)
+
+    def _query_logs(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        incremental = "since" in params
+        source = self.logs
+        if incremental:
+            since = int(params.get("since") or 0) if params.get("epoch") == self.epoch else 0
+            since = max(0, min(since, len(self.logs)))
+            source = [dict(entry, seq=since + index) for index, entry in enumerate(self.logs[since:])]
+
+        types, module_pattern, terms = build_filters(
+            params.get("show_logs") is not False, params.get("show_warnings") is not False,
+            params.get("show_errors") is not False, params.get("search_term") or None,
+            params.get("module_filter") or None)
+        logs = [entry for entry in source if matches_filters(entry, types, module_pattern, terms)]
+        if incremental:
+            return {"logs": logs, "epoch": self.epoch, "next_seq": len(self.logs)}
+        return {"logs": logs}
+
+    def _scene_command(self, command_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        if command_type == "GET_SCENE_INFO":
+            return {"success": True, "data": {"name": self.scene.name, "uuid": self.scene.uuid,
+                                              "nodeCount": len(self._flat)}}
+
+        if command_type == "QUERY_SCENE_NODES":
+            return self._query_nodes(params)
+
+        if command_type == "HASH_SCENE_NODES":
+            return self._hash_nodes(params)
+
+        limit = int(params.get("limit") or 0)
+        # 与桥接端相同，游标为 "<场景代数>:<下标路径>"，场景变化后旧游标失效
+        cursor = params.get("cursor") or ""
+        generation, _, path = cursor.partition(":")
+        if cursor and (not generation.isdigit() or path not in self._cursors):
+            return {"success": False, "message": f"无效的分页游标: {cursor}"}
+        if cursor and int(generation) != self._generation:
+            return {"success": False, "message": "分页游标已过期：场景在分页期间发生了变化，请从第一页重新获取"}
+        start = self._cursors[path]
+        end = min(start + limit, len(self._flat)) if limit else len(self._flat)
+        page = self._flat[start:end]
+
+        if params.get("format") == "columns":
+            columns = {"name": [], "uuid": [], "childCount": [], "active": [], "position": []}
+            for node, _ in page:
+                columns["name"].append(node.name)
+                columns["uuid"].append(node.uuid)
+                columns["childCount"].append(len(node.children))
+                columns["active"].append(node.active)
+                columns["position"].extend(node.position)
+            data: Dict[str, Any] = {"nodeCount": len(page), "format": "columns", "columns": columns}
+        else:
+            data = {"nodeCount": len(page), "nodes": [
+                {"name": node.name, "uuid": node.uuid, "path": path,
+                 "childCount": len(node.children), "active": node.active}
+                for node, path in page]}
+        if limit or params.get("format"):
+            data["nextCursor"] = f"{self._generation}:{self._cursor_list[end]}" if end < len(self._flat) else None
+        return {"success": True, "data": data}
+
+    def _query_nodes(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Same matching rules as ``queryNodes`` in the scene script, without subtree pruning."""
+        fields = params.get("fields") or ["name", "uuid", "path"]
+        unknown = [field for field in fields if field not in QUERY_FIELDS]
+        if unknown:
+            return {"success": False, "message": f"未知字段 '{unknown[0]}'"}
+        patterns = None
+        if params.get("path"):
+            patterns = [None if segment == "**" else _glob(segment)
+                        for segment in params["path"].split("/") if segment]
+        name = _glob(params["name"]) if params.get("name") else None
+        component = params.get("component")
+        if component and "." not in component:
+            component = f"cc.{component}"
+        active = params.get("active")
+        min_depth = int(params.get("minDepth") or 0)
+        max_depth = params.get("maxDepth")
+        offset = max(0, int(params.get("offset") or 0))
+        limit = int(params.get("limit") or 0) or 100
+
+        nodes = []
+        total = 0
+        for node, path in self._flat[1:]:
+            names = path.split("/")[1:]
+            depth = len(names)
+            if depth < min_depth or (max_depth is not None and depth > int(max_depth)):
+                continue
+            if patterns is not None and not _match_path(patterns, names):
+                continue
+            if name and not name.match(node.name):
+                continue
+            if isinstance(active, bool) and node.active != active:
+                continue
+            if component and component not in node.components:
+                continue
+            if offset <= total < offset + limit:
+                values = {"name": node.name, "uuid": node.uuid, "path": path, "depth": depth,
+                          "childCount": len(node.children), "active": node.active,
+                          "activeInHierarchy": node.active, "layer": 1 << 25,
+                          "position": dict(zip("xyz", node.position)),
+                          "worldPosition": dict(zip("xyz", node.position)),
+                          "scale": {"x": 1, "y": 1, "z": 1}, "eulerAngles": {"x": 0, "y": 0, "z": 0},
+                          "components": list(node.components), "parent": None, "siblingIndex": 0}
+                nodes.append({field: values[field] for field in fields})
+            total += 1
+        return {"success": True, "data": {"total": total, "offset": offset,
+                                          "nodeCount": len(nodes), "nodes": nodes}}
+
+    def _hash_nodes(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Same hashes and output as ``hashNodes`` in the scene script."""
+        hashes: Dict[str, Tuple[str, str]] = {}
+
+        def hash_subtree(node: FakeNode) -> str:
+            transform = ",".join(_js_number(value) for value in node.position + (0, 0, 0, 1, 1, 1))
+            own = _hash_string("|".join([node.uuid, node.name, "1" if node.active else "0",
+                                         ",".join(node.components), transform]))
+            children = "".join(hash_subtree(child) + "," for child in node.children)
+            tree = _hash_string(f"{own}:{children}")
+            hashes[node.uuid] = (own, tree)
+            return tree
+
+        tree = hash_subtree(self.scene)
+        known = set(params.get("known") or ())
+        nodes = []
+        reused = 0
+        stack = [(self.scene, 0)]
+        while stack:
+            node, depth = stack.pop()
+            own, node_tree = hashes[node.uuid]
+            if node_tree in known:
+                nodes.append({"uuid": node.uuid, "depth": depth, "tree": node_tree, "same": True})
+                reused += 1
+                continue
+            nodes.append({"uuid": node.uuid, "name": node.name, "depth": depth, "active": node.active,
+                          "components": list(node.components),
+                          "transform": [float(_js_number(value)) for value in node.position + (0, 0, 0, 1, 1, 1)],
+                          "hash": own, "tree": node_tree})
+            stack.extend((child, depth + 1) for child in reversed(node.children))
+        return {"success": True, "data": {"name": self.scene.name, "uuid": self.scene.uuid,
+                                          "nodeCount": len(hashes), "reused": reused, "tree": tree,
+                                          "nodes": nodes}}
+
+    async def _stream(self, command: Dict[str, Any], writer: asyncio.StreamWriter) -> Dict[str, Any]:
+        command_type = command["type"]
+        params = command.get("params") or {}
+        self.requests += 1
+        self.commands[command_type] += 1
+        if self.rtt:
+            await asyncio.sleep(self.rtt)
+
+        async def emit(chunk: Dict[str, Any]) -> None:
+            await self._write_frame(writer, {"id": command.get("id"), "status": "partial", "result": chunk})
+
+        if command_type == "QUERY_LOGS":
+            page_size = int(params.get("page_size") or DEFAULT_LOG_PAGE_SIZE)
+            result = self._query_logs(params)
+            logs = result.pop("logs")
+            for start in range(0, len(logs), page_size):
+                chunk: Dict[str, Any] = {"logs": logs[start:start + page_size]}
+                if "epoch" in result:
+                    chunk["epoch"] = result["epoch"]
+                    chunk["next_seq"] = chunk["logs"][-1]["seq"] + 1
+                await emit(chunk)
+            return {"status": "success", "result": dict(result, count=len(logs))}
+
+        if command_type == "HASH_SCENE_NODES":
+            page_size = int(params.get("page_size") or DEFAULT_NODE_PAGE_SIZE)
+            await self._scene_hop()
+            result = self._hash_nodes(params)
+            data = result["data"]
+            nodes = data.pop("nodes")
+            for start in range(0, len(nodes), page_size):
+                await emit({"nodes": nodes[start:start + page_size]})
+            return {"status": "success", "result": result}
+
+        page_size = int(params.get("page_size") or DEFAULT_NODE_PAGE_SIZE)
+        cursor = params.get("cursor") or ""
+        node_count = 0
+        while cursor is not None:
+            await self._scene_hop()
+            page = self._scene_command("LIST_SCENE_NODES", {"cursor": cursor, "limit": page_size,
+                                                            "format": params.get("format")})
+            if not page["success"]:
+                return {"status": "error", "error": page["message"]}
+            data = page["data"]
+            cursor = data.pop("nextCursor")
+            node_count += data["nodeCount"]
+            await emit(data)
+        return {"status": "success", "result": {"success": True, "data": {"nodeCount": node_count}}}
+
+    async def _batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        commands = params.get("commands") or []
+        results = []
+        previous_scene = False
+        for item in commands:
+            command_type = item.get("type") if isinstance(item, dict) else None
+            if command_type == "BATCH":
+                results.append({"status": "error", "error": "Nested BATCH commands are not supported"})
+                previous_scene = False
+                continue
+            is_scene = command_type in SCENE_COMMANDS
+            # 相邻的场景命令共享一次 execute-scene-script 调用
+            if is_scene and not previous_scene:
+                await self._scene_hop()
+            previous_scene = is_scene
+            try:
+                if is_scene:
+                    result = self._scene_command(command_type, item.get("params") or {})
+                else:
+                    result = await self._run(command_type, item.get("params") or {})
+                results.append({"status": "success", "result": result})
+            except Exception as e:
+                results.append({"status": "error", "error": str(e)})
+        return {"results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="::1")
+    parser.add_argument("--port", type=int, default=6400)
+    parser.add_argument("--logs", type=int, default=1000)
+    parser.add_argument("--message-size", type=int, default=80)
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--branching", type=int, default=4)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    parser.add_argument("--hop-ms", type=float, default=0.0)
+    parser.add_argument("--write-chunk", type=int, default=0)
+    parser.add_argument("--legacy", action="store_true", help="Reject HELLO like a pre-framing bridge")
+    parser.add_argument("--no-compression", action="store_true",
+                        help="Ignore compression in HELLO like a bridge without compression support")
+    args = parser.parse_args()
+
+    editor = FakeEditor(host=args.host, port=args.port, log_count=args.logs,
+                        message_size=args.message_size, node_count=args.nodes,
+                        branching=args.branching, rtt=args.rtt_ms / 1000,
+                        scene_hop=args.hop_ms / 1000, write_chunk=args.write_chunk,
+                        framed=not args.legacy, compression=not args.no_compression)
+
+    async def run():
+        await editor.serve()
+        # 第一行输出端口，供启动它的进程读取
+        print(f"listening {editor.port}", flush=True)
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
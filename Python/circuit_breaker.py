@@ -0,0 +1,171 @@
+"""
+Retry backoff and circuit breaker for the connection to the editor.
+
+While the editor is down every request would otherwise pay a connect
+attempt (up to ``connection_timeout``) before failing.  ``CircuitBreaker``
+counts consecutive transport failures; after ``failure_threshold`` of them
+it opens and requests fail immediately with ``CircuitOpenError``.  A daemon
+thread then probes the editor with jittered exponential backoff and closes
+the circuit as soon as a probe succeeds, so no request has to be the one
+that finds out the editor is back.
+
+States::
+
+    closed --(threshold failures)--> open --(probe due)--> half_open
+    half_open --(probe ok)--> closed
+    half_open --(probe failed)--> open (longer delay)
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Dict, Any, Optional, Callable
+
+logger = logging.getLogger("CocosMCP")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of contacting an editor that is known to be unreachable."""
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)].
+
+    The jitter keeps several clients (or the prober and a retrying request)
+    from reconnecting in lockstep when the editor comes back.
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Fail fast while the editor is unreachable and probe it in the background."""
+
+    def __init__(self, probe: Callable[[], bool], failure_threshold: int = 3,
+                 base_delay: float = 1.0, max_delay: float = 10.0, name: str = "cocos") -> None:
+        self.probe = probe
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.name = name
+
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self._failures = 0
+        self._last_error: Optional[str] = None
+        self._opened_at: Optional[float] = None
+        self._prober: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self._opens = 0
+        self._rejected = 0
+        self._probes = 0
+        self._probe_failures = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` if requests should not reach the editor now."""
+        if self.state == CLOSED:
+            return
+        with self._lock:
+            self._rejected += 1
+            down_for = time.monotonic() - self._opened_at if self._opened_at else 0.0
+            error = self._last_error
+        raise CircuitOpenError(
+            f"Cocos Creator is unreachable (down for {down_for:.1f}s, last error: {error}); "
+            f"reconnecting in the background"
+        )
+
+    def record_success(self) -> None:
+        if self._failures == 0 and self.state == CLOSED:
+            return
+        with self._lock:
+            self._failures = 0
+            if self.state != CLOSED:
+                self._close()
+
+    def record_failure(self, error: BaseException) -> None:
+        """Count a transport failure; opens the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            if self.state == CLOSED and self._failures >= self.failure_threshold:
+                self.state = OPEN
+                self._opened_at = time.monotonic()
+                self._opens += 1
+                logger.warning(f"Circuit to {self.name} opened after {self._failures} failures: {error}")
+                self._start_prober()
+
+    def _close(self) -> None:
+        down_for = time.monotonic() - self._opened_at if self._opened_at else 0.0
+        self.state = CLOSED
+        self._opened_at = None
+        self._failures = 0
+        logger.info(f"Circuit to {self.name} closed, editor reachable again after {down_for:.1f}s")
+
+    # ------------------------------------------------------------------
+    # Background probing
+    # ------------------------------------------------------------------
+
+    def _start_prober(self) -> None:
+        if self._prober is not None and self._prober.is_alive():
+            return
+        self._stop.clear()
+        self._prober = threading.Thread(target=self._probe_loop, name=f"{self.name}-circuit-probe",
+                                        daemon=True)
+        self._prober.start()
+
+    def _probe_loop(self) -> None:
+        attempt = 0
+        while self.state != CLOSED:
+            # 至少等待 base_delay 的一半，避免编辑器刚退出时频繁探测
+            delay = self.base_delay / 2 + backoff_delay(attempt, self.base_delay, self.max_delay)
+            if self._stop.wait(delay):
+                return
+            with self._lock:
+                if self.state == CLOSED:
+                    return
+                self.state = HALF_OPEN
+                self._probes += 1
+            try:
+                healthy = self.probe()
+                error = None if healthy else "probe failed"
+            except Exception as e:
+                healthy = False
+                error = str(e)
+            with self._lock:
+                if healthy:
+                    self._close()
+                    return
+                self._probe_failures += 1
+                self._last_error = error
+                self.state = OPEN
+            attempt += 1
+
+    def stop(self) -> None:
+        """Stop background probing (used when the owning pool closes)."""
+        self._stop.set()
+        prober, self._prober = self._prober, None
+        if prober is not None and prober is not threading.current_thread():
+            prober.join()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "last_error": self._last_error,
+                "open_for": round(time.monotonic() - self._opened_at, 3) if self._opened_at else 0.0,
+                "opens": self._opens,
+                "rejected": self._rejected,
+                "probes": self._probes,
+                "probe_failures": self._probe_failures,
+            }
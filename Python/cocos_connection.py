@@ -1,17 +1,20 @@
 import socket
 import json
+import asyncio
+import itertools
 import logging
-from dataclasses import dataclass
-from typing import Dict, Any, Optional
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple, Iterator, AsyncIterator, Union, Callable
 from config import config
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, config.log_level),
-    format=config.log_format,
-    filename=config.log_file,
-    filemode='a'
+from protocol import (
+    LEGACY_PROTOCOL_VERSION, HELLO_COMMAND, SUBSCRIBE_COMMAND, FRAME_HEADER_SIZE,
+    FLAG_COMPRESSED, COMPRESSION_ZLIB, Inflater, compress_payload, encode_frame, decode_header
 )
+from metrics import metrics, RequestTimer
+from logging_setup import preview, without_request_id
+
+# Logging is configured by logging_setup.setup_logging() in server.py
 logger = logging.getLogger("CocosMCP")
 
 @dataclass
@@ -20,6 +23,14 @@ class CocosConnection:
     host: str = config.cocos_host
     port: int = config.cocos_port
     sock: Optional[socket.socket] = None
+    protocol_version: int = LEGACY_PROTOCOL_VERSION
+    compression: bool = False
+    _async_client: Optional["AsyncCocosConnection"] = field(default=None, repr=False)
+
+    @property
+    def framed(self) -> bool:
+        """Whether the current connection uses length-prefixed frames."""
+        return self.protocol_version > LEGACY_PROTOCOL_VERSION
 
     def connect(self) -> bool:
         """Establish a connection to the Cocos Creator Editor."""
@@ -27,14 +38,47 @@ class CocosConnection:
             return True
         try:
             self.sock = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+            self.sock.settimeout(config.connection_timeout)
             self.sock.connect((self.host, self.port))
             logger.info(f"Connected to Cocos Creator at {self.host}:{self.port}")
-            return True
         except Exception as e:
             logger.error(f"Failed to connect to Cocos Creator: {str(e)}")
             self.sock = None
             return False
 
+        self.protocol_version = self.negotiate_protocol()
+        return self.sock is not None
+
+    def negotiate_protocol(self) -> int:
+        """
+        Ask the bridge for length-prefixed framing.
+
+        Older bridges reject the HELLO command with an error response, in
+        which case the connection stays in the legacy bare-JSON mode.
+        """
+        if config.protocol_version <= LEGACY_PROTOCOL_VERSION:
+            return LEGACY_PROTOCOL_VERSION
+
+        hello = {"type": HELLO_COMMAND, "params": _hello_params()}
+        try:
+            self.sock.sendall(json.dumps(hello).encode('utf-8'))
+            response = json.loads(self.receive_full_response(self.sock).decode('utf-8'))
+        except Exception as e:
+            logger.warning(f"Protocol negotiation failed, closing connection: {str(e)}")
+            self.disconnect()
+            return LEGACY_PROTOCOL_VERSION
+
+        if response.get("status") != "success":
+            logger.info("Bridge does not support framing, using legacy JSON protocol")
+            return LEGACY_PROTOCOL_VERSION
+
+        result = response.get("result", {})
+        version = min(int(result.get("protocol", LEGACY_PROTOCOL_VERSION)), config.protocol_version)
+        self.compression = _negotiated_compression(result)
+        logger.info(f"Negotiated bridge protocol version {version}"
+                    f"{' with compression' if self.compression else ''}")
+        return version
+
     def disconnect(self):
         """Close the connection to the Cocos Creator Editor."""
         if self.sock:
@@ -44,6 +88,74 @@ class CocosConnection:
                 logger.error(f"Error disconnecting from Cocos Creator: {str(e)}")
             finally:
                 self.sock = None
+                self.protocol_version = LEGACY_PROTOCOL_VERSION
+                self.compression = False
+        if self._async_client:
+            self._async_client.close()
+            self._async_client = None
+
+    def _recv_exactly_into(self, sock, view: memoryview) -> None:
+        """Fill ``view`` completely from the socket."""
+        received = 0
+        total = len(view)
+        while received < total:
+            count = sock.recv_into(view[received:], total - received)
+            if count == 0:
+                raise ConnectionError("Connection closed in the middle of a frame")
+            received += count
+
+    def receive_frame(self, sock) -> Tuple[bytearray, int]:
+        """
+        Receive one length-prefixed frame.
+
+        Returns:
+            Tuple of (payload, bytes on the wire); compressed payloads are
+            inflated chunk by chunk as they arrive
+        """
+        sock.settimeout(config.connection_timeout)
+        header = bytearray(FRAME_HEADER_SIZE)
+        try:
+            self._recv_exactly_into(sock, memoryview(header))
+            _, flags, length = decode_header(bytes(header), config.max_frame_size)
+
+            if flags & FLAG_COMPRESSED:
+                payload = self._receive_compressed(sock, length)
+            else:
+                payload = bytearray(length)
+                self._recv_exactly_into(sock, memoryview(payload))
+        except socket.timeout:
+            logger.warning("Socket timeout during receive")
+            raise TimeoutError("Timeout receiving Cocos Creator response")
+
+        logger.debug("Received frame (%d bytes on the wire, %d bytes payload)", length, len(payload))
+        return payload, FRAME_HEADER_SIZE + length
+
+    def _receive_compressed(self, sock, length: int) -> bytearray:
+        """Read ``length`` compressed bytes and inflate them as they arrive."""
+        inflater = Inflater(config.max_frame_size)
+        chunk = bytearray(min(length, config.buffer_size))
+        view = memoryview(chunk)
+        remaining = length
+        while remaining > 0:
+            count = sock.recv_into(view, min(remaining, len(chunk)))
+            if count == 0:
+                raise ConnectionError("Connection closed in the middle of a frame")
+            inflater.feed(view[:count])
+            remaining -= count
+        return inflater.finish()
+
+    def _exchange(self, message: bytes, timer: RequestTimer) -> Dict[str, Any]:
+        """Send one request and parse the matching response, recording bytes and parse time."""
+        if self.framed:
+            frame = _encode_request(message, self.protocol_version, self.compression)
+            self.sock.sendall(frame)
+            timer.bytes_sent += len(frame)
+            payload, size = self.receive_frame(self.sock)
+            return timer.parse(payload, size)
+
+        self.sock.sendall(message)
+        timer.bytes_sent += len(message)
+        return timer.parse(self.receive_full_response(self.sock))
 
     def receive_full_response(self, sock, buffer_size=config.buffer_size) -> bytes:
         """Receive a complete response from Cocos Creator, handling chunked data."""
@@ -73,7 +185,7 @@ class CocosConnection:
                     json.loads(decoded_data)
                     
                     # If we get here, we have valid JSON
-                    logger.info(f"Received complete response ({len(data)} bytes)")
+                    logger.debug("Received complete response (%d bytes)", len(data))
                     return data
                 except json.JSONDecodeError:
                     # We haven't received a complete valid JSON response yet
@@ -84,7 +196,7 @@ class CocosConnection:
                     continue
         except socket.timeout:
             logger.warning("Socket timeout during receive")
-            raise Exception("Timeout receiving Cocos Creator response")
+            raise TimeoutError("Timeout receiving Cocos Creator response")
         except Exception as e:
             logger.error(f"Error during receive: {str(e)}")
             raise
@@ -94,61 +206,579 @@ class CocosConnection:
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Cocos Creator")
         
+        timer = metrics.start(command_type)
         # Special handling for ping command
         if command_type == "ping":
             try:
                 logger.debug("Sending ping to verify connection")
-                self.sock.sendall(b"ping")
-                response_data = self.receive_full_response(self.sock)
-                response = json.loads(response_data.decode('utf-8'))
+                # 旧协议使用裸字符串 ping，帧协议下 ping 是普通命令
+                message = b'{"type": "ping", "params": {}}' if self.framed else b"ping"
+                response = self._exchange(message, timer)
                 
                 if response.get("status") != "success":
                     logger.warning("Ping response was not successful")
-                    self.sock = None
+                    self.disconnect()
                     raise ConnectionError("Connection verification failed")
                     
+                timer.finish()
                 return {"message": "pong"}
             except Exception as e:
+                timer.finish(e)
                 logger.error(f"Ping error: {str(e)}")
-                self.sock = None
+                self.disconnect()
                 raise ConnectionError(f"Connection verification failed: {str(e)}")
         
         # Normal command handling
         command = {"type": command_type, "params": params or {}}
         try:
-            logger.info(f"Sending command: {command_type} with params: {params}")
-            self.sock.sendall(json.dumps(command).encode('utf-8'))
-            response_data = self.receive_full_response(self.sock)
-            response = json.loads(response_data.decode('utf-8'))
-            
-            if response.get("status") == "error":
-                error_message = response.get("error") or response.get("message", "Unknown Cocos Creator error")
-                logger.error(f"Cocos Creator error: {error_message}")
-                raise Exception(error_message)
-            
-            result = response.get("result", {})
-            logger.debug(f"Command result: {result}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sending command: %s with params: %s", command_type, preview(params))
+            response = self._exchange(json.dumps(command).encode('utf-8'), timer)
+            result = _unwrap_response(response)
+            timer.finish()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Command result: %s", preview(result))
             return result
+        except BridgeError as e:
+            # 扩展正常应答了错误，连接仍然可用
+            timer.finish(e)
+            raise
         except Exception as e:
+            timer.finish(e)
             logger.error(f"Communication error with Cocos Creator: {str(e)}")
-            self.sock = None
-            raise Exception(f"Failed to communicate with Cocos Creator: {str(e)}")
+            self.disconnect()
+            # 区分超时与连接错误，供连接池决定是否重试
+            error_type = TimeoutError if isinstance(e, TimeoutError) else ConnectionError
+            raise error_type(f"Failed to communicate with Cocos Creator: {str(e)}")
             
-    async def send_command_async(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """发送命令到 Cocos Creator 并返回响应(异步版本)."""
-        # 这里我们直接调用同步版本，因为异步处理的问题较多
-        # 在实际应用中，如果需要真正的异步，应该使用异步IO库
-        return self.send_command(command_type, params)
+    def send_batch(self, commands: List[Dict[str, Any]], parallel: bool = False) -> List[Dict[str, Any]]:
+        """
+        Execute several commands in a single round trip.
+
+        Args:
+            commands: List of ``{"type": ..., "params": {...}}`` items
+            parallel: Let the bridge run the items concurrently instead of in order
+
+        Returns:
+            One ``{"status": "success", "result": ...}`` or
+            ``{"status": "error", "error": ...}`` entry per command
+        """
+        items = _batch_items(commands)
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Cocos Creator")
+        if not self.framed:
+            # 旧版扩展不支持 BATCH，逐条发送
+            results = []
+            for item in items:
+                try:
+                    results.append({"status": "success",
+                                    "result": self.send_command(item["type"], item["params"])})
+                except Exception as e:
+                    results.append({"status": "error", "error": str(e)})
+            return results
+        return self.send_command("BATCH", {"commands": items, "parallel": parallel}).get("results", [])
+
+    def stream_command(self, command_type: str, params: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Send a command with ``stream`` enabled and yield its results frame by frame.
+
+        The bridge sends bounded ``partial`` frames followed by one terminal
+        response; every partial result is yielded, and the terminal result is
+        yielded last.  Bridges or commands without streaming support answer
+        with a single terminal response.  Abandoning the generator early
+        closes the connection because unread frames would corrupt the next
+        request.
+        """
+        if not self.sock and not self.connect():
+            raise ConnectionError("Not connected to Cocos Creator")
+        if not self.framed:
+            yield self.send_command(command_type, params)
+            return
+
+        command = {"type": command_type, "params": dict(params or {}, stream=True)}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Streaming command: %s with params: %s", command_type, preview(params))
+        timer: Optional[RequestTimer] = metrics.start(command_type)
+        error: Optional[Exception] = None
+        completed = False
+        try:
+            frame = _encode_request(json.dumps(command).encode('utf-8'), self.protocol_version,
+                                    self.compression)
+            self.sock.sendall(frame)
+            timer.bytes_sent += len(frame)
+            while True:
+                payload, size = self.receive_frame(self.sock)
+                response = timer.parse(payload, size)
+                if response.get("status") == STREAM_PARTIAL:
+                    yield response.get("result", {})
+                    continue
+                completed = True
+                result = _unwrap_response(response)
+                # 在交出最后一帧前记录，消费者可能不会再推进生成器
+                timer.finish()
+                timer = None
+                yield result
+                return
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if timer is not None:
+                timer.finish(error)
+            if not completed:
+                # 流未读完，连接上残留的帧会干扰后续请求
+                self.disconnect()
+
+    async def send_command_async(self, command_type: str, params: Dict[str, Any] = None,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """发送命令到 Cocos Creator 并返回响应(异步版本).
+
+        Uses a separate multiplexed asyncio connection, so awaiting this never
+        blocks the event loop and concurrent calls share one socket.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client.loop is not loop:
+            self._async_client = AsyncCocosConnection(self.host, self.port)
+        return await self._async_client.send_command(command_type, params, timeout)
+
+
+# 流式响应中间帧的状态
+STREAM_PARTIAL = "partial"
+
+
+def _hello_params() -> Dict[str, Any]:
+    """HELLO parameters: protocol version and, if enabled, the accepted compression."""
+    params: Dict[str, Any] = {"protocol": config.protocol_version}
+    if config.compression:
+        params["compression"] = [COMPRESSION_ZLIB]
+        params["compress_threshold"] = config.compression_threshold
+    return params
+
+
+def _negotiated_compression(result: Dict[str, Any]) -> bool:
+    return config.compression and result.get("compression") == COMPRESSION_ZLIB
+
+
+def _encode_request(message: bytes, version: int, compression: bool) -> bytes:
+    """Frame a request, compressing it if negotiated and large enough."""
+    flags = 0
+    if compression:
+        message, flags = compress_payload(message, config.compression_threshold, config.compression_level)
+    return encode_frame(message, flags, version)
+
+
+# 订阅事件的连接断开时分发给监听器的本地事件，期间的编辑器事件可能已丢失
+DISCONNECTED_EVENT = "disconnected"
+
+
+def _batch_items(commands: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Validate batch items and normalize them to ``{type, params}``."""
+    items = []
+    for command in commands:
+        if not isinstance(command, dict) or not isinstance(command.get("type"), str):
+            raise ValueError(f"Invalid batch item: {command!r}")
+        items.append({"type": command["type"], "params": command.get("params") or {}})
+    return items
+
+
+class BridgeError(Exception):
+    """Error response from the bridge; unlike transport errors the connection stays usable."""
+
+
+def _unwrap_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the result of a bridge response or raise its error."""
+    if response.get("status") == "error":
+        error_message = response.get("error") or response.get("message", "Unknown Cocos Creator error")
+        logger.error(f"Cocos Creator error: {error_message}")
+        raise BridgeError(error_message)
+    return response.get("result", {})
+
+
+class AsyncCocosConnection:
+    """
+    Multiplexed asyncio client for the Cocos Creator bridge.
+
+    Every request carries an id which the bridge echoes in its response, so
+    many requests can be in flight on one connection and complete in any
+    order.  A single reader task dispatches incoming frames to the waiting
+    futures.  Against a bridge without framing support requests fall back
+    to one-at-a-time bare JSON exchanges.
+
+    After ``subscribe`` the bridge also pushes event frames (frames with an
+    ``event`` field and no id), which are passed to the listeners registered
+    with ``add_event_listener``.
+    """
+
+    def __init__(self, host: str = config.cocos_host, port: int = config.cocos_port) -> None:
+        self.host = host
+        self.port = port
+        self.loop = asyncio.get_running_loop()
+        self.protocol_version = LEGACY_PROTOCOL_VERSION
+        self.compression = False
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        # 普通请求对应 Future，流式请求对应有界队列
+        self._pending: Dict[int, Union[asyncio.Future, asyncio.Queue]] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+        # 旧协议下无法区分响应，只能串行收发
+        self._legacy_lock = asyncio.Lock()
+        self._event_listeners: List[Callable[[Dict[str, Any]], None]] = []
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests waiting for a response."""
+        return len(self._pending)
+
+    async def connect(self) -> bool:
+        """Open the connection and negotiate the protocol version."""
+        async with self._connect_lock:
+            if self.connected:
+                return True
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port),
+                    config.connection_timeout
+                )
+                self.protocol_version = await self._negotiate()
+            except Exception as e:
+                logger.error(f"Failed to connect to Cocos Creator (async): {str(e)}")
+                self.close()
+                return False
+
+            if self.protocol_version > LEGACY_PROTOCOL_VERSION:
+                self._reader_task = without_request_id(self.loop.create_task, self._read_frames())
+            logger.info(f"Async connection to Cocos Creator at {self.host}:{self.port} "
+                        f"(protocol {self.protocol_version})")
+            return True
+
+    async def _negotiate(self) -> int:
+        if config.protocol_version <= LEGACY_PROTOCOL_VERSION:
+            return LEGACY_PROTOCOL_VERSION
+        hello = {"type": HELLO_COMMAND, "params": _hello_params()}
+        self._writer.write(json.dumps(hello).encode('utf-8'))
+        response, _, _ = await asyncio.wait_for(self._read_legacy(), config.connection_timeout)
+        if response.get("status") != "success":
+            return LEGACY_PROTOCOL_VERSION
+        result = response.get("result", {})
+        self.compression = _negotiated_compression(result)
+        return min(int(result.get("protocol", LEGACY_PROTOCOL_VERSION)), config.protocol_version)
+
+    async def _read_legacy(self) -> Tuple[Dict[str, Any], int, float]:
+        """Read one bare JSON document (legacy protocol); returns it with its size and parse time."""
+        data = bytearray()
+        while True:
+            chunk = await self._reader.read(config.buffer_size)
+            if not chunk:
+                raise ConnectionError("Connection closed before receiving data")
+            data += chunk
+            started = time.perf_counter()
+            try:
+                response = json.loads(data)
+            except ValueError:
+                continue
+            return response, len(data), time.perf_counter() - started
+
+    async def _read_frames(self) -> None:
+        """Dispatch incoming frames to the requests waiting for them."""
+        error: Exception = ConnectionError("Connection to Cocos Creator closed")
+        try:
+            while True:
+                header = await self._reader.readexactly(FRAME_HEADER_SIZE)
+                _, flags, length = decode_header(header, config.max_frame_size)
+                if flags & FLAG_COMPRESSED:
+                    payload = await self._read_compressed(length)
+                else:
+                    payload = await self._reader.readexactly(length)
+                started = time.perf_counter()
+                response = json.loads(payload)
+                # 请求方据此记录响应字节数与解析耗时
+                received = (response, FRAME_HEADER_SIZE + length, time.perf_counter() - started)
+
+                request_id = response.get("id")
+                if request_id is None and "event" in response:
+                    self._dispatch_event(response)
+                    continue
+                target = self._pending.get(request_id)
+                if target is None:
+                    # 请求已超时或被取消，丢弃迟到的响应
+                    logger.debug("Dropping response for unknown request id %s", request_id)
+                    continue
+                if isinstance(target, asyncio.Queue):
+                    if response.get("status") != STREAM_PARTIAL:
+                        self._pending.pop(request_id, None)
+                    # 队列满时在这里等待消费者，对编辑器形成背压
+                    await target.put(received)
+                    continue
+                self._pending.pop(request_id, None)
+                if not target.done():
+                    target.set_result(received)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            logger.error(f"Error reading from Cocos Creator: {str(e)}")
+            error = ConnectionError(f"Connection to Cocos Creator failed: {str(e)}")
+        finally:
+            self._fail_pending(error)
+            self._close_transport()
+
+    async def _read_compressed(self, length: int) -> bytearray:
+        """Inflate a compressed payload of ``length`` bytes while it is being received."""
+        inflater = Inflater(config.max_frame_size)
+        remaining = length
+        while remaining > 0:
+            chunk = await self._reader.read(min(remaining, config.buffer_size * 8))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            inflater.feed(chunk)
+            remaining -= len(chunk)
+        return inflater.finish()
+
+    def _fail_pending(self, error: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for target in pending.values():
+            if isinstance(target, asyncio.Queue):
+                # 丢弃未消费的中间帧，让消费者尽快看到错误
+                while not target.empty():
+                    target.get_nowait()
+                target.put_nowait(error)
+            elif not target.done():
+                target.set_exception(error)
+
+    def _close_transport(self) -> None:
+        was_connected = self._writer is not None
+        if self._writer:
+            try:
+                self._writer.close()
+            except Exception as e:
+                logger.error(f"Error disconnecting from Cocos Creator: {str(e)}")
+        self._reader = None
+        self._writer = None
+        self.protocol_version = LEGACY_PROTOCOL_VERSION
+        self.compression = False
+        if was_connected:
+            self._dispatch_event({"event": DISCONNECTED_EVENT})
+
+    def add_event_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback for event frames pushed by the bridge."""
+        if listener not in self._event_listeners:
+            self._event_listeners.append(listener)
+
+    def _dispatch_event(self, event: Dict[str, Any]) -> None:
+        for listener in list(self._event_listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error in event listener for {event.get('event')}: {str(e)}")
+
+    async def subscribe(self, events: List[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Ask the bridge to push the given event groups (e.g. ``"scene"``) on this connection.
+
+        The subscription lasts until the connection closes; listeners then
+        receive a ``DISCONNECTED_EVENT`` and have to subscribe again.
+        """
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Cocos Creator")
+        if self.protocol_version <= LEGACY_PROTOCOL_VERSION:
+            raise Exception("Event subscriptions require the framed protocol")
+        return await self.send_command(SUBSCRIBE_COMMAND, {"events": events}, timeout)
+
+    def close(self) -> None:
+        """Close the connection and fail every request still in flight."""
+        if self._reader_task and not self._reader_task.done():
+            self._reader_task.cancel()
+        self._reader_task = None
+        self._fail_pending(ConnectionError("Connection to Cocos Creator closed"))
+        self._close_transport()
+
+    async def send_command(self, command_type: str, params: Dict[str, Any] = None,
+                           timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send a command and wait for its response.
+
+        Args:
+            command_type: Bridge command type
+            params: Command parameters
+            timeout: Deadline for this request in seconds, defaults to
+                ``config.request_timeout``
+
+        Raises:
+            TimeoutError: If no response arrives before the deadline
+        """
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Cocos Creator")
+
+        timeout = config.request_timeout if timeout is None else timeout
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Sending command (async): %s with params: %s", command_type, preview(params))
+        timer = metrics.start(command_type)
+        try:
+            try:
+                if self.protocol_version > LEGACY_PROTOCOL_VERSION:
+                    response = await self._send_framed(command_type, params or {}, timeout, timer)
+                else:
+                    response = await self._send_legacy(command_type, params or {}, timeout, timer)
+            except asyncio.TimeoutError:
+                logger.warning("Command %s timed out after %ss", command_type, timeout)
+                raise TimeoutError(f"Timeout waiting for Cocos Creator response to {command_type}")
+
+            if command_type == "ping":
+                if response.get("status") != "success":
+                    raise ConnectionError("Connection verification failed")
+                result = {"message": "pong"}
+            else:
+                result = _unwrap_response(response)
+        except Exception as e:
+            timer.finish(e)
+            raise
+        timer.finish()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Command result (async): %s", preview(result))
+        return result
+
+    async def send_batch(self, commands: List[Dict[str, Any]], parallel: bool = False,
+                         timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Execute several commands in one round trip, see ``CocosConnection.send_batch``."""
+        items = _batch_items(commands)
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Cocos Creator")
+        if self.protocol_version <= LEGACY_PROTOCOL_VERSION:
+            results = []
+            for item in items:
+                try:
+                    results.append({"status": "success",
+                                    "result": await self.send_command(item["type"], item["params"], timeout)})
+                except Exception as e:
+                    results.append({"status": "error", "error": str(e)})
+            return results
+        result = await self.send_command("BATCH", {"commands": items, "parallel": parallel}, timeout)
+        return result.get("results", [])
+
+    async def stream_command(self, command_type: str, params: Dict[str, Any] = None,
+                             timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Async counterpart of ``CocosConnection.stream_command``.
+
+        ``timeout`` applies to the wait for each frame.  Frames are buffered
+        in a bounded queue (``config.stream_queue_size``); a slow consumer
+        therefore throttles the connection instead of growing memory.
+        """
+        if not self.connected and not await self.connect():
+            raise ConnectionError("Not connected to Cocos Creator")
+        if self.protocol_version <= LEGACY_PROTOCOL_VERSION:
+            yield await self.send_command(command_type, params, timeout)
+            return
+
+        timeout = config.request_timeout if timeout is None else timeout
+        writer = self._writer
+        if writer is None:
+            raise ConnectionError("Not connected to Cocos Creator")
+        request_id = next(self._ids)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=config.stream_queue_size)
+        self._pending[request_id] = queue
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Streaming command (async): %s with params: %s", command_type, preview(params))
+        timer: Optional[RequestTimer] = metrics.start(command_type)
+        error: Optional[Exception] = None
+        try:
+            command = {"id": request_id, "type": command_type,
+                       "params": dict(params or {}, stream=True)}
+            frame = _encode_request(json.dumps(command).encode('utf-8'), self.protocol_version,
+                                    self.compression)
+            writer.write(frame)
+            timer.bytes_sent += len(frame)
+            await writer.drain()
+            while True:
+                try:
+                    received = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"Timeout waiting for Cocos Creator stream of {command_type}")
+                if isinstance(received, Exception):
+                    raise received
+                response, size, parse_time = received
+                timer.received(size, parse_time, response)
+                if response.get("status") == STREAM_PARTIAL:
+                    yield response.get("result", {})
+                    continue
+                result = _unwrap_response(response)
+                # 在交出最后一帧前记录，消费者可能不会再推进生成器
+                timer.finish()
+                timer = None
+                yield result
+                return
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if timer is not None:
+                timer.finish(error)
+            self._pending.pop(request_id, None)
+            # 消费者提前退出时清空队列，避免读取任务阻塞在 put 上
+            while not queue.empty():
+                queue.get_nowait()
+
+    async def _send_framed(self, command_type: str, params: Dict[str, Any],
+                           timeout: float, timer: RequestTimer) -> Dict[str, Any]:
+        writer = self._writer
+        if writer is None:
+            raise ConnectionError("Not connected to Cocos Creator")
+        request_id = next(self._ids)
+        future = self.loop.create_future()
+        self._pending[request_id] = future
+        try:
+            command = {"id": request_id, "type": command_type, "params": params}
+            frame = _encode_request(json.dumps(command).encode('utf-8'), self.protocol_version,
+                                    self.compression)
+            writer.write(frame)
+            timer.bytes_sent += len(frame)
+            await writer.drain()
+            # 取消或超时时 wait_for 会取消 future，迟到的响应由读取任务丢弃
+            response, size, parse_time = await asyncio.wait_for(future, timeout)
+            return timer.received(size, parse_time, response)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _send_legacy(self, command_type: str, params: Dict[str, Any],
+                           timeout: float, timer: RequestTimer) -> Dict[str, Any]:
+        async with self._legacy_lock:
+            if command_type == "ping":
+                message = b"ping"
+            else:
+                message = json.dumps({"type": command_type, "params": params}).encode('utf-8')
+            try:
+                self._writer.write(message)
+                timer.bytes_sent += len(message)
+                await self._writer.drain()
+                response, size, parse_time = await asyncio.wait_for(self._read_legacy(), timeout)
+                return timer.received(size, parse_time, response)
+            except BaseException:
+                # 响应流已经错位，必须重新建立连接
+                self._close_transport()
+                raise
+
+# Global connection pool instance
+_connection: Optional["ConnectionPool"] = None
 
-# Global connection instance
-_connection: Optional[CocosConnection] = None
+def get_cocos_connection() -> "ConnectionPool":
+    """
+    Get the global Cocos Creator connection pool.
 
-def get_cocos_connection() -> CocosConnection:
-    """Get the global Cocos Creator connection instance."""
+    Creating the pool does not touch the network: connections are opened
+    by the first request (or the background heartbeat), so nothing blocks
+    on an editor that is not running.
+    """
     global _connection
     if _connection is None:
-        _connection = CocosConnection()
-        if not _connection.connect():
-            logger.error("Failed to establish initial connection to Cocos Creator")
+        # 延迟导入以避免与 connection_pool 的循环依赖
+        from connection_pool import ConnectionPool
+        _connection = ConnectionPool(host=config.cocos_host, port=config.cocos_port)
     
-    return _connection 
\ No newline at end of file
+    return _connection
@@ -0,0 +1,98 @@
+"""
+Per-class concurrency limits for commands sent to the editor.
+
+The bridge executes scene commands one ``execute-scene-script`` call at a
+time in the scene process and queries the console through
+``Editor.Logger``; flooding either with requests only lengthens the queue
+inside the editor, where nothing can be cancelled.  ``CommandLimiter``
+keeps at most ``config.command_concurrency[class]`` requests of each class
+(``protocol.COMMAND_CLASSES``) in flight and queues the rest on the
+client, where a cancelled or timed-out tool call simply leaves the queue.
+Commands without a class (ping, SUBSCRIBE) are never limited, so the
+heartbeat keeps answering while scene commands are busy.
+
+``stats()`` is the signal for sizing the limits: ``queued`` counts requests
+that found every slot of their class taken, and the wait times show how
+long they stayed in the local queue.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, AsyncIterator
+
+
+class _Class:
+    __slots__ = ("limit", "semaphore", "active", "waiting", "acquired", "queued", "max_waiting",
+                 "wait_time_total", "wait_time_max")
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.queued = 0
+        self.max_waiting = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+
+class CommandLimiter:
+    """Bounds the requests of each command class in flight on one event loop."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None) -> None:
+        self._classes = {name: _Class(limit) for name, limit in (limits or {}).items() if limit and limit > 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @asynccontextmanager
+    async def slot(self, command_class: Optional[str]) -> AsyncIterator[None]:
+        """Hold one slot of ``command_class`` for the duration of the block."""
+        state = self._classes.get(command_class) if command_class else None
+        if state is None:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 信号量绑定在事件循环上，与异步连接一样随事件循环重建
+            self._loop = loop
+            for item in self._classes.values():
+                item.semaphore = None
+        if state.semaphore is None:
+            state.semaphore = asyncio.Semaphore(state.limit)
+        semaphore = state.semaphore
+
+        started = time.perf_counter()
+        if semaphore.locked():
+            state.queued += 1
+        state.waiting += 1
+        state.max_waiting = max(state.max_waiting, state.waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            state.waiting -= 1
+        waited = time.perf_counter() - started
+        state.acquired += 1
+        state.active += 1
+        state.wait_time_total += waited
+        state.wait_time_max = max(state.wait_time_max, waited)
+        try:
+            yield
+        finally:
+            state.active -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "limit": state.limit,
+                "active": state.active,
+                "waiting": state.waiting,
+                "max_waiting": state.max_waiting,
+                "acquired": state.acquired,
+                "queued": state.queued,
+                "wait_time_avg": round(state.wait_time_total / state.acquired, 6) if state.acquired else 0.0,
+                "wait_time_max": round(state.wait_time_max, 6),
+            }
+            for name, state in self._classes.items()
+        }
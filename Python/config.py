@@ -3,7 +3,8 @@ Configuration settings for the Cocos MCP Server.
 This file contains all configurable parameters for the server.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Dict, List
 
 @dataclass
 class ServerConfig:
@@ -13,18 +14,87 @@ class ServerConfig:
     cocos_host: str = "::1"  # 使用IPv6地址
     cocos_port: int = 6400
     
+    # Multiple editors
+    default_editor: str = "default"  # cocos_host/cocos_port 对应的编辑器名称，工具不指定 editor 时使用
+    editors: Dict[str, str] = field(default_factory=dict)  # 其他编辑器，名称 -> "host:port"，如 {"branch-b": "::1:6401"}
+    fanout_timeout: float = 10.0  # 跨编辑器查询时每个编辑器的超时，超时的编辑器记为失败
+    
     # Connection settings
     connection_timeout: float = 5.0  # 5 seconds timeout
     buffer_size: int = 8192  # 8KB buffer size
+    request_timeout: float = 30.0  # 异步请求的默认超时时间
+    
+    # Paging and streaming settings
+    page_size: int = 500  # query_logs / list_scene_nodes 默认每页条目数
+    stream_page_size: int = 1000  # 流式响应每帧的条目数
+    stream_queue_size: int = 8  # 异步流式请求最多缓存的帧数
+    
+    # Wire protocol settings
+    protocol_version: int = 1  # 0 强制使用旧的裸 JSON 模式
+    max_frame_size: int = 256 * 1024 * 1024  # 256MB
+    compression: bool = False  # 与桥接端协商 zlib 压缩；本机连接上反而更慢，适合远程或低带宽连接
+    compression_threshold: int = 64 * 1024  # 负载达到该字节数才压缩，ping 等小消息保持原样
+    compression_level: int = 1  # zlib 压缩级别，1 最快，JSON 已有约 10 倍压缩率
+    
+    # Heartbeat settings
+    heartbeat_interval: float = 10.0  # 0 表示关闭心跳，connection_status 每次都实时 ping
+    heartbeat_timeout: float = 3.0  # 超过该时间未应答视为一次丢失
+    heartbeat_miss_threshold: int = 2  # 连续丢失多少次后主动重建连接
+    
+    # Log mirror settings
+    log_sync_interval: float = 1.0  # 两次增量同步之间的最短间隔（秒）
+    log_mirror_max_entries: int = 50000
+    log_mirror_max_bytes: int = 32 * 1024 * 1024  # 32MB
+    log_signature_max: int = 10000  # top_errors 最多跟踪的错误签名数
+    
+    # Persistent log history settings
+    log_history_enabled: bool = True  # 把同步到的日志追加写入磁盘，clear_logs 和编辑器重启后仍可查询
+    log_history_dir: str = "log_history"
+    log_history_segment_size: int = 8 * 1024 * 1024  # 单个段文件的大小上限
+    log_history_max_bytes: int = 256 * 1024 * 1024  # 超出后删除最旧的段
+    log_history_max_age_days: float = 7.0  # 0 表示不按时间删除
+    log_history_index_interval: int = 64  # 每隔多少条记录写一个稀疏索引项
+    
+    # Log rate settings
+    log_rate_windows: Dict[str, List[float]] = field(default_factory=lambda: {"10m": [10, 60], "1m": [1, 60], "1h": [60, 60]})  # log_stats 的时间窗口：名称 -> [每桶秒数, 桶数]，第一个为默认窗口
+    log_rate_max_series: int = 1000  # 按模块和按错误签名各最多保留的时间序列数，超出后淘汰最久未出现的
+    log_spike_factor: float = 3.0  # 窗口最后十分之一的速率达到之前速率的多少倍时视为突增
+    log_spike_min_count: int = 5  # 突增至少需要的条目数，避免零星日志被报告
+    
+    # Request coalescing settings
+    request_coalescing: bool = True  # 并发的相同只读命令共用一次编辑器调用
+    coalesce_ttl: Dict[str, float] = field(default_factory=dict)  # 按命令类型短时间缓存结果（秒），如 {"GET_SCENE_INFO": 0.5}；默认只合并同时进行的请求
+    
+    # Tool execution settings
+    command_concurrency: Dict[str, int] = field(default_factory=lambda: {"scene": 2, "logs": 4})  # 每类命令同时发往编辑器的请求数上限，多出的请求在本地排队；按 connection_status 中 pool.concurrency 的排队数和等待时间调整
+    tool_timeout: float = 60.0  # 单次工具调用的超时（秒），0 表示不限制
+    tool_timeouts: Dict[str, float] = field(default_factory=dict)  # 按工具名覆盖 tool_timeout，如 {"query_log_history": 120.0}
+    tool_workers: int = 4  # 同步工具在线程池中执行，不阻塞事件循环
+    
+    # Scene cache settings
+    scene_cache_enabled: bool = True  # 通过编辑器场景事件保持缓存有效，关闭后每次都查询编辑器
+    scene_cache_max_entries: int = 256  # 每个编辑器最多缓存的查询结果数（不同分页和过滤条件各占一条），超出时丢弃最久未使用的
+    scene_snapshot_max: int = 8  # 每个编辑器保留的 snapshot_scene 快照数，超出时丢弃最早的
+    scene_snapshot_known_max: int = 4096  # 拍快照时最多发送多少个上一快照的子树哈希，未变化的子树不再传输
+    
+    # Metrics settings
+    metrics_dump_path: str = ""  # 非空时定期把请求指标写入该文件，供 Prometheus 等采集
+    metrics_dump_format: str = "prometheus"  # "prometheus" 文本格式或 "json"
+    metrics_dump_interval: float = 15.0
     
     # Logging settings
     log_level: str = "INFO"
-    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    log_format: str = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"  # request_id 为工具调用的关联 ID
     log_file: str = "cocos_mcp.log"
+    log_queue_size: int = 10000  # 日志记录经队列由后台线程写入文件，队列满时丢弃；0 表示在调用线程同步写入
+    log_preview_chars: int = 500  # 日志中参数、响应等内容的最大长度
+    log_debug_sample_every: int = 1  # DEBUG 日志每种消息每 N 条保留一条，1 表示全部保留
     
     # Server settings
-    max_retries: int = 3
-    retry_delay: float = 1.0
+    max_retries: int = 3  # 只读命令在连接错误后的最多重试次数
+    retry_delay: float = 1.0  # 指数退避的基础间隔（秒），实际间隔带随机抖动
+    retry_max_delay: float = 10.0  # 退避间隔上限，也用于熔断后的后台探测
+    circuit_failure_threshold: int = 3  # 连续失败多少次后快速失败，转入后台重连
 
 # Create a global config instance
 config = ServerConfig() 
\ No newline at end of file
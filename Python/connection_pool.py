@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, AsyncIterator, List, Callable, TypeVar
+from config import config
+from cocos_connection import CocosConnection, AsyncCocosConnection, DISCONNECTED_EVENT
+from circuit_breaker import CircuitBreaker, backoff_delay
+from protocol import SUBSCRIBE_COMMAND, BATCH_COMMAND, is_idempotent, command_class
+from request_coalescer import RequestCoalescer
+from command_limiter import CommandLimiter
+
+logger = logging.getLogger("CocosMCP")
+
+T = TypeVar("T")
+
+
+class ConnectionPool:
+    """
+    The connection to one editor, shared by every tool call.
+
+    Exposes the same ``send_command_async`` interface as
+    ``AsyncCocosConnection`` so callers use it transparently.  All requests
+    go through one multiplexed ``AsyncCocosConnection``: it pipelines
+    requests by id, so concurrent tools neither share a byte stream nor wait
+    for each other's responses, and event subscriptions live on it as well.
+    What is bounded is the work sent to the editor, not the number of
+    sockets: a ``CommandLimiter`` keeps at most
+    ``config.command_concurrency[class]`` requests of each command class in
+    flight and queues the rest locally.  Its per-class counters (waiting,
+    wait time) appear under ``concurrency`` in ``stats()`` and are what to
+    look at when sizing those limits.  Liveness is checked by the heartbeat
+    (``heartbeat.py``) with the bridge ``ping`` command.
+
+    Transport failures (connection lost, timeouts) reconnect and retry
+    idempotent read commands up to ``config.max_retries`` times with
+    jittered exponential backoff; commands that change editor state are
+    never resent.  Connection failures (not timeouts, which a busy editor
+    also produces) feed a ``CircuitBreaker``: while the editor is known to
+    be unreachable, requests fail immediately with ``CircuitOpenError`` and
+    a background probe reconnects.
+
+    Identical read commands issued concurrently share one editor call
+    through a ``RequestCoalescer`` (see ``request_coalescer.py``); streams
+    are not coalesced.
+    """
+
+    def __init__(self, host: str = config.cocos_host, port: int = config.cocos_port) -> None:
+        self.host = host
+        self.port = port
+        self._async_client: Optional[AsyncCocosConnection] = None
+        self._event_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._retries = 0
+
+        self.coalescer = RequestCoalescer(config.request_coalescing, config.coalesce_ttl)
+        self._event_listeners.append(self.coalescer.on_event)
+        self.limiter = CommandLimiter(config.command_concurrency)
+
+        self.breaker = CircuitBreaker(
+            self._probe, failure_threshold=config.circuit_failure_threshold,
+            base_delay=config.retry_delay, max_delay=config.retry_max_delay,
+            name=f"{host}:{port}"
+        )
+
+    # ------------------------------------------------------------------
+    # CocosConnection compatible interface
+    # ------------------------------------------------------------------
+
+    async def send_command_async(self, command_type: str, params: Dict[str, Any] = None,
+                                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Send a command on the shared multiplexed asyncio connection."""
+        return await self.coalescer.call_async(command_type, params, lambda: self._call_async(
+            command_type, is_idempotent(command_type, params),
+            lambda: self._get_async_client().send_command(command_type, params, timeout),
+            command_class(command_type, params)))
+
+    async def send_batch_async(self, commands: List[Dict[str, Any]], parallel: bool = False,
+                               timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Execute several commands in one round trip on the asyncio connection."""
+        params = {"commands": commands}
+        return await self.coalescer.call_async(BATCH_COMMAND, params, lambda: self._call_async(
+            BATCH_COMMAND, is_idempotent(BATCH_COMMAND, params),
+            lambda: self._get_async_client().send_batch(commands, parallel, timeout),
+            command_class(BATCH_COMMAND, params)))
+
+    async def stream_command_async(self, command_type: str, params: Dict[str, Any] = None,
+                                   timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a command's results on the asyncio connection.
+
+        Streams are not retried, since part of the result may already have
+        been consumed; failures still count towards the circuit breaker.
+        """
+        self.breaker.before_call()
+        try:
+            # 整个流占用一个并发名额，编辑器在此期间一直在处理该命令
+            async with self.limiter.slot(command_class(command_type, params)):
+                async for chunk in self._get_async_client().stream_command(command_type, params, timeout):
+                    yield chunk
+        except (ConnectionError, TimeoutError) as e:
+            self._on_transport_error(e)
+            raise
+        self.breaker.record_success()
+
+    async def ping_async(self, timeout: Optional[float] = None) -> float:
+        """Ping once on the asyncio connection, without retries; returns the round trip in seconds."""
+        client = self._get_async_client()
+        started = time.perf_counter()
+        await self._call_async("ping", False, lambda: client.send_command("ping", None, timeout))
+        return time.perf_counter() - started
+
+    async def subscribe_async(self, events: List[str], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Subscribe the asyncio connection to bridge events, see ``AsyncCocosConnection.subscribe``."""
+        return await self._call_async(
+            SUBSCRIBE_COMMAND, True, lambda: self._get_async_client().subscribe(events, timeout))
+
+    # ------------------------------------------------------------------
+    # Retries and circuit breaker
+    # ------------------------------------------------------------------
+
+    def _retry_delay(self, command_type: str, attempt: int, error: Exception) -> Optional[float]:
+        """Delay before retrying after a transport failure, or None to give up."""
+        if attempt >= config.max_retries or self.breaker.is_open:
+            return None
+        # 最常见的失败是编辑器重启后残留的失效连接，第一次重试立即重连
+        delay = backoff_delay(attempt - 1, config.retry_delay, config.retry_max_delay) if attempt else 0.0
+        self._retries += 1
+        logger.warning("Retrying %s in %.2fs after transport error: %s", command_type, delay, error)
+        return delay
+
+    def _on_transport_error(self, error: Exception) -> None:
+        if isinstance(error, TimeoutError):
+            # 超时可能只是编辑器繁忙（心跳 ping 的期限也很短），不计入熔断器，其他连接仍然可用；
+            # 编辑器真的不响应时重连会失败，由连接错误计数
+            return
+        self.breaker.record_failure(error)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests waiting for a response on the asyncio connection."""
+        return self._async_client.in_flight if self._async_client else 0
+
+    def reconnect(self) -> None:
+        """
+        Drop the asyncio connection.
+
+        Used when the editor stopped answering on a socket that still looks
+        open; the next request connects afresh instead of waiting on it.
+        Requests still in flight on the asyncio connection fail with
+        ``ConnectionError`` and only idempotent ones are retried, so callers
+        should check ``in_flight`` first.
+        """
+        if self._async_client:
+            self._async_client.close()
+
+    async def _call_async(self, command_type: str, idempotent: bool,
+                          send: Callable[[], "asyncio.Future[T]"], limit_class: Optional[str] = None) -> T:
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                # 重试前的退避不占用并发名额
+                async with self.limiter.slot(limit_class):
+                    result = await send()
+            except (ConnectionError, TimeoutError) as e:
+                self._on_transport_error(e)
+                delay = self._retry_delay(command_type, attempt, e) if idempotent else None
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.breaker.record_success()
+            return result
+
+    def _probe(self) -> bool:
+        """Circuit breaker probe: check with a throwaway connection that the editor answers."""
+        conn = CocosConnection(host=self.host, port=self.port)
+        try:
+            if not conn.connect():
+                return False
+            conn.send_command("ping")
+        except Exception as e:
+            logger.debug("Circuit probe failed: %s", e)
+            return False
+        finally:
+            # 探测在熔断器的线程中运行，不能使用事件循环上的异步连接
+            conn.disconnect()
+        return True
+
+    def add_event_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """Register a callback for events pushed on the asyncio connection."""
+        if listener not in self._event_listeners:
+            self._event_listeners.append(listener)
+        if self._async_client:
+            self._async_client.add_event_listener(listener)
+
+    def _get_async_client(self) -> AsyncCocosConnection:
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client.loop is not loop:
+            if self._async_client is not None:
+                # 旧事件循环上的连接及其订阅不再使用
+                for listener in self._event_listeners:
+                    listener({"event": DISCONNECTED_EVENT})
+            self._async_client = AsyncCocosConnection(self.host, self.port)
+            for listener in self._event_listeners:
+                self._async_client.add_event_listener(listener)
+        return self._async_client
+
+    def disconnect(self) -> None:
+        """Close the connection and stop the circuit breaker probe."""
+        self.breaker.stop()
+        if self._async_client:
+            self._async_client.close()
+            self._async_client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of usage counters; ``concurrency`` is the per-class queueing of the limiter."""
+        return {
+            "async_in_flight": self.in_flight,
+            "retries": self._retries,
+            "circuit": self.breaker.stats(),
+            "coalescing": self.coalescer.stats(),
+            "concurrency": self.limiter.stats(),
+        }
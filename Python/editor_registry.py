@@ -0,0 +1,271 @@
+"""
+Registry of named Cocos Creator editors and concurrent scatter-gather.
+
+Several editor instances (one per project or branch) can run side by side
+on different ports.  ``EditorRegistry`` maps a name to each endpoint and
+owns, per editor, the connection pool, the scene cache, the scene
+snapshots and the heartbeat.  The default editor (``config.default_editor``)
+is the one configured by ``cocos_host`` / ``cocos_port`` and uses the global
+instances returned by ``get_cocos_connection``, ``get_scene_cache`` and
+``get_heartbeat``; additional editors come from ``config.editors`` or
+``add``.  Pools are created lazily, so registering an editor that is not
+running costs nothing.
+
+``gather`` runs one coroutine per editor concurrently and collects the
+results with per-editor timing.  An editor that fails, returns an error
+result or does not answer within the timeout is reported as failed
+without affecting the others.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable, Iterable, Union
+
+from config import config
+from cocos_connection import get_cocos_connection
+from scene_cache import SceneCache, get_scene_cache
+from scene_snapshots import SceneSnapshots
+from heartbeat import Heartbeat, get_heartbeat
+
+logger = logging.getLogger("CocosMCP")
+
+# editors 参数为该值或为空时表示所有编辑器
+ALL_EDITORS = "all"
+
+
+class UnknownEditorError(KeyError):
+    """Raised for an editor name that is not registered."""
+
+    def __str__(self) -> str:
+        return f"Unknown editor: {self.args[0]}"
+
+
+def parse_endpoint(endpoint: str) -> Tuple[str, int]:
+    """Split "host:port" into its parts; IPv6 hosts may be bracketed ("[::1]:6401") or bare ("::1:6401")."""
+    host, sep, port = endpoint.strip().rpartition(":")
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Invalid editor endpoint {endpoint!r}, expected host:port")
+    return host.strip("[]"), int(port)
+
+
+class _Editor:
+    """Endpoint of one editor and the per-editor state created on first use."""
+
+    __slots__ = ("name", "host", "port", "pool", "scene_cache", "scene_snapshots", "heartbeat")
+
+    def __init__(self, name: str, host: str, port: int) -> None:
+        self.name = name
+        self.host = host
+        self.port = port
+        self.pool = None
+        self.scene_cache: Optional[SceneCache] = None
+        self.scene_snapshots: Optional[SceneSnapshots] = None
+        self.heartbeat: Optional[Heartbeat] = None
+
+
+class EditorRegistry:
+    """Named editor endpoints with a connection pool, scene cache and heartbeat each."""
+
+    def __init__(self, endpoints: Optional[Dict[str, str]] = None,
+                 default: str = config.default_editor) -> None:
+        self.default = default
+        self._lock = threading.Lock()
+        self._editors: Dict[str, _Editor] = {default: _Editor(default, config.cocos_host, config.cocos_port)}
+        for name, endpoint in (endpoints or {}).items():
+            self.add(name, *parse_endpoint(endpoint))
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    def add(self, name: str, host: str, port: int) -> None:
+        """Register an editor; replacing an existing name closes its connections."""
+        if not name or name == ALL_EDITORS:
+            raise ValueError(f"Invalid editor name: {name!r}")
+        if name == self.default:
+            raise ValueError("The default editor is configured by cocos_host/cocos_port")
+        with self._lock:
+            previous = self._editors.get(name)
+            self._editors[name] = _Editor(name, host, int(port))
+        if previous is not None:
+            self._close(previous)
+        logger.info(f"Registered editor {name} at {host}:{port}")
+
+    def remove(self, name: str) -> None:
+        """Unregister an editor and close its connections."""
+        if name == self.default:
+            raise ValueError("The default editor cannot be removed")
+        with self._lock:
+            editor = self._editors.pop(name, None)
+        if editor is None:
+            raise UnknownEditorError(name)
+        self._close(editor)
+
+    def names(self) -> List[str]:
+        """Registered editor names, the default editor first."""
+        with self._lock:
+            return list(self._editors)
+
+    def resolve(self, editors: Union[None, str, Iterable[str]] = None) -> List[str]:
+        """Expand ``None``/"all" to every editor and validate explicit names."""
+        if editors is None or editors == ALL_EDITORS:
+            return self.names()
+        if isinstance(editors, str):
+            editors = [name.strip() for name in editors.split(",") if name.strip()]
+        names = list(dict.fromkeys(editors))
+        for name in names:
+            self._get(name)
+        return names
+
+    def _get(self, name: Optional[str]) -> _Editor:
+        name = name or self.default
+        with self._lock:
+            editor = self._editors.get(name)
+        if editor is None:
+            raise UnknownEditorError(name)
+        return editor
+
+    # ------------------------------------------------------------------
+    # Per-editor state
+    # ------------------------------------------------------------------
+
+    def connection(self, name: Optional[str] = None):
+        """Connection pool of the editor (the default editor when ``name`` is empty)."""
+        editor = self._get(name)
+        if editor.pool is None:
+            if editor.name == self.default:
+                editor.pool = get_cocos_connection()
+            else:
+                # 延迟导入以避免与 connection_pool 的循环依赖，与 get_cocos_connection 相同
+                from connection_pool import ConnectionPool
+                editor.pool = ConnectionPool(host=editor.host, port=editor.port)
+        return editor.pool
+
+    def scene_cache(self, name: Optional[str] = None) -> SceneCache:
+        editor = self._get(name)
+        if editor.scene_cache is None:
+            editor.scene_cache = get_scene_cache() if editor.name == self.default else SceneCache()
+        return editor.scene_cache
+
+    def scene_snapshots(self, name: Optional[str] = None) -> SceneSnapshots:
+        editor = self._get(name)
+        if editor.scene_snapshots is None:
+            editor.scene_snapshots = SceneSnapshots()
+        return editor.scene_snapshots
+
+    def heartbeat(self, name: Optional[str] = None) -> Heartbeat:
+        editor = self._get(name)
+        if editor.heartbeat is None:
+            editor.heartbeat = (get_heartbeat() if editor.name == self.default
+                                else Heartbeat(self.connection(editor.name)))
+        return editor.heartbeat
+
+    def endpoint(self, name: Optional[str] = None) -> Dict[str, Any]:
+        editor = self._get(name)
+        return {"name": editor.name, "host": editor.host, "port": editor.port,
+                "default": editor.name == self.default}
+
+    # ------------------------------------------------------------------
+    # Scatter-gather
+    # ------------------------------------------------------------------
+
+    async def gather(self, call: Callable[[str], Awaitable[Dict[str, Any]]],
+                     editors: Union[None, str, Iterable[str]] = None,
+                     timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run ``call(name)`` for every selected editor concurrently.
+
+        Returns:
+            ``editors`` with one entry per editor in registration order:
+            ``success``, ``elapsed_ms`` and either ``result`` or ``error``;
+            ``succeeded`` / ``failed`` list the editor names and
+            ``elapsed_ms`` is the wall time of the whole fan-out
+        """
+        names = self.resolve(editors)
+        timeout = config.fanout_timeout if timeout is None else timeout
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(*(self._timed(name, call, timeout) for name in names))
+        results = dict(zip(names, outcomes))
+        return {
+            "editors": results,
+            "succeeded": [name for name, outcome in results.items() if outcome["success"]],
+            "failed": [name for name, outcome in results.items() if not outcome["success"]],
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    @staticmethod
+    async def _timed(name: str, call: Callable[[str], Awaitable[Dict[str, Any]]],
+                     timeout: float) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(call(name), timeout if timeout > 0 else None)
+            # 工具把错误作为结果返回而不是抛出异常
+            error = result.get("error") if isinstance(result, dict) else None
+            if error is None and isinstance(result, dict) and result.get("success") is False:
+                error = result.get("message") or "Command failed"
+            outcome: Dict[str, Any] = {"success": error is None}
+            if error is None:
+                outcome["result"] = result
+            else:
+                outcome["error"] = str(error)
+        except asyncio.TimeoutError:
+            outcome = {"success": False, "error": f"Timed out after {timeout}s"}
+        except Exception as e:
+            logger.warning(f"Editor {name} failed during fan-out: {e}")
+            outcome = {"success": False, "error": str(e)}
+        outcome["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        return outcome
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start_heartbeats(self) -> List[str]:
+        """Start the heartbeat of every editor on the running loop; returns the names started."""
+        return [name for name in self.names() if self.heartbeat(name).start()]
+
+    async def stop_heartbeats(self) -> None:
+        for editor in list(self._editors.values()):
+            if editor.heartbeat is not None:
+                await editor.heartbeat.stop()
+
+    @staticmethod
+    def _close(editor: _Editor) -> None:
+        if editor.heartbeat is not None and editor.heartbeat.running:
+            # 心跳任务只会运行在事件循环线程上，从该线程注销时才需要停止
+            try:
+                asyncio.get_running_loop().create_task(editor.heartbeat.stop())
+            except RuntimeError:
+                pass
+        if editor.pool is not None:
+            editor.pool.disconnect()
+            editor.pool = None
+
+    def disconnect(self) -> None:
+        """Close the connections of every editor."""
+        with self._lock:
+            editors = list(self._editors.values())
+        for editor in editors:
+            self._close(editor)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Endpoint and last-known heartbeat state of every editor."""
+        result = []
+        for name in self.names():
+            editor = self._get(name)
+            entry = self.endpoint(name)
+            entry["connected"] = editor.heartbeat.connected if editor.heartbeat is not None else None
+            result.append(entry)
+        return result
+
+
+_registry: Optional[EditorRegistry] = None
+
+def get_editor_registry() -> EditorRegistry:
+    """Get the global registry built from ``config.editors``."""
+    global _registry
+    if _registry is None:
+        _registry = EditorRegistry(config.editors, config.default_editor)
+    return _registry
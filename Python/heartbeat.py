@@ -0,0 +1,168 @@
+"""
+Background heartbeat on the connection to the editor.
+
+``Heartbeat`` pings the bridge every ``config.heartbeat_interval`` seconds
+on the shared asyncio connection and keeps the last-known state: whether
+the editor answered, the round-trip time and when it last succeeded.
+``connection_status`` answers from this state instead of making a round
+trip of its own.
+
+A ping that fails or takes longer than ``config.heartbeat_timeout`` is a
+missed beat.  After ``config.heartbeat_miss_threshold`` consecutive misses
+the pool's connections are dropped and reopened proactively, so the first
+real command after an idle period does not find a dead socket.  A slow ping
+on a connection that is still carrying requests usually means a busy editor,
+and reconnecting would fail those requests (commands that change editor
+state are not retried), so the reconnect waits until nothing is in flight;
+a socket that really died fails its requests on its own.  While the circuit
+breaker is open, reconnecting is left to its probe.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from config import config
+from circuit_breaker import CircuitOpenError
+from cocos_connection import get_cocos_connection
+from logging_setup import without_request_id
+
+logger = logging.getLogger("CocosMCP")
+
+
+class Heartbeat:
+    """Periodic ping that tracks the last-known connection state."""
+
+    def __init__(self, cocos, interval: float = config.heartbeat_interval,
+                 timeout: float = config.heartbeat_timeout,
+                 miss_threshold: int = config.heartbeat_miss_threshold) -> None:
+        self.cocos = cocos
+        self.interval = interval
+        self.timeout = timeout
+        self.miss_threshold = max(1, miss_threshold)
+        self._task: Optional[asyncio.Task] = None
+
+        # None 表示尚未完成第一次检查
+        self.connected: Optional[bool] = None
+        self.rtt: Optional[float] = None
+        self.rtt_avg: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.last_check: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_misses = 0
+
+        # 达到丢失阈值后，等没有进行中的请求时再重连
+        self._reconnect_due = False
+
+        self._beats = 0
+        self._misses = 0
+        self._reconnects = 0
+        self._deferred_reconnects = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> bool:
+        """Start the heartbeat task on the running event loop; False if disabled."""
+        if self.interval <= 0:
+            return False
+        if not self.running:
+            self._task = without_request_id(asyncio.get_running_loop().create_task, self._run())
+        return True
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.beat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Heartbeat failed unexpectedly: %s", e)
+            await asyncio.sleep(self.interval)
+
+    async def beat(self) -> bool:
+        """Ping the editor once and update the state; True if it answered."""
+        self._beats += 1
+        try:
+            rtt = await self.cocos.ping_async(self.timeout)
+        except Exception as e:
+            self._missed(e)
+            return False
+
+        now = time.time()
+        self.connected = True
+        self.rtt = rtt
+        # 指数加权平均，平滑偶发的慢响应
+        self.rtt_avg = rtt if self.rtt_avg is None else 0.8 * self.rtt_avg + 0.2 * rtt
+        self.last_success = now
+        self.last_check = now
+        self.last_error = None
+        if self.consecutive_misses:
+            logger.info("Heartbeat recovered after %d missed beats", self.consecutive_misses)
+        self.consecutive_misses = 0
+        self._reconnect_due = False
+        return True
+
+    def _missed(self, error: Exception) -> None:
+        self.connected = False
+        self.last_check = time.time()
+        self.last_error = str(error)
+        self.consecutive_misses += 1
+        self._misses += 1
+        logger.warning("Heartbeat missed (%d in a row): %s", self.consecutive_misses, error)
+        if isinstance(error, CircuitOpenError):
+            return
+        if self.consecutive_misses % self.miss_threshold == 0:
+            self._reconnect_due = True
+        if not self._reconnect_due:
+            return
+        in_flight = self.cocos.in_flight
+        if in_flight:
+            self._deferred_reconnects += 1
+            logger.info("Missed heartbeats with %d requests in flight, not reconnecting yet", in_flight)
+            return
+        self._reconnect_due = False
+        self._reconnects += 1
+        logger.info("Reconnecting to Cocos Creator after missed heartbeats")
+        self.cocos.reconnect()
+
+    def status(self) -> Dict[str, Any]:
+        """Last-known connection state, without contacting the editor."""
+        now = time.time()
+        return {
+            "connected": self.connected,
+            "rtt_ms": round(self.rtt * 1000, 3) if self.rtt is not None else None,
+            "rtt_avg_ms": round(self.rtt_avg * 1000, 3) if self.rtt_avg is not None else None,
+            "last_success": self.last_success,
+            "last_success_age": round(now - self.last_success, 3) if self.last_success else None,
+            "last_check_age": round(now - self.last_check, 3) if self.last_check else None,
+            "last_error": self.last_error,
+            "consecutive_misses": self.consecutive_misses,
+            "interval": self.interval,
+            "running": self.running,
+            "beats": self._beats,
+            "misses": self._misses,
+            "reconnects": self._reconnects,
+            "deferred_reconnects": self._deferred_reconnects,
+        }
+
+
+_heartbeat: Optional[Heartbeat] = None
+
+def get_heartbeat() -> Heartbeat:
+    """Get the global heartbeat of the editor connection pool."""
+    global _heartbeat
+    if _heartbeat is None:
+        _heartbeat = Heartbeat(get_cocos_connection())
+    return _heartbeat
@@ -1,10 +1,123 @@
 import asyncio
+import inspect
+import time
 import websockets
 import json
-from typing import Dict, Any, Optional, List, Callable
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable, Deque
+
+# 队列已满时的处理策略
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+BLOCK = "block"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+class LogStream:
+    """
+    实时日志的有界队列，按批交付
+
+    读取任务把收到的日志放入队列，消费者通过 ``async for batch in stream``
+    每次取得一批日志：攒够 ``batch_size`` 条或第一条日志等待了
+    ``batch_interval`` 秒后交付。队列满时按 ``overflow`` 处理：
+    丢弃最旧的（drop_oldest）、丢弃新到的（drop_newest），或者
+    阻塞读取任务（block），此时同一连接上的 query_logs / clear_logs
+    响应也要等消费者取走日志后才能读到。
+    """
+
+    def __init__(self, max_size: int = 1000, overflow: str = DROP_OLDEST,
+                 batch_size: int = 100, batch_interval: float = 0.05):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.max_size = max(1, max_size)
+        self.overflow = overflow
+        self.batch_size = max(1, batch_size)
+        self.batch_interval = batch_interval
+        self._queue: Deque[Dict[str, Any]] = deque()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.closed = False
+
+        self.received = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.batches = 0
+        self.max_queued = 0
+
+    async def put(self, entry: Dict[str, Any]):
+        """放入一条日志，按溢出策略处理满队列"""
+        self.received += 1
+        while len(self._queue) >= self.max_size:
+            if self.overflow == DROP_NEWEST:
+                self.dropped += 1
+                return
+            if self.overflow == DROP_OLDEST:
+                self._queue.popleft()
+                self.dropped += 1
+                break
+            self._not_full.clear()
+            await self._not_full.wait()
+            if self.closed:
+                self.dropped += 1
+                return
+        self._queue.append(entry)
+        self.max_queued = max(self.max_queued, len(self._queue))
+        self._not_empty.set()
+
+    async def next_batch(self) -> List[Dict[str, Any]]:
+        """等待下一批日志；流关闭且队列已空时抛出 StopAsyncIteration"""
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        # 第一条日志到达后最多再等 batch_interval 秒凑满一批
+        deadline = time.monotonic() + self.batch_interval
+        while len(self._queue) < self.batch_size and not self.closed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._not_empty.clear()
+            try:
+                await asyncio.wait_for(self._not_empty.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+        count = min(self.batch_size, len(self._queue))
+        batch = [self._queue.popleft() for _ in range(count)]
+        self.delivered += count
+        self.batches += 1
+        self._not_full.set()
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> List[Dict[str, Any]]:
+        return await self.next_batch()
+
+    def close(self):
+        """停止接收，消费者取完剩余日志后迭代结束"""
+        self.closed = True
+        self._not_empty.set()
+        self._not_full.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "queued": len(self._queue),
+            "max_queued": self.max_queued,
+            "batches": self.batches,
+            "overflow": self.overflow,
+        }
+
 
 class LogClient:
-    def __init__(self, uri=None, host='127.0.0.1', port=8765):
+    def __init__(self, uri=None, host='127.0.0.1', port=8765, request_timeout: float = 10.0):
         if uri:
             self.uri = uri
         else:
@@ -12,6 +125,13 @@ class LogClient:
         self.ws = None
         self.log_callback = None
         self.connected = False
+        self.request_timeout = request_timeout
+        self._listener: Optional[asyncio.Task] = None
+        self._streams: List[LogStream] = []
+        self._callback_task: Optional[asyncio.Task] = None
+        # 响应不带 id，只能一次发出一个请求，由读取任务交给等待中的 future
+        self._request_lock = asyncio.Lock()
+        self._response: Optional[asyncio.Future] = None
 
     async def connect(self):
         """连接到日志服务器"""
@@ -19,8 +139,8 @@ class LogClient:
             self.ws = await websockets.connect(self.uri)
             self.connected = True
             print(f"Successfully connected to {self.uri}")
-            # 启动日志监听
-            asyncio.create_task(self._listen_logs())
+            # 启动日志监听，这是唯一调用 ws.recv() 的地方
+            self._listener = asyncio.create_task(self._listen_logs())
             return True
         except Exception as e:
             print(f"Failed to connect to log server: {e}")
@@ -28,30 +148,53 @@ class LogClient:
             return False
 
     async def _listen_logs(self):
-        """监听日志消息"""
+        """监听日志消息，日志放入各个流，其余消息作为请求的响应"""
         if not self.ws:
             return
-            
-        while True:
-            try:
+
+        error: Exception = ConnectionError("Connection to log server closed")
+        try:
+            while True:
                 message = await self.ws.recv()
                 data = json.loads(message)
-                if data.get('type') == 'log' and self.log_callback:
-                    await self.log_callback(data['data'])
-            except websockets.exceptions.ConnectionClosed:
-                print("WebSocket connection closed")
-                self.connected = False
-                break
-            except Exception as e:
-                print(f"Error listening to logs: {e}")
-                break
+                if data.get('type') == 'log':
+                    # 不在这里等待消费者，慢消费者只会填满各自的有界队列
+                    for stream in list(self._streams):
+                        await stream.put(data['data'])
+                elif self._response is not None and not self._response.done():
+                    self._response.set_result(data)
+                else:
+                    print(f"Unexpected message from log server: {data.get('type')}")
+        except websockets.exceptions.ConnectionClosed:
+            print("WebSocket connection closed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Error listening to logs: {e}")
+            error = e
+        finally:
+            self.connected = False
+            if self._response is not None and not self._response.done():
+                self._response.set_exception(error)
+            for stream in self._streams:
+                stream.close()
+
+    async def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """发送请求并等待读取任务转交的响应"""
+        async with self._request_lock:
+            self._response = asyncio.get_running_loop().create_future()
+            try:
+                await self.ws.send(json.dumps(message))
+                return await asyncio.wait_for(self._response, self.request_timeout)
+            finally:
+                self._response = None
 
     async def query_logs(self, show_logs: bool = True, show_warnings: bool = True,
                         show_errors: bool = True, search_term: Optional[str] = None) -> Dict[str, Any]:
         """查询日志"""
         if not self.ws or not self.connected:
             return {"error": "Not connected to log server"}
-            
+
         try:
             message = {
                 'type': 'query-logs',
@@ -62,9 +205,7 @@ class LogClient:
                     'searchTerm': search_term
                 }
             }
-            await self.ws.send(json.dumps(message))
-            response = await self.ws.recv()
-            return json.loads(response)
+            return await self._request(message)
         except Exception as e:
             print(f"Error querying logs: {e}")
             return {"error": str(e)}
@@ -73,24 +214,82 @@ class LogClient:
         """清除日志"""
         if not self.ws or not self.connected:
             return {"error": "Not connected to log server"}
-            
+
         try:
             message = {
                 'type': 'clear-logs'
             }
-            await self.ws.send(json.dumps(message))
-            response = await self.ws.recv()
-            return json.loads(response)
+            return await self._request(message)
         except Exception as e:
             print(f"Error clearing logs: {e}")
             return {"error": str(e)}
 
-    def on_log(self, callback: Callable[[Dict[str, Any]], None]):
-        """设置日志回调函数"""
+    def stream(self, max_size: int = 1000, overflow: str = DROP_OLDEST,
+               batch_size: int = 100, batch_interval: float = 0.05) -> LogStream:
+        """
+        订阅实时日志，返回按批交付的异步迭代器
+
+        用法::
+
+            async for batch in client.stream(batch_size=50, batch_interval=0.1):
+                handle(batch)
+
+        Args:
+            max_size: 队列中最多缓存的日志条数
+            overflow: 队列满时的策略，drop_oldest / drop_newest / block
+            batch_size: 每批最多的日志条数
+            batch_interval: 凑批的最长等待时间（秒）
+        """
+        stream = LogStream(max_size, overflow, batch_size, batch_interval)
+        if not self.connected and self._listener is not None:
+            stream.close()
+        self._streams.append(stream)
+        return stream
+
+    def remove_stream(self, stream: LogStream):
+        """取消订阅"""
+        stream.close()
+        if stream in self._streams:
+            self._streams.remove(stream)
+
+    def on_log(self, callback: Callable[[Dict[str, Any]], None], **stream_options):
+        """
+        设置日志回调函数
+
+        回调在单独的任务中按顺序调用，可以是普通函数或协程函数；
+        回调较慢时日志在有界队列中按 overflow 策略处理，不会阻塞连接。
+        stream_options 与 stream() 的参数相同。
+        """
         self.log_callback = callback
+        if self._callback_task is None:
+            stream = self.stream(**stream_options)
+            self._callback_task = asyncio.create_task(self._deliver_callbacks(stream))
+
+    async def _deliver_callbacks(self, stream: LogStream):
+        async for batch in stream:
+            for entry in batch:
+                try:
+                    result = self.log_callback(entry)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    print(f"Error in log callback: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """各个日志流的接收、交付和丢弃计数"""
+        streams = [stream.stats() for stream in self._streams]
+        return {
+            "connected": self.connected,
+            "received": max((s["received"] for s in streams), default=0),
+            "delivered": sum(s["delivered"] for s in streams),
+            "dropped": sum(s["dropped"] for s in streams),
+            "streams": streams,
+        }
 
     async def close(self):
         """关闭连接"""
+        for stream in self._streams:
+            stream.close()
         if self.ws:
             try:
                 await self.ws.close()
@@ -98,6 +297,9 @@ class LogClient:
                 print("Connection to log server closed")
             except Exception as e:
                 print(f"Error closing connection: {e}")
+        if self._callback_task is not None:
+            await asyncio.gather(self._callback_task, return_exceptions=True)
+            self._callback_task = None
 
 async def main():
     # 示例用法
@@ -106,7 +308,7 @@ async def main():
         # 设置日志回调
         async def log_callback(log_data):
             print(f"Received log: {log_data}")
-        
+
         client.on_log(log_callback)
 
         # 查询日志示例
@@ -119,9 +321,10 @@ async def main():
 
         # 保持连接一段时间以接收实时日志
         await asyncio.sleep(60)
+        print(f"Log stream stats: {client.stats()}")
         await client.close()
     else:
         print("Failed to connect to log server")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,602 @@
+"""
+Persistent history of console entries on disk.
+
+``LogMirror`` only holds the current console epoch in memory: after
+``CLEAR_LOGS`` or an editor restart the earlier entries are gone.
+``LogHistory`` is a mirror listener that appends every new entry to an
+on-disk segment store, so older entries stay queryable by time range,
+type, module and search terms with ``query_log_history``.
+
+Layout of ``config.log_history_dir``::
+
+    0000000000.seg   records 0 .. n-1 (sealed)
+    0000000000.idx   sparse index of the sealed segment
+    0000004096.seg   active segment, appended to
+    ...
+
+A segment is named after the number of its first record; record numbers
+increase across segments and serve as query cursors.  Each record is a
+fixed little-endian header followed by the module tags, message and stack
+as UTF-8::
+
+    length u32 | crc32 u32 | timestamp ms i64 | bridge seq i64 | epoch hash u32 |
+    type u8 | tags length u8 | flags u16 | message length u32 | stack length u32
+
+Tags are stored whole; when they do not all fit in 255 bytes the rest are
+left out and ``FLAG_TAGS_TRUNCATED`` is set, so module queries check the
+message itself for those records.
+
+Every ``config.log_history_index_interval``-th record is added to the
+segment's sparse index (timestamp, record number, offset).  Queries bisect
+that index to the first candidate record and read the segment through
+``mmap``, decoding a message only if type, time and module already match,
+so a query never loads whole files.  Sealed segments keep their index in
+an ``.idx`` file; the active segment is rescanned on startup, which also
+truncates a record torn by a crash.
+
+Entries are deduplicated on the bridge's ``(epoch, seq)`` cursor, so the
+full re-sync after an MCP server restart does not store them twice.  For
+bridges without incremental queries (no ``seq``) only entries newer than
+the newest stored timestamp are kept.
+
+Mirror listeners run on the event loop, inside the log sync, so
+``on_append`` only queues the new entries (with the console epoch they
+belong to); a writer thread does the file writes, rotation and retention.
+Queries first wait for the queue to drain, so an entry synced before a
+query is part of its results.
+
+Retention deletes the oldest sealed segments once the store exceeds
+``config.log_history_max_bytes`` or their newest entry is older than
+``config.log_history_max_age_days``.  A file that cannot be removed (on
+Windows, while a query still has it mapped) is retried on later runs.
+"""
+
+import logging
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterable, BinaryIO
+
+from config import config
+from log_index import MODULE_TAG
+from log_mirror import build_filters
+
+logger = logging.getLogger("CocosMCP")
+
+RECORD = struct.Struct("<IIqqIBBHII")
+SEGMENT_MAGIC = b"CMLH\x01\x00\x00\x00"
+SEGMENT_HEADER_SIZE = len(SEGMENT_MAGIC)
+INDEX_HEADER = struct.Struct("<8sBBHqqqqqqI")
+INDEX_MAGIC = b"CMLI\x01\x00\x00\x00"
+INDEX_ENTRY = struct.Struct("<qqQ")
+
+TYPE_CODES = {"log": 0, "warn": 1, "error": 2}
+TYPE_NAMES = ("log", "warn", "error", "other")
+_OTHER_TYPE = 3
+
+_MAX_TAGS = 255
+# 记录头 flags：模块标签超出 _MAX_TAGS 字节，只保存了一部分
+FLAG_TAGS_TRUNCATED = 0x01
+_RELATIVE_TIME = re.compile(r"^-(\d+(?:\.\d+)?)\s*([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def to_millis(value: Any) -> Optional[int]:
+    """
+    Epoch milliseconds from a number or date string.
+
+    Numbers below 1e11 are taken as seconds (1e11 ms is 1973), strings may be
+    numeric or ISO 8601; naive dates are local time.  Returns None if the
+    value cannot be interpreted.
+    """
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        text = value.strip()
+        try:
+            value = float(text)
+        except ValueError:
+            try:
+                return int(datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp() * 1000)
+            except ValueError:
+                return None
+    if isinstance(value, (int, float)):
+        return int(value if abs(value) >= 1e11 else value * 1000)
+    return None
+
+
+def parse_time(value: Any) -> Optional[int]:
+    """Tool argument to epoch milliseconds; also accepts relative times like ``-15m``, ``-2h``, ``-1d``."""
+    if isinstance(value, str):
+        match = _RELATIVE_TIME.match(value.strip())
+        if match:
+            return int((time.time() - float(match.group(1)) * _UNITS[match.group(2)]) * 1000)
+    millis = to_millis(value)
+    if value is not None and millis is None:
+        raise ValueError(f"Invalid time: {value!r}")
+    return millis
+
+
+def format_millis(millis: int) -> str:
+    return datetime.fromtimestamp(millis / 1000).isoformat(timespec="milliseconds")
+
+
+def _epoch_hash(epoch: Optional[str]) -> int:
+    return zlib.crc32(epoch.encode("utf-8")) if epoch else 0
+
+
+def encode_record(timestamp: int, seq: int, epoch_hash: int, log_type: str,
+                  message: str, stack: Optional[str]) -> bytes:
+    """One binary record; module tags are taken from the message."""
+    tags = b""
+    flags = 0
+    for tag in dict.fromkeys(MODULE_TAG.findall(message)):
+        encoded = tag.encode("utf-8", "replace")
+        joined = tags + b"\0" + encoded if tags else encoded
+        # 只保存完整的标签，放不下的由查询时检查消息本身
+        if len(joined) > _MAX_TAGS:
+            flags |= FLAG_TAGS_TRUNCATED
+            continue
+        tags = joined
+    message_bytes = message.encode("utf-8", "replace")
+    stack_bytes = (stack or "").encode("utf-8", "replace")
+    body = tags + message_bytes + stack_bytes
+    header = RECORD.pack(RECORD.size + len(body), 0, timestamp, seq, epoch_hash,
+                         TYPE_CODES.get(log_type, _OTHER_TYPE), len(tags), flags,
+                         len(message_bytes), len(stack_bytes))
+    crc = zlib.crc32(body, zlib.crc32(header[8:]))
+    return header[:4] + struct.pack("<I", crc) + header[8:] + body
+
+
+class _Segment:
+    """Bookkeeping of one segment file; record data stays on disk."""
+
+    __slots__ = ("first", "path", "size", "count", "min_ts", "max_ts", "monotonic",
+                 "last_seq", "last_epoch", "index_ts", "index_numbers", "index_offsets")
+
+    def __init__(self, first: int, path: str) -> None:
+        self.first = first
+        self.path = path
+        self.size = SEGMENT_HEADER_SIZE
+        self.count = 0
+        self.min_ts = 0
+        self.max_ts = 0
+        # 时间戳不递增时不能用索引按时间定位，只能从头扫描
+        self.monotonic = True
+        self.last_seq = -1
+        self.last_epoch = 0
+        self.index_ts = array("q")
+        self.index_numbers = array("q")
+        self.index_offsets = array("Q")
+
+    @property
+    def end(self) -> int:
+        """Number of the record after the last one."""
+        return self.first + self.count
+
+    def add(self, offset: int, length: int, timestamp: int, seq: int, epoch_hash: int,
+            interval: int) -> None:
+        if self.count % interval == 0:
+            self.index_ts.append(timestamp)
+            self.index_numbers.append(self.first + self.count)
+            self.index_offsets.append(offset)
+        if self.count == 0:
+            self.min_ts = self.max_ts = timestamp
+        else:
+            if timestamp < self.max_ts:
+                self.monotonic = False
+            self.min_ts = min(self.min_ts, timestamp)
+            self.max_ts = max(self.max_ts, timestamp)
+        self.count += 1
+        self.size = offset + length
+        self.last_seq = seq
+        self.last_epoch = epoch_hash
+
+    def seek(self, start_ms: Optional[int], cursor: Optional[int]) -> Tuple[int, int]:
+        """(offset, record number) of the indexed record to start scanning from."""
+        position = 0
+        if start_ms is not None and self.monotonic and self.index_ts:
+            position = max(position, bisect_left(self.index_ts, start_ms) - 1)
+        if cursor is not None and self.index_numbers:
+            position = max(position, bisect_right(self.index_numbers, cursor) - 1)
+        if not self.index_offsets:
+            return SEGMENT_HEADER_SIZE, self.first
+        return self.index_offsets[position], self.index_numbers[position]
+
+    def scan(self, data, interval: int, verify: bool) -> int:
+        """Rebuild the bookkeeping from the segment bytes; returns the end of the last valid record."""
+        offset = SEGMENT_HEADER_SIZE
+        limit = len(data)
+        while offset + RECORD.size <= limit:
+            length, crc, timestamp, seq, epoch_hash = RECORD.unpack_from(data, offset)[:5]
+            if length < RECORD.size or offset + length > limit:
+                break
+            if verify and zlib.crc32(data[offset + 8:offset + length]) != crc:
+                break
+            self.add(offset, length, timestamp, seq, epoch_hash, interval)
+            offset += length
+        return offset
+
+    def save_index(self, interval: int) -> None:
+        header = INDEX_HEADER.pack(INDEX_MAGIC, int(self.monotonic), 0, 0, self.count, self.size,
+                                   self.min_ts, self.max_ts, self.last_seq, self.last_epoch,
+                                   interval)
+        entries = b"".join(INDEX_ENTRY.pack(ts, number, offset) for ts, number, offset in
+                           zip(self.index_ts, self.index_numbers, self.index_offsets))
+        path = self.path[:-4] + ".idx"
+        with open(path + ".tmp", "wb") as f:
+            f.write(header + entries)
+        os.replace(path + ".tmp", path)
+
+    def load_index(self, interval: int) -> bool:
+        """Load the sidecar index of a sealed segment; False if missing or stale."""
+        try:
+            with open(self.path[:-4] + ".idx", "rb") as f:
+                data = f.read()
+            (magic, monotonic, _, _, count, size, min_ts, max_ts, last_seq, last_epoch,
+             saved_interval) = INDEX_HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return False
+        if magic != INDEX_MAGIC or saved_interval != interval or size != os.path.getsize(self.path):
+            return False
+        self.monotonic = bool(monotonic)
+        self.count, self.size = count, size
+        self.min_ts, self.max_ts = min_ts, max_ts
+        self.last_seq, self.last_epoch = last_seq, last_epoch
+        for ts, number, offset in INDEX_ENTRY.iter_unpack(data[INDEX_HEADER.size:]):
+            self.index_ts.append(ts)
+            self.index_numbers.append(number)
+            self.index_offsets.append(offset)
+        return True
+
+
+class LogHistory:
+    """Append-only segment store of console entries, fed as a ``LogMirror`` listener."""
+
+    def __init__(self, directory: str = config.log_history_dir,
+                 segment_size: int = config.log_history_segment_size,
+                 max_bytes: int = config.log_history_max_bytes,
+                 max_age_days: float = config.log_history_max_age_days,
+                 index_interval: int = config.log_history_index_interval,
+                 current_epoch: Optional[Callable[[], Optional[str]]] = None) -> None:
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.index_interval = max(1, index_interval)
+        # 返回当前控制台 epoch，用于按 (epoch, seq) 去重
+        self.current_epoch = current_epoch or (lambda: None)
+        self._lock = threading.RLock()
+        self._segments: List[_Segment] = []
+        # 已移出保留范围但删除失败的文件，之后重试
+        self._pending_delete: List[str] = []
+        self._file: Optional[BinaryIO] = None
+        self._opened = False
+        # (entries, epoch)，由写入线程按顺序写盘；None 让线程退出
+        self._queue: "queue.Queue[Optional[Tuple[List[Dict[str, Any]], Optional[str]]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        # 写入线程写盘时持有 _lock，启动线程不能等它
+        self._writer_lock = threading.Lock()
+
+        self._written = 0
+        self._duplicates = 0
+        self._deleted_segments = 0
+        self._failed_deletions = 0
+        self._truncated_bytes = 0
+
+    # ------------------------------------------------------------------
+    # Opening and recovery
+    # ------------------------------------------------------------------
+
+    def open(self) -> None:
+        """Load the segment bookkeeping; called lazily on first use."""
+        with self._lock:
+            if self._opened:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            names = sorted(name for name in os.listdir(self.directory) if name.endswith(".seg"))
+            for position, name in enumerate(names):
+                segment = _Segment(int(name[:-4]), os.path.join(self.directory, name))
+                active = position == len(names) - 1
+                if not active and segment.load_index(self.index_interval):
+                    self._segments.append(segment)
+                    continue
+                if os.path.getsize(segment.path) >= SEGMENT_HEADER_SIZE:
+                    with open(segment.path, "rb") as f, self._map(f) as data:
+                        valid = data[:SEGMENT_HEADER_SIZE] == SEGMENT_MAGIC
+                        end = segment.scan(data, self.index_interval, verify=active) if valid else 0
+                else:
+                    valid, end = False, 0
+                if not valid:
+                    logger.warning(f"Ignoring invalid log history segment {segment.path}")
+                    continue
+                if active and end < os.path.getsize(segment.path):
+                    # 进程中断时写了一半的记录
+                    self._truncated_bytes += os.path.getsize(segment.path) - end
+                    with open(segment.path, "r+b") as f:
+                        f.truncate(end)
+                if not active:
+                    segment.save_index(self.index_interval)
+                self._segments.append(segment)
+            if not self._segments:
+                self._segments.append(self._create_segment(0))
+            self._file = open(self._segments[-1].path, "ab")
+            self._opened = True
+            self._enforce_retention()
+            logger.info(f"Log history: {len(self._segments)} segments, "
+                        f"{self._segments[-1].end - self._segments[0].first} records in {self.directory}")
+
+    @staticmethod
+    def _map(f):
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _create_segment(self, first: int) -> _Segment:
+        segment = _Segment(first, os.path.join(self.directory, f"{first:010d}.seg"))
+        with open(segment.path, "wb") as f:
+            f.write(SEGMENT_MAGIC)
+        return segment
+
+    def close(self) -> None:
+        """Write the queued entries, stop the writer thread and close the active segment."""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._opened = False
+            self._segments = []
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def on_append(self, entries: Iterable[Dict[str, Any]]) -> None:
+        """Mirror listener: queue the entries for the writer thread and return immediately."""
+        # epoch 在入队时确定，写盘时镜像可能已经换到新的控制台 epoch
+        self._queue.put((list(entries), self.current_epoch()))
+        if self._writer is None:
+            with self._writer_lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._write_loop, name="cocos-log-history",
+                                                    daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                try:
+                    self._append(*item)
+                except Exception as e:
+                    # 磁盘问题不能影响实时日志查询
+                    logger.error(f"Failed to write log history: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """Wait until every entry queued by ``on_append`` is on disk."""
+        self._queue.join()
+
+    def append(self, entries: Iterable[Dict[str, Any]]) -> int:
+        """Persist new entries of the current epoch in the calling thread; returns how many were written."""
+        return self._append(entries, self.current_epoch())
+
+    def _append(self, entries: Iterable[Dict[str, Any]], epoch: Optional[str]) -> int:
+        with self._lock:
+            self.open()
+            epoch_hash = _epoch_hash(epoch)
+            segment = self._segments[-1]
+            last_epoch, last_seq = segment.last_epoch, segment.last_seq
+            newest = max((s.max_ts for s in self._segments if s.count), default=None)
+            buffer = bytearray()
+            written = 0
+            for entry in entries:
+                timestamp = to_millis(entry.get("date"))
+                if timestamp is None:
+                    timestamp = int(time.time() * 1000)
+                seq = entry.get("seq")
+                if seq is None:
+                    if newest is not None and timestamp <= newest:
+                        self._duplicates += 1
+                        continue
+                    seq = -1
+                elif epoch_hash == last_epoch and seq <= last_seq:
+                    self._duplicates += 1
+                    continue
+
+                record = encode_record(timestamp, int(seq), epoch_hash, str(entry.get("type", "log")).lower(),
+                                       entry.get("message") or "", entry.get("stack"))
+                # size 包含尚在 buffer 中的记录
+                if segment.count and segment.size + len(record) > self.segment_size:
+                    self._write(buffer)
+                    buffer = bytearray()
+                    segment = self._rotate()
+                segment.add(segment.size, len(record), timestamp, int(seq), epoch_hash, self.index_interval)
+                buffer += record
+                last_epoch, last_seq = epoch_hash, int(seq)
+                newest = timestamp if newest is None else max(newest, timestamp)
+                written += 1
+            self._write(buffer)
+            self._written += written
+            return written
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self._file.write(data)
+            # 刷到页缓存，查询通过 mmap 立即可见
+            self._file.flush()
+
+    def _rotate(self) -> _Segment:
+        sealed = self._segments[-1]
+        self._file.close()
+        sealed.save_index(self.index_interval)
+        segment = self._create_segment(sealed.end)
+        self._segments.append(segment)
+        self._file = open(segment.path, "ab")
+        self._enforce_retention()
+        return segment
+
+    def _enforce_retention(self) -> None:
+        self._pending_delete = [path for path in self._pending_delete if not self._remove(path)]
+        cutoff = (time.time() - self.max_age_days * 86400) * 1000 if self.max_age_days > 0 else None
+        total = sum(segment.size for segment in self._segments)
+        # 活动段永远保留
+        while len(self._segments) > 1:
+            oldest = self._segments[0]
+            too_big = self.max_bytes > 0 and total > self.max_bytes
+            too_old = cutoff is not None and oldest.max_ts < cutoff
+            if not (too_big or too_old):
+                break
+            self._segments.pop(0)
+            total -= oldest.size
+            self._deleted_segments += 1
+            for path in (oldest.path, oldest.path[:-4] + ".idx"):
+                if not self._remove(path):
+                    self._pending_delete.append(path)
+
+    def _remove(self, path: str) -> bool:
+        """Delete a file; False if it still exists (e.g. mapped by a query on Windows)."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self._failed_deletions += 1
+            logger.debug("Failed to delete log history file %s: %s", path, e)
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None,
+              show_logs: bool = True, show_warnings: bool = True, show_errors: bool = True,
+              search_term: Optional[str] = None, module_filter: Optional[str] = None,
+              limit: int = 100, cursor: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Stored entries in ``[start_ms, end_ms]`` matching the filters, oldest first.
+
+        Filters have the same semantics as ``query_logs``.  Waits for the
+        queued writes first; call it from a worker thread, not the event loop.
+
+        Returns:
+            Tuple of (entries, cursor of the next page or None); the cursor
+            is the id of the first record not yet returned
+        """
+        types, module_pattern, terms = build_filters(
+            show_logs, show_warnings, show_errors, search_term, module_filter)
+        type_codes = frozenset(TYPE_CODES[t] for t in types)
+        # 模块名不含方括号时直接比较记录中的模块标签，不必解码消息
+        module_tag = None
+        if module_filter and "[" not in module_filter and "]" not in module_filter:
+            module_tag = module_filter.encode("utf-8")
+            module_pattern = None
+
+        self.flush()
+        with self._lock:
+            self.open()
+            self._enforce_retention()
+            segments = [(segment, segment.size) for segment in self._segments if segment.count]
+
+        results: List[Dict[str, Any]] = []
+        for segment, size in segments:
+            if cursor is not None and segment.end <= cursor:
+                continue
+            if start_ms is not None and segment.max_ts < start_ms:
+                continue
+            if end_ms is not None and segment.min_ts > end_ms:
+                continue
+            offset, number = segment.seek(start_ms, cursor)
+            try:
+                f = open(segment.path, "rb")
+            except OSError:
+                # 查询过程中被保留策略删除
+                continue
+            with f, self._map(f) as data:
+                while offset < size:
+                    (length, _, timestamp, seq, _, type_code, tags_length, flags,
+                     message_length, stack_length) = RECORD.unpack_from(data, offset)
+                    record, record_id = offset, number
+                    offset, number = offset + length, number + 1
+                    if cursor is not None and record_id < cursor:
+                        continue
+                    if end_ms is not None and timestamp > end_ms:
+                        if segment.monotonic:
+                            break
+                        continue
+                    if start_ms is not None and timestamp < start_ms:
+                        continue
+                    if type_code not in type_codes:
+                        continue
+                    body = record + RECORD.size
+                    tag_pattern = None
+                    if module_tag is not None:
+                        tags = data[body:body + tags_length].split(b"\0")
+                        if module_tag not in tags:
+                            if not flags & FLAG_TAGS_TRUNCATED:
+                                continue
+                            # 标签未全部保存，按 query_logs 的规则检查消息
+                            tag_pattern = f"[{module_filter}]"
+                    body += tags_length
+                    message = data[body:body + message_length].decode("utf-8", "replace")
+                    if module_pattern and module_pattern not in message:
+                        continue
+                    if tag_pattern and tag_pattern not in message:
+                        continue
+                    if terms:
+                        content = message.lower()
+                        if not all(term in content for term in terms):
+                            continue
+                    entry: Dict[str, Any] = {
+                        "id": record_id,
+                        "type": TYPE_NAMES[type_code],
+                        "message": message,
+                        "date": timestamp,
+                        "time": format_millis(timestamp),
+                    }
+                    if stack_length:
+                        body += message_length
+                        entry["stack"] = data[body:body + stack_length].decode("utf-8", "replace")
+                    if seq >= 0:
+                        entry["seq"] = seq
+                    results.append(entry)
+                    if len(results) >= limit:
+                        return results, record_id + 1
+        return results, None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self._opened:
+                return {"opened": False, "directory": self.directory}
+            populated = [segment for segment in self._segments if segment.count]
+            return {
+                "opened": True,
+                "directory": self.directory,
+                "segments": len(self._segments),
+                "records": self._segments[-1].end - self._segments[0].first,
+                "bytes": sum(segment.size for segment in self._segments),
+                "oldest": format_millis(min(s.min_ts for s in populated)) if populated else None,
+                "newest": format_millis(max(s.max_ts for s in populated)) if populated else None,
+                "written": self._written,
+                "queued_batches": self._queue.qsize(),
+                "duplicates_skipped": self._duplicates,
+                "deleted_segments": self._deleted_segments,
+                "failed_deletions": self._failed_deletions,
+                "pending_deletions": len(self._pending_delete),
+                "truncated_bytes": self._truncated_bytes,
+            }
@@ -0,0 +1,235 @@
+"""
+Incremental inverted index over mirrored console entries.
+
+``LogIndex`` is a ``LogMirror`` listener that keeps three kinds of posting
+lists, each a sorted ``array`` of document ids:
+
+- per log type (``log`` / ``warn`` / ``error``)
+- per module tag, i.e. every ``[Module]`` bracket in the message
+- per lower-cased whitespace-delimited token of the message
+
+``query`` answers ``query_logs`` filters from posting-list intersections while
+preserving the substring semantics of ``LogBridge.handleQueryLogs``: a search
+term without whitespace occurs in a message exactly when it occurs inside one
+of the message's tokens, so the term is resolved against the (much smaller)
+token vocabulary first.  Terms containing whitespace and module names
+containing brackets fall back to verifying candidates directly.
+"""
+
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, Optional, List, Set, Tuple, Iterable, Sequence
+
+from log_mirror import build_filters, matches_filters
+
+MODULE_TAG = re.compile(r"\[([^\[\]]*)\]")
+
+
+def _postings() -> array:
+    return array('q')
+
+
+class LogIndex:
+    """Type, module-tag and token posting lists over a FIFO window of entries."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        # 文档按 id 顺序存放在列表中：id = 下标 + _offset
+        # 淘汰总是从最旧的文档开始，_base 是第一个存活文档的 id
+        self._docs: List[Optional[Dict[str, Any]]] = []
+        self._offset = 0
+        self._base = 0
+        self._type_postings: Dict[str, array] = {}
+        self._module_postings: Dict[str, array] = {}
+        self._token_postings: Dict[str, array] = {}
+        # 词表按加入顺序保存，搜索词缓存记录已扫描到的位置以便增量更新
+        self._vocab: List[str] = []
+        self._term_cache: Dict[str, Tuple[int, Set[str]]] = {}
+
+    def __len__(self) -> int:
+        return self._offset + len(self._docs) - self._base
+
+    # ------------------------------------------------------------------
+    # LogMirror listener interface
+    # ------------------------------------------------------------------
+
+    def on_append(self, entries: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            for entry in entries:
+                self._add(entry)
+
+    def on_evict(self, entries: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for _ in range(min(len(entries), len(self))):
+                # 先释放条目本身，列表空间在压缩时回收
+                self._docs[self._base - self._offset] = None
+                self._base += 1
+            # 过期 id 超过存活文档数量时压缩一次倒排表
+            if self._base - self._offset > len(self):
+                self._compact()
+
+    def on_reset(self) -> None:
+        with self._lock:
+            self._offset += len(self._docs)
+            self._base = self._offset
+            self._docs = []
+            self._type_postings.clear()
+            self._module_postings.clear()
+            self._token_postings.clear()
+            self._vocab.clear()
+            self._term_cache.clear()
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _add(self, entry: Dict[str, Any]) -> None:
+        doc_id = self._offset + len(self._docs)
+        self._docs.append(entry)
+        message = entry.get("message") or ""
+
+        log_type = str(entry.get("type", "")).lower()
+        self._type_postings.setdefault(log_type, _postings()).append(doc_id)
+
+        for tag in set(MODULE_TAG.findall(message)):
+            self._module_postings.setdefault(tag, _postings()).append(doc_id)
+
+        for token in set(message.lower().split()):
+            postings = self._token_postings.get(token)
+            if postings is None:
+                postings = self._token_postings[token] = _postings()
+                self._vocab.append(token)
+            postings.append(doc_id)
+
+    def _compact(self) -> None:
+        """Drop evicted ids from every posting list and prune empty tokens."""
+        base = self._base
+        for table in (self._type_postings, self._module_postings, self._token_postings):
+            for key in list(table):
+                postings = table[key]
+                del postings[:bisect_left(postings, base)]
+                if not postings:
+                    del table[key]
+        if len(self._vocab) != len(self._token_postings):
+            self._vocab = [token for token in self._vocab if token in self._token_postings]
+            self._term_cache.clear()
+        del self._docs[:base - self._offset]
+        self._offset = base
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def _live(self, postings: array) -> array:
+        """Slice of a posting list without evicted ids."""
+        return postings[bisect_left(postings, self._base):]
+
+    def _union(self, group: List[array]) -> Set[int]:
+        ids: Set[int] = set()
+        for postings in group:
+            ids.update(self._live(postings))
+        return ids
+
+    def _tokens_containing(self, term: str) -> Set[str]:
+        """Vocabulary tokens that contain ``term``, updated incrementally."""
+        scanned, tokens = self._term_cache.get(term, (0, set()))
+        if scanned < len(self._vocab):
+            tokens = tokens | {token for token in self._vocab[scanned:] if term in token}
+            self._term_cache[term] = (len(self._vocab), tokens)
+        return tokens
+
+    def _matching_ids(self, show_logs: bool, show_warnings: bool, show_errors: bool,
+                      search_term: Optional[str], module_filter: Optional[str]) -> Sequence[int]:
+        """
+        Sorted ids of the live documents that match the filters.
+
+        Each indexable filter maps to a group of posting lists whose union is
+        its candidate set; the result is the intersection of those sets.
+        Must be called with the lock held.
+        """
+        types, module_pattern, terms = build_filters(
+            show_logs, show_warnings, show_errors, search_term, module_filter)
+
+        groups: List[List[array]] = []
+        exact = True
+
+        # 控制台中还有 info、debug 等其他类型时，三种类型全选也要按类型过滤
+        if not types.issuperset(self._type_postings):
+            groups.append([self._type_postings[t] for t in types if t in self._type_postings])
+
+        if module_pattern:
+            if '[' in module_filter or ']' in module_filter:
+                exact = False
+            else:
+                postings = self._module_postings.get(module_filter)
+                groups.append([postings] if postings else [])
+
+        for term in terms or ():
+            if not term:
+                continue  # 空字符串总是匹配
+            if any(ch.isspace() for ch in term):
+                exact = False
+                continue
+            groups.append([self._token_postings[token] for token in self._tokens_containing(term)])
+
+        ids: Sequence[int]
+        if not groups:
+            ids = range(self._base, self._offset + len(self._docs))
+        else:
+            # 从最小的候选集合开始求交集
+            sets = sorted((self._union(group) for group in groups), key=len)
+            ids = sorted(sets[0].intersection(*sets[1:]) if len(sets) > 1 else sets[0])
+
+        if not exact:
+            offset = self._offset
+            ids = [doc_id for doc_id in ids
+                   if matches_filters(self._docs[doc_id - offset], types, module_pattern, terms)]
+        return ids
+
+    def query(self, show_logs: bool = True, show_warnings: bool = True, show_errors: bool = True,
+              search_term: Optional[str] = None, module_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the matching entries oldest first, same semantics as ``LogMirror.query``."""
+        with self._lock:
+            ids = self._matching_ids(show_logs, show_warnings, show_errors, search_term, module_filter)
+            offset = self._offset
+            return [self._docs[doc_id - offset] for doc_id in ids]
+
+    def query_page(self, show_logs: bool = True, show_warnings: bool = True, show_errors: bool = True,
+                   search_term: Optional[str] = None, module_filter: Optional[str] = None,
+                   limit: Optional[int] = None, cursor: Optional[int] = None,
+                   newest_first: bool = False) -> Tuple[List[Dict[str, Any]], Optional[int], int]:
+        """
+        Return one page of matching entries.
+
+        Document ids never change for an entry, so a cursor (the id of the
+        last entry of the previous page) stays valid while new entries are
+        appended.
+
+        Returns:
+            Tuple of (entries, next cursor or None, total number of matches)
+        """
+        with self._lock:
+            ids = self._matching_ids(show_logs, show_warnings, show_errors, search_term, module_filter)
+            total = len(ids)
+            if newest_first:
+                if cursor is not None:
+                    ids = ids[:bisect_left(ids, cursor)]
+                ids = ids[::-1]
+            elif cursor is not None:
+                ids = ids[bisect_right(ids, cursor):]
+
+            page = ids[:limit] if limit else ids
+            next_cursor = page[-1] if limit and len(ids) > limit else None
+            offset = self._offset
+            return [self._docs[doc_id - offset] for doc_id in page], next_cursor, total
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self),
+                "tokens": len(self._token_postings),
+                "modules": len(self._module_postings),
+                "postings": sum(len(p) for p in self._token_postings.values()),
+            }
@@ -0,0 +1,192 @@
+"""
+Local mirror of the Cocos Creator console.
+
+The bridge numbers console entries within an *epoch* (a history that has not
+been cleared) and answers ``QUERY_LOGS`` with ``since`` set to only the entries
+added after that cursor.  ``LogMirror`` keeps the fetched entries in a bounded
+ring buffer so filtering runs locally instead of shipping the whole console
+history on every query.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Deque
+
+from config import config
+
+# Rough per-entry overhead of a dict with a handful of keys
+_ENTRY_OVERHEAD = 240
+
+LOG_TYPES = ("log", "warn", "error")
+
+
+def entry_size(entry: Dict[str, Any]) -> int:
+    """Approximate memory footprint of a log entry in bytes."""
+    return _ENTRY_OVERHEAD + len(entry.get("message") or "") + len(entry.get("stack") or "")
+
+
+def matches_filters(entry: Dict[str, Any], types: frozenset,
+                    module_pattern: Optional[str], terms: Optional[List[str]]) -> bool:
+    """Apply the same filter semantics as LogBridge.handleQueryLogs."""
+    if str(entry.get("type", "")).lower() not in types:
+        return False
+    message = entry.get("message") or ""
+    if module_pattern and module_pattern not in message:
+        return False
+    if terms:
+        content = message.lower()
+        return all(term in content for term in terms)
+    return True
+
+
+def build_filters(show_logs: bool = True, show_warnings: bool = True, show_errors: bool = True,
+                  search_term: Optional[str] = None, module_filter: Optional[str] = None):
+    """
+    Translate query_logs arguments into (types, module_pattern, terms).
+    """
+    types = frozenset(t for t, enabled in zip(LOG_TYPES, (show_logs, show_warnings, show_errors))
+                      if enabled)
+    module_pattern = f"[{module_filter}]" if module_filter else None
+    terms = search_term.lower().split(' ') if search_term else None
+    return types, module_pattern, terms
+
+
+class LogMirror:
+    """
+    Bounded ring buffer of console entries with an incremental sync cursor.
+
+    Listeners registered with ``add_listener`` are notified about appended,
+    evicted and reset entries, so derived structures (indexes, aggregates) can
+    be maintained incrementally.  A listener may implement any of
+    ``on_append(entries)``, ``on_evict(entries)`` and ``on_reset()``.
+    """
+
+    def __init__(self, max_entries: int = config.log_mirror_max_entries,
+                 max_bytes: int = config.log_mirror_max_bytes) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.epoch: Optional[str] = None
+        self.next_seq = 0
+        self.last_sync = 0.0
+        self._entries: Deque[Dict[str, Any]] = deque()
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._listeners: List[Any] = []
+        self._fetched = 0
+        self._evicted = 0
+        self._resets = 0
+        self._syncs = 0
+        self._full_syncs = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add_listener(self, listener: Any) -> None:
+        with self._lock:
+            self._listeners.append(listener)
+            if self._entries:
+                self._notify("on_append", list(self._entries))
+
+    def _notify(self, event: str, *args) -> None:
+        for listener in self._listeners:
+            handler = getattr(listener, event, None)
+            if handler:
+                handler(*args)
+
+    def needs_sync(self, interval: Optional[float] = None) -> bool:
+        """Whether the last sync is older than ``interval`` seconds."""
+        interval = config.log_sync_interval if interval is None else interval
+        return time.monotonic() - self.last_sync >= interval
+
+    def sync_params(self) -> Dict[str, Any]:
+        """Parameters for the next incremental QUERY_LOGS request."""
+        params: Dict[str, Any] = {"since": self.next_seq}
+        if self.epoch is not None:
+            params["epoch"] = self.epoch
+        return params
+
+    def apply(self, result: Dict[str, Any]) -> int:
+        """
+        Apply a QUERY_LOGS response.
+
+        Bridges that do not support incremental queries return no ``epoch``;
+        their response is the complete history and replaces the mirror.
+
+        Returns:
+            Number of new entries
+        """
+        logs = result.get("logs") or []
+        epoch = result.get("epoch")
+        with self._lock:
+            self._syncs += 1
+            self.last_sync = time.monotonic()
+            if epoch is None or epoch != self.epoch:
+                # 控制台历史被清空或桥接端重启，重新开始镜像
+                self._full_syncs += 1
+                self._reset()
+                self.epoch = epoch
+            if epoch is None:
+                self.next_seq = 0
+            else:
+                self.next_seq = int(result.get("next_seq", self.next_seq + len(logs)))
+            self._append(logs)
+        return len(logs)
+
+    def _append(self, logs: List[Dict[str, Any]]) -> None:
+        if not logs:
+            return
+        for entry in logs:
+            self._entries.append(entry)
+            self._bytes += entry_size(entry)
+        self._fetched += len(logs)
+        self._notify("on_append", logs)
+
+        evicted = []
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            entry = self._entries.popleft()
+            self._bytes -= entry_size(entry)
+            evicted.append(entry)
+        if evicted:
+            self._evicted += len(evicted)
+            self._notify("on_evict", evicted)
+
+    def _reset(self) -> None:
+        if self._entries:
+            self._resets += 1
+        self._entries.clear()
+        self._bytes = 0
+        self._notify("on_reset")
+
+    def clear(self) -> None:
+        """Forget all entries, e.g. after CLEAR_LOGS."""
+        with self._lock:
+            self._reset()
+            self.epoch = None
+            self.next_seq = 0
+            self.last_sync = 0.0
+
+    def query(self, show_logs: bool = True, show_warnings: bool = True, show_errors: bool = True,
+              search_term: Optional[str] = None, module_filter: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Filter the mirrored entries, oldest first."""
+        types, module_pattern, terms = build_filters(
+            show_logs, show_warnings, show_errors, search_term, module_filter)
+        with self._lock:
+            return [entry for entry in self._entries
+                    if matches_filters(entry, types, module_pattern, terms)]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "epoch": self.epoch,
+                "next_seq": self.next_seq,
+                "fetched": self._fetched,
+                "evicted": self._evicted,
+                "resets": self._resets,
+                "syncs": self._syncs,
+                "full_syncs": self._full_syncs,
+            }
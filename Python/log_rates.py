@@ -0,0 +1,309 @@
+"""
+Rolling, bucketed counters of console entries.
+
+``LogRates`` is a ``LogMirror`` listener that counts entries as they are
+synced, per log type, per ``[Module]`` tag and type (the tags
+``query_logs``' ``module_filter`` matches) and per error/warning signature
+(``log_signatures.signature``).  Every counter is a time series over each
+configured window (``config.log_rate_windows``: name -> bucket seconds,
+bucket count; the first is the default), stored as fixed-size ring
+arrays.  The number of module and signature series is bounded (the least
+recently seen are dropped), so memory stays constant however long the
+editor runs.
+
+Entries are bucketed by their ``date`` (arrival time if missing).  Counters
+describe time, not the console contents: they survive ``clear_logs``, and
+entries the bridge sends again are skipped on the same ``(epoch, seq)``
+cursor as ``LogHistory``.
+
+``snapshot`` returns counts, rates and spikes -- series whose rate in the
+most recent tenth of the window is ``config.log_spike_factor`` times the
+rate before it -- without any individual log entry.
+"""
+
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Iterable, Callable
+
+from config import config
+from log_history import to_millis
+from log_index import MODULE_TAG
+from log_mirror import LOG_TYPES
+from log_signatures import signature
+
+# 按签名统计的日志类型
+SIGNATURE_TYPES = ("error", "warn")
+
+# (dimension, log type, key[, module])：("type", "error", "")、("module", "error", "Scene")、
+# ("signature", "error", "<模板>", "Scene")，签名序列的模块为 "" 时表示不区分模块
+SeriesKey = Tuple[str, ...]
+
+
+class _Window:
+    __slots__ = ("name", "width", "buckets")
+
+    def __init__(self, name: str, seconds: float, buckets: int) -> None:
+        self.name = name
+        self.width = max(1, int(seconds * 1000))
+        self.buckets = max(2, int(buckets))
+
+    @property
+    def seconds(self) -> float:
+        return self.width * self.buckets / 1000
+
+
+class _Series:
+    """Ring arrays of (bucket number, count) for every window."""
+
+    __slots__ = ("stamps", "counts")
+
+    def __init__(self, windows: List[_Window]) -> None:
+        self.stamps = [array('q', [-1]) * window.buckets for window in windows]
+        self.counts = [array('I', [0]) * window.buckets for window in windows]
+
+    def add(self, windows: List[_Window], timestamp: int) -> None:
+        for stamps, counts, window in zip(self.stamps, self.counts, windows):
+            bucket = timestamp // window.width
+            slot = bucket % window.buckets
+            stamp = stamps[slot]
+            if stamp == bucket:
+                counts[slot] += 1
+            elif stamp < bucket:
+                # 槽位中是一圈之前的桶，直接覆盖
+                stamps[slot] = bucket
+                counts[slot] = 1
+            # stamp > bucket：比窗口更旧的条目，不计数
+
+    def buckets(self, index: int, window: _Window, current: int) -> List[int]:
+        """Counts of the window's buckets ending with ``current``, oldest first."""
+        n = window.buckets
+        result = [0] * n
+        for stamp, count in zip(self.stamps[index], self.counts[index]):
+            age = current - stamp
+            if 0 <= age < n:
+                result[n - 1 - age] = count
+        return result
+
+
+def _rate(count: int, seconds: float) -> float:
+    """Entries per minute."""
+    return round(count * 60 / seconds, 3) if seconds > 0 else 0.0
+
+
+class LogRates:
+    """Per-type, per-module and per-signature time series over the synced console."""
+
+    def __init__(self, windows: Optional[Dict[str, List[float]]] = None,
+                 max_series: int = 1000,
+                 current_epoch: Optional[Callable[[], Optional[str]]] = None,
+                 clock: Callable[[], float] = time.time) -> None:
+        windows = config.log_rate_windows if windows is None else windows
+        self.windows = [_Window(name, seconds, buckets) for name, (seconds, buckets) in windows.items()]
+        if not self.windows:
+            raise ValueError("At least one log rate window is required")
+        self.max_series = max_series
+        # 与 LogHistory 相同，按 (epoch, seq) 跳过重复发送的条目
+        self.current_epoch = current_epoch or (lambda: None)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._types: Dict[SeriesKey, _Series] = {}
+        # 模块和签名的序列按最近出现的顺序排列，超出上限时淘汰最久未出现的
+        self._modules: "OrderedDict[SeriesKey, _Series]" = OrderedDict()
+        self._signatures: "OrderedDict[SeriesKey, _Series]" = OrderedDict()
+        self._last_epoch: Optional[str] = None
+        self._last_seq = -1
+        self._newest = -1
+        self._entries = 0
+        self._duplicates = 0
+        self._evicted_series = 0
+
+    # ------------------------------------------------------------------
+    # LogMirror listener interface
+    # ------------------------------------------------------------------
+
+    def on_append(self, entries: Iterable[Dict[str, Any]]) -> None:
+        epoch = self.current_epoch()
+        now = int(self.clock() * 1000)
+        windows = self.windows
+        with self._lock:
+            # 只与之前同步的条目比较时间，同一批中相同毫秒的条目都计数
+            newest = self._newest
+            for entry in entries:
+                timestamp = to_millis(entry.get("date"))
+                if timestamp is None:
+                    timestamp = now
+                seq = entry.get("seq")
+                if seq is not None and epoch is not None and epoch == self._last_epoch:
+                    if seq <= self._last_seq:
+                        self._duplicates += 1
+                        continue
+                elif timestamp <= newest:
+                    # 新的 epoch 或没有 seq：桥接端重启后会重新发送已计数的旧条目
+                    self._duplicates += 1
+                    continue
+                if seq is not None:
+                    self._last_epoch, self._last_seq = epoch, int(seq)
+                self._newest = max(self._newest, timestamp)
+                self._entries += 1
+
+                log_type = str(entry.get("type", "log")).lower()
+                self._series(self._types, ("type", log_type, ""), False).add(windows, timestamp)
+                message = entry.get("message") or ""
+                tags = set(MODULE_TAG.findall(message))
+                for tag in tags:
+                    self._series(self._modules, ("module", log_type, tag), True).add(windows, timestamp)
+                if log_type in SIGNATURE_TYPES:
+                    template = signature(entry)[1]
+                    # 模块取自原始消息，模板中的标签已被归一化（[Http2] -> [Http<n>]）
+                    for tag in ("", *tags):
+                        key = ("signature", log_type, template, tag)
+                        self._series(self._signatures, key, True).add(windows, timestamp)
+
+    def _series(self, table: Dict[SeriesKey, _Series], key: SeriesKey, bounded: bool) -> _Series:
+        series = table.get(key)
+        if series is None:
+            series = table[key] = _Series(self.windows)
+            if bounded and len(table) > self.max_series:
+                table.popitem(last=False)
+                self._evicted_series += 1
+        elif bounded:
+            table.move_to_end(key)
+        return series
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def window(self, name: Optional[str] = None) -> _Window:
+        if name is None:
+            return self.windows[0]
+        for window in self.windows:
+            if window.name == name:
+                return window
+        raise ValueError(f"Unknown window {name!r}, expected one of "
+                         f"{', '.join(window.name for window in self.windows)}")
+
+    def snapshot(self, window: Optional[str] = None, types: Iterable[str] = LOG_TYPES,
+                 module: Optional[str] = None, limit: int = 10,
+                 include_series: bool = False) -> Dict[str, Any]:
+        """
+        Counts, rates (per minute) and spikes over ``window``.
+
+        With ``module`` only entries tagged ``[module]`` are counted (type
+        counts come from the module's series, signatures from the series
+        recorded for that tag at ingest).  ``include_series`` adds the per-bucket
+        counts of the listed modules and signatures; type series are always
+        included.
+        """
+        current_window = self.window(window)
+        index = self.windows.index(current_window)
+        types = [log_type for log_type in LOG_TYPES if log_type in frozenset(types)]
+        now = int(self.clock() * 1000)
+        current = now // current_window.width
+        # 最后一个桶只经过了一部分，按实际时长计算速率
+        elapsed = (now - current * current_window.width) / 1000
+        seconds = current_window.seconds - current_window.width / 1000 + elapsed
+        recent_buckets = max(1, current_window.buckets // 10)
+        recent_seconds = (recent_buckets - 1) * current_window.width / 1000 + elapsed
+        baseline_seconds = seconds - recent_seconds
+
+        def describe(series: _Series) -> Tuple[List[int], Dict[str, Any]]:
+            buckets = series.buckets(index, current_window, current)
+            count = sum(buckets)
+            return buckets, {"count": count, "rate_per_min": _rate(count, seconds)}
+
+        def spike(buckets: List[int]) -> Optional[Dict[str, Any]]:
+            recent = sum(buckets[-recent_buckets:])
+            if recent < config.log_spike_min_count:
+                return None
+            baseline = sum(buckets[:-recent_buckets])
+            recent_rate = _rate(recent, recent_seconds)
+            baseline_rate = _rate(baseline, baseline_seconds)
+            if baseline_rate and recent_rate < config.log_spike_factor * baseline_rate:
+                return None
+            return {"recent_count": recent, "recent_rate_per_min": recent_rate,
+                    "baseline_rate_per_min": baseline_rate,
+                    "ratio": round(recent_rate / baseline_rate, 2) if baseline_rate else None}
+
+        type_stats: Dict[str, Any] = {}
+        modules: Dict[str, Dict[str, Any]] = {}
+        signatures: List[Dict[str, Any]] = []
+        spikes: List[Dict[str, Any]] = []
+        with self._lock:
+            if module is None:
+                type_series = {log_type: self._types.get(("type", log_type, "")) for log_type in types}
+            else:
+                type_series = {log_type: self._modules.get(("module", log_type, module)) for log_type in types}
+            for log_type, series in type_series.items():
+                buckets, stats = describe(series) if series is not None else ([0] * current_window.buckets,
+                                                                            {"count": 0, "rate_per_min": 0.0})
+                type_stats[log_type] = dict(stats, series=buckets)
+                found = spike(buckets)
+                if found:
+                    spikes.append(dict(found, dimension="type", type=log_type))
+
+            for (_, log_type, tag), series in self._modules.items():
+                if log_type not in types or (module is not None and tag != module):
+                    continue
+                buckets, stats = describe(series)
+                if not stats["count"]:
+                    continue
+                item = modules.setdefault(tag, {"module": tag, "count": 0, "by_type": {}, "_buckets": None})
+                item["count"] += stats["count"]
+                item["by_type"][log_type] = stats["count"]
+                item["_buckets"] = (buckets if item["_buckets"] is None
+                                    else [a + b for a, b in zip(item["_buckets"], buckets)])
+                found = spike(buckets)
+                if found:
+                    spikes.append(dict(found, dimension="module", type=log_type, module=tag))
+
+            wanted = "" if module is None else module
+            for (_, log_type, template, tag), series in self._signatures.items():
+                if log_type not in types or tag != wanted:
+                    continue
+                buckets, stats = describe(series)
+                if not stats["count"]:
+                    continue
+                signatures.append(dict(stats, signature=template, type=log_type, _buckets=buckets))
+                found = spike(buckets)
+                if found:
+                    spikes.append(dict(found, dimension="signature", type=log_type, signature=template))
+
+        top_modules = sorted(modules.values(), key=lambda item: -item["count"])[:limit]
+        top_signatures = sorted(signatures, key=lambda item: -item["count"])[:limit]
+        for item in top_modules + top_signatures:
+            buckets = item.pop("_buckets")
+            item["rate_per_min"] = _rate(item["count"], seconds)
+            if include_series:
+                item["series"] = buckets
+        total = sum(stats["count"] for stats in type_stats.values())
+        errors = type_stats.get("error", {}).get("count", 0)
+        return {
+            "window": current_window.name,
+            "bucket_seconds": current_window.width / 1000,
+            "buckets": current_window.buckets,
+            "end": now,
+            "module": module,
+            "total": total,
+            "error_ratio": round(errors / total, 4) if total else 0.0,
+            "types": type_stats,
+            "modules": top_modules,
+            "signatures": top_signatures,
+            "spikes": sorted(spikes, key=lambda item: -item["recent_count"])[:limit],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            series = len(self._types) + len(self._modules) + len(self._signatures)
+            return {
+                "windows": {window.name: [window.width / 1000, window.buckets] for window in self.windows},
+                "entries": self._entries,
+                "duplicates": self._duplicates,
+                "module_series": len(self._modules),
+                "signature_series": len(self._signatures),
+                "max_series": self.max_series,
+                "evicted_series": self._evicted_series,
+                "bytes": series * sum(window.buckets for window in self.windows) * 12,
+            }
@@ -0,0 +1,159 @@
+"""
+Error-signature aggregation of console entries.
+
+During hot-reload loops the console is dominated by the same warning or
+stack trace repeated thousands of times with only ids, numbers or paths
+changing.  ``signature`` reduces the first line of a message to a template
+by replacing URLs and file paths, uuids, hex ids and numbers with
+placeholders; entries with the same type and template share a signature.
+
+``LogAggregator`` is a ``LogMirror`` listener that counts signatures as
+entries arrive and keeps, per signature, the first and last timestamps,
+the first raw message and one representative stack.  Counts cover
+everything fetched since the console was last cleared, including entries
+the mirror has already evicted; the number of signatures is bounded.
+``aggregate`` groups a one-off list of entries with an unbounded
+aggregator.
+"""
+
+import heapq
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+_URL = re.compile(r"\b[a-zA-Z][\w+.-]*://\S+")
+_PATH = re.compile(
+    r"(?:\b[A-Za-z]:)?(?:[\\/][^\s\\/:'\"()\[\]<>]+){2,}(?::\d+)*"
+    r"|\b[\w.@-]+(?:[\\/][\w.@-]+)+\.\w+(?::\d+)*"
+)
+_UUID = re.compile(r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?:@\w+)?")
+# 0x 前缀，或同时包含数字和字母、至少 12 位的十六进制串（哈希、实例 id）
+_HEX = re.compile(r"\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*\d)(?=[0-9a-fA-F]*[a-fA-F])[0-9a-fA-F]{12,}\b")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_SPACES = re.compile(r"\s+")
+
+# 只用第一行计算签名，其余行通常是调用栈
+_MAX_SIGNATURE_LENGTH = 300
+
+
+@lru_cache(maxsize=8192)
+def normalize_message(message: str) -> str:
+    """Template of the first line of ``message`` with variable parts replaced."""
+    line = message.strip().split("\n", 1)[0][:_MAX_SIGNATURE_LENGTH]
+    line = _URL.sub("<url>", line)
+    line = _PATH.sub("<path>", line)
+    line = _UUID.sub("<uuid>", line)
+    line = _HEX.sub("<hex>", line)
+    line = _NUMBER.sub("<n>", line)
+    return _SPACES.sub(" ", line).strip()
+
+
+def signature(entry: Dict[str, Any]) -> Tuple[str, str]:
+    """(type, message template) identifying near-identical entries."""
+    return str(entry.get("type", "log")).lower(), normalize_message(entry.get("message") or "")
+
+
+def _stack_of(entry: Dict[str, Any]) -> Optional[str]:
+    """The entry's stack, or the message lines after the first one."""
+    stack = entry.get("stack")
+    if stack:
+        return stack
+    parts = (entry.get("message") or "").strip().split("\n", 1)
+    return parts[1] if len(parts) > 1 else None
+
+
+class _Signature:
+    __slots__ = ("type", "template", "count", "first_seen", "last_seen", "message", "stack")
+
+    def __init__(self, key: Tuple[str, str], entry: Dict[str, Any]) -> None:
+        self.type, self.template = key
+        self.count = 0
+        self.first_seen = entry.get("date")
+        self.last_seen = entry.get("date")
+        self.message = entry.get("message") or ""
+        self.stack = _stack_of(entry)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        self.count += 1
+        self.last_seen = entry.get("date")
+        if self.stack is None:
+            self.stack = _stack_of(entry)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "signature": self.template,
+            "type": self.type,
+            "count": self.count,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "message": self.message,
+            "stack": self.stack,
+        }
+
+
+class LogAggregator:
+    """Incremental signature counts over the mirrored console (``max_signatures`` None: unbounded)."""
+
+    def __init__(self, max_signatures: Optional[int] = 10000) -> None:
+        self.max_signatures = max_signatures
+        self._lock = threading.Lock()
+        self._signatures: Dict[Tuple[str, str], _Signature] = {}
+        self._entries = 0
+        self._pruned = 0
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def on_append(self, entries: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            signatures = self._signatures
+            for entry in entries:
+                key = signature(entry)
+                group = signatures.get(key)
+                if group is None:
+                    group = signatures[key] = _Signature(key, entry)
+                group.add(entry)
+                self._entries += 1
+            # 超出上限 10% 后一次性裁剪，均摊开销
+            if self.max_signatures is not None and len(signatures) > self.max_signatures * 1.1:
+                self._prune()
+
+    def on_reset(self) -> None:
+        with self._lock:
+            self._signatures = {}
+            self._entries = 0
+
+    def _prune(self) -> None:
+        """Keep the ``max_signatures`` most frequent signatures."""
+        keep = heapq.nlargest(self.max_signatures, self._signatures.items(), key=lambda item: item[1].count)
+        self._pruned += len(self._signatures) - len(keep)
+        self._signatures = dict(keep)
+
+    def top(self, limit: int = 10, types: Optional[Iterable[str]] = ("error",)) -> List[Dict[str, Any]]:
+        """
+        The ``limit`` most frequent signatures of the given log types (None: all
+        types); ties keep the order of first appearance.
+        """
+        types = frozenset(types) if types is not None else None
+        with self._lock:
+            groups = [group for group in self._signatures.values() if types is None or group.type in types]
+            # nlargest 与稳定排序等价，计数相同的签名保持首次出现的顺序
+            top = heapq.nlargest(limit, groups, key=lambda group: group.count)
+            return [group.to_dict() for group in top]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "signatures": len(self._signatures),
+                "entries": self._entries,
+                "max_signatures": self.max_signatures,
+                "pruned": self._pruned,
+            }
+
+
+def aggregate(entries: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group entries by signature, most frequent first (ties in order of first appearance)."""
+    aggregator = LogAggregator(max_signatures=None)
+    aggregator.on_append(entries)
+    return aggregator.top(len(aggregator), types=None)
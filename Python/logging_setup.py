@@ -0,0 +1,246 @@
+"""
+Logging subsystem of the MCP server (its own ``cocos_mcp.log``, not the
+editor console logs handled by ``log_mirror``/``log_history``).
+
+Logging used to be configured with ``logging.basicConfig`` in both
+``server.py`` and ``cocos_connection.py``, and the request path formatted
+whole parameter and response dicts with f-strings and wrote them to the
+file synchronously.  Here:
+
+* ``setup_logging()`` configures the root logger once.  Records go through
+  a bounded queue to a ``QueueListener`` thread that formats and writes
+  them; the request path only creates the record.  When the queue is full
+  records are dropped and counted instead of blocking the caller.
+* ``preview(obj)`` renders a payload for a log argument with ``reprlib``
+  limits, so the cost does not grow with the payload and the output is
+  capped at ``config.log_preview_chars``.  It renders right away in the
+  calling thread and keeps only the string: a queued record must not hold
+  on to a payload the caller may still change.  Call sites check
+  ``logger.isEnabledFor`` first so nothing is rendered when the level is
+  disabled.
+* Every tool call gets a correlation id (``request_context``), added to all
+  records it produces as ``%(request_id)s``, also for the commands it sends
+  and across the tool thread pool.
+* DEBUG records are sampled per message template
+  (``config.log_debug_sample_every``), so per-command and per-frame debug
+  lines stay usable on a busy server.
+
+Call sites use lazy ``%s`` arguments so the message itself is only
+formatted on the listener thread, and only if the record is emitted.
+"""
+
+import atexit
+import contextvars
+import itertools
+import logging
+import logging.handlers
+import queue
+import reprlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Iterator, Callable, TypeVar
+
+from config import config
+
+T = TypeVar("T")
+
+# 当前工具调用的关联 ID，没有时为 "-"
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("cocos_mcp_request_id", default="-")
+_ids = itertools.count(1)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional["_QueueHandler"] = None
+_sampler: Optional["DebugSampler"] = None
+_setup_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# Payload previews
+# ----------------------------------------------------------------------
+
+class _BoundedRepr(reprlib.Repr):
+    def __init__(self) -> None:
+        super().__init__()
+        self.maxlevel = 4
+        self.maxdict = 8
+        self.maxlist = 8
+        self.maxtuple = 8
+        self.maxset = 8
+        self.maxstring = 80
+        self.maxother = 80
+
+
+_repr = _BoundedRepr()
+
+
+class preview:
+    """
+    Log argument holding a bounded rendering of ``obj``.
+
+    Rendered when created, so guard the call with ``logger.isEnabledFor``::
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Command result: %s", preview(result))
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, obj: Any, limit: Optional[int] = None) -> None:
+        limit = limit if limit is not None else config.log_preview_chars
+        text = _repr.repr(obj)
+        if limit > 0 and len(text) > limit:
+            text = f"{text[:limit]}... ({len(text)} chars)"
+        self.text = text
+
+    def __str__(self) -> str:
+        return self.text
+
+    __repr__ = __str__
+
+
+# ----------------------------------------------------------------------
+# Correlation ids
+# ----------------------------------------------------------------------
+
+def current_request_id() -> str:
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(name: str) -> Iterator[str]:
+    """Give the block (e.g. one tool call) a new correlation id ``<name>#<n>``."""
+    request_id = f"{name}#{next(_ids)}"
+    token = _request_id.set(request_id)
+    try:
+        yield request_id
+    finally:
+        _request_id.reset(token)
+
+
+def without_request_id(fn: Callable[..., T], *args: Any) -> T:
+    """
+    Call ``fn`` outside any correlation id, e.g. ``loop.create_task`` for a
+    background task that must not inherit the id of the tool call that
+    happened to start it (tasks copy the current context).
+    """
+    return contextvars.Context().run(fn, *args)
+
+
+class RequestIdFilter(logging.Filter):
+    """Adds ``request_id`` to every record; runs in the thread that logs, where the context is set."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        return True
+
+
+# ----------------------------------------------------------------------
+# Sampling
+# ----------------------------------------------------------------------
+
+class DebugSampler(logging.Filter):
+    """Keeps the first and then every ``every``-th DEBUG record of each message template."""
+
+    def __init__(self, every: int = 1) -> None:
+        super().__init__()
+        self.every = max(1, every)
+        self._counts: Dict[Any, int] = {}
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != logging.DEBUG or self.every <= 1:
+            return True
+        key = (record.name, record.msg)
+        # 计数不加锁，并发时偶尔多保留或少保留一条可以接受
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+# ----------------------------------------------------------------------
+# Queue handler
+# ----------------------------------------------------------------------
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records without formatting them.
+
+    The standard ``QueueHandler.prepare`` formats the message in the calling
+    thread (so that records can cross process boundaries); the queue here
+    stays in-process, so formatting is left to the listener thread.
+    """
+
+    def __init__(self, log_queue: "queue.Queue") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # 写日志跟不上时丢弃，不阻塞请求
+            self.dropped += 1
+
+
+def setup_logging(force: bool = False) -> None:
+    """
+    Configure the root logger from ``config`` (idempotent).
+
+    With ``config.log_queue_size`` 0 the file handler is attached directly,
+    i.e. records are written synchronously as before.
+    """
+    global _listener, _queue_handler, _sampler
+    with _setup_lock:
+        if _sampler is not None and not force:
+            return
+        shutdown_logging()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+
+        handler: logging.Handler = (logging.FileHandler(config.log_file, mode="a", encoding="utf-8")
+                                    if config.log_file else logging.StreamHandler())
+        handler.setFormatter(logging.Formatter(config.log_format))
+        _sampler = DebugSampler(config.log_debug_sample_every)
+        if config.log_queue_size > 0:
+            _queue_handler = _QueueHandler(queue.Queue(config.log_queue_size))
+            front: logging.Handler = _queue_handler
+            _listener = logging.handlers.QueueListener(_queue_handler.queue, handler)
+            _listener.start()
+        else:
+            front = handler
+        # 先采样，被丢弃的记录不再做其他处理
+        front.addFilter(_sampler)
+        front.addFilter(RequestIdFilter())
+        root.addHandler(front)
+        root.setLevel(getattr(logging, config.log_level))
+
+
+def shutdown_logging() -> None:
+    """Stop the listener thread after writing the queued records."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+def logging_stats() -> Dict[str, Any]:
+    """Queue depth and records dropped by the full queue or by debug sampling."""
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        "dropped_queue_full": _queue_handler.dropped if _queue_handler is not None else 0,
+        "dropped_sampled": _sampler.dropped if _sampler is not None else 0,
+    }
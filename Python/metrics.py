@@ -0,0 +1,301 @@
+"""
+Per-command metrics for requests sent to the Cocos Creator bridge.
+
+Every request made through ``CocosConnection`` / ``AsyncCocosConnection``
+is measured with a ``RequestTimer`` and recorded in the global ``metrics``
+registry, keyed by command type:
+
+- total latency, from sending the request to having the parsed response
+- JSON parse time of the response
+- the bridge's own handler time, reported as ``handler_ms`` in responses
+- transport time: latency minus handler and parse time, i.e. socket wait,
+  framing and queueing on either side
+- request / response bytes, error and timeout counts
+
+Latencies are kept in fixed-bucket histograms so recording is O(1) and the
+memory used does not depend on the number of requests; percentiles are
+estimated from the buckets.  ``to_prometheus`` renders the registry in the
+Prometheus text exposition format and ``dump`` writes it (or the JSON
+snapshot) to a file, optionally every few seconds from a background thread.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger("CocosMCP")
+
+# 直方图桶上界（毫秒），最后一个桶收集更慢的请求
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+DUMP_FORMATS = ("json", "prometheus")
+
+
+class Histogram:
+    """Fixed-bucket histogram of millisecond values."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a percentile by interpolating inside its bucket."""
+        if self.count == 0:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = LATENCY_BUCKETS_MS[index - 1] if index > 0 else 0.0
+                upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else self.max
+                # 用实际的最小/最大值收紧首尾桶的范围
+                lower = max(lower, self.min)
+                upper = min(upper, self.max)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "min": round(self.min, 3),
+            "p50": round(self.percentile(0.50), 3),
+            "p90": round(self.percentile(0.90), 3),
+            "p99": round(self.percentile(0.99), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class CommandMetrics:
+    """Counters and histograms of one command type."""
+
+    __slots__ = ("requests", "errors", "timeouts", "bytes_sent", "bytes_received",
+                 "latency", "parse", "handler", "transport")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = Histogram()
+        self.parse = Histogram()
+        self.handler = Histogram()
+        self.transport = Histogram()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "latency_ms": self.latency.snapshot(),
+            "parse_ms": self.parse.snapshot(),
+            "handler_ms": self.handler.snapshot(),
+            "transport_ms": self.transport.snapshot(),
+        }
+
+
+class RequestTimer:
+    """
+    Measurements of one request, recorded with ``finish``.
+
+    A request may receive several frames (streaming); bytes and parse time
+    accumulate over all of them.
+    """
+
+    __slots__ = ("registry", "command", "started", "bytes_sent", "bytes_received",
+                 "parse_time", "handler_ms")
+
+    def __init__(self, registry: "BridgeMetrics", command: str) -> None:
+        self.registry = registry
+        self.command = command
+        self.started = time.perf_counter()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.parse_time = 0.0
+        self.handler_ms: Optional[float] = None
+
+    def received(self, size: int, parse_time: float, response: Any) -> Any:
+        """Account for one received response and pass it through."""
+        self.bytes_received += size
+        self.parse_time += parse_time
+        if isinstance(response, dict):
+            handler_ms = response.get("handler_ms")
+            if isinstance(handler_ms, (int, float)):
+                self.handler_ms = (self.handler_ms or 0.0) + handler_ms
+        return response
+
+    def parse(self, data, size: Optional[int] = None) -> Any:
+        """``json.loads`` the response payload, timing it."""
+        started = time.perf_counter()
+        response = json.loads(data)
+        return self.received(len(data) if size is None else size,
+                             time.perf_counter() - started, response)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.registry.record(self, error)
+
+
+def is_timeout(error: Optional[BaseException]) -> bool:
+    # 同步与异步连接都把超时转换为 TimeoutError 抛出
+    return isinstance(error, TimeoutError)
+
+
+class BridgeMetrics:
+    """Thread-safe registry of per-command request metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._commands: Dict[str, CommandMetrics] = {}
+        self._since = time.time()
+        self._dump_thread: Optional[threading.Thread] = None
+        self._dump_stop = threading.Event()
+
+    def start(self, command: str) -> RequestTimer:
+        """Begin measuring a request for ``command``."""
+        return RequestTimer(self, command)
+
+    def record(self, timer: RequestTimer, error: Optional[BaseException] = None) -> None:
+        latency = (time.perf_counter() - timer.started) * 1000
+        parse = timer.parse_time * 1000
+        with self._lock:
+            stats = self._commands.get(timer.command)
+            if stats is None:
+                stats = self._commands[timer.command] = CommandMetrics()
+            stats.requests += 1
+            stats.bytes_sent += timer.bytes_sent
+            stats.bytes_received += timer.bytes_received
+            if error is not None:
+                stats.errors += 1
+                if is_timeout(error):
+                    stats.timeouts += 1
+            stats.latency.observe(latency)
+            if timer.bytes_received:
+                stats.parse.observe(parse)
+            if timer.handler_ms is not None:
+                stats.handler.observe(timer.handler_ms)
+                stats.transport.observe(max(0.0, latency - parse - timer.handler_ms))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._commands = {}
+            self._since = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All metrics as a JSON-serializable dict."""
+        with self._lock:
+            commands = {name: stats.snapshot() for name, stats in sorted(self._commands.items())}
+            since = self._since
+        totals = {key: sum(stats[key] for stats in commands.values())
+                  for key in ("requests", "errors", "timeouts", "bytes_sent", "bytes_received")}
+        return {
+            "since": since,
+            "window_seconds": round(time.time() - since, 3),
+            "totals": totals,
+            "commands": commands,
+        }
+
+    def to_prometheus(self) -> str:
+        """Render the registry in the Prometheus text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            commands = sorted(self._commands.items())
+            counters = (
+                ("requests", "cocos_mcp_requests_total", "Requests sent to the bridge"),
+                ("errors", "cocos_mcp_request_errors_total", "Requests that failed, including timeouts"),
+                ("timeouts", "cocos_mcp_request_timeouts_total", "Requests that timed out"),
+                ("bytes_sent", "cocos_mcp_request_bytes_total", "Bytes sent to the bridge"),
+                ("bytes_received", "cocos_mcp_response_bytes_total", "Bytes received from the bridge"),
+            )
+            for attribute, name, help_text in counters:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for command, stats in commands:
+                    lines.append(f'{name}{{command="{_label(command)}"}} {getattr(stats, attribute)}')
+            histograms = (
+                ("latency", "cocos_mcp_request_duration_seconds", "Request latency seen by the server"),
+                ("parse", "cocos_mcp_response_parse_seconds", "Time spent parsing response JSON"),
+                ("handler", "cocos_mcp_bridge_handler_seconds", "Handler time reported by the bridge"),
+                ("transport", "cocos_mcp_transport_seconds", "Latency not spent in the handler or parsing"),
+            )
+            for attribute, name, help_text in histograms:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for command, stats in commands:
+                    _histogram_lines(lines, name, _label(command), getattr(stats, attribute))
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str, format: str = "json") -> None:
+        """Write the metrics to ``path`` atomically, so scrapers never see a partial file."""
+        if format not in DUMP_FORMATS:
+            raise ValueError(f"Unknown metrics format: {format}")
+        text = self.to_prometheus() if format == "prometheus" else json.dumps(self.snapshot(), indent=2)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+
+    def start_dump(self, path: str, format: str = "prometheus", interval: float = 15.0) -> None:
+        """Dump the metrics to ``path`` every ``interval`` seconds from a daemon thread."""
+        if self._dump_thread is not None:
+            return
+        if format not in DUMP_FORMATS:
+            raise ValueError(f"Unknown metrics format: {format}")
+        self._dump_stop.clear()
+
+        def run():
+            while not self._dump_stop.wait(interval):
+                try:
+                    self.dump(path, format)
+                except Exception as e:
+                    logger.error("Failed to dump metrics to %s: %s", path, e)
+
+        self._dump_thread = threading.Thread(target=run, name="cocos-mcp-metrics", daemon=True)
+        self._dump_thread.start()
+        logger.info("Dumping bridge metrics to %s every %ss (%s)", path, interval, format)
+
+    def stop_dump(self) -> None:
+        thread, self._dump_thread = self._dump_thread, None
+        if thread is not None:
+            self._dump_stop.set()
+            thread.join()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(lines: List[str], name: str, command: str, histogram: Histogram) -> None:
+    cumulative = 0
+    for bound, count in zip(LATENCY_BUCKETS_MS, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{command="{command}",le="{bound / 1000:g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{command="{command}",le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{command="{command}"}} {histogram.total / 1000:.6f}')
+    lines.append(f'{name}_count{{command="{command}"}} {histogram.count}')
+
+
+# Global metrics registry shared by every connection
+metrics = BridgeMetrics()
@@ -0,0 +1,194 @@
+"""
+Wire protocol shared by the Python client and the LogBridge TCP server.
+
+The original bridge exchanged bare JSON documents and relied on the reader to
+notice when the bytes received so far formed a complete document.  Protocol
+version 1 prefixes every message with a fixed-size header carrying the exact
+payload length, so the receiver can read the payload into one preallocated
+buffer and parse it exactly once.
+
+Framing is negotiated per connection: right after connecting the client sends
+a bare-JSON ``HELLO`` command.  A bridge that understands framing answers with
+the protocol version it selected and switches that socket to framed mode for
+both directions; an older bridge answers with an "unknown command" error and
+the client keeps using bare JSON.
+
+Frame layout (big-endian)::
+
+    +-------+---------+-------+----------------+----------------+
+    | magic | version | flags | payload length | payload ...    |
+    | 2 B   | 1 B     | 1 B   | 4 B (uint32)   | length bytes   |
+    +-------+---------+-------+----------------+----------------+
+
+Compression is negotiated in the same ``HELLO``: the client lists the codecs
+it accepts and its size threshold, and a bridge that supports one of them
+names it in the answer.  From then on either side may send a payload of at
+least the threshold as a zlib stream with ``FLAG_COMPRESSED`` set; smaller
+payloads (pings, single commands) stay raw.  The length in the header is
+always the number of bytes on the wire.
+"""
+
+import struct
+import zlib
+from typing import Dict, Any, Optional, Tuple, FrozenSet
+
+# Version 0 is the legacy bare-JSON mode, version 1 adds length-prefixed frames.
+LEGACY_PROTOCOL_VERSION = 0
+PROTOCOL_VERSION = 1
+
+HELLO_COMMAND = "HELLO"
+# Framed connections only: ask the bridge to push event frames ({"event": ...}, no id)
+SUBSCRIBE_COMMAND = "SUBSCRIBE"
+
+# Read-only commands that can safely be resent after a transport failure.
+# BATCH is idempotent when all of its items are.
+IDEMPOTENT_COMMANDS = frozenset({"ping", "QUERY_LOGS", "GET_SCENE_INFO", "LIST_SCENE_NODES",
+                                 "QUERY_SCENE_NODES", "HASH_SCENE_NODES", SUBSCRIBE_COMMAND})
+BATCH_COMMAND = "BATCH"
+
+# Read commands whose concurrent identical requests share one editor call
+SCENE_READ_COMMANDS = frozenset({"GET_SCENE_INFO", "LIST_SCENE_NODES", "QUERY_SCENE_NODES",
+                                 "HASH_SCENE_NODES"})
+COALESCED_COMMANDS = SCENE_READ_COMMANDS | {"QUERY_LOGS"}
+# Concurrency classes: the bridge runs scene commands through execute-scene-script
+# and log commands through Editor.Logger; control commands (ping, HELLO,
+# SUBSCRIBE) belong to no class and are never queued behind them
+COMMAND_CLASSES = {
+    "scene": SCENE_READ_COMMANDS | {"OPEN_SCENE"},
+    "logs": frozenset({"QUERY_LOGS", "CLEAR_LOGS"}),
+}
+# Commands that change editor state and the read results they make stale;
+# any other non-idempotent command invalidates every read
+INVALIDATED_BY = {
+    "OPEN_SCENE": SCENE_READ_COMMANDS,
+    "CLEAR_LOGS": frozenset({"QUERY_LOGS"}),
+}
+
+# Frame flags
+FLAG_COMPRESSED = 0x01  # payload is a zlib stream
+KNOWN_FLAGS = FLAG_COMPRESSED
+
+COMPRESSION_ZLIB = "zlib"
+
+FRAME_MAGIC = b"CM"
+FRAME_HEADER = struct.Struct(">2sBBI")
+FRAME_HEADER_SIZE = FRAME_HEADER.size
+
+# Refuse frames larger than this to protect against corrupt headers
+DEFAULT_MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends bytes that violate the framing protocol."""
+
+
+def is_idempotent(command_type: str, params: Optional[Dict[str, Any]] = None) -> bool:
+    """Whether resending the command cannot change editor state."""
+    if command_type == BATCH_COMMAND:
+        commands = (params or {}).get("commands") or []
+        return all(is_idempotent(item.get("type", ""), item.get("params")) for item in commands)
+    return command_type in IDEMPOTENT_COMMANDS
+
+
+def invalidated_commands(command_type: str, params: Optional[Dict[str, Any]] = None) -> FrozenSet[str]:
+    """Read command types whose cached results are stale after this command ran."""
+    if command_type == BATCH_COMMAND:
+        commands = (params or {}).get("commands") or []
+        return frozenset().union(*(invalidated_commands(item.get("type", ""), item.get("params"))
+                                   for item in commands))
+    if command_type in IDEMPOTENT_COMMANDS or command_type == HELLO_COMMAND:
+        return frozenset()
+    return INVALIDATED_BY.get(command_type, COALESCED_COMMANDS)
+
+
+def command_class(command_type: str, params: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """Concurrency class of a command; a BATCH takes the first class among its items."""
+    if command_type == BATCH_COMMAND:
+        for item in (params or {}).get("commands") or []:
+            item_class = command_class(item.get("type", ""), item.get("params"))
+            if item_class is not None:
+                return item_class
+        return None
+    for name, commands in COMMAND_CLASSES.items():
+        if command_type in commands:
+            return name
+    return None
+
+
+def encode_frame(payload: bytes, flags: int = 0, version: int = PROTOCOL_VERSION) -> bytes:
+    """Prefix ``payload`` with a frame header."""
+    return FRAME_HEADER.pack(FRAME_MAGIC, version, flags, len(payload)) + payload
+
+
+def decode_header(header: bytes, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE) -> Tuple[int, int, int]:
+    """
+    Validate a frame header.
+
+    Returns:
+        Tuple of (version, flags, payload length)
+    """
+    magic, version, flags, length = FRAME_HEADER.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise ProtocolError(f"Invalid frame magic: {magic!r}")
+    if version < 1 or version > PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version: {version}")
+    if flags & ~KNOWN_FLAGS:
+        raise ProtocolError(f"Unknown frame flags: {flags:#x}")
+    if length > max_frame_size:
+        raise ProtocolError(f"Frame too large: {length} bytes (limit {max_frame_size})")
+    return version, flags, length
+
+
+def compress_payload(payload: bytes, threshold: int, level: int = 1) -> Tuple[bytes, int]:
+    """
+    Compress ``payload`` if it is at least ``threshold`` bytes.
+
+    Returns:
+        Tuple of (bytes to send, frame flags); the payload is sent raw when
+        compression is off (threshold <= 0), it is too small, or it does not shrink
+    """
+    if threshold <= 0 or len(payload) < threshold:
+        return payload, 0
+    compressed = zlib.compress(payload, level)
+    if len(compressed) >= len(payload):
+        return payload, 0
+    return compressed, FLAG_COMPRESSED
+
+
+class Inflater:
+    """
+    Incremental zlib decompression into a bounded buffer.
+
+    Compressed chunks are fed as they arrive from the socket, so inflating
+    overlaps with the transfer.  Output beyond ``max_size`` raises
+    ``ProtocolError`` without being materialized, which protects against
+    corrupt or malicious frames that expand enormously.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_FRAME_SIZE) -> None:
+        self.max_size = max_size
+        self._decompressor = zlib.decompressobj()
+        self._output = bytearray()
+
+    def feed(self, data) -> None:
+        # 最多多解出一个字节，用来判断是否超出上限
+        remaining = self.max_size - len(self._output) + 1
+        try:
+            self._output += self._decompressor.decompress(data, remaining)
+        except zlib.error as e:
+            raise ProtocolError(f"Corrupt compressed frame: {e}")
+        if len(self._output) > self.max_size or self._decompressor.unconsumed_tail:
+            raise ProtocolError(f"Decompressed frame exceeds {self.max_size} bytes")
+
+    def finish(self) -> bytearray:
+        """The decompressed payload; raises if the stream is incomplete."""
+        if not self._decompressor.eof or self._decompressor.unused_data:
+            raise ProtocolError("Truncated or trailing data in compressed frame")
+        return self._output
+
+
+def decompress_payload(payload, max_size: int = DEFAULT_MAX_FRAME_SIZE) -> bytearray:
+    """Inflate a complete compressed payload, bounded by ``max_size``."""
+    inflater = Inflater(max_size)
+    inflater.feed(payload)
+    return inflater.finish()
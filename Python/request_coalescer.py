@@ -0,0 +1,215 @@
+"""
+Single-flight coalescing of identical read commands.
+
+Several agent sub-tasks often ask for the same thing at the same moment,
+e.g. ``GET_SCENE_INFO`` right after a scene was opened.  Without
+coalescing every call walks the scene tree or queries the editor console
+again.  ``RequestCoalescer`` sits in front of the connection pool: a read
+command (``protocol.COALESCED_COMMANDS``) with the same type and parameters
+as one already in flight waits for that call instead of sending its own.
+
+Optionally, successful results are also kept for a short, per-command-type
+TTL (``config.coalesce_ttl``), so requests that arrive shortly after each
+other are answered locally as well.  A command that changes editor state
+invalidates the affected command types when it completes
+(``protocol.invalidated_commands``): cached results are dropped, calls in
+flight no longer accept new waiters, and their results are not cached.
+Scene events and a lost connection invalidate in the same way.
+
+Coalesced callers share one result object, which must not be modified.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, Iterable, TypeVar
+
+from cocos_connection import DISCONNECTED_EVENT
+from protocol import COALESCED_COMMANDS, SCENE_READ_COMMANDS, invalidated_commands
+
+T = TypeVar("T")
+
+# (command type, parameters as canonical JSON)
+Key = Tuple[str, str]
+
+
+class _Counters:
+    __slots__ = ("requests", "editor_calls", "coalesced", "hits", "invalidations")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.editor_calls = 0
+        self.coalesced = 0
+        self.hits = 0
+        self.invalidations = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RequestCoalescer:
+    """Shares in-flight read commands and optionally caches their results briefly."""
+
+    def __init__(self, enabled: bool = True, ttls: Optional[Dict[str, float]] = None) -> None:
+        self.enabled = enabled
+        self.ttls = dict(ttls or {})
+        self._lock = threading.Lock()
+        # 每种命令的失效代数，发出请求后代数变化则结果不再缓存
+        self._generations: Dict[str, int] = {}
+        self._tasks: Dict[Key, "asyncio.Task"] = {}
+        # 共享请求 -> 仍在等待它的调用方数量
+        self._waiters: Dict["asyncio.Task", int] = {}
+        # key -> (result, expires_at)
+        self._cache: Dict[Key, Tuple[Any, float]] = {}
+        self._counters: Dict[str, _Counters] = {}
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def _key(self, command_type: str, params: Optional[Dict[str, Any]]) -> Optional[Key]:
+        if not self.enabled or command_type not in COALESCED_COMMANDS:
+            return None
+        try:
+            return command_type, json.dumps(params or {}, sort_keys=True, separators=(",", ":"))
+        except (TypeError, ValueError):
+            return None
+
+    def _lookup(self, key: Key) -> Tuple[bool, Any]:
+        """(hit, result) from the TTL cache; called with the lock held."""
+        counters = self._counters_for(key[0])
+        counters.requests += 1
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[1] <= time.monotonic():
+            del self._cache[key]
+            return False, None
+        counters.hits += 1
+        return True, entry[0]
+
+    def _store(self, key: Key, generation: int, result: Any) -> None:
+        ttl = self.ttls.get(key[0], 0.0)
+        # 失败的结果不缓存
+        if ttl <= 0 or (isinstance(result, dict) and result.get("success") is False):
+            return
+        with self._lock:
+            if self._generations.get(key[0], 0) == generation:
+                self._cache[key] = (result, time.monotonic() + ttl)
+
+    async def call_async(self, command_type: str, params: Optional[Dict[str, Any]],
+                         send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await ``send()`` for the command, sharing it with identical concurrent calls.
+
+        The shared call runs as its own task: cancelling one caller does not
+        cancel the request the other callers are waiting for.  Only when the
+        last waiting caller is cancelled is the request itself cancelled.
+        """
+        key = self._key(command_type, params)
+        if key is None:
+            return await self._invalidating_async(command_type, params, send)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            hit, result = self._lookup(key)
+            if hit:
+                return result
+            task = self._tasks.get(key)
+            # 连接按事件循环创建，其他事件循环上的请求不能共享
+            if task is not None and task.get_loop() is loop:
+                self._counters[command_type].coalesced += 1
+            else:
+                generation = self._generations.get(command_type, 0)
+                task = self._tasks[key] = loop.create_task(self._run(key, generation, send))
+                task.add_done_callback(self._task_done)
+                self._counters[command_type].editor_calls += 1
+            self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            with self._lock:
+                remaining = self._waiters.pop(task, 1) - 1
+                if remaining:
+                    self._waiters[task] = remaining
+                elif not task.done() and self._tasks.get(key) is task:
+                    # 没有调用方再等待，之后的相同请求不能再加入将被取消的请求
+                    del self._tasks[key]
+            if not remaining and not task.done():
+                # 所有调用方都已取消，取消请求以释放并发名额
+                task.cancel()
+
+    async def _run(self, key: Key, generation: int, send: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await send()
+        finally:
+            with self._lock:
+                if self._tasks.get(key) is asyncio.current_task():
+                    del self._tasks[key]
+        self._store(key, generation, result)
+        return result
+
+    @staticmethod
+    def _task_done(task: "asyncio.Task") -> None:
+        # 所有调用方都已取消时没有人读取异常，避免 "exception was never retrieved" 警告
+        if not task.cancelled():
+            task.exception()
+
+    async def _invalidating_async(self, command_type: str, params: Optional[Dict[str, Any]],
+                                  send: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await send()
+        finally:
+            self.invalidate(invalidated_commands(command_type, params), command_type)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def invalidate(self, command_types: Iterable[str] = COALESCED_COMMANDS, reason: str = "manual") -> None:
+        """Drop cached results of these command types and stop sharing their calls in flight."""
+        command_types = frozenset(command_types)
+        if not command_types:
+            return
+        with self._lock:
+            for command_type in command_types:
+                self._generations[command_type] = self._generations.get(command_type, 0) + 1
+                self._counters_for(command_type).invalidations += 1
+            # 进行中的请求可能在状态变化之前已被编辑器处理，之后的调用方重新发送
+            for entries in (self._cache, self._tasks):
+                for key in [key for key in entries if key[0] in command_types]:
+                    del entries[key]
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """Event listener: scene events make scene reads stale, a lost connection everything."""
+        name = str(event.get("event"))
+        if name == DISCONNECTED_EVENT:
+            self.invalidate(COALESCED_COMMANDS, name)
+        elif name.startswith("scene:"):
+            self.invalidate(SCENE_READ_COMMANDS, name)
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def _counters_for(self, command_type: str) -> _Counters:
+        counters = self._counters.get(command_type)
+        if counters is None:
+            counters = self._counters[command_type] = _Counters()
+        return counters
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            commands = {command_type: counters.to_dict() for command_type, counters in self._counters.items()}
+            in_flight = len(self._tasks)
+            cached = len(self._cache)
+        totals = {name: sum(counters[name] for counters in commands.values())
+                  for name in ("requests", "editor_calls", "coalesced", "hits")}
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttls,
+            "in_flight": in_flight,
+            "cached": cached,
+            **totals,
+            "commands": commands,
+        }
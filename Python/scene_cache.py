@@ -0,0 +1,213 @@
+"""
+Local cache of scene query results kept current by editor events.
+
+The bridge pushes an event frame to every subscribed connection when the
+editor broadcasts a scene change (scene opened or closed, node added,
+removed or changed).  ``SceneCache`` stores ``GET_SCENE_INFO`` and
+``LIST_SCENE_NODES`` results for the open scene and drops them as soon as
+such an event arrives, so repeated reads of an unchanged scene are answered
+locally.
+
+Every invalidation bumps ``generation``.  A result is only stored if the
+generation did not change while it was being fetched, which discards
+results that raced with an edit.  Without an active subscription (old
+bridge, legacy protocol, connection lost) nothing is served from the cache.
+
+Node listings are keyed by their query parameters (page, filters, format),
+so an unchanged scene can accumulate many entries; at most
+``config.scene_cache_max_entries`` are kept, dropping the least recently
+used one first.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable, Hashable
+
+from config import config
+from cocos_connection import DISCONNECTED_EVENT
+
+logger = logging.getLogger("CocosMCP")
+
+SCENE_EVENTS = "scene"
+# 这些事件表示打开了另一个场景，其余场景事件只影响当前场景的内容
+SCENE_SWITCH_EVENTS = ("scene:ready", "scene:close")
+
+
+class SceneCache:
+    """Scene info and node listings of the open scene, invalidated by editor events."""
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries = config.scene_cache_max_entries if max_entries is None else max_entries
+        self._lock = threading.RLock()
+        self.scene_uuid: Optional[str] = None
+        self.generation = 0
+        self.subscribed = False
+        # 桥接端不支持订阅时不再重试，直到连接重建
+        self._unsupported = False
+        # key -> (value, generation, stored_at)，按最近使用排序，右端最新
+        self._entries: "OrderedDict[Hashable, Tuple[Dict[str, Any], int, float]]" = OrderedDict()
+        self._last_event_at: Optional[float] = None
+        self._bridge_generation: Optional[int] = None
+
+        self._hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._stores = 0
+        self._discarded = 0
+        self._evicted = 0
+        self._invalidations = 0
+        self._events = 0
+        self._served_age_max = 0.0
+
+    # ------------------------------------------------------------------
+    # Subscription
+    # ------------------------------------------------------------------
+
+    async def ensure_subscribed(self, cocos) -> bool:
+        """Subscribe to scene events on the connection used for scene reads."""
+        if self.subscribed or self._unsupported or not config.scene_cache_enabled:
+            return self.subscribed
+        cocos.add_event_listener(self.on_event)
+        try:
+            result = await cocos.subscribe_async([SCENE_EVENTS])
+        except (ConnectionError, TimeoutError):
+            return False
+        except Exception as e:
+            logger.info(f"Scene events unavailable, scene cache disabled: {str(e)}")
+            self._unsupported = True
+            return False
+        with self._lock:
+            # 订阅之前缓存的内容无法确认是否有效
+            self._invalidate("subscribed")
+            self._bridge_generation = result.get("generation")
+            self.subscribed = True
+        return True
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def on_event(self, event: Dict[str, Any]) -> None:
+        """Event listener registered on the async connection."""
+        name = event.get("event")
+        with self._lock:
+            if name == DISCONNECTED_EVENT:
+                self.subscribed = False
+                self._unsupported = False
+                self._invalidate(name)
+                return
+            if not str(name).startswith(SCENE_EVENTS + ":"):
+                return
+
+            self._events += 1
+            self._last_event_at = time.monotonic()
+            generation = event.get("generation")
+            if generation is not None:
+                self._bridge_generation = generation
+
+            data = event.get("data") or {}
+            if name in SCENE_SWITCH_EVENTS:
+                self.scene_uuid = data.get("uuid") if name == "scene:ready" else None
+            self._invalidate(name)
+
+    def invalidate(self, reason: str = "manual") -> None:
+        """Drop every cached result, e.g. after OPEN_SCENE."""
+        with self._lock:
+            self._invalidate(reason)
+
+    def _invalidate(self, reason: str) -> None:
+        self.generation += 1
+        if self._entries:
+            self._invalidations += 1
+            logger.debug("Scene cache invalidated (%s), dropped %d entries", reason, len(self._entries))
+        self._entries.clear()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return a cached result for the current generation, or None."""
+        with self._lock:
+            if not self.subscribed:
+                self._bypassed += 1
+                return None
+            entry = self._entries.get(key)
+            if entry is None or entry[1] != self.generation:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._entries.move_to_end(key)
+            self._served_age_max = max(self._served_age_max, time.monotonic() - entry[2])
+            return entry[0]
+
+    def store(self, key: Hashable, value: Dict[str, Any], generation: int) -> bool:
+        """Cache ``value`` if no event arrived since ``generation`` was read."""
+        with self._lock:
+            if not self.subscribed:
+                return False
+            if generation != self.generation:
+                # 获取期间场景发生了变化，结果可能已过期
+                self._discarded += 1
+                return False
+            self._entries[key] = (value, generation, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > max(1, self.max_entries):
+                self._entries.popitem(last=False)
+                self._evicted += 1
+            self._stores += 1
+            data = value.get("data") if isinstance(value, dict) else None
+            if key == ("info",) and isinstance(data, dict) and data.get("uuid"):
+                self.scene_uuid = data["uuid"]
+            return True
+
+    async def read(self, key: Hashable, loader: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Return the cached result for ``key`` or load and cache it."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        generation = self.generation
+        value = await loader()
+        # 失败的结果不缓存
+        if isinstance(value, dict) and value.get("success") is not False:
+            self.store(key, value, generation)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            lookups = self._hits + self._misses
+            return {
+                "enabled": config.scene_cache_enabled,
+                "subscribed": self.subscribed,
+                "scene_uuid": self.scene_uuid,
+                "generation": self.generation,
+                "bridge_generation": self._bridge_generation,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "discarded_stale": self._discarded,
+                "evicted": self._evicted,
+                "invalidations": self._invalidations,
+                "events": self._events,
+                "last_event_age": round(now - self._last_event_at, 3) if self._last_event_at else None,
+                "oldest_entry_age": round(now - min(e[2] for e in self._entries.values()), 3)
+                                    if self._entries else None,
+                "max_served_age": round(self._served_age_max, 3),
+            }
+
+
+_scene_cache: Optional[SceneCache] = None
+
+def get_scene_cache() -> SceneCache:
+    """Get the global scene cache."""
+    global _scene_cache
+    if _scene_cache is None:
+        _scene_cache = SceneCache()
+    return _scene_cache
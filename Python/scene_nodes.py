@@ -0,0 +1,186 @@
+"""
+Column-oriented table of scene nodes.
+
+With ``format: "columns"`` the scene script answers ``LIST_SCENE_NODES`` with
+parallel arrays instead of one dict per node::
+
+    {"name": [...], "uuid": [...], "childCount": [...], "active": [...],
+     "position": [x0, y0, z0, x1, y1, z1, ...]}
+
+Nodes are listed in pre-order, so the child counts alone determine the
+tree; ``SceneNodeTable`` rebuilds parent indices while appending, which also
+works when the listing arrives as several pages or stream frames.  Numeric
+columns are kept in ``array`` objects and per-node dicts are only built on
+request (``node`` / ``to_dicts``), in the same shape as the dict listing.
+"""
+
+from array import array
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+COLUMNS_FORMAT = "columns"
+
+
+class SceneNodeTable:
+    """Pre-order scene nodes stored as parallel columns."""
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.uuids: List[str] = []
+        self.parents = array('i')
+        self.child_counts = array('i')
+        self.active = bytearray()
+        # 每个节点 3 个坐标，旧版扩展不提供位置时为空
+        self.positions = array('d')
+        # 追加过程中尚未收齐子节点的祖先：[索引, 剩余子节点数]
+        self._open: List[List[int]] = []
+        self._uuid_index: Optional[Dict[str, int]] = None
+        self._subtree_end: Optional[array] = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, Any]) -> "SceneNodeTable":
+        table = cls()
+        table.extend_columns(columns)
+        return table
+
+    @classmethod
+    def from_dicts(cls, nodes: Iterable[Dict[str, Any]]) -> "SceneNodeTable":
+        table = cls()
+        table.extend_dicts(nodes)
+        return table
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _append_structure(self, child_counts: Iterable[int]) -> None:
+        """Derive parent indices for the next nodes from their child counts."""
+        index = len(self.parents)
+        open_nodes = self._open
+        for count in child_counts:
+            if open_nodes:
+                parent = open_nodes[-1]
+                self.parents.append(parent[0])
+                parent[1] -= 1
+                if parent[1] == 0:
+                    open_nodes.pop()
+            else:
+                self.parents.append(-1)
+            if count > 0:
+                open_nodes.append([index, count])
+            index += 1
+
+    def extend_columns(self, columns: Dict[str, Any]) -> None:
+        """Append one page of a columnar listing."""
+        child_counts = columns.get("childCount") or []
+        self.names.extend(columns.get("name") or [])
+        self.uuids.extend(columns.get("uuid") or [])
+        self.child_counts.extend(child_counts)
+        self.active.extend(1 if value else 0 for value in columns.get("active") or [])
+        self.positions.extend(columns.get("position") or [])
+        self._append_structure(child_counts)
+        self._invalidate()
+
+    def extend_dicts(self, nodes: Iterable[Dict[str, Any]]) -> None:
+        """Append nodes from the dict listing of older bridges."""
+        child_counts = []
+        for node in nodes:
+            self.names.append(node.get("name", ""))
+            self.uuids.append(node.get("uuid", ""))
+            self.active.append(1 if node.get("active", True) else 0)
+            child_counts.append(int(node.get("childCount", 0)))
+        self.child_counts.extend(child_counts)
+        self._append_structure(child_counts)
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._uuid_index = None
+        self._subtree_end = None
+
+    # ------------------------------------------------------------------
+    # Navigation
+    # ------------------------------------------------------------------
+
+    def index_of(self, uuid: str) -> Optional[int]:
+        """Index of the node with ``uuid``, or None."""
+        if self._uuid_index is None:
+            self._uuid_index = {value: index for index, value in enumerate(self.uuids)}
+        return self._uuid_index.get(uuid)
+
+    def parent(self, index: int) -> int:
+        """Index of the parent node, -1 for the scene root."""
+        return self.parents[index]
+
+    def _subtree_ends(self) -> array:
+        """End (exclusive) of each node's subtree; descendants are contiguous in pre-order."""
+        if self._subtree_end is None:
+            count = len(self)
+            ends = array('i', range(1, count + 1))
+            # 逆序遍历时子节点总是先于父节点处理
+            for index in range(count - 1, -1, -1):
+                parent = self.parents[index]
+                if parent >= 0 and ends[index] > ends[parent]:
+                    ends[parent] = ends[index]
+            self._subtree_end = ends
+        return self._subtree_end
+
+    def children(self, index: int) -> List[int]:
+        """Indices of the direct children of a node."""
+        ends = self._subtree_ends()
+        result = []
+        child = index + 1
+        end = ends[index]
+        while child < end:
+            result.append(child)
+            child = ends[child]
+        return result
+
+    def descendant_count(self, index: int) -> int:
+        return self._subtree_ends()[index] - index - 1
+
+    def path(self, index: int) -> str:
+        """Slash-separated names from the scene root, as in the dict listing."""
+        names = []
+        while index >= 0:
+            names.append(self.names[index])
+            index = self.parents[index]
+        return "/".join(reversed(names))
+
+    def position(self, index: int) -> Optional[Tuple[float, float, float]]:
+        if len(self.positions) < 3 * (index + 1):
+            return None
+        offset = 3 * index
+        return self.positions[offset], self.positions[offset + 1], self.positions[offset + 2]
+
+    # ------------------------------------------------------------------
+    # Compatibility
+    # ------------------------------------------------------------------
+
+    def node(self, index: int) -> Dict[str, Any]:
+        """The node in the dict listing format."""
+        return {
+            "name": self.names[index],
+            "uuid": self.uuids[index],
+            "path": self.path(index),
+            "childCount": self.child_counts[index],
+            "active": bool(self.active[index]),
+        }
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialize the whole dict listing, building paths incrementally."""
+        paths: List[str] = []
+        result = []
+        for index in range(len(self)):
+            parent = self.parents[index]
+            path = f"{paths[parent]}/{self.names[index]}" if parent >= 0 else self.names[index]
+            paths.append(path)
+            result.append({
+                "name": self.names[index],
+                "uuid": self.uuids[index],
+                "path": path,
+                "childCount": self.child_counts[index],
+                "active": bool(self.active[index]),
+            })
+        return result
@@ -0,0 +1,350 @@
+"""
+Structural snapshots of the open scene and fast diffs between them.
+
+``HASH_SCENE_NODES`` makes the scene script hash every node (uuid, name,
+active, component class names, transform) and every subtree (the node's
+hash plus its children's subtree hashes, Merkle-style), and list the nodes
+in pre-order.  A change anywhere in the scene changes the subtree hash of
+the changed node and of all its ancestors, and of nothing else.
+
+``SceneSnapshots.take`` stores such a listing as a ``SceneSnapshot``.  It
+sends the subtree hashes of the previous snapshot along (``known``, the
+largest subtrees first): the script answers an unchanged subtree with its
+hash only, and the snapshot reuses the previous snapshot's nodes for it, so
+a snapshot of a mostly unchanged scene transfers only the changed paths.
+
+``diff`` compares two snapshots of the same scene top-down and descends
+only into subtrees whose hashes differ, so its cost is proportional to the
+size of the change, not of the scene.  It reports added and removed
+subtrees and modified nodes (fields, parent, child order).
+
+Component property values are not hashed: a change that only edits a
+component's properties is not detected.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+from config import config
+
+logger = logging.getLogger("CocosMCP")
+
+# transform 中各分量的下标
+TRANSFORM_FIELDS = (("position", 0), ("rotation", 3), ("scale", 6))
+
+
+class SnapshotNode:
+    """One node of a snapshot; immutable, so unchanged subtrees are shared between snapshots."""
+
+    __slots__ = ("uuid", "name", "active", "components", "transform", "hash", "tree", "children", "size")
+
+    def __init__(self, uuid: str, name: str, active: bool, components: Tuple[str, ...],
+                 transform: Tuple[float, ...], hash: str, tree: str, children: Tuple[str, ...],
+                 size: int) -> None:
+        self.uuid = uuid
+        self.name = name
+        self.active = active
+        self.components = components
+        self.transform = transform
+        self.hash = hash
+        self.tree = tree
+        # 子节点 uuid，按场景中的顺序
+        self.children = children
+        # 子树的节点数，包含自身
+        self.size = size
+
+
+class SceneSnapshot:
+    """The node tree of a scene at one point in time."""
+
+    def __init__(self, snapshot_id: str, scene_name: str, scene_uuid: str, root: str, tree: str,
+                 nodes: Dict[str, SnapshotNode], parents: Dict[str, Optional[str]],
+                 transferred: int, reused: int) -> None:
+        self.id = snapshot_id
+        self.scene_name = scene_name
+        self.scene_uuid = scene_uuid
+        self.root = root
+        self.tree = tree
+        self.nodes = nodes
+        self.parents = parents
+        # 编辑器发送的完整节点数和从上一个快照复用的节点数
+        self.transferred = transferred
+        self.reused = reused
+        self.created = time.time()
+
+    def path(self, uuid: Optional[str]) -> Optional[str]:
+        """Path of the node relative to the scene root ("" for the root), as in query_scene_nodes."""
+        if uuid is None or uuid not in self.nodes:
+            return None
+        names = []
+        while uuid != self.root:
+            names.append(self.nodes[uuid].name)
+            uuid = self.parents[uuid]
+        return "/".join(reversed(names))
+
+    def subtree(self, uuid: str) -> Iterable[SnapshotNode]:
+        """Nodes of the subtree in pre-order."""
+        stack = [uuid]
+        while stack:
+            node = self.nodes[stack.pop()]
+            yield node
+            stack.extend(reversed(node.children))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "snapshot_id": self.id,
+            "scene": {"name": self.scene_name, "uuid": self.scene_uuid},
+            "node_count": len(self.nodes),
+            "hash": self.tree,
+            "created": round(self.created, 3),
+            "transferred": self.transferred,
+            "reused": self.reused,
+        }
+
+
+class _Builder:
+    """Rebuilds the tree from the pre-order listing of ``HASH_SCENE_NODES``."""
+
+    def __init__(self, base: Optional[SceneSnapshot], known: Dict[str, str]) -> None:
+        self.base = base
+        # 发送给编辑器的子树哈希 -> 上一个快照中的节点 uuid
+        self.known = known
+        self.order: List[Dict[str, Any]] = []
+        self.nodes: Dict[str, SnapshotNode] = {}
+        self.parents: Dict[str, Optional[str]] = {}
+        # 当前路径上的节点：(深度, uuid)
+        self._stack: List[Tuple[int, str]] = []
+        self._children: Dict[str, List[str]] = {}
+        self.transferred = 0
+        self.reused = 0
+
+    def add(self, entries: Iterable[Dict[str, Any]]) -> None:
+        stack = self._stack
+        for entry in entries:
+            depth = int(entry["depth"])
+            uuid = entry["uuid"]
+            while stack and stack[-1][0] >= depth:
+                stack.pop()
+            parent = stack[-1][1] if stack else None
+            self.parents[uuid] = parent
+            if parent is not None:
+                self._children[parent].append(uuid)
+            if entry.get("same"):
+                self._reuse(entry["tree"], uuid)
+                continue
+            self.order.append(entry)
+            self._children[uuid] = []
+            stack.append((depth, uuid))
+            self.transferred += 1
+
+    def _reuse(self, tree: str, uuid: str) -> None:
+        base_uuid = self.known.get(tree)
+        if self.base is None or base_uuid != uuid:
+            raise RuntimeError(f"Editor returned an unknown subtree hash {tree} for node {uuid}")
+        for node in self.base.subtree(uuid):
+            self.nodes[node.uuid] = node
+            if node.uuid != uuid:
+                self.parents[node.uuid] = self.base.parents[node.uuid]
+            self.reused += 1
+
+    def finish(self) -> Tuple[Dict[str, SnapshotNode], Dict[str, Optional[str]]]:
+        # 先序的逆序保证子节点先于父节点创建
+        for entry in reversed(self.order):
+            children = tuple(self._children[entry["uuid"]])
+            self.nodes[entry["uuid"]] = SnapshotNode(
+                entry["uuid"], entry.get("name", ""), bool(entry.get("active", True)),
+                tuple(entry.get("components") or ()), tuple(entry.get("transform") or ()),
+                entry.get("hash", ""), entry["tree"], children,
+                1 + sum(self.nodes[child].size for child in children))
+        return self.nodes, self.parents
+
+
+class SceneSnapshots:
+    """The most recent snapshots of one editor, addressed by id."""
+
+    def __init__(self, max_snapshots: Optional[int] = None, known_max: Optional[int] = None) -> None:
+        self.max_snapshots = config.scene_snapshot_max if max_snapshots is None else max_snapshots
+        self.known_max = config.scene_snapshot_known_max if known_max is None else known_max
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[str, SceneSnapshot]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def latest(self) -> Optional[SceneSnapshot]:
+        with self._lock:
+            return next(reversed(self._snapshots.values()), None)
+
+    def get(self, snapshot_id: str) -> SceneSnapshot:
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+            if snapshot is None:
+                raise ValueError(f"Unknown snapshot {snapshot_id!r}, available: "
+                                 f"{', '.join(self._snapshots) or 'none'}")
+            return snapshot
+
+    def known_hashes(self, base: Optional[SceneSnapshot]) -> Dict[str, str]:
+        """Subtree hashes of ``base`` to send as ``known``: the largest subtrees, at most ``known_max``."""
+        if base is None or self.known_max <= 0:
+            return {}
+        # 叶子节点的哈希与节点本身差不多大，不发送
+        nodes = [node for node in base.nodes.values() if node.children]
+        if len(nodes) > self.known_max:
+            nodes.sort(key=lambda node: -node.size)
+            nodes = nodes[:self.known_max]
+        return {node.tree: node.uuid for node in nodes}
+
+    async def take(self, cocos) -> SceneSnapshot:
+        """Hash the open scene and store the result as a new snapshot."""
+        base = self.latest()
+        known = self.known_hashes(base)
+        builder = _Builder(base, known)
+        summary: Dict[str, Any] = {}
+        params = {"known": list(known), "page_size": config.stream_page_size}
+        async for chunk in cocos.stream_command_async("HASH_SCENE_NODES", params):
+            if "nodes" in chunk:
+                builder.add(chunk["nodes"])
+                continue
+            # 最后一帧为 {success, data}；旧协议下没有分帧，节点也在其中
+            if chunk.get("success") is False:
+                raise RuntimeError(chunk.get("message") or "Failed to hash scene nodes")
+            summary = dict(chunk.get("data") or {})
+            builder.add(summary.pop("nodes", ()))
+        nodes, parents = builder.finish()
+        root = next((uuid for uuid, parent in parents.items() if parent is None), None)
+        if root is None or len(nodes) != summary.get("nodeCount", len(nodes)):
+            raise RuntimeError(f"Incomplete scene hash listing: {len(nodes)} of "
+                               f"{summary.get('nodeCount')} nodes")
+
+        with self._lock:
+            snapshot = SceneSnapshot(f"s{next(self._ids)}", summary.get("name", ""), summary.get("uuid", root),
+                                     root, summary.get("tree") or nodes[root].tree, nodes, parents,
+                                     builder.transferred, builder.reused)
+            self._snapshots[snapshot.id] = snapshot
+            while len(self._snapshots) > max(1, self.max_snapshots):
+                self._snapshots.popitem(last=False)
+        logger.debug("Scene snapshot %s: %d nodes, %d transferred, %d reused",
+                     snapshot.id, len(nodes), builder.transferred, builder.reused)
+        return snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"snapshots": list(self._snapshots), "max_snapshots": self.max_snapshots}
+
+
+def _changes(before: SnapshotNode, after: SnapshotNode) -> Dict[str, Any]:
+    """Fields that differ between two versions of a node."""
+    changes: Dict[str, Any] = {}
+    if before.name != after.name:
+        changes["name"] = {"from": before.name, "to": after.name}
+    if before.active != after.active:
+        changes["active"] = {"from": before.active, "to": after.active}
+    if before.components != after.components:
+        changes["components"] = {
+            "added": [name for name in after.components if name not in before.components],
+            "removed": [name for name in before.components if name not in after.components],
+        }
+    for field, start in TRANSFORM_FIELDS:
+        old, new = before.transform[start:start + 3], after.transform[start:start + 3]
+        if old != new:
+            changes[field] = {"from": list(old), "to": list(new)}
+    return changes
+
+
+def diff(a: SceneSnapshot, b: SceneSnapshot, limit: int = 100) -> Dict[str, Any]:
+    """
+    Changes from snapshot ``a`` to snapshot ``b`` of the same scene.
+
+    Only subtrees whose hashes differ are visited.  ``added`` / ``removed``
+    list the roots of added and removed subtrees with their node counts;
+    ``modified`` lists nodes whose fields, parent (``moved``) or child order
+    changed.  At most ``limit`` entries are returned in total, the counts in
+    ``summary`` cover all of them.
+    """
+    if a.scene_uuid != b.scene_uuid:
+        raise ValueError(f"Snapshots {a.id} and {b.id} are of different scenes "
+                         f"({a.scene_name}, {b.scene_name})")
+    added: List[Dict[str, Any]] = []
+    removed: List[Dict[str, Any]] = []
+    modified: List[Dict[str, Any]] = []
+    counts = {"added_nodes": 0, "removed_nodes": 0, "moved_nodes": 0}
+    visited = 0
+    # 需要比较的 (a 中的节点, b 中的同一节点, 父节点是否变化)
+    pending: List[Tuple[SnapshotNode, SnapshotNode, bool]] = []
+    if a.tree != b.tree:
+        pending.append((a.nodes[a.root], b.nodes[b.root], False))
+
+    while pending:
+        before, after, moved = pending.pop()
+        visited += 1
+        changes = _changes(before, after) if before.hash != after.hash else {}
+        if moved:
+            changes["parent"] = {"from": a.path(a.parents[before.uuid]), "to": b.path(b.parents[after.uuid])}
+            counts["moved_nodes"] += 1
+
+        if before.tree != after.tree:
+            old_children = set(before.children)
+            new_children = set(after.children)
+            for uuid in before.children:
+                if uuid in new_children:
+                    if a.nodes[uuid].tree != b.nodes[uuid].tree:
+                        pending.append((a.nodes[uuid], b.nodes[uuid], False))
+                elif uuid not in b.nodes:
+                    # 子树中移动到别处的节点不计入删除，在 b 中的新父节点下处理
+                    count = sum(1 for node in a.subtree(uuid) if node.uuid not in b.nodes)
+                    visited += count
+                    counts["removed_nodes"] += count
+                    removed.append({"uuid": uuid, "name": a.nodes[uuid].name, "path": a.path(uuid),
+                                    "nodes": count})
+            for uuid in after.children:
+                if uuid in old_children:
+                    continue
+                if uuid in a.nodes:
+                    pending.append((a.nodes[uuid], b.nodes[uuid], True))
+                    continue
+                # 新子树中可能包含从别处移来的节点
+                count = 0
+                stack = [uuid]
+                while stack:
+                    node = b.nodes[stack.pop()]
+                    visited += 1
+                    if node.uuid in a.nodes:
+                        pending.append((a.nodes[node.uuid], node, True))
+                    else:
+                        count += 1
+                        stack.extend(node.children)
+                counts["added_nodes"] += count
+                added.append({"uuid": uuid, "name": b.nodes[uuid].name, "path": b.path(uuid), "nodes": count})
+            common_before = [uuid for uuid in before.children if uuid in new_children]
+            common_after = [uuid for uuid in after.children if uuid in old_children]
+            if common_before != common_after:
+                changes["childOrder"] = {"from": [a.nodes[uuid].name for uuid in common_before],
+                                         "to": [b.nodes[uuid].name for uuid in common_after]}
+
+        if changes:
+            modified.append({"uuid": after.uuid, "name": after.name, "path": b.path(after.uuid),
+                             "changes": changes})
+
+    total = len(added) + len(removed) + len(modified)
+    for entries in (added, removed, modified):
+        entries.sort(key=lambda entry: entry["path"])
+    limit = max(0, limit)
+    result_added = added[:limit]
+    result_removed = removed[:max(0, limit - len(result_added))]
+    result_modified = modified[:max(0, limit - len(result_added) - len(result_removed))]
+    return {
+        "from": a.id,
+        "to": b.id,
+        "scene": {"name": b.scene_name, "uuid": b.scene_uuid},
+        "identical": a.tree == b.tree,
+        "summary": dict(counts, added=len(added), removed=len(removed), modified=len(modified)),
+        "added": result_added,
+        "removed": result_removed,
+        "modified": result_modified,
+        "truncated": total > limit,
+        # 比较过的节点数，未变化的子树不会被访问
+        "visited_nodes": visited,
+        "node_count": {"from": len(a.nodes), "to": len(b.nodes)},
+    }
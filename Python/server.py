@@ -1,48 +1,41 @@
-from mcp.server.fastmcp import FastMCP, Context, Image
+from mcp.server.fastmcp import FastMCP
 import logging
-from dataclasses import dataclass
 from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, List
+from typing import AsyncIterator, Dict, Any
 from config import config
 from tools import register_all_tools
-from cocos_connection import get_cocos_connection
+from editor_registry import get_editor_registry
+from metrics import metrics
+from logging_setup import setup_logging
 
 # Configure logging using settings from config
-logging.basicConfig(
-    level=getattr(logging, config.log_level),
-    format=config.log_format,
-    filename=config.log_file,
-    filemode='a'
-)
+setup_logging()
 logger = logging.getLogger("CocosMCP")
 
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     """Handle server startup and shutdown."""
     logger.info("CocosMCP server starting up")
+    if config.metrics_dump_path:
+        metrics.start_dump(config.metrics_dump_path, config.metrics_dump_format, config.metrics_dump_interval)
+    registry = get_editor_registry()
     try:
-        # 尝试连接到Cocos Creator
-        cocos_connection = get_cocos_connection()
-        try:
-            # 验证连接是否有效 - 使用同步方式
-            # 我们直接使用socket发送ping而不是调用异步方法
-            cocos_connection.sock.sendall(b"ping")
-            response_data = cocos_connection.receive_full_response(cocos_connection.sock)
-            logger.info("Connected to Cocos Creator on startup")
-        except Exception as e:
-            logger.warning(f"Could not verify Cocos Creator connection: {str(e)}")
+        # 心跳在后台验证每个编辑器的连接，启动时不再同步等待 ping
+        if not registry.start_heartbeats():
+            logger.info("Heartbeat disabled, connection is checked on demand")
     except Exception as e:
-        logger.warning(f"Could not connect to Cocos Creator on startup: {str(e)}")
+        logger.warning(f"Could not start the heartbeat: {str(e)}")
     
     try:
         yield {}
     finally:
-        # 获取连接并断开
+        await registry.stop_heartbeats()
+        # 断开所有编辑器的连接
         try:
-            cocos_connection = get_cocos_connection()
-            cocos_connection.disconnect()
+            registry.disconnect()
         except:
             pass
+        metrics.stop_dump()
         logger.info("CocosMCP server shut down")
 
 # Initialize MCP server
@@ -60,15 +53,22 @@ def log_management_guide() -> str:
         "Cocos Creator MCP Tools Guide:\n\n"
         "1. **Querying Logs**\n"
         "   - `query_logs(show_logs=True, show_warnings=True, show_errors=True, search_term=None)` - Read and filter Cocos Creator Console logs\n"
+        "   - `top_errors(limit=10)` - Most frequent error signatures, repeated messages collapsed\n"
+        "   - `log_stats(window='10m')` - Error rates and spikes per type, module and signature\n"
+        "   - `query_log_history(start_time='-1h')` - Persisted logs, including those from before clear_logs or an editor restart\n"
         "2. **Clearing Logs**\n"
         "   - `clear_logs()` - Clear all console logs\n"
         "3. **Checking Connection**\n"
-        "   - `connection_status()` - Check if connected to Cocos Creator\n\n"
+        "   - `connection_status()` - Last-known connection state from the background heartbeat\n"
+        "   - `bridge_metrics()` - Per-command latency, bytes, errors and timeouts\n"
+        "   - `list_editors()` - Registered editors; pass `editor=name` to any tool to target one of them\n"
+        "   - `query_logs_all_editors()` / `get_scene_info_all_editors()` - Query every editor concurrently\n\n"
         "4. **Best Practices**\n"
         "   - Always check connection status before performing operations\n"
         "   - Use search terms to filter console output when debugging\n"
         "   - Clear logs before major operations to make debugging easier\n"
         "   - Filter by log types when looking for specific issues\n"
+        "   - Call `snapshot_scene()` before changing a scene and `diff_scene(from_snapshot=id)` after it to see what changed\n"
     )
 
 # Register all tools
@@ -0,0 +1,198 @@
+/*
+ * Runs the compiled LogBridge (dist/Editor) outside Cocos Creator.
+ *
+ * The editor globals and the `cc` engine module are replaced by small
+ * in-memory stand-ins: `Editor.Logger` serves a synthetic console history and
+ * `execute-scene-script` calls the real scene script (dist/Editor/mcpSceneScript.js)
+ * against a generated node tree.  The bridge listens on an ephemeral ::1 port
+ * and prints "listening <port>" once ready.
+ *
+ * Commands on stdin, one per line, drive changes the way the editor would;
+ * each is acknowledged with an "ok" line once applied:
+ *   log <type> <message>   append a console entry
+ *   clear                  clear the console
+ *   add <parent-uuid> <name>  add a child node and broadcast scene:change-node
+ *
+ * Usage: node bridge_stub.js <dist-dir> [--logs N] [--nodes N] [--branching N]
+ */
+
+const Module = require('module');
+const path = require('path');
+const readline = require('readline');
+
+const distDir = path.resolve(process.argv[2]);
+const options = { logs: 100, nodes: 200, branching: 4 };
+for (let i = 3; i < process.argv.length; i += 2) {
+    options[process.argv[i].replace(/^--/, '')] = Number(process.argv[i + 1]);
+}
+
+class Vec3 {
+    constructor(x = 0, y = 0, z = 0) {
+        this.x = x;
+        this.y = y;
+        this.z = z;
+    }
+}
+
+class Component {
+    constructor(className) {
+        this.__classname__ = className;
+    }
+}
+
+class Node {
+    constructor(name, uuid) {
+        this.name = name;
+        this.uuid = uuid;
+        this.active = true;
+        this.layer = 1;
+        this.children = [];
+        this.parent = null;
+        this.components = [];
+        this.position = new Vec3();
+        this.eulerAngles = new Vec3();
+        this.scale = new Vec3(1, 1, 1);
+    }
+
+    get activeInHierarchy() {
+        return this.active && (!this.parent || this.parent.activeInHierarchy);
+    }
+
+    get worldPosition() {
+        const parent = this.parent ? this.parent.worldPosition : new Vec3();
+        return new Vec3(parent.x + this.position.x, parent.y + this.position.y, parent.z + this.position.z);
+    }
+
+    addChild(child) {
+        child.parent = this;
+        this.children.push(child);
+    }
+
+    getChildByName(name) {
+        return this.children.find((child) => child.name === name) || null;
+    }
+
+    getSiblingIndex() {
+        return this.parent ? this.parent.children.indexOf(this) : 0;
+    }
+}
+
+function buildScene(count, branching) {
+    const scene = new Node('scene-stub', 'stub-scene');
+    const byUuid = new Map([[scene.uuid, scene]]);
+    const parents = [scene];
+    for (let index = 1; index < count; index++) {
+        while (parents[0].children.length >= branching) {
+            parents.shift();
+        }
+        const node = new Node(`Node${index}`, `stub-${index.toString(16).padStart(8, '0')}`);
+        node.active = index % 10 !== 0;
+        node.position = new Vec3(index, -index, 0);
+        node.components = [new Component('cc.UITransform'), new Component(index % 2 ? 'cc.Sprite' : 'cc.Label')];
+        parents[0].addChild(node);
+        parents.push(node);
+        byUuid.set(node.uuid, node);
+    }
+    return { scene, byUuid };
+}
+
+const { scene, byUuid } = buildScene(options.nodes, options.branching);
+const cc = {
+    Node,
+    Vec3,
+    director: { getScene: () => scene },
+    js: { getClassName: (object) => (object && object.__classname__) || (object && object.constructor.name) || '' }
+};
+
+// 场景脚本 require('cc') 时返回上面的替身
+const resolveFilename = Module._resolveFilename;
+Module._resolveFilename = function (request, ...rest) {
+    return request === 'cc' ? 'cc' : resolveFilename.call(this, request, ...rest);
+};
+require.cache.cc = { id: 'cc', filename: 'cc', loaded: true, exports: cc };
+
+const logs = [];
+const listeners = new Map();
+const date = Date.now();
+function addLog(type, message) {
+    logs.push({ type, message, date: date + logs.length });
+}
+for (let i = 0; i < options.logs; i++) {
+    const type = i % 7 === 0 ? 'error' : i % 3 === 0 ? 'warn' : 'log';
+    addLog(type, `[Module${i % 5}] message ${i}`);
+}
+
+let sceneScript = null;
+global.Editor = {
+    App: { path: distDir },
+    Message: {
+        addBroadcastListener(message, listener) {
+            if (!listeners.has(message)) {
+                listeners.set(message, []);
+            }
+            listeners.get(message).push(listener);
+        },
+        removeBroadcastListener(message, listener) {
+            const list = listeners.get(message) || [];
+            listeners.set(message, list.filter((item) => item !== listener));
+        },
+        async request(target, method, request) {
+            if (target !== 'scene' || method !== 'execute-scene-script') {
+                throw new Error(`Unsupported message ${target}:${method}`);
+            }
+            const handler = sceneScript.methods[request.method];
+            if (!handler) {
+                throw new Error(`Unknown scene script method: ${request.method}`);
+            }
+            return handler.apply(sceneScript.methods, request.args || []);
+        },
+        async send() {},
+        async broadcast(message, ...args) {
+            for (const listener of listeners.get(message) || []) {
+                listener(...args);
+            }
+        }
+    },
+    Logger: {
+        async query() {
+            return logs.slice();
+        },
+        async clear() {
+            logs.length = 0;
+        }
+    }
+};
+
+// 桥接端的日志会写满 stdout 管道，只在需要时输出到 stderr
+if (!process.env.BRIDGE_STUB_VERBOSE) {
+    for (const level of ['log', 'debug', 'info', 'warn', 'error']) {
+        console[level] = () => {};
+    }
+}
+
+sceneScript = require(path.join(distDir, 'Editor', 'mcpSceneScript.js'));
+const { Config } = require(path.join(distDir, 'Editor', 'config', 'Config.js'));
+Config.TCP_HOST = '::1';
+Config.TCP_PORT = 0;
+const { LogBridge } = require(path.join(distDir, 'Editor', 'LogBridge.js'));
+const bridge = LogBridge.getInstance();
+
+bridge.server.on('listening', () => {
+    process.stdout.write(`listening ${bridge.server.address().port}\n`);
+});
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+    const [command, ...args] = line.trim().split(' ');
+    if (command === 'log') {
+        addLog(args[0], args.slice(1).join(' '));
+    } else if (command === 'clear') {
+        logs.length = 0;
+    } else if (command === 'add') {
+        const parent = byUuid.get(args[0]);
+        const node = new Node(args[1], `stub-added-${byUuid.size}`);
+        parent.addChild(node);
+        byUuid.set(node.uuid, node);
+        Editor.Message.broadcast('scene:change-node', node.uuid);
+    }
+    process.stdout.write('ok\n');
+}).on('close', () => process.exit(0));
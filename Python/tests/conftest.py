@@ -0,0 +1,60 @@
+"""
+Tests run from ``Python/`` (``python -m pytest``); the server modules are
+flat top-level modules, so that directory is put on ``sys.path``.
+
+Tests that need an editor start ``benchmarks.fake_editor`` in a child
+process and point a fresh ``EditorRegistry`` at it.
+"""
+
+import os
+import sys
+from contextlib import ExitStack
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import config
+import cocos_connection
+import editor_registry
+import heartbeat
+import scene_cache
+from editor_registry import EditorRegistry
+from tools import log_tools
+
+
+@pytest.fixture
+def fake_editor():
+    """Starts ``benchmarks.fake_editor`` child processes with the given arguments, stopped after the test."""
+    from benchmarks.bench_suite import FakeEditorProcess
+    with ExitStack() as stack:
+        yield lambda *args: stack.enter_context(FakeEditorProcess([str(arg) for arg in args]))
+
+
+@pytest.fixture
+def editors(monkeypatch):
+    """
+    Installs a fresh global ``EditorRegistry`` whose default editor listens on ``port``.
+
+    The default editor's global pool, scene cache and heartbeat are
+    recreated as well.  Log history and heartbeats are off; connections are
+    closed after the test.
+    """
+    monkeypatch.setattr(config, "log_history_enabled", False)
+    monkeypatch.setattr(config, "heartbeat_interval", 0)
+    monkeypatch.setattr(log_tools, "_editor_logs", {})
+    monkeypatch.setattr(cocos_connection, "_connection", None)
+    monkeypatch.setattr(scene_cache, "_scene_cache", None)
+    monkeypatch.setattr(heartbeat, "_heartbeat", None)
+    created = []
+
+    def install(port, endpoints=None):
+        monkeypatch.setattr(config, "cocos_port", port)
+        registry = EditorRegistry(endpoints)
+        monkeypatch.setattr(editor_registry, "_registry", registry)
+        created.append(registry)
+        return registry
+
+    yield install
+    for registry in created:
+        registry.disconnect()
@@ -0,0 +1,53 @@
+"""
+OPEN_SCENE and CLEAR_LOGS inside ``batch_commands`` have the same effects as
+the ``open_scene`` and ``clear_logs`` tools.
+"""
+
+import asyncio
+import json
+
+from mcp.server.fastmcp import FastMCP
+
+from config import config
+from editor_registry import get_editor_registry
+from tools import register_all_tools, log_tools
+
+
+def test_batch_applies_tool_side_effects(fake_editor, editors, monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "log_history_enabled", True)
+    monkeypatch.setattr(config, "log_history_dir", str(tmp_path))
+    # 长同步间隔：批量清空前的强制同步才会取回新增的日志
+    monkeypatch.setattr(config, "log_sync_interval", 60)
+    editor = fake_editor("--logs", 20)
+    editors(editor.port)
+    mcp = FastMCP("test")
+    register_all_tools(mcp)
+    reasons = []
+    scene_cache = get_editor_registry().scene_cache()
+    invalidate = scene_cache.invalidate
+    monkeypatch.setattr(scene_cache, "invalidate", lambda reason="manual": (reasons.append(reason),
+                                                                           invalidate(reason)))
+
+    async def call(name, arguments):
+        return json.loads((await mcp.call_tool(name, arguments))[0].text)
+
+    async def run():
+        await call("query_logs", {})
+        pool = get_editor_registry().connection()
+        await pool.send_command_async("FAKE_ADD_LOGS", {"count": 5})
+        batch = await call("batch_commands", {"commands": [
+            {"type": "OPEN_SCENE", "params": {"sceneUuid": "scene-b"}},
+            {"type": "CLEAR_LOGS"},
+            {"type": "HASH_SCENE_NODES"},
+        ]})
+        mirrored = len(log_tools.get_log_mirror())
+        history = await call("query_log_history", {"limit": 100})
+        return batch, mirrored, history
+
+    batch, mirrored, history = asyncio.run(run())
+    assert [result["status"] for result in batch["results"]] == ["success"] * 3
+    assert "batch_commands" in reasons
+    assert mirrored == 0
+    # 清空前新增的 5 条日志也已写入历史
+    assert len(history["logs"]) == 25
+    log_tools.get_editor_logs().history.close()
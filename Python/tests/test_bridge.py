@@ -0,0 +1,159 @@
+"""
+The compiled bridge (``dist/Editor``) against the Python client.
+
+``bridge_stub.js`` runs the real ``LogBridge.js`` and ``mcpSceneScript.js``
+under node with the editor and engine replaced by in-memory stand-ins, so
+these tests catch a ``dist/`` that was not rebuilt after a TypeScript change.
+The other tests only talk to ``benchmarks.fake_editor``.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from connection_pool import ConnectionPool
+from protocol import PROTOCOL_VERSION
+from scene_cache import SceneCache
+from tools.scene_tools import SceneTools
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(TESTS_DIR, "..", "..", "dist")
+NODE = shutil.which("node")
+
+pytestmark = pytest.mark.skipif(
+    NODE is None or not os.path.exists(os.path.join(DIST_DIR, "Editor", "LogBridge.js")),
+    reason="needs node and a built dist/")
+
+
+class BridgeProcess:
+    """``bridge_stub.js`` in a child process; ``send`` runs one stdin command."""
+
+    def __init__(self, *args) -> None:
+        self.process = subprocess.Popen(
+            [NODE, os.path.join(TESTS_DIR, "bridge_stub.js"), DIST_DIR, *[str(arg) for arg in args]],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line.startswith("listening "):
+            self.process.kill()
+            raise RuntimeError(f"Bridge stub failed to start: {line!r}")
+        self.port = int(line.split()[1])
+
+    def send(self, command: str) -> None:
+        self.process.stdin.write(command + "\n")
+        self.process.stdin.flush()
+        # 等待确认，之后的请求一定能看到这次改动
+        assert self.process.stdout.readline() == "ok\n"
+
+    def stop(self) -> None:
+        self.process.stdin.close()
+        self.process.wait(5)
+
+
+@pytest.fixture
+def bridge():
+    started = []
+
+    def start(*args):
+        started.append(BridgeProcess(*args))
+        return started[-1]
+
+    yield start
+    for process in started:
+        process.stop()
+
+
+def run(pool, coro):
+    try:
+        return asyncio.run(coro)
+    finally:
+        pool.disconnect()
+
+
+def test_framed_log_queries(bridge):
+    editor = bridge("--logs", 100)
+    pool = ConnectionPool(port=editor.port)
+
+    async def query():
+        full = await pool.send_command_async("QUERY_LOGS", {"show_logs": False})
+        frames = [frame async for frame in pool.stream_command_async(
+            "QUERY_LOGS", {"show_logs": False, "page_size": 30})]
+        incremental = await pool.send_command_async("QUERY_LOGS", {"since": 0})
+        filtered = await pool.send_command_async("QUERY_LOGS", {"since": 10, "epoch": incremental["epoch"],
+                                                                "module_filter": "Module2", "search_term": "MESSAGE 7"})
+        filtered_frames = [frame async for frame in pool.stream_command_async(
+            "QUERY_LOGS", {"since": 10, "epoch": incremental["epoch"], "module_filter": "Module2",
+                           "search_term": "MESSAGE 7", "page_size": 2})]
+        editor.send("log error [Net] reconnect failed")
+        newer = await pool.send_command_async(
+            "QUERY_LOGS", {"since": incremental["next_seq"], "epoch": incremental["epoch"]})
+        return pool._get_async_client().protocol_version, full, frames, incremental, filtered, filtered_frames, newer
+
+    version, full, frames, incremental, filtered, filtered_frames, newer = run(pool, query())
+    assert version == PROTOCOL_VERSION
+    assert {log["type"] for log in full["logs"]} == {"warn", "error"}
+    streamed = [log for frame in frames[:-1] for log in frame["logs"]]
+    assert streamed == full["logs"]
+    assert frames[-1] == {"count": len(full["logs"])}
+    assert len(incremental["logs"]) == 100
+    assert [log["seq"] for log in filtered["logs"]] == [17, 27, 37, 47, 57, 67, 72, 77, 87, 97]
+    assert [log for frame in filtered_frames[:-1] for log in frame["logs"]] == filtered["logs"]
+    assert [frame["next_seq"] for frame in filtered_frames[:-1]] == [28, 48, 68, 78, 98]
+    assert filtered_frames[-1] == {"epoch": incremental["epoch"], "next_seq": 100, "count": 10}
+    assert [log["message"] for log in newer["logs"]] == ["[Net] reconnect failed"]
+
+
+def test_scene_pages_and_events(bridge):
+    editor = bridge("--nodes", 120, "--branching", 3)
+    pool = ConnectionPool(port=editor.port)
+    scene_tools = SceneTools(pool, SceneCache())
+    events = []
+    pool.add_event_listener(events.append)
+
+    async def page_across_edit():
+        table = await scene_tools.load_node_table(page_size=7)
+        nodes, cursor = [], None
+        while True:
+            page = await scene_tools.list_scene_nodes(limit=25, cursor=cursor)
+            nodes.extend(page["data"]["nodes"])
+            cursor = page["data"]["nextCursor"]
+            if cursor is None:
+                break
+        first = await scene_tools.list_scene_nodes(limit=25)
+        subscribed = await pool.subscribe_async(["scene"])
+        editor.send("add stub-scene Extra")
+        for _ in range(50):
+            if events:
+                break
+            await asyncio.sleep(0.02)
+        stale = await scene_tools.list_scene_nodes(limit=25, cursor=first["data"]["nextCursor"])
+        return table, nodes, subscribed, stale
+
+    table, nodes, subscribed, stale = run(pool, page_across_edit())
+    assert len(table) == len(nodes) == 120
+    assert table.to_dicts() == nodes
+    assert subscribed == {"events": ["scene"], "generation": 0}
+    assert events[0] == {"event": "scene:change-node", "data": {"uuid": "stub-added-120"}, "generation": 1}
+    assert stale["success"] is False
+    assert "过期" in stale["message"]
+
+
+def test_batch_of_scene_commands(bridge):
+    editor = bridge("--nodes", 40)
+    pool = ConnectionPool(port=editor.port)
+
+    async def batch():
+        return await pool.send_batch_async([
+            {"type": "GET_SCENE_INFO"},
+            {"type": "QUERY_SCENE_NODES", "params": {"name": "Node1", "components": ["cc.Sprite"]}},
+            {"type": "HASH_SCENE_NODES"},
+            {"type": "BATCH"},
+        ])
+
+    info, query, hashes, nested = run(pool, batch())
+    assert info["result"]["data"]["nodeCount"] == 40
+    assert [node["name"] for node in query["result"]["data"]["nodes"]] == ["Node1"]
+    assert len(hashes["result"]["data"]["nodes"]) == 40
+    assert nested["status"] == "error"
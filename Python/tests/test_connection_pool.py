@@ -0,0 +1,78 @@
+"""
+The limiter's per-class queueing shows up in the pool stats; only connection
+failures, not timeouts, open the circuit.
+"""
+
+import asyncio
+import socket
+
+import pytest
+
+from circuit_breaker import CircuitOpenError
+from config import config
+from connection_pool import ConnectionPool
+
+
+def test_concurrency_stats_show_queueing(fake_editor):
+    editor = fake_editor("--logs", 10, "--hop-ms", 100)
+    pool = ConnectionPool(port=editor.port)
+    limit = config.command_concurrency["scene"]
+    calls = limit + 4
+
+    async def tool_traffic():
+        scene = asyncio.gather(*(pool.send_command_async("GET_SCENE_INFO", {"n": i}) for i in range(calls)))
+        await asyncio.sleep(0.05)
+        # ping 不受并发限制，不排在场景命令后面
+        rtt = await pool.ping_async()
+        await scene
+        return rtt
+
+    try:
+        rtt = asyncio.run(tool_traffic())
+    finally:
+        pool.disconnect()
+    assert rtt < 0.1
+    scene = pool.stats()["concurrency"]["scene"]
+    assert scene["limit"] == limit
+    assert scene["acquired"] == calls
+    assert scene["queued"] == scene["max_waiting"] == calls - limit
+    assert scene["active"] == scene["waiting"] == 0
+    assert scene["wait_time_max"] >= 0.1
+
+
+def test_timeouts_do_not_open_the_circuit(fake_editor):
+    editor = fake_editor("--logs", 10, "--rtt-ms", 300)
+    pool = ConnectionPool(port=editor.port)
+
+    async def slow_pings():
+        for _ in range(pool.breaker.failure_threshold + 1):
+            with pytest.raises(TimeoutError):
+                await pool.ping_async(timeout=0.05)
+        return await pool.send_command_async("GET_SCENE_INFO")
+
+    try:
+        info = asyncio.run(slow_pings())
+    finally:
+        pool.disconnect()
+    assert info["success"] is True
+    assert pool.breaker.state == "closed"
+    assert pool.breaker.stats()["opens"] == 0
+
+
+def test_connection_failures_open_the_circuit():
+    with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as sock:
+        sock.bind(("::1", 0))
+        port = sock.getsockname()[1]
+    pool = ConnectionPool(port=port)
+
+    async def unreachable():
+        for _ in range(pool.breaker.failure_threshold):
+            with pytest.raises(ConnectionError):
+                await pool.send_command_async("CLEAR_LOGS")
+        with pytest.raises(CircuitOpenError):
+            await pool.send_command_async("CLEAR_LOGS")
+
+    try:
+        asyncio.run(unreachable())
+    finally:
+        pool.disconnect()
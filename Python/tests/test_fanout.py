@@ -0,0 +1,85 @@
+"""
+Scatter-gather across fake editors with one editor that cannot be reached.
+"""
+
+import asyncio
+import json
+import socket
+
+import pytest
+from mcp.server.fastmcp import FastMCP
+
+from config import config
+from tools import register_all_tools, log_tools
+
+RTT_MS = 200
+LOG_COUNTS = [5, 8, 12]
+UNREACHABLE = "unreachable"
+
+
+def free_port():
+    """A local port that nothing listens on once this returns."""
+    with socket.socket(socket.AF_INET6, socket.SOCK_STREAM) as sock:
+        sock.bind(("::1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def registry(fake_editor, editors, monkeypatch):
+    """Default editor plus editor1, editor2 (fake editors) and one name pointing at a closed port."""
+    monkeypatch.setattr(config, "max_retries", 0)
+    monkeypatch.setattr(config, "fanout_timeout", 5.0)
+    # 每次查询都向编辑器同步，而不是直接使用本地镜像
+    monkeypatch.setattr(config, "log_sync_interval", 0)
+    ports = [fake_editor("--logs", count, "--rtt-ms", RTT_MS).port for count in LOG_COUNTS]
+    endpoints = {f"editor{i}": f"::1:{port}" for i, port in enumerate(ports) if i}
+    endpoints[UNREACHABLE] = f"::1:{free_port()}"
+    return editors(ports[0], endpoints)
+
+
+def check_outcomes(result, names):
+    assert list(result["editors"]) == names
+    assert result["succeeded"] == names[:-1]
+    assert result["failed"] == [UNREACHABLE]
+    for name in names[:-1]:
+        outcome = result["editors"][name]
+        assert outcome["success"] is True
+        assert "error" not in outcome
+        assert outcome["elapsed_ms"] >= RTT_MS
+    failed = result["editors"][UNREACHABLE]
+    assert failed["success"] is False
+    assert failed["error"]
+    assert "result" not in failed
+    succeeded_ms = [result["editors"][name]["elapsed_ms"] for name in names[:-1]]
+    # 各编辑器并发查询，总耗时接近最慢的一个而不是所有编辑器之和
+    assert max(succeeded_ms) <= result["elapsed_ms"] < sum(succeeded_ms)
+
+
+def test_get_scene_info_all_editors(registry):
+    mcp = FastMCP("test")
+    register_all_tools(mcp)
+    names = registry.names()
+
+    result = json.loads(asyncio.run(mcp.call_tool("get_scene_info_all_editors", {}))[0].text)
+    check_outcomes(result, names)
+    for name in names[:-1]:
+        assert result["editors"][name]["result"]["data"]["uuid"] == "fake-scene"
+
+
+def test_query_logs_all_editors(registry):
+    names = registry.names()
+
+    result = asyncio.run(log_tools.query_logs_all_editors(None, limit=100))
+    check_outcomes(result, names)
+    assert [result["editors"][name]["total"] for name in names[:-1]] == LOG_COUNTS
+    logs = result["logs"]
+    assert len(logs) == sum(LOG_COUNTS)
+    for name, count in zip(names, LOG_COUNTS):
+        assert sum(1 for entry in logs if entry["editor"] == name) == count
+    dates = [entry["date"] for entry in logs]
+    assert dates == sorted(dates)
+
+    newest = asyncio.run(log_tools.query_logs_all_editors(None, names, limit=10, newest_first=True))
+    assert newest["failed"] == [UNREACHABLE]
+    assert len(newest["logs"]) == 10
+    assert [entry["date"] for entry in newest["logs"]] == sorted(dates, reverse=True)[:10]
@@ -0,0 +1,140 @@
+"""
+Framed transport of the sync client against a stand-in bridge.
+
+The bridge answers ``HELLO`` (or rejects it like an old bridge) and then
+sends one multi-megabyte response in small writes.  In framed mode the
+client must parse that payload exactly once, however many ``recv`` calls it
+takes; the old reader re-parsed everything received so far after every
+chunk.
+"""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from cocos_connection import CocosConnection
+from protocol import LEGACY_PROTOCOL_VERSION, PROTOCOL_VERSION, FRAME_HEADER_SIZE, encode_frame, decode_header
+
+PAYLOAD_NODES = 60000  # 约 5MB JSON
+# 旧协议每收到一块都重新解析，解析次数与大小的平方成正比，只用较小的响应
+LEGACY_PAYLOAD_NODES = 6000
+BIG = 64 * 1024
+
+
+def big_result(nodes=PAYLOAD_NODES):
+    return {"nodes": [{"name": f"Node{i}", "uuid": f"uuid-{i:08d}", "path": f"Canvas/Group{i % 50}/Node{i}"}
+                      for i in range(nodes)]}
+
+
+def recv_exactly(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return bytes(data)
+
+
+def recv_json(sock):
+    """Read one bare JSON document (the legacy protocol has no length prefix)."""
+    data = b""
+    while True:
+        data += sock.recv(65536)
+        try:
+            return json.loads(data)
+        except ValueError:
+            continue
+
+
+class StandInBridge:
+    """One-connection TCP server speaking just enough of the LogBridge protocol."""
+
+    def __init__(self, framing: bool, response: dict) -> None:
+        self.framing = framing
+        self.response = json.dumps({"status": "success", "result": response}).encode("utf-8")
+        self.requests = []
+        self.server = socket.socket(socket.AF_INET6, socket.SOCK_STREAM)
+        self.server.bind(("::1", 0))
+        self.server.listen(1)
+        self.port = self.server.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self) -> None:
+        conn, _ = self.server.accept()
+        with conn:
+            hello = recv_json(conn)
+            self.requests.append(hello)
+            if self.framing:
+                reply = {"status": "success", "result": {"protocol": PROTOCOL_VERSION}}
+            else:
+                reply = {"status": "error", "error": f"Unknown command type: {hello['type']}"}
+            conn.sendall(json.dumps(reply).encode("utf-8"))
+
+            if self.framing:
+                _, _, length = decode_header(recv_exactly(conn, FRAME_HEADER_SIZE))
+                self.requests.append(json.loads(recv_exactly(conn, length)))
+                data = encode_frame(self.response)
+            else:
+                self.requests.append(recv_json(conn))
+                data = self.response
+            # 小块写出，客户端需要多次 recv 才能收齐
+            for start in range(0, len(data), 64 * 1024):
+                conn.sendall(data[start:start + 64 * 1024])
+            conn.recv(1)
+
+    def close(self) -> None:
+        self.server.close()
+
+
+@pytest.fixture
+def big_parses(monkeypatch):
+    """Counts json.loads calls on payloads of at least 64KB."""
+    calls = []
+    loads = json.loads
+
+    def counting(data, *args, **kwargs):
+        if len(data) >= BIG:
+            calls.append(len(data))
+        return loads(data, *args, **kwargs)
+
+    monkeypatch.setattr(json, "loads", counting)
+    return calls
+
+
+def test_framed_response_is_parsed_once(big_parses):
+    bridge = StandInBridge(framing=True, response=big_result())
+    client = CocosConnection(host="::1", port=bridge.port)
+    try:
+        assert client.connect()
+        assert client.protocol_version == PROTOCOL_VERSION
+        big_parses.clear()
+        result = client.send_command("LIST_SCENE_NODES", {"limit": PAYLOAD_NODES})
+        assert len(result["nodes"]) == PAYLOAD_NODES
+        assert len(bridge.response) > 4 << 20
+        assert len(big_parses) == 1
+        assert bridge.requests[0]["type"] == "HELLO"
+        assert bridge.requests[1]["type"] == "LIST_SCENE_NODES"
+    finally:
+        client.disconnect()
+        bridge.close()
+
+
+def test_legacy_fallback_when_hello_is_rejected(big_parses):
+    bridge = StandInBridge(framing=False, response=big_result(LEGACY_PAYLOAD_NODES))
+    client = CocosConnection(host="::1", port=bridge.port)
+    try:
+        assert client.connect()
+        assert client.protocol_version == LEGACY_PROTOCOL_VERSION
+        assert not client.framed
+        result = client.send_command("LIST_SCENE_NODES", {"limit": LEGACY_PAYLOAD_NODES})
+        assert len(result["nodes"]) == LEGACY_PAYLOAD_NODES
+        assert bridge.requests[1] == {"type": "LIST_SCENE_NODES", "params": {"limit": LEGACY_PAYLOAD_NODES}}
+        # 旧协议只能反复尝试解析已收到的数据，正是帧协议要避免的
+        assert len(big_parses) > 1
+    finally:
+        client.disconnect()
+        bridge.close()
@@ -0,0 +1,38 @@
+"""
+Missed heartbeats on a busy editor must not tear down the shared connection
+while requests are still waiting on it.
+"""
+
+import asyncio
+
+from connection_pool import ConnectionPool
+from heartbeat import Heartbeat
+
+
+def test_reconnect_waits_for_requests_in_flight(fake_editor):
+    editor = fake_editor("--logs", 10, "--rtt-ms", 300)
+    pool = ConnectionPool(port=editor.port)
+    heartbeat = Heartbeat(pool, interval=1, timeout=0.05, miss_threshold=2)
+
+    async def slow_editor():
+        # CLEAR_LOGS 会改变编辑器状态，连接被重建时不会重试
+        clear = asyncio.ensure_future(pool.send_command_async("CLEAR_LOGS"))
+        await asyncio.sleep(0.02)
+        busy = [await heartbeat.beat() for _ in range(2)]
+        cleared = await clear
+        deferred = heartbeat.status()
+        idle = [await heartbeat.beat()]
+        return busy, cleared, deferred, idle
+
+    try:
+        busy, cleared, deferred, idle = asyncio.run(slow_editor())
+    finally:
+        pool.disconnect()
+    assert busy == [False, False]
+    assert cleared == {"message": "Console logs cleared successfully"}
+    assert deferred["reconnects"] == 0 and deferred["deferred_reconnects"] >= 1
+    # 请求完成后的下一次丢失才重建连接
+    assert idle == [False]
+    status = heartbeat.status()
+    assert status["reconnects"] == 1
+    assert status["consecutive_misses"] == 3
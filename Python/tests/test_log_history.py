@@ -0,0 +1,80 @@
+import os
+import time
+
+import log_history
+from log_history import LogHistory, RECORD, FLAG_TAGS_TRUNCATED, encode_record
+
+
+def entries(start, count, message="[Scene] message"):
+    return [{"type": "log", "message": f"{message} {i}", "date": 1700000000000 + i, "seq": i}
+            for i in range(start, start + count)]
+
+
+def test_tags_are_stored_whole_and_flagged_when_truncated():
+    tags = [f"Module{i:03d}" + "é" * 10 for i in range(20)]
+    message = " ".join(f"[{tag}]" for tag in tags)
+    record = encode_record(0, 0, 0, "log", message, None)
+    tags_length, flags = RECORD.unpack_from(record)[6:8]
+    stored = record[RECORD.size:RECORD.size + tags_length].decode("utf-8").split("\0")
+    assert flags & FLAG_TAGS_TRUNCATED
+    assert tags_length <= 255
+    assert stored == tags[:len(stored)]
+
+    short = encode_record(0, 0, 0, "log", "[Scene] ok", None)
+    assert RECORD.unpack_from(short)[7] == 0
+
+
+def test_module_query_matches_tags_that_did_not_fit(tmp_path):
+    history = LogHistory(str(tmp_path), current_epoch=lambda: "e1")
+    filler = " ".join(f"[Filler{i:02d}xxxxxxxxxxxxxxxx]" for i in range(12))
+    history.append([{"type": "log", "message": f"{filler} [Late] found", "date": 1700000000000, "seq": 0},
+                    {"type": "log", "message": "[Other] not found", "date": 1700000000001, "seq": 1}])
+    logs, _ = history.query(module_filter="Late")
+    assert [entry["message"].split()[-1] for entry in logs] == ["found"]
+    assert len(history.query(module_filter="Filler00xxxxxxxxxxxxxxxx")[0]) == 1
+    history.close()
+
+
+def test_failed_segment_deletion_is_retried(tmp_path, monkeypatch):
+    history = LogHistory(str(tmp_path), segment_size=2048, max_bytes=4096, current_epoch=lambda: "e1")
+    real_remove = os.remove
+    locked = set()
+
+    def remove(path):
+        if path.endswith(".seg") and (not locked or path in locked):
+            locked.add(path)
+            raise PermissionError(13, "file is in use", path)
+        real_remove(path)
+
+    monkeypatch.setattr(log_history.os, "remove", remove)
+    history.append(entries(0, 200))
+    stats = history.stats()
+    assert stats["failed_deletions"] >= 1
+    assert stats["pending_deletions"] == 1
+    assert all(os.path.exists(path) for path in locked)
+
+    # 文件不再被占用后，下一次保留检查（轮转或查询时）删除它
+    monkeypatch.setattr(log_history.os, "remove", real_remove)
+    history.query(limit=1)
+    assert history.stats()["pending_deletions"] == 0
+    assert not any(os.path.exists(path) for path in locked)
+    history.close()
+
+
+def test_mirror_listener_does_not_wait_for_the_disk(tmp_path):
+    epoch = ["e1"]
+    history = LogHistory(str(tmp_path), current_epoch=lambda: epoch[0])
+    # 模拟正在进行的慢写入：写入线程拿不到锁
+    with history._lock:
+        started = time.perf_counter()
+        history.on_append(entries(0, 50))
+        epoch[0] = "e2"
+        history.on_append(entries(0, 10))
+        assert time.perf_counter() - started < 0.5
+        assert not os.listdir(tmp_path)
+
+    # 查询等待排队的写入；第二批属于新的 epoch，不算重复
+    logs, _ = history.query(limit=100)
+    assert len(logs) == 60
+    assert history.stats()["queued_batches"] == 0
+    history.close()
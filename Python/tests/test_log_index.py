@@ -0,0 +1,24 @@
+"""
+Type filtering of the inverted log index, including console types other
+than log, warn and error.
+"""
+
+from log_index import LogIndex
+
+ENTRIES = [{"type": "log", "message": "[Scene] loaded"},
+           {"type": "info", "message": "[Scene] info line"},
+           {"type": "warn", "message": "[Scene] slow frame"},
+           {"type": "debug", "message": "[Net] debug line"},
+           {"type": "error", "message": "[Net] request failed"}]
+
+
+def test_other_types_are_never_returned():
+    index = LogIndex()
+    index.on_append(ENTRIES)
+    assert [entry["type"] for entry in index.query()] == ["log", "warn", "error"]
+    assert [entry["message"] for entry in index.query(module_filter="Scene")] == ["[Scene] loaded",
+                                                                                  "[Scene] slow frame"]
+    assert [entry["message"] for entry in index.query(search_term="line")] == []
+    assert [entry["type"] for entry in index.query(show_logs=False)] == ["warn", "error"]
+    _, _, total = index.query_page(limit=2)
+    assert total == 3
@@ -0,0 +1,26 @@
+"""
+Module-filtered rate snapshots use the module tags recorded at ingest, not
+the normalized signature template.
+"""
+
+from log_rates import LogRates
+
+NOW = 1700000000.0
+
+
+def test_signatures_are_filtered_by_the_recorded_module():
+    rates = LogRates({"10m": [10, 60]}, clock=lambda: NOW)
+    messages = ["[Http2] request 5 failed"] * 3 + ["[Http1] request 7 failed", "[Scene] missing node 3"]
+    rates.on_append([{"type": "error", "message": message, "date": NOW * 1000 - 1000 + i, "seq": i}
+                     for i, message in enumerate(messages)])
+
+    # 模板中的数字被归一化，[Http2] 和 [Http1] 属于同一个签名
+    everything = rates.snapshot()
+    assert {item["signature"]: item["count"] for item in everything["signatures"]} == {
+        "[Http<n>] request <n> failed": 4, "[Scene] missing node <n>": 1}
+
+    http2 = rates.snapshot(module="Http2")
+    assert http2["types"]["error"]["count"] == 3
+    assert [(item["signature"], item["count"]) for item in http2["signatures"]] == [
+        ("[Http<n>] request <n> failed", 3)]
+    assert rates.snapshot(module="Http<n>")["signatures"] == []
@@ -0,0 +1,27 @@
+"""
+``aggregate`` over a one-off list agrees with the incremental ``LogAggregator``.
+"""
+
+from log_signatures import LogAggregator, aggregate
+
+ENTRIES = [{"type": "warn", "message": "Texture 12 missing", "date": 1},
+           {"type": "error", "message": "Request 7 failed\n  at fetch (net.js:10)", "date": 2},
+           {"type": "warn", "message": "Texture 13 missing", "date": 3},
+           {"type": "error", "message": "Request 8 failed", "date": 4},
+           {"type": "log", "message": "Loaded scene", "date": 5}]
+
+
+def test_aggregate_groups_all_types_by_count():
+    groups = aggregate(ENTRIES)
+    assert [(group["type"], group["signature"], group["count"]) for group in groups] == [
+        ("warn", "Texture <n> missing", 2),
+        ("error", "Request <n> failed", 2),
+        ("log", "Loaded scene", 1)]
+    assert groups[1]["first_seen"] == 2 and groups[1]["last_seen"] == 4
+    assert groups[1]["stack"] == "  at fetch (net.js:10)"
+
+
+def test_aggregate_matches_the_aggregator():
+    aggregator = LogAggregator()
+    aggregator.on_append(ENTRIES)
+    assert aggregator.top(types=("error",)) == [group for group in aggregate(ENTRIES) if group["type"] == "error"]
@@ -0,0 +1,20 @@
+"""
+``preview`` renders in the calling thread and keeps no reference to the payload.
+"""
+
+from logging_setup import preview
+
+
+def test_preview_is_a_snapshot():
+    params = {"nodes": ["Canvas"]}
+    text = preview(params)
+    params["nodes"].append("Camera")
+    assert str(text) == "{'nodes': ['Canvas']}"
+    assert not hasattr(text, "obj")
+
+
+def test_preview_is_bounded():
+    text = str(preview("x" * 1000, limit=20))
+    assert text.startswith("'xxxxxxxx")
+    assert text.endswith("chars)")
+    assert len(text) < 60
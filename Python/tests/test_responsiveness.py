@@ -0,0 +1,69 @@
+"""
+The MCP server keeps answering while slow scene commands run.
+
+Scene tools are coroutines: a one-second ``execute-scene-script`` on the
+fake editor must not hold up ``connection_status``, which only pings the
+editor.  Tools are called through a real ``FastMCP`` instance, the way the
+MCP client calls them.
+"""
+
+import asyncio
+import json
+import statistics
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+from config import config
+from tools import register_all_tools
+
+HOP_MS = 1000
+SCENE_CALLS = 3
+
+
+async def status_latencies(mcp, until):
+    """connection_status latencies (ms) until ``until`` completes."""
+    samples = []
+    while not until.done():
+        started = time.perf_counter()
+        await mcp.call_tool("connection_status", {"refresh": True})
+        samples.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.01)
+    return samples
+
+
+def test_connection_status_stays_fast_during_slow_scene_calls(fake_editor, editors):
+    editor = fake_editor("--logs", 100, "--hop-ms", HOP_MS)
+    editors(editor.port)
+    mcp = FastMCP("test")
+    register_all_tools(mcp)
+
+    async def scenario():
+        # 先建立连接，首次连接不计入延迟
+        await mcp.call_tool("connection_status", {"refresh": True})
+        started = time.perf_counter()
+        scene_calls = asyncio.ensure_future(asyncio.gather(*(
+            mcp.call_tool("open_scene", {"scene_uuid": f"scene-{i}"}) for i in range(SCENE_CALLS))))
+        latencies = await status_latencies(mcp, scene_calls)
+        results = await scene_calls
+        return latencies, (time.perf_counter() - started) * 1000, results
+
+    latencies, scene_ms, results = asyncio.run(scenario())
+    assert scene_ms >= HOP_MS
+    for result in results:
+        assert json.loads(result[0].text)["success"] is True
+    assert len(latencies) >= 5
+    assert statistics.median(latencies) < 100
+
+
+def test_tool_timeout_returns_error(fake_editor, editors, monkeypatch):
+    editor = fake_editor("--logs", 10, "--hop-ms", HOP_MS)
+    editors(editor.port)
+    monkeypatch.setitem(config.tool_timeouts, "get_scene_info", 0.2)
+    mcp = FastMCP("test")
+    register_all_tools(mcp)
+
+    started = time.perf_counter()
+    result = asyncio.run(mcp.call_tool("get_scene_info", {}))
+    assert (time.perf_counter() - started) * 1000 < HOP_MS
+    assert json.loads(result[0].text) == {"success": False, "error": "get_scene_info timed out after 0.2s"}
@@ -0,0 +1,21 @@
+"""
+The scene cache keeps at most ``max_entries`` results, least recently used out first.
+"""
+
+from scene_cache import SceneCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SceneCache(max_entries=3)
+    cache.subscribed = True
+    for page in range(3):
+        assert cache.store(("nodes", page), {"success": True, "data": {"page": page}}, cache.generation)
+    # 读取 page 0 后，最久未使用的是 page 1
+    assert cache.get(("nodes", 0))["data"]["page"] == 0
+    cache.store(("nodes", 3), {"success": True, "data": {"page": 3}}, cache.generation)
+
+    assert cache.get(("nodes", 1)) is None
+    assert [cache.get(("nodes", page))["data"]["page"] for page in (0, 2, 3)] == [0, 2, 3]
+    stats = cache.stats()
+    assert stats["entries"] == stats["max_entries"] == 3
+    assert stats["evicted"] == 1
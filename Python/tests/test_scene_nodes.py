@@ -0,0 +1,125 @@
+"""
+Scene node listings: ``SceneNodeTable`` rebuilt from columnar pages matches
+the dict listing, and page cursors do not survive a scene change.
+"""
+
+import asyncio
+
+import pytest
+
+from connection_pool import ConnectionPool
+from scene_cache import SceneCache
+from scene_nodes import SceneNodeTable
+from tools.scene_tools import SceneTools
+
+#   Scene
+#   ├── Canvas
+#   │   ├── Title
+#   │   └── Panel
+#   │       ├── Button
+#   │       └── Label
+#   └── Camera
+TREE = [("Scene", 2), ("Canvas", 2), ("Title", 0), ("Panel", 2), ("Button", 0), ("Label", 0), ("Camera", 0)]
+PARENTS = [-1, 0, 1, 1, 3, 3, 0]
+
+
+def dict_listing():
+    nodes, paths, parents = [], [], PARENTS
+    for index, (name, child_count) in enumerate(TREE):
+        path = f"{paths[parents[index]]}/{name}" if parents[index] >= 0 else name
+        paths.append(path)
+        nodes.append({"name": name, "uuid": f"uuid-{index}", "path": path,
+                      "childCount": child_count, "active": index != 2})
+    return nodes
+
+
+def columns(nodes):
+    return {"name": [node["name"] for node in nodes], "uuid": [node["uuid"] for node in nodes],
+            "childCount": [node["childCount"] for node in nodes], "active": [node["active"] for node in nodes],
+            "position": [float(i) for node in nodes for i in range(3)]}
+
+
+@pytest.mark.parametrize("page_size", range(1, len(TREE) + 1))
+def test_pages_rebuild_the_tree(page_size):
+    nodes = dict_listing()
+    table = SceneNodeTable()
+    # 分页边界落在子节点尚未收齐的祖先之间
+    for start in range(0, len(nodes), page_size):
+        table.extend_columns(columns(nodes[start:start + page_size]))
+
+    assert list(table.parents) == PARENTS
+    assert table.children(0) == [1, 6]
+    assert table.children(1) == [2, 3]
+    assert table.children(3) == [4, 5]
+    assert table.children(6) == []
+    assert table.descendant_count(1) == 4
+    assert table.index_of("uuid-4") == 4
+    assert table.index_of("missing") is None
+    assert table.path(5) == "Scene/Canvas/Panel/Label"
+    assert table.position(6) == (0.0, 1.0, 2.0)
+    assert table.to_dicts() == nodes
+    assert [table.node(index) for index in range(len(table))] == nodes
+
+
+def test_dict_pages_of_older_bridges():
+    nodes = dict_listing()
+    table = SceneNodeTable()
+    table.extend_dicts(nodes[:3])
+    table.extend_dicts(nodes[3:])
+    assert list(table.parents) == PARENTS
+    assert table.to_dicts() == nodes
+    assert table.position(0) is None
+
+
+def test_load_node_table_matches_listing(fake_editor):
+    editor = fake_editor("--logs", 10, "--nodes", 300, "--branching", 3)
+    pool = ConnectionPool(port=editor.port)
+    scene_tools = SceneTools(pool)
+
+    async def load():
+        table = await scene_tools.load_node_table(page_size=7)
+        nodes, cursor = [], None
+        while True:
+            page = await scene_tools.list_scene_nodes(limit=50, cursor=cursor)
+            nodes.extend(page["data"]["nodes"])
+            cursor = page["data"]["nextCursor"]
+            if cursor is None:
+                return table, nodes
+
+    try:
+        table, nodes = asyncio.run(load())
+    finally:
+        pool.disconnect()
+    assert len(table) == len(nodes) == 300
+    assert table.to_dicts() == nodes
+    for node in nodes[::37]:
+        index = table.index_of(node["uuid"])
+        assert table.node(index) == node
+        children = [other["uuid"] for other in nodes if other["path"] == f"{node['path']}/{other['name']}"]
+        assert [table.uuids[child] for child in table.children(index)] == children
+
+
+def test_cursor_is_rejected_after_scene_change(fake_editor):
+    editor = fake_editor("--logs", 10, "--nodes", 100)
+    pool = ConnectionPool(port=editor.port)
+    scene_tools = SceneTools(pool, SceneCache())
+
+    async def page_across_edit():
+        first = await scene_tools.list_scene_nodes(limit=30)
+        second = await scene_tools.list_scene_nodes(limit=30, cursor=first["data"]["nextCursor"])
+        await pool.send_command_async("FAKE_EDIT_SCENE", {"add": 1})
+        stale = await scene_tools.list_scene_nodes(limit=30, cursor=second["data"]["nextCursor"])
+        restarted = await scene_tools.list_scene_nodes(limit=30)
+        return first, second, stale, restarted
+
+    try:
+        first, second, stale, restarted = asyncio.run(page_across_edit())
+    finally:
+        pool.disconnect()
+    assert second["success"] is True
+    assert second["data"]["nodes"][0]["uuid"] != first["data"]["nodes"][0]["uuid"]
+    assert stale["success"] is False
+    assert "过期" in stale["message"]
+    generation = int(first["data"]["nextCursor"].split(":")[0])
+    assert restarted["success"] is True
+    assert int(restarted["data"]["nextCursor"].split(":")[0]) > generation
@@ -1,7 +1,11 @@
 from .log_tools import register_log_tools
-from cocos_connection import get_cocos_connection
+from .batch_tools import register_batch_tools
+from .editor_tools import register_editor_tools
+from .execution import register_tool
+from editor_registry import get_editor_registry
+from scene_snapshots import diff as scene_diff
 from mcp.server.fastmcp import Context
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 import logging
 
 # 尝试导入 scene_tools，如果不存在则跳过
@@ -14,6 +18,8 @@ except ImportError:
 def register_all_tools(mcp):
     """Register all tools with the MCP server."""
     register_log_tools(mcp)
+    register_batch_tools(mcp)
+    register_editor_tools(mcp)
     
     # 如果场景工具可用则注册
     if HAS_SCENE_TOOLS:
@@ -24,71 +30,191 @@ def register_scene_tools(mcp):
     if not HAS_SCENE_TOOLS:
         return
     
-    # 创建一个SceneTools实例
-    cocos_client = get_cocos_connection()
-    scene_tools = SceneTools(cocos_client)
+    # 注册工具不依赖编辑器连接，连接在第一次调用工具时才获取
+    registry = get_editor_registry()
+    
+    def scene_tools(editor: Optional[str]) -> SceneTools:
+        return SceneTools(registry.connection(editor), registry.scene_cache(editor))
     
     # 1. 打开场景工具
-    def open_scene(ctx: Context, scene_uuid: str) -> Dict[str, Any]:
+    async def open_scene(ctx: Context, scene_uuid: str, editor: Optional[str] = None) -> Dict[str, Any]:
         """
         打开指定UUID的场景
         
         Args:
             scene_uuid: 场景资源的UUID
+            editor: 编辑器名称（见 list_editors），默认为主编辑器
             
         Returns:
             操作结果
         """
-        logging.info(f"MCP处理open_scene请求: {scene_uuid}")
+        logging.info("MCP处理open_scene请求: %s", scene_uuid)
         
-        if not scene_uuid:
-            return {"success": False, "error": "Missing scene_uuid parameter"}
-            
         try:
-            # 直接调用SceneTools的方法并返回结果
-            result = scene_tools.open_scene(scene_uuid)
-            return result
+            return await scene_tools(editor).open_scene(scene_uuid)
         except Exception as e:
             logging.error(f"open_scene错误: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
     
     # 2. 获取场景信息工具
-    def get_scene_info(ctx: Context) -> Dict[str, Any]:
+    async def get_scene_info(ctx: Context, editor: Optional[str] = None) -> Dict[str, Any]:
         """
         获取当前场景信息
         
+        Args:
+            editor: 编辑器名称（见 list_editors），默认为主编辑器
+            
         Returns:
             场景信息
         """
         logging.info("MCP处理get_scene_info请求")
         
         try:
-            # 调用SceneTools的方法
-            result = scene_tools.get_scene_info()
-            return result
+            # 场景未变化时直接使用缓存的结果
+            return await scene_tools(editor).get_scene_info()
         except Exception as e:
             logging.error(f"get_scene_info错误: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
     
     # 4. 列出场景节点工具
-    def list_scene_nodes(ctx: Context) -> Dict[str, Any]:
+    async def list_scene_nodes(ctx: Context, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               format: Optional[str] = None, editor: Optional[str] = None) -> Dict[str, Any]:
         """
-        列出场景中的所有节点
+        分页列出场景中的节点（先序遍历顺序）
         
+        Args:
+            limit: 每页最多返回的节点数，默认使用配置的分页大小
+            cursor: 上一页返回的 data.nextCursor，用于获取下一页
+            format: 为 "columns" 时以平行数组 data.columns（name、uuid、childCount、
+                active、position 展开为 x, y, z）代替 data.nodes，适合大场景
+            editor: 编辑器名称（见 list_editors），默认为主编辑器
+            
         Returns:
-            节点列表
+            节点列表，data.nextCursor 为 None 表示已是最后一页
         """
         logging.info("MCP处理list_scene_nodes请求")
         
         try:
-            # 调用SceneTools的方法
-            result = scene_tools.list_scene_nodes()
-            return result
+            return await scene_tools(editor).list_scene_nodes(limit, cursor, format)
         except Exception as e:
             logging.error(f"list_scene_nodes错误: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
     
+    # 5. 按条件查询场景节点工具
+    async def query_scene_nodes(ctx: Context, path: Optional[str] = None, name: Optional[str] = None,
+                                component: Optional[str] = None, active: Optional[bool] = None,
+                                min_depth: Optional[int] = None, max_depth: Optional[int] = None,
+                                fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                                offset: int = 0, editor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        在编辑器内按条件查询场景节点，只返回匹配节点的指定字段
+        
+        Args:
+            path: 节点路径的 glob，相对于场景根节点（不含场景名），如 "Canvas/**/Button*"；
+                "*" 匹配一段路径内的任意字符，"?" 匹配单个字符，"**" 匹配任意层级
+            name: 节点名称的 glob，如 "Enemy*"
+            component: 节点上必须有的组件类名，如 "cc.Sprite" 或 "Sprite"
+            active: 只返回 active 为该值的节点
+            min_depth: 最小深度，场景根节点的子节点深度为 1
+            max_depth: 最大深度，更深的子树不会被遍历
+            fields: 返回的字段，默认 ["name", "uuid", "path"]；可选 depth、parent、
+                siblingIndex、childCount、active、activeInHierarchy、layer、position、
+                worldPosition、scale、eulerAngles、components
+            limit: 最多返回的节点数，默认使用配置的分页大小
+            offset: 跳过前 offset 个匹配节点
+            editor: 编辑器名称（见 list_editors），默认为主编辑器
+            
+        Returns:
+            data.nodes 为匹配的节点（先序遍历顺序），data.total 为匹配总数
+        """
+        logging.info("MCP处理query_scene_nodes请求: path=%s, name=%s, component=%s", path, name, component)
+        
+        try:
+            return await scene_tools(editor).query_scene_nodes(
+                path=path, name=name, component=component, active=active, min_depth=min_depth,
+                max_depth=max_depth, fields=fields, limit=limit, offset=offset)
+        except Exception as e:
+            logging.error(f"query_scene_nodes错误: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+    
+    # 6. 跨编辑器获取场景信息工具
+    async def get_scene_info_all_editors(ctx: Context, editors: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        同时获取多个编辑器的当前场景信息
+        
+        Args:
+            editors: 编辑器名称列表，默认为所有已注册的编辑器
+            
+        Returns:
+            editors 中按编辑器给出 success、elapsed_ms 以及 result 或 error；
+            succeeded / failed 为成功和失败的编辑器名称，部分失败不影响其他编辑器的结果
+        """
+        logging.info("MCP处理get_scene_info_all_editors请求: %s", editors)
+        
+        try:
+            return await registry.gather(lambda name: get_scene_info(ctx, editor=name), editors)
+        except Exception as e:
+            logging.error(f"get_scene_info_all_editors错误: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+    
+    # 7. 场景结构快照工具
+    async def snapshot_scene(ctx: Context, editor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        记录当前场景的结构快照（节点名称、active、组件、变换及子树哈希），供 diff_scene 比较
+        
+        Args:
+            editor: 编辑器名称（见 list_editors），默认为主编辑器
+            
+        Returns:
+            snapshot_id、scene、node_count、hash（场景根节点的子树哈希，未变化时相同）；
+            transferred / reused 为编辑器发送的节点数和从上一个快照复用的节点数
+        """
+        logging.info("MCP处理snapshot_scene请求")
+        
+        try:
+            snapshot = await registry.scene_snapshots(editor).take(registry.connection(editor))
+            return dict(snapshot.summary(), success=True)
+        except Exception as e:
+            logging.error(f"snapshot_scene错误: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+    
+    # 8. 场景快照比较工具
+    async def diff_scene(ctx: Context, from_snapshot: str, to_snapshot: Optional[str] = None,
+                         limit: int = 100, editor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        比较同一场景的两个快照，只进入子树哈希不同的部分
+        
+        Args:
+            from_snapshot: snapshot_scene 返回的 snapshot_id
+            to_snapshot: 另一个快照的 snapshot_id；省略时先记录当前场景的快照再比较
+            limit: added、removed、modified 合计最多返回的条目数
+            editor: 编辑器名称（见 list_editors），默认为主编辑器
+            
+        Returns:
+            added / removed 为新增和删除的子树根节点（nodes 为子树节点数），modified 为
+            名称、active、组件、position / rotation / scale、父节点或子节点顺序变化的节点；
+            summary 为完整计数，truncated 表示条目超过 limit；to 为比较的快照 ID。
+            组件属性值的变化不会被检测到
+        """
+        logging.info("MCP处理diff_scene请求: %s -> %s", from_snapshot, to_snapshot)
+        
+        try:
+            snapshots = registry.scene_snapshots(editor)
+            before = snapshots.get(from_snapshot)
+            if to_snapshot:
+                after = snapshots.get(to_snapshot)
+            else:
+                after = await snapshots.take(registry.connection(editor))
+            return dict(scene_diff(before, after, limit), success=True)
+        except Exception as e:
+            logging.error(f"diff_scene错误: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+    
     # 注册工具
-    mcp.tool(name="open_scene")(open_scene)
-    mcp.tool(name="get_scene_info")(get_scene_info)
-    mcp.tool(name="list_scene_nodes")(list_scene_nodes) 
\ No newline at end of file
+    register_tool(mcp, open_scene)
+    register_tool(mcp, get_scene_info)
+    register_tool(mcp, list_scene_nodes)
+    register_tool(mcp, query_scene_nodes)
+    register_tool(mcp, get_scene_info_all_editors) 
+    register_tool(mcp, snapshot_scene)
+    register_tool(mcp, diff_scene)
@@ -0,0 +1,56 @@
+import logging
+from typing import Dict, Any, List, Optional
+from mcp.server.fastmcp import Context
+from .execution import register_tool
+from .log_tools import sync_before_clear, get_log_mirror
+from editor_registry import get_editor_registry
+
+# Get the logger
+logger = logging.getLogger("CocosMCP")
+
+async def batch_commands(
+    ctx: Context,
+    commands: List[Dict[str, Any]],
+    parallel: bool = False,
+    editor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Run several Cocos Creator bridge commands in a single round trip.
+
+    Args:
+        commands: List of commands, each like {"type": "GET_SCENE_INFO", "params": {}}.
+            Supported types: QUERY_LOGS, CLEAR_LOGS, OPEN_SCENE, GET_SCENE_INFO,
+            LIST_SCENE_NODES, QUERY_SCENE_NODES, HASH_SCENE_NODES, ping.
+            OPEN_SCENE and CLEAR_LOGS have the same effects as the open_scene
+            and clear_logs tools (scene cache, log history and mirror)
+        parallel: Execute the commands concurrently instead of in order
+        editor: Name of the editor (see `list_editors`), the default editor if omitted
+
+    Returns:
+        Dictionary with one {"status", "result" | "error"} entry per command
+    """
+    if not commands:
+        return {"error": "No commands given", "results": []}
+    try:
+        registry = get_editor_registry()
+        cocos = registry.connection(editor)
+        types = {command.get("type") for command in commands if isinstance(command, dict)}
+        if "CLEAR_LOGS" in types:
+            await sync_before_clear(cocos, editor)
+        try:
+            results = await cocos.send_batch_async(commands, parallel)
+        finally:
+            if "OPEN_SCENE" in types:
+                # 与 open_scene 相同，不等待 scene:ready 事件
+                registry.scene_cache(editor).invalidate("batch_commands")
+        if any(command.get("type") == "CLEAR_LOGS" and result.get("status") == "success"
+               for command, result in zip(commands, results) if isinstance(command, dict)):
+            get_log_mirror(editor).clear()
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"Error running batch: {e}")
+        return {"error": str(e), "results": []}
+
+def register_batch_tools(mcp):
+    """Register batch tools with the MCP server."""
+    register_tool(mcp, batch_commands)
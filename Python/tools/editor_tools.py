@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from typing import Dict, Any
+from mcp.server.fastmcp import Context
+from .execution import register_tool
+from editor_registry import get_editor_registry
+
+# Get the logger
+logger = logging.getLogger("CocosMCP")
+
+async def list_editors(ctx: Context, refresh: bool = False) -> Dict[str, Any]:
+    """
+    List the registered Cocos Creator editors.
+
+    Every tool that talks to an editor takes an optional `editor` argument
+    with one of these names; the default editor is used when it is omitted.
+
+    Args:
+        refresh: Ping every editor now (concurrently) instead of using the last heartbeat
+
+    Returns:
+        Dictionary with `default` and `editors`, each with name, host, port
+        and the last-known `connected` state (None if never checked)
+    """
+    try:
+        registry = get_editor_registry()
+        if refresh:
+            await asyncio.gather(*(registry.heartbeat(name).beat() for name in registry.names()))
+        return {"default": registry.default, "editors": registry.stats()}
+    except Exception as e:
+        logger.error(f"Error listing editors: {e}")
+        return {"error": str(e), "editors": []}
+
+async def register_editor(ctx: Context, name: str, host: str, port: int) -> Dict[str, Any]:
+    """
+    Register another Cocos Creator editor, e.g. one opened on a second project.
+
+    Registering an existing name replaces its endpoint.  Nothing is
+    connected until the editor is first used.
+
+    Args:
+        name: Name used as `editor` in the other tools
+        host: Host the editor's MCP extension listens on, e.g. "::1"
+        port: Port of the editor's MCP extension
+
+    Returns:
+        Dictionary with the registered editor
+    """
+    try:
+        registry = get_editor_registry()
+        registry.add(name, host, port)
+        # 与启动时注册的编辑器一样在后台检查连接
+        registry.heartbeat(name).start()
+        return {"success": True, "editor": registry.endpoint(name)}
+    except Exception as e:
+        logger.error(f"Error registering editor {name}: {e}")
+        return {"success": False, "error": str(e)}
+
+async def unregister_editor(ctx: Context, name: str) -> Dict[str, Any]:
+    """
+    Remove a registered editor and close its connections.
+
+    Args:
+        name: Name of the editor; the default editor cannot be removed
+
+    Returns:
+        Success status
+    """
+    try:
+        get_editor_registry().remove(name)
+        return {"success": True}
+    except Exception as e:
+        logger.error(f"Error unregistering editor {name}: {e}")
+        return {"success": False, "error": str(e)}
+
+def register_editor_tools(mcp):
+    """Register editor registry tools with the MCP server."""
+    register_tool(mcp, list_editors)
+    register_tool(mcp, register_editor)
+    register_tool(mcp, unregister_editor)
@@ -0,0 +1,84 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
+from config import config
+from logging_setup import request_context
+
+# Get the logger
+logger = logging.getLogger("CocosMCP")
+
+# FastMCP 直接在事件循环上调用同步工具，一次慢调用会阻塞所有请求，
+# 因此同步工具改在有界线程池中执行
+_executor: Optional[ThreadPoolExecutor] = None
+
+# 工具名 -> 调用、超时、取消计数
+_stats: Dict[str, Dict[str, int]] = {}
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max(1, config.tool_workers), thread_name_prefix="cocos-mcp-tool")
+    return _executor
+
+def tool_timeout(name: str) -> float:
+    """Timeout of a tool in seconds, 0 for none."""
+    return config.tool_timeouts.get(name, config.tool_timeout)
+
+def run_tool(fn: Callable[..., Any], name: Optional[str] = None) -> Callable[..., Any]:
+    """
+    Wrap a tool so it never blocks the event loop and honours its timeout.
+
+    Coroutine tools are awaited directly, plain functions run on the bounded
+    tool thread pool.  Every call gets a logging correlation id.  A call that
+    exceeds `tool_timeout(name)` is cancelled and returns an error result; a
+    call cancelled by the MCP client (or the server shutting down) propagates
+    the cancellation after logging it.  The wrapper keeps the signature and
+    docstring FastMCP builds the tool schema from.
+    """
+    name = name or fn.__name__
+    is_async = inspect.iscoroutinefunction(fn)
+
+    @functools.wraps(fn)
+    async def tool(*args, **kwargs):
+        stats = _stats.setdefault(name, {"calls": 0, "active": 0, "timeouts": 0, "cancelled": 0, "errors": 0})
+        stats["calls"] += 1
+        stats["active"] += 1
+        timeout = tool_timeout(name)
+        # 本次调用及其发出的命令的日志都带上同一个关联 ID
+        with request_context(name):
+            try:
+                if is_async:
+                    call = fn(*args, **kwargs)
+                else:
+                    # 线程池不会传递上下文，显式复制以保留关联 ID；
+                    # 超时或取消时线程中的调用无法中断，只是不再等待它的结果
+                    call = asyncio.get_running_loop().run_in_executor(
+                        _get_executor(), functools.partial(contextvars.copy_context().run, fn, *args, **kwargs))
+                return await asyncio.wait_for(call, timeout if timeout > 0 else None)
+            except asyncio.TimeoutError:
+                stats["timeouts"] += 1
+                logger.warning("Tool %s timed out after %ss", name, timeout)
+                return {"success": False, "error": f"{name} timed out after {timeout}s"}
+            except asyncio.CancelledError:
+                stats["cancelled"] += 1
+                logger.info("Tool %s cancelled", name)
+                raise
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                stats["active"] -= 1
+
+    return tool
+
+def register_tool(mcp, fn: Callable[..., Any], name: Optional[str] = None) -> None:
+    """Register ``fn`` as an MCP tool through ``run_tool``."""
+    mcp.tool(name=name)(run_tool(fn, name))
+
+def tool_stats() -> Dict[str, Any]:
+    """Per-tool call, active, timeout, cancellation and error counts."""
+    return {name: dict(stats) for name, stats in _stats.items()}
@@ -1,18 +1,100 @@
+import asyncio
 import logging
+import os
 from typing import Dict, Any, Optional, List
 from mcp.server.fastmcp import Context
-from cocos_connection import get_cocos_connection
+from .execution import register_tool, tool_stats
+from config import config
+from editor_registry import get_editor_registry
+from log_mirror import LogMirror, build_filters
+from log_index import LogIndex
+from log_signatures import LogAggregator, aggregate
+from log_rates import LogRates
+from log_history import LogHistory, parse_time, to_millis
+from metrics import metrics, DUMP_FORMATS
+from logging_setup import logging_stats
 
 # Get the logger
 logger = logging.getLogger("CocosMCP")
 
+class EditorLogs:
+    """Local console mirror of one editor and the listeners built on it."""
+
+    def __init__(self, history_dir: str) -> None:
+        # 编辑器控制台的本地镜像，只增量拉取新日志
+        self.mirror = LogMirror()
+        # 镜像上的倒排索引，用于按类型、模块和搜索词快速过滤
+        self.index = LogIndex()
+        self.mirror.add_listener(self.index)
+        # 按错误签名增量计数，供 top_errors 使用
+        self.aggregator = LogAggregator(config.log_signature_max)
+        self.mirror.add_listener(self.aggregator)
+        # 按类型、模块和错误签名的滚动计数，供 log_stats 使用
+        self.rates = LogRates(config.log_rate_windows, config.log_rate_max_series,
+                              current_epoch=lambda: self.mirror.epoch)
+        self.mirror.add_listener(self.rates)
+        # 磁盘上的持久日志历史，清空控制台或编辑器重启后仍可查询；首次写入时才打开
+        self.history: Optional[LogHistory] = None
+        if config.log_history_enabled:
+            self.history = LogHistory(history_dir, current_epoch=lambda: self.mirror.epoch)
+            self.mirror.add_listener(self.history)
+        self.sync_lock: Optional[asyncio.Lock] = None
+
+_editor_logs: Dict[str, EditorLogs] = {}
+
+def get_editor_logs(editor: Optional[str] = None) -> EditorLogs:
+    """Get the log state of an editor (the default editor when ``editor`` is empty)."""
+    registry = get_editor_registry()
+    name = registry.resolve([editor])[0] if editor else registry.default
+    logs = _editor_logs.get(name)
+    if logs is None:
+        # 默认编辑器沿用原来的目录，其他编辑器的历史放在以名称命名的子目录中
+        history_dir = (config.log_history_dir if name == registry.default
+                       else os.path.join(config.log_history_dir, name))
+        logs = _editor_logs[name] = EditorLogs(history_dir)
+    return logs
+
+def get_log_mirror(editor: Optional[str] = None) -> LogMirror:
+    """Get the local console mirror shared by the log tools."""
+    return get_editor_logs(editor).mirror
+
+async def sync_logs(cocos=None, force: bool = False, editor: Optional[str] = None) -> int:
+    """
+    Fetch console entries added since the last sync into the local mirror.
+
+    Syncs are skipped if the previous one is younger than
+    ``config.log_sync_interval`` unless ``force`` is set, and concurrent
+    callers share a single in-flight request.
+
+    Returns:
+        Number of new entries
+    """
+    logs = get_editor_logs(editor)
+    if logs.sync_lock is None:
+        logs.sync_lock = asyncio.Lock()
+    async with logs.sync_lock:
+        if not force and not logs.mirror.needs_sync():
+            return 0
+        cocos = cocos or get_editor_registry().connection(editor)
+        params = dict(logs.mirror.sync_params(), page_size=config.stream_page_size)
+        # 以流的形式接收，每帧直接写入镜像，首次全量同步时内存占用也保持有界
+        count = 0
+        async for chunk in cocos.stream_command_async("QUERY_LOGS", params):
+            count += logs.mirror.apply(chunk)
+        return count
+
 async def query_logs(
     ctx: Context,
     show_logs: bool = True,
     show_warnings: bool = True,
     show_errors: bool = True,
     search_term: Optional[str] = None,
-    module_filter: Optional[str] = None
+    module_filter: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    newest_first: bool = False,
+    aggregate_similar: bool = False,
+    editor: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Query Cocos Creator editor logs with optional filtering.
@@ -23,66 +105,189 @@ async def query_logs(
         show_errors: Include error logs in results
         search_term: Optional search term to filter logs
         module_filter: Optional module name to filter logs (e.g. "Scene", "Assets")
+        limit: Maximum number of logs to return (defaults to the configured page size)
+        cursor: `next_cursor` from a previous call to fetch the following page
+        newest_first: Return the most recent logs first
+        aggregate_similar: Collapse near-identical logs (differing only in
+            numbers, uuids, hex ids or paths) into signatures with a count,
+            first/last timestamps and one representative stack
+        editor: Name of the editor to query (see `list_editors`), the default editor if omitted
     
     Returns:
-        Dictionary containing filtered logs
+        Dictionary containing filtered logs, `next_cursor` (None on the last
+        page) and `total` number of matching logs.  With `aggregate_similar`,
+        `signatures` (most frequent first) replaces `logs`, `total` counts
+        signatures and `total_logs` the matching logs
     """
     try:
-        cocos = get_cocos_connection()
-        # 保存日志请求的副本，因为我们要修改它
-        params = {
-            "show_logs": show_logs,
-            "show_warnings": show_warnings,
-            "show_errors": show_errors
-        }
-        
-        # 只有在提供了 search_term 且非空且是字符串类型时才添加
-        if search_term and isinstance(search_term, str) and search_term.strip():
-            logger.info(f"Adding search term to log query: {search_term}")
-            params["search_term"] = search_term.strip()
-            
+        # 只有在提供了 search_term 且非空且是字符串类型时才使用
+        if not (search_term and isinstance(search_term, str) and search_term.strip()):
+            search_term = None
+        else:
+            search_term = search_term.strip()
+            logger.info("Adding search term to log query: %s", search_term)
+
         # 添加模块过滤
-        if module_filter and isinstance(module_filter, str) and module_filter.strip():
-            logger.info(f"Adding module filter to log query: {module_filter}")
-            params["module_filter"] = module_filter.strip()
-            
-        result = cocos.send_command("QUERY_LOGS", params)
-        return result
+        if not (module_filter and isinstance(module_filter, str) and module_filter.strip()):
+            module_filter = None
+        else:
+            module_filter = module_filter.strip()
+            logger.info("Adding module filter to log query: %s", module_filter)
+
+        limit = limit if limit and limit > 0 else config.page_size
+        position = int(cursor) if cursor else None
+
+        # 先增量同步，再在本地镜像上过滤
+        logs_state = get_editor_logs(editor)
+        await sync_logs(editor=editor)
+        if aggregate_similar:
+            entries = logs_state.index.query(show_logs, show_warnings, show_errors, search_term, module_filter)
+            signatures = aggregate(entries)
+            start = position or 0
+            page = signatures[start:start + limit]
+            return {
+                "signatures": page,
+                "next_cursor": str(start + limit) if start + limit < len(signatures) else None,
+                "total": len(signatures),
+                "total_logs": len(entries)
+            }
+        logs, next_position, total = logs_state.index.query_page(
+            show_logs, show_warnings, show_errors, search_term, module_filter,
+            limit=limit, cursor=position, newest_first=newest_first
+        )
+        return {
+            "logs": logs,
+            "next_cursor": str(next_position) if next_position is not None else None,
+            "total": total
+        }
     except Exception as e:
         logger.error(f"Error querying logs: {e}")
         return {"error": str(e), "logs": []}
 
-async def clear_logs(ctx: Context) -> Dict[str, Any]:
+async def query_logs_all_editors(
+    ctx: Context,
+    editors: Optional[List[str]] = None,
+    show_logs: bool = True,
+    show_warnings: bool = True,
+    show_errors: bool = True,
+    search_term: Optional[str] = None,
+    module_filter: Optional[str] = None,
+    limit: Optional[int] = None,
+    newest_first: bool = False
+) -> Dict[str, Any]:
+    """
+    Query the logs of several editors concurrently and merge them by time.
+    
+    Every editor is queried like `query_logs` with the same filters; the
+    merged logs are tagged with their `editor` and cut to `limit`.
+    
+    Args:
+        editors: Editor names (see `list_editors`), all registered editors if omitted
+        show_logs: Include regular logs in results
+        show_warnings: Include warning logs in results
+        show_errors: Include error logs in results
+        search_term: Optional search term to filter logs
+        module_filter: Optional module name to filter logs (e.g. "Scene", "Assets")
+        limit: Maximum number of merged logs to return (defaults to the configured page size)
+        newest_first: Return the most recent logs first
+    
+    Returns:
+        Dictionary with the merged `logs` and, per editor in `editors`,
+        `success`, `elapsed_ms` and the editor's `total` matching logs or
+        its `error`; `succeeded` / `failed` list the editor names.  An
+        editor that fails or times out does not fail the whole query
+    """
+    try:
+        limit = limit if limit and limit > 0 else config.page_size
+        gathered = await get_editor_registry().gather(
+            lambda name: query_logs(ctx, show_logs, show_warnings, show_errors, search_term, module_filter,
+                                    limit=limit, newest_first=newest_first, editor=name),
+            editors)
+        merged: List[Dict[str, Any]] = []
+        for name, outcome in gathered["editors"].items():
+            result = outcome.pop("result", None)
+            if result is None:
+                continue
+            outcome["total"] = result["total"]
+            merged.extend(dict(entry, editor=name) for entry in result["logs"])
+        # 稳定排序，时间相同的日志保持各编辑器内的顺序
+        merged.sort(key=lambda entry: to_millis(entry.get("date")) or 0, reverse=newest_first)
+        gathered["logs"] = merged[:limit]
+        return gathered
+    except Exception as e:
+        logger.error(f"Error querying logs across editors: {e}")
+        return {"error": str(e), "logs": []}
+
+async def sync_before_clear(cocos, editor: Optional[str] = None) -> None:
+    """Write the entries added since the last sync to the history before CLEAR_LOGS removes them."""
+    if get_editor_logs(editor).history is None:
+        return
+    try:
+        await sync_logs(cocos, force=True, editor=editor)
+    except Exception as e:
+        logger.warning(f"Could not sync logs to history before clearing: {e}")
+
+async def clear_logs(ctx: Context, editor: Optional[str] = None) -> Dict[str, Any]:
     """
     Clear all Cocos Creator editor logs.
     
+    Args:
+        editor: Name of the editor (see `list_editors`), the default editor if omitted
+    
     Returns:
         Success status and message
     """
     try:
-        cocos = get_cocos_connection()
-        result = cocos.send_command("CLEAR_LOGS", {})
+        cocos = get_editor_registry().connection(editor)
+        # 先把上次同步之后的日志写入历史，清空后就无法再取回
+        await sync_before_clear(cocos, editor)
+        result = await cocos.send_command_async("CLEAR_LOGS", {})
+        get_log_mirror(editor).clear()
         return result
     except Exception as e:
         logger.error(f"Error clearing logs: {e}")
         return {"error": str(e)}
 
-async def connection_status(ctx: Context) -> Dict[str, Any]:
+async def connection_status(ctx: Context, refresh: bool = False, editor: Optional[str] = None) -> Dict[str, Any]:
     """
     Check the connection status to Cocos Creator.
     
+    Answers from the last background heartbeat without contacting the editor;
+    `heartbeat.last_check_age` tells how old that state is.
+    
+    Args:
+        refresh: Ping the editor now instead of using the last heartbeat
+        editor: Name of the editor (see `list_editors`), the default editor if omitted
+    
     Returns:
         Dictionary with connection status information
     """
     try:
-        cocos = get_cocos_connection()
-        # Try a ping command to verify connection
-        cocos.send_command("ping")
-        return {
-            "connected": True,
+        registry = get_editor_registry()
+        cocos = registry.connection(editor)
+        heartbeat = registry.heartbeat(editor)
+        # 心跳未运行或尚无结果时实时检查一次
+        if refresh or not heartbeat.running or heartbeat.last_check is None:
+            await heartbeat.beat()
+        status = heartbeat.status()
+        result = {
+            "connected": bool(status["connected"]),
+            "editor": editor or registry.default,
             "host": cocos.host,
-            "port": cocos.port
+            "port": cocos.port,
+            "heartbeat": status,
+            "pool": cocos.stats(),
+            "scene_cache": registry.scene_cache(editor).stats(),
+            "tools": tool_stats(),
+            "logging": logging_stats()
         }
+        history = get_editor_logs(editor).history
+        if history is not None:
+            # 写入线程写盘时持有历史的锁，不在事件循环上等待
+            result["log_history"] = await asyncio.get_running_loop().run_in_executor(None, history.stats)
+        if not status["connected"]:
+            result["error"] = status["last_error"]
+        return result
     except Exception as e:
         logger.error(f"Connection check failed: {e}")
         return {
@@ -90,17 +295,206 @@ async def connection_status(ctx: Context) -> Dict[str, Any]:
             "error": str(e)
         }
 
+async def bridge_metrics(
+    ctx: Context,
+    reset: bool = False,
+    dump_path: Optional[str] = None,
+    format: str = "json"
+) -> Dict[str, Any]:
+    """
+    Per-command request metrics of the connection to Cocos Creator.
+    
+    For every command type: request, error and timeout counts, bytes sent and
+    received, and latency histograms (ms) split into parse time, the bridge's
+    own handler time and the remaining transport time (socket wait, framing,
+    queueing).
+    
+    Args:
+        reset: Clear the metrics after reading them
+        dump_path: Also write the metrics to this file
+        format: Format of the dump, "json" or "prometheus"
+    
+    Returns:
+        Dictionary with totals and per-command metrics
+    """
+    if format not in DUMP_FORMATS:
+        return {"success": False, "error": f"Unknown format: {format}, expected one of {list(DUMP_FORMATS)}"}
+    result = metrics.snapshot()
+    if dump_path:
+        try:
+            metrics.dump(dump_path, format)
+            result["dump_path"] = dump_path
+        except Exception as e:
+            logger.error(f"Failed to dump metrics: {e}")
+            return {"success": False, "error": str(e)}
+    if reset:
+        metrics.reset()
+    return result
+
+async def top_errors(
+    ctx: Context,
+    limit: int = 10,
+    include_warnings: bool = False,
+    editor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Most frequent error signatures since the console was last cleared.
+    
+    Near-identical messages (differing only in numbers, uuids, hex ids or
+    paths) share a signature.  Counts are maintained incrementally as logs
+    are synced, so this is cheap even for very noisy consoles.
+    
+    Args:
+        limit: Number of signatures to return
+        include_warnings: Also count warnings
+        editor: Name of the editor (see `list_editors`), the default editor if omitted
+    
+    Returns:
+        Dictionary with `signatures` (signature, type, count, first_seen,
+        last_seen, message, stack), most frequent first
+    """
+    try:
+        aggregator = get_editor_logs(editor).aggregator
+        await sync_logs(editor=editor)
+        types = ("error", "warn") if include_warnings else ("error",)
+        return {
+            "signatures": aggregator.top(max(1, limit), types),
+            "stats": aggregator.stats()
+        }
+    except Exception as e:
+        logger.error(f"Error computing top errors: {e}")
+        return {"error": str(e), "signatures": []}
+
+async def log_stats(
+    ctx: Context,
+    window: Optional[str] = None,
+    show_logs: bool = True,
+    show_warnings: bool = True,
+    show_errors: bool = True,
+    module_filter: Optional[str] = None,
+    limit: int = 10,
+    include_series: bool = False,
+    editor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Log counts, rates and spikes over a recent time window, without any log lines.
+    
+    Counters are kept per log type, per `[Module]` tag and per error/warning
+    signature as logs are synced, in fixed-size time buckets; they are not
+    reset by clear_logs.  Use this to spot regressions (e.g. an error rate
+    that jumped after a change) before querying the logs themselves.
+    
+    Args:
+        window: Time window, e.g. "1m", "10m" or "1h" (see `stats.windows`); the first configured window if omitted
+        show_logs: Count regular logs
+        show_warnings: Count warnings
+        show_errors: Count errors
+        module_filter: Only count logs tagged `[module_filter]`, as in query_logs
+        limit: Number of modules, signatures and spikes to return
+        include_series: Also return per-bucket counts of the listed modules and signatures
+        editor: Name of the editor (see `list_editors`), the default editor if omitted
+    
+    Returns:
+        Dictionary with `total`, `error_ratio`, `types` (count, rate_per_min and
+        per-bucket `series` per type), `modules` and `signatures` (most frequent
+        first, with count and rate_per_min) and `spikes`: series whose rate in
+        the last tenth of the window is well above the rate before it
+        (`ratio` is None when there was nothing before)
+    """
+    try:
+        rates = get_editor_logs(editor).rates
+        await sync_logs(editor=editor)
+        types = build_filters(show_logs, show_warnings, show_errors)[0]
+        module = module_filter.strip() if module_filter and module_filter.strip() else None
+        result = rates.snapshot(window, types, module, max(1, limit), include_series)
+        result["stats"] = rates.stats()
+        return result
+    except Exception as e:
+        logger.error(f"Error computing log stats: {e}")
+        return {"error": str(e)}
+
+async def query_log_history(
+    ctx: Context,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    show_logs: bool = True,
+    show_warnings: bool = True,
+    show_errors: bool = True,
+    search_term: Optional[str] = None,
+    module_filter: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    editor: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Query the persistent log history, which survives clear_logs and editor restarts.
+    
+    Args:
+        start_time: Oldest entries to return; ISO 8601 ("2024-05-01T10:00:00"),
+            epoch seconds/milliseconds, or relative like "-15m", "-2h", "-1d"
+        end_time: Newest entries to return, same formats
+        show_logs: Include regular logs in results
+        show_warnings: Include warning logs in results
+        show_errors: Include error logs in results
+        search_term: Optional search term to filter logs
+        module_filter: Optional module name to filter logs (e.g. "Scene", "Assets")
+        limit: Maximum number of logs to return (defaults to the configured page size)
+        cursor: `next_cursor` from a previous call to fetch the following page
+        editor: Name of the editor (see `list_editors`), the default editor if omitted
+    
+    Returns:
+        Dictionary containing matching logs oldest first (each with `id`,
+        `type`, `message`, `time` and `date` in epoch milliseconds) and
+        `next_cursor` (None on the last page)
+    """
+    try:
+        history = get_editor_logs(editor).history
+        if history is None:
+            return {"error": "Log history is disabled (config.log_history_enabled)", "logs": []}
+        start_ms = parse_time(start_time)
+        end_ms = parse_time(end_time)
+        search_term = search_term.strip() if isinstance(search_term, str) and search_term.strip() else None
+        module_filter = module_filter.strip() if isinstance(module_filter, str) and module_filter.strip() else None
+        limit = limit if limit and limit > 0 else config.page_size
+
+        # 编辑器不可用时历史仍然可以查询，只是缺少最近的日志
+        try:
+            await sync_logs(editor=editor)
+        except Exception as e:
+            logger.warning(f"Could not sync logs before querying history: {e}")
+
+        logs, next_cursor = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: history.query(
+                start_ms, end_ms, show_logs, show_warnings, show_errors, search_term, module_filter,
+                limit=limit, cursor=int(cursor) if cursor else None))
+        return {
+            "logs": logs,
+            "next_cursor": str(next_cursor) if next_cursor is not None else None
+        }
+    except Exception as e:
+        logger.error(f"Error querying log history: {e}")
+        return {"error": str(e), "logs": []}
+
 def log_management_guide() -> str:
     """Guide for managing Cocos Creator logs."""
     return (
         "Cocos Creator MCP Log Tools Guide:\n\n"
         "1. **Querying Logs**\n"
-        "   - `query_logs(show_logs=True, show_warnings=True, show_errors=True, search_term=None, module_filter=None)` - Read and filter Cocos Creator Console logs\n"
+        "   - `query_logs(show_logs=True, show_warnings=True, show_errors=True, search_term=None, module_filter=None, limit=None, cursor=None, newest_first=False)` - Read and filter Cocos Creator Console logs\n"
         "     - Use `module_filter` to filter logs by specific modules (e.g. 'Scene', 'Assets')\n"
+        "     - Results are paged: pass `next_cursor` back as `cursor` to get the next page\n"
+        "     - Use `aggregate_similar=True` to collapse repeated messages into signatures with counts\n"
+        "   - `top_errors(limit=10, include_warnings=False)` - Most frequent error signatures\n"
+        "   - `log_stats(window='10m', module_filter=None)` - Counts, rates and spikes per type, module and signature, no log lines\n"
+        "   - `query_log_history(start_time='-1h', end_time=None, ...)` - Logs persisted on disk, including those from before clear_logs or an editor restart\n"
+        "   - `query_logs_all_editors(editors=None, ...)` - Query every registered editor concurrently and merge the logs by time\n"
+        "     - All log tools take `editor` to target one editor from `list_editors()`\n"
         "2. **Clearing Logs**\n"
         "   - `clear_logs()` - Clear all console logs\n"
         "3. **Checking Connection**\n"
-        "   - `connection_status()` - Check if connected to Cocos Creator\n\n"
+        "   - `connection_status(refresh=False)` - Last-known connection state from the background heartbeat\n"
+        "   - `bridge_metrics(reset=False, dump_path=None, format='json')` - Per-command latency, bytes, errors and timeouts\n"
+        "   - `list_editors(refresh=False)` - Registered editors and their last-known connection state\n\n"
         "4. **Best Practices**\n"
         "   - Always check connection status before performing operations\n"
         "   - Use module filters to focus on specific components (e.g. 'Scene', 'Assets')\n"
@@ -111,7 +505,12 @@ def log_management_guide() -> str:
 
 def register_log_tools(mcp):
     """Register all log tools with the MCP server."""
-    mcp.tool()(query_logs)
-    mcp.tool()(clear_logs)
-    mcp.tool()(connection_status)
+    register_tool(mcp, query_logs)
+    register_tool(mcp, query_logs_all_editors)
+    register_tool(mcp, top_errors)
+    register_tool(mcp, log_stats)
+    register_tool(mcp, query_log_history)
+    register_tool(mcp, clear_logs)
+    register_tool(mcp, connection_status)
+    register_tool(mcp, bridge_metrics)
     mcp.prompt()(log_management_guide) 
\ No newline at end of file
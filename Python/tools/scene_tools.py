@@ -1,85 +1,144 @@
 import logging
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Hashable
+from config import config
+from logging_setup import preview
+from scene_nodes import SceneNodeTable, COLUMNS_FORMAT
 
 class SceneTools:
-    """场景操作工具类"""
-    
-    def __init__(self, cocos_client) -> None:
+    """场景操作工具类，MCP 场景工具都通过它向编辑器发送命令"""
+
+    def __init__(self, cocos_client, scene_cache=None) -> None:
         """
         初始化场景工具
-        
+
         Args:
-            cocos_client: Cocos TCP 客户端实例
+            cocos_client: 连接池（ConnectionPool），命令以异步方式发送
+            scene_cache: 场景缓存，为空时每次都查询编辑器
         """
         self.cocos_client = cocos_client
-        logging.info("SceneTools initialized")
-        
-    def open_scene(self, scene_uuid: str) -> Dict[str, Any]:
+        self.scene_cache = scene_cache
+
+    async def _read(self, key: Hashable, command_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """发送场景读取命令，场景未变化时直接使用缓存的结果"""
+        if self.scene_cache is None:
+            return await self.cocos_client.send_command_async(command_type, params)
+        await self.scene_cache.ensure_subscribed(self.cocos_client)
+        return await self.scene_cache.read(
+            key, lambda: self.cocos_client.send_command_async(command_type, params))
+
+    async def open_scene(self, scene_uuid: str) -> Dict[str, Any]:
         """
         打开指定UUID的场景
-        
+
         Args:
             scene_uuid: 场景资源的UUID
-            
+
         Returns:
             操作结果
         """
+        if not scene_uuid:
+            return {"success": False, "error": "Missing scene_uuid parameter"}
         try:
-            logging.info(f"向Cocos Creator发送打开场景命令: {scene_uuid}")
-            
-            # 发送命令并获取响应 - 使用同步方式
-            response = self.cocos_client.send_command("OPEN_SCENE", {"sceneUuid": scene_uuid})
-            
-            # 记录响应
-            logging.info(f"Cocos Creator响应: {response}")
-            
-            # 返回结果
+            # 异步发送，场景脚本执行期间不阻塞其他工具
+            response = await self.cocos_client.send_command_async("OPEN_SCENE", {"sceneUuid": scene_uuid})
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("Cocos Creator响应: %s", preview(response))
+            if self.scene_cache is not None:
+                # 不等待 scene:ready 事件，立即让旧场景的缓存失效
+                self.scene_cache.invalidate("open_scene")
             return {"success": True, "message": "Scene opened successfully"}
-                
         except Exception as e:
-            logging.error(f"打开场景错误: {e}", exc_info=True)
+            logging.error(f"open_scene错误: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
-            
-    def get_scene_info(self) -> Dict[str, Any]:
+
+    async def get_scene_info(self) -> Dict[str, Any]:
         """
         获取当前场景信息
-        
+
         Returns:
             场景信息
         """
         try:
-            logging.info("向Cocos Creator发送获取场景信息命令")
-            
-            # 发送命令并获取响应
-            response = self.cocos_client.send_command("GET_SCENE_INFO", {})
-            
-            # 记录响应
-            logging.info(f"Cocos Creator响应: {response}")
-            
-            return response
-                
+            return await self._read(("info",), "GET_SCENE_INFO", {})
         except Exception as e:
-            logging.error(f"获取场景信息错误: {e}", exc_info=True)
+            logging.error(f"get_scene_info错误: {e}", exc_info=True)
             return {"success": False, "error": str(e)}
-            
-    def list_scene_nodes(self) -> Dict[str, Any]:
+
+    async def list_scene_nodes(self, limit: Optional[int] = None, cursor: Optional[str] = None,
+                               format: Optional[str] = None) -> Dict[str, Any]:
         """
-        列出场景中的所有节点
-        
+        分页列出场景中的节点
+
+        Args:
+            limit: 每页最多返回的节点数，默认使用配置的分页大小
+            cursor: 上一页返回的 nextCursor，用于获取下一页
+            format: 为 "columns" 时 data 中返回列数组 columns 而不是 nodes
+
         Returns:
-            节点列表
+            节点列表，data 中包含 nextCursor（最后一页为 None）
         """
         try:
-            logging.info("向Cocos Creator发送列出场景节点命令")
-            
-            # 发送命令并获取响应
-            response = self.cocos_client.send_command("LIST_SCENE_NODES", {})
-            
-            # 记录响应
-            logging.info(f"Cocos Creator响应: {response}")
-            
-            return response
-                
+            params: Dict[str, Any] = {"limit": limit or config.page_size}
+            if cursor:
+                params["cursor"] = cursor
+            if format:
+                params["format"] = format
+            return await self._read(("nodes", params["limit"], cursor or "", format or ""),
+                                    "LIST_SCENE_NODES", params)
         except Exception as e:
-            logging.error(f"列出场景节点错误: {e}", exc_info=True)
-            return {"success": False, "error": str(e)} 
\ No newline at end of file
+            logging.error(f"list_scene_nodes错误: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
+    @staticmethod
+    def query_params(path: Optional[str] = None, name: Optional[str] = None, component: Optional[str] = None,
+                     active: Optional[bool] = None, min_depth: Optional[int] = None,
+                     max_depth: Optional[int] = None, fields: Optional[List[str]] = None,
+                     limit: Optional[int] = None, offset: int = 0) -> Dict[str, Any]:
+        """QUERY_SCENE_NODES 的参数，省略未设置的条件"""
+        params: Dict[str, Any] = {"limit": limit or config.page_size, "offset": max(0, offset or 0)}
+        for key, value in (("path", path), ("name", name), ("component", component), ("active", active),
+                           ("minDepth", min_depth), ("maxDepth", max_depth)):
+            if value is not None and value != "":
+                params[key] = value
+        if fields:
+            params["fields"] = list(fields)
+        return params
+
+    async def query_scene_nodes(self, **query) -> Dict[str, Any]:
+        """
+        按条件查询场景节点，条件在编辑器内求值，只返回匹配节点的指定字段
+
+        参数与 query_params 相同，见 MCP 工具 query_scene_nodes
+        """
+        try:
+            params = self.query_params(**query)
+            key = ("query",) + tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in params.items()))
+            return await self._read(key, "QUERY_SCENE_NODES", params)
+        except Exception as e:
+            logging.error(f"query_scene_nodes错误: {e}", exc_info=True)
+            return {"success": False, "error": str(e)}
+
+    async def load_node_table(self, page_size: Optional[int] = None) -> SceneNodeTable:
+        """
+        以列格式流式获取整个场景，构建 SceneNodeTable
+
+        大场景下比节点字典列表占用更少的内存和解析时间；旧版扩展返回
+        节点字典时同样可以构建
+
+        Args:
+            page_size: 每帧的节点数
+
+        Returns:
+            场景节点表
+        """
+        table = SceneNodeTable()
+        params = {"page_size": page_size or config.stream_page_size, "format": COLUMNS_FORMAT}
+        async for chunk in self.cocos_client.stream_command_async("LIST_SCENE_NODES", params):
+            if chunk.get("success") is False:
+                raise Exception(chunk.get("message") or "Failed to list scene nodes")
+            data = chunk.get("data", chunk)
+            if data.get("columns") is not None:
+                table.extend_columns(data["columns"])
+            elif data.get("nodes") is not None:
+                table.extend_dicts(data["nodes"])
+        return table
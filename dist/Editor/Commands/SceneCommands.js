@@ -1,6 +1,6 @@
 "use strict";
 Object.defineProperty(exports, "__esModule", { value: true });
-exports.handleOpenScene = void 0;
+exports.handleOpenScene = handleOpenScene;
 const SceneService_1 = require("../Services/SceneService");
 /**
  * 打开场景命令处理函数
@@ -31,4 +31,3 @@ async function handleOpenScene(params) {
         };
     }
 }
-exports.handleOpenScene = handleOpenScene;
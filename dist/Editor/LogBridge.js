@@ -15,24 +15,152 @@ var __setModuleDefault = (this && this.__setModuleDefault) || (Object.create ? (
 }) : function(o, v) {
     o["default"] = v;
 });
-var __importStar = (this && this.__importStar) || function (mod) {
-    if (mod && mod.__esModule) return mod;
-    var result = {};
-    if (mod != null) for (var k in mod) if (k !== "default" && Object.prototype.hasOwnProperty.call(mod, k)) __createBinding(result, mod, k);
-    __setModuleDefault(result, mod);
-    return result;
+var __importStar = (this && this.__importStar) || (function () {
+    var ownKeys = function(o) {
+        ownKeys = Object.getOwnPropertyNames || function (o) {
+            var ar = [];
+            for (var k in o) if (Object.prototype.hasOwnProperty.call(o, k)) ar[ar.length] = k;
+            return ar;
+        };
+        return ownKeys(o);
+    };
+    return function (mod) {
+        if (mod && mod.__esModule) return mod;
+        var result = {};
+        if (mod != null) for (var k = ownKeys(mod), i = 0; i < k.length; i++) if (k[i] !== "default") __createBinding(result, mod, k[i]);
+        __setModuleDefault(result, mod);
+        return result;
+    };
+})();
+var __rest = (this && this.__rest) || function (s, e) {
+    var t = {};
+    for (var p in s) if (Object.prototype.hasOwnProperty.call(s, p) && e.indexOf(p) < 0)
+        t[p] = s[p];
+    if (s != null && typeof Object.getOwnPropertySymbols === "function")
+        for (var i = 0, p = Object.getOwnPropertySymbols(s); i < p.length; i++) {
+            if (e.indexOf(p[i]) < 0 && Object.prototype.propertyIsEnumerable.call(s, p[i]))
+                t[p[i]] = s[p[i]];
+        }
+    return t;
 };
 Object.defineProperty(exports, "__esModule", { value: true });
 exports.LogBridge = void 0;
 const net = __importStar(require("net"));
 const Config_1 = require("./config/Config");
+const Protocol_1 = require("./Protocol");
+// 流式返回时每帧的默认条目数
+const DEFAULT_LOG_PAGE_SIZE = 1000;
+const DEFAULT_NODE_PAGE_SIZE = 500;
+// 转发给订阅者的场景广播消息
+// 添加、删除节点时编辑器会对父节点广播 scene:change-node
+const SCENE_BROADCASTS = ['scene:ready', 'scene:close', 'scene:change-node'];
+// 可以合并到一次 execute-scene-script 调用中的命令及其场景脚本方法
+const SCENE_SCRIPT_COMMANDS = {
+    GET_SCENE_INFO: 'getSceneInfo',
+    LIST_SCENE_NODES: 'listSceneNodes',
+    QUERY_SCENE_NODES: 'queryNodes',
+    HASH_SCENE_NODES: 'hashNodes'
+};
+function waitForDrain(socket) {
+    return new Promise((resolve) => {
+        const done = () => {
+            socket.removeListener('drain', done);
+            socket.removeListener('close', done);
+            resolve();
+        };
+        socket.once('drain', done);
+        socket.once('close', done);
+    });
+}
+/**
+ * 解析节点分页游标 "<场景代数>:<下标路径>"，格式无效时返回 null
+ */
+function parseNodeCursor(cursor) {
+    const match = /^(\d+):(.*)$/.exec(cursor);
+    return match ? { generation: Number(match[1]), path: match[2] } : null;
+}
+/**
+ * 给场景脚本返回的下一页游标加上生成它时的场景代数
+ */
+function stampNodeCursor(result, generation) {
+    if (result && result.success && result.data && typeof result.data.nextCursor === 'string') {
+        result.data.nextCursor = `${generation}:${result.data.nextCursor}`;
+    }
+    return result;
+}
+/**
+ * 将命令参数转换为场景脚本方法的参数
+ */
+function sceneScriptArgs(type, params) {
+    if (type === 'LIST_SCENE_NODES' && params && (params.limit || params.format)) {
+        // 场景脚本只使用游标中的下标路径，场景代数由 checkNodeCursor 检查
+        const cursor = params.cursor ? parseNodeCursor(String(params.cursor)) : null;
+        return [{ cursor: cursor ? cursor.path : '', limit: Number(params.limit) || 0, format: params.format }];
+    }
+    if (type === 'QUERY_SCENE_NODES') {
+        return [params || {}];
+    }
+    if (type === 'HASH_SCENE_NODES') {
+        return [{ known: Array.isArray(params && params.known) ? params.known : [] }];
+    }
+    return [];
+}
+/**
+ * 自 start（process.hrtime() 的返回值）以来经过的毫秒数
+ */
+function elapsedMs(start) {
+    const [seconds, nanoseconds] = process.hrtime(start);
+    return Math.round((seconds * 1e3 + nanoseconds / 1e6) * 1000) / 1000;
+}
+function createEpoch() {
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`;
+}
+function logKey(log) {
+    return `${log.type}|${String(log.date)}|${log.message}`;
+}
+/**
+ * QUERY_LOGS 的过滤条件：日志类型、模块标签 `[module]` 和搜索词（空格分隔，全部匹配）
+ */
+function logFilter(params) {
+    const showLogs = params.show_logs !== false;
+    const showWarnings = params.show_warnings !== false;
+    const showErrors = params.show_errors !== false;
+    const modulePattern = params.module_filter ? `[${params.module_filter}]` : '';
+    const terms = params.search_term ? params.search_term.toLowerCase().split(' ') : [];
+    return (log) => {
+        const type = log.type.toLowerCase();
+        if (!((showLogs && type === 'log') || (showWarnings && type === 'warn') || (showErrors && type === 'error'))) {
+            return false;
+        }
+        if (modulePattern && !log.message.includes(modulePattern)) {
+            return false;
+        }
+        if (terms.length > 0) {
+            const content = log.message.toLowerCase();
+            return terms.every((term) => content.includes(term));
+        }
+        return true;
+    };
+}
 class LogBridge {
     constructor() {
         this.isRunning = false;
         this.commandHandlers = new Map();
+        // 支持分帧流式返回的命令处理器
+        this.streamHandlers = new Map();
+        // 增量日志查询的游标状态
+        this.logEpoch = createEpoch();
+        this.logHistoryLength = 0;
+        this.logHistoryHead = null;
+        // 订阅了事件的连接
+        this.subscribers = new Map();
+        // 场景事件计数，每次场景变化加一，客户端可据此判断缓存是否过期；节点分页游标也带有该值
+        this.sceneGeneration = 0;
+        this.broadcastListeners = [];
         this.setupCommandHandlers();
         this.startTcpServer();
         this.setupLogListener();
+        this.setupSceneListener();
     }
     static getInstance() {
         if (!LogBridge.instance) {
@@ -52,11 +180,30 @@ class LogBridge {
         this.commandHandlers.set('OPEN_SCENE', this.handleOpenScene.bind(this));
         this.commandHandlers.set('GET_SCENE_INFO', this.handleGetSceneInfo.bind(this));
         this.commandHandlers.set('LIST_SCENE_NODES', this.handleListSceneNodes.bind(this));
+        this.commandHandlers.set('QUERY_SCENE_NODES', this.handleQuerySceneNodes.bind(this));
+        this.commandHandlers.set('HASH_SCENE_NODES', this.handleHashSceneNodes.bind(this));
+        // 批量命令
+        this.commandHandlers.set('BATCH', this.handleBatch.bind(this));
+        // 流式命令：请求参数带 stream: true 时按帧分批返回结果
+        this.streamHandlers.set('QUERY_LOGS', this.streamQueryLogs.bind(this));
+        this.streamHandlers.set('LIST_SCENE_NODES', this.streamListSceneNodes.bind(this));
+        this.streamHandlers.set('HASH_SCENE_NODES', this.streamHashSceneNodes.bind(this));
     }
     startTcpServer() {
         this.server = net.createServer((socket) => {
             console.log('Client connected to Cocos MCP bridge');
+            const state = {
+                protocol: Protocol_1.LEGACY_PROTOCOL_VERSION,
+                decoder: new Protocol_1.FrameDecoder(),
+                compressThreshold: 0,
+                subscriptions: new Set()
+            };
             socket.on('data', async (data) => {
+                var _a, _b;
+                if (state.protocol > Protocol_1.LEGACY_PROTOCOL_VERSION) {
+                    this.handleFramedData(socket, state, data);
+                    return;
+                }
                 try {
                     // 处理可能的ping命令（简单字符串，不是JSON）
                     const message = data.toString().trim();
@@ -70,7 +217,27 @@ class LogBridge {
                     }
                     // 处理JSON命令
                     const command = JSON.parse(message);
+                    if (command.type === Protocol_1.HELLO_COMMAND) {
+                        // 协商帧协议：应答仍为裸 JSON，之后该连接切换到帧模式
+                        const requested = Number((_a = command.params) === null || _a === void 0 ? void 0 : _a.protocol) || Protocol_1.LEGACY_PROTOCOL_VERSION;
+                        const response = {
+                            status: 'success',
+                            result: { protocol: Math.min(requested, Protocol_1.PROTOCOL_VERSION) }
+                        };
+                        // 客户端声明支持 zlib 时启用压缩，阈值以客户端为准
+                        const codecs = (_b = command.params) === null || _b === void 0 ? void 0 : _b.compression;
+                        if (response.result.protocol > Protocol_1.LEGACY_PROTOCOL_VERSION &&
+                            Array.isArray(codecs) && codecs.includes(Protocol_1.COMPRESSION_ZLIB)) {
+                            response.result.compression = Protocol_1.COMPRESSION_ZLIB;
+                            state.compressThreshold = Number(command.params.compress_threshold) || Protocol_1.DEFAULT_COMPRESSION_THRESHOLD;
+                        }
+                        socket.write(JSON.stringify(response));
+                        state.protocol = response.result.protocol;
+                        return;
+                    }
+                    const started = process.hrtime();
                     const response = await this.executeCommand(command);
+                    response.handler_ms = elapsedMs(started);
                     socket.write(JSON.stringify(response));
                 }
                 catch (error) {
@@ -82,6 +249,7 @@ class LogBridge {
                 }
             });
             socket.on('close', () => {
+                this.subscribers.delete(socket);
                 console.log('Client disconnected from Cocos MCP bridge');
             });
             socket.on('error', (err) => {
@@ -97,6 +265,106 @@ class LogBridge {
             this.isRunning = false;
         });
     }
+    /**
+     * 处理帧模式下收到的数据
+     * 每个请求独立执行，完成后立即写回并带上请求 id，允许乱序完成
+     */
+    handleFramedData(socket, state, data) {
+        let frames;
+        try {
+            frames = state.decoder.push(data);
+        }
+        catch (error) {
+            // 帧头损坏后无法再同步数据流，只能断开连接
+            console.error(`Invalid frame from client: ${error.message}`);
+            socket.destroy();
+            return;
+        }
+        for (const frame of frames) {
+            let payload = frame.payload;
+            if (frame.flags & Protocol_1.FLAG_COMPRESSED) {
+                try {
+                    payload = (0, Protocol_1.decompressPayload)(payload);
+                }
+                catch (error) {
+                    console.error(`Invalid compressed frame from client: ${error.message}`);
+                    socket.destroy();
+                    return;
+                }
+            }
+            this.handleFrame(socket, state, payload);
+        }
+    }
+    async handleFrame(socket, state, payload) {
+        const started = process.hrtime();
+        let command;
+        let response;
+        try {
+            command = JSON.parse(payload.toString('utf8'));
+            if (command.type === Protocol_1.SUBSCRIBE_COMMAND) {
+                response = { status: 'success', result: this.handleSubscribe(socket, state, command.params || {}) };
+            }
+            else if (command.params && command.params.stream === true && this.streamHandlers.has(command.type)) {
+                response = await this.executeStream(socket, state, command);
+            }
+            else {
+                response = await this.executeCommand(command);
+            }
+        }
+        catch (error) {
+            response = {
+                status: 'error',
+                error: `Error processing command: ${error.message}`
+            };
+        }
+        if (command && command.id !== undefined) {
+            response.id = command.id;
+        }
+        // 流式命令的耗时包含等待客户端读取（drain）的时间
+        response.handler_ms = elapsedMs(started);
+        this.writeFrame(socket, state, response);
+    }
+    /**
+     * 写出一帧，返回 false 表示 socket 缓冲区已满，调用方应等待 drain
+     * 协商了压缩的连接上，较大的负载以 zlib 压缩后发送
+     */
+    writeFrame(socket, state, response) {
+        if (socket.destroyed) {
+            return false;
+        }
+        const [body, flags] = (0, Protocol_1.compressPayload)(Buffer.from(JSON.stringify(response), 'utf8'), state.compressThreshold);
+        const [header, payload] = (0, Protocol_1.encodeFrame)(body, flags);
+        // 合并帧头和负载为一次系统调用
+        socket.cork();
+        socket.write(header);
+        const flushed = socket.write(payload);
+        socket.uncork();
+        return flushed;
+    }
+    /**
+     * 执行流式命令：中间结果以 status 为 partial 的帧发送，
+     * 返回值作为最终帧。写缓冲区满时暂停生成，保持两端内存占用有界。
+     */
+    async executeStream(socket, state, command) {
+        const handler = this.streamHandlers.get(command.type);
+        const emit = async (chunk) => {
+            if (socket.destroyed) {
+                throw new Error('Client disconnected');
+            }
+            const flushed = this.writeFrame(socket, state, { id: command.id, status: 'partial', result: chunk });
+            if (!flushed) {
+                await waitForDrain(socket);
+            }
+        };
+        try {
+            const result = await handler(command.params, emit);
+            return { status: 'success', result };
+        }
+        catch (error) {
+            console.error(`Error streaming command: ${error.message}`);
+            return { status: 'error', error: error.message };
+        }
+    }
     setupLogListener() {
         // 监听编辑器日志消息，但不再广播，由客户端查询获取
         Editor.Message.addBroadcastListener('console:log', (log) => {
@@ -104,6 +372,50 @@ class LogBridge {
             console.debug('Log captured by Cocos MCP bridge:', log);
         });
     }
+    /**
+     * 订阅事件分组，之后该连接会收到对应的事件帧，直到连接关闭
+     */
+    handleSubscribe(socket, state, params) {
+        const events = Array.isArray(params.events) ? params.events : [];
+        for (const event of events) {
+            state.subscriptions.add(String(event));
+        }
+        if (state.subscriptions.size > 0) {
+            this.subscribers.set(socket, state);
+        }
+        return {
+            events: Array.from(state.subscriptions),
+            generation: this.sceneGeneration
+        };
+    }
+    setupSceneListener() {
+        for (const message of SCENE_BROADCASTS) {
+            const listener = (...args) => {
+                this.sceneGeneration++;
+                this.publishEvent('scene', {
+                    event: message,
+                    data: { uuid: typeof args[0] === 'string' ? args[0] : undefined },
+                    generation: this.sceneGeneration
+                });
+            };
+            Editor.Message.addBroadcastListener(message, listener);
+            this.broadcastListeners.push([message, listener]);
+        }
+    }
+    /**
+     * 将事件帧写给订阅了该分组的所有连接
+     * 事件很小，不等待 drain；连接过慢时由 socket 自身缓冲
+     */
+    publishEvent(group, frame) {
+        for (const [socket, state] of this.subscribers) {
+            if (socket.destroyed) {
+                this.subscribers.delete(socket);
+            }
+            else if (state.subscriptions.has(group)) {
+                this.writeFrame(socket, state, frame);
+            }
+        }
+    }
     async executeCommand(command) {
         try {
             const { type, params = {} } = command;
@@ -130,43 +442,22 @@ class LogBridge {
     }
     async handleQueryLogs(params) {
         try {
-            const showLogs = params.show_logs !== false;
-            const showWarnings = params.show_warnings !== false;
-            const showErrors = params.show_errors !== false;
-            const searchTerm = params.search_term || '';
-            const moduleFilter = params.module_filter || '';
-            // 直接使用 Editor.Logger.query() API 获取日志列表
-            console.log('Querying logs with Editor.Logger.query()...');
-            // @ts-ignore - Editor.Logger 是 Cocos Creator 编辑器 API
-            const logs = await Editor.Logger.query() || [];
-            console.log(`Found ${logs.length} logs`);
-            // 根据类型过滤
-            let filteredLogs = logs.filter((log) => {
-                const type = log.type.toLowerCase();
-                return ((showLogs && type === 'log') ||
-                    (showWarnings && type === 'warn') ||
-                    (showErrors && type === 'error'));
-            });
-            // 根据模块过滤
-            if (moduleFilter) {
-                console.log(`Filtering logs by module: "${moduleFilter}"`);
-                const modulePattern = `[${moduleFilter}]`;
-                filteredLogs = filteredLogs.filter((log) => {
-                    return log.message.includes(modulePattern);
-                });
-                console.log(`Found ${filteredLogs.length} logs matching module filter`);
+            const incremental = params.since !== undefined;
+            const { logs, since } = await this.readLogs(params);
+            const matches = logFilter(params);
+            // 逐条过滤，不为每个过滤条件生成中间数组
+            const filteredLogs = [];
+            for (let index = since; index < logs.length; index++) {
+                if (matches(logs[index])) {
+                    filteredLogs.push(incremental ? Object.assign(Object.assign({}, logs[index]), { seq: index }) : logs[index]);
+                }
             }
-            // 根据搜索词过滤
-            if (searchTerm) {
-                console.log(`Filtering logs by search term: "${searchTerm}"`);
-                const terms = searchTerm.toLowerCase().split(' ');
-                const searchResults = filteredLogs.filter((log) => {
-                    const content = log.message.toLowerCase();
-                    return terms.every((term) => content.includes(term));
-                });
-                console.log(`Found ${searchResults.length} logs matching search term`);
+            console.log(`Found ${filteredLogs.length} logs matching filters`);
+            if (incremental) {
                 return {
-                    logs: searchResults
+                    logs: filteredLogs,
+                    epoch: this.logEpoch,
+                    next_seq: logs.length
                 };
             }
             return {
@@ -179,11 +470,47 @@ class LogBridge {
             throw error;
         }
     }
+    /**
+     * 读取控制台历史并返回查询的起始位置
+     * 增量查询从游标开始；客户端的 epoch 与当前不一致时说明历史已被清空，从头返回
+     */
+    async readLogs(params) {
+        // 直接使用 Editor.Logger.query() API 获取日志列表
+        console.log('Querying logs with Editor.Logger.query()...');
+        // @ts-ignore - Editor.Logger 是 Cocos Creator 编辑器 API
+        const logs = await Editor.Logger.query() || [];
+        console.log(`Found ${logs.length} logs`);
+        this.refreshLogEpoch(logs);
+        let since = 0;
+        if (params.since !== undefined && params.epoch === this.logEpoch) {
+            since = Math.max(0, Math.min(Number(params.since) || 0, logs.length));
+        }
+        return { logs, since };
+    }
+    /**
+     * 检测控制台历史是否在桥接之外被清空（长度变短或首条日志变化），
+     * 如果是则开始新的 epoch，使客户端的增量游标失效
+     */
+    refreshLogEpoch(logs) {
+        const head = logs.length > 0 ? logKey(logs[0]) : null;
+        if (logs.length < this.logHistoryLength ||
+            (this.logHistoryHead !== null && head !== this.logHistoryHead)) {
+            this.resetLogEpoch();
+        }
+        this.logHistoryLength = logs.length;
+        this.logHistoryHead = head;
+    }
+    resetLogEpoch() {
+        this.logEpoch = createEpoch();
+        this.logHistoryLength = 0;
+        this.logHistoryHead = null;
+    }
     async handleClearLogs(params) {
         try {
             console.log('Clearing logs with Editor.Logger.clear()...');
             // @ts-ignore - Editor.Logger 是 Cocos Creator 编辑器 API
             await Editor.Logger.clear();
+            this.resetLogEpoch();
             return {
                 message: 'Console logs cleared successfully'
             };
@@ -233,25 +560,256 @@ class LogBridge {
             throw error;
         }
     }
+    /**
+     * 检查节点分页游标：游标中的下标路径只对生成它时的场景结构有效，场景变化后拒绝旧游标
+     * @returns 游标无效或已过期时的失败结果，否则为 null
+     */
+    checkNodeCursor(params) {
+        if (!params || !params.cursor) {
+            return null;
+        }
+        const cursor = parseNodeCursor(String(params.cursor));
+        if (!cursor) {
+            return { success: false, message: `无效的分页游标: ${params.cursor}` };
+        }
+        if (cursor.generation !== this.sceneGeneration) {
+            return { success: false, message: '分页游标已过期：场景在分页期间发生了变化，请从第一页重新获取' };
+        }
+        return null;
+    }
     /**
      * 处理列出场景节点命令
      */
     async handleListSceneNodes(params) {
         try {
-            // 调用场景脚本的 listSceneNodes 方法
+            const rejected = this.checkNodeCursor(params);
+            if (rejected) {
+                return rejected;
+            }
+            const generation = this.sceneGeneration;
+            // 调用场景脚本的 listSceneNodes 方法，传入 limit 时只返回一页
             const result = await Editor.Message.request('scene', 'execute-scene-script', {
                 name: 'cocos-mcp',
                 method: 'listSceneNodes',
-                args: []
+                args: sceneScriptArgs('LIST_SCENE_NODES', params)
             });
-            return result;
+            return stampNodeCursor(result, generation);
         }
         catch (error) {
             console.error(`Error listing scene nodes: ${error.message}`);
             throw error;
         }
     }
+    /**
+     * 处理查询场景节点命令：过滤和字段投影都在场景脚本中完成，只有匹配的节点会传回
+     */
+    async handleQuerySceneNodes(params) {
+        try {
+            const result = await Editor.Message.request('scene', 'execute-scene-script', {
+                name: 'cocos-mcp',
+                method: 'queryNodes',
+                args: sceneScriptArgs('QUERY_SCENE_NODES', params)
+            });
+            return result;
+        }
+        catch (error) {
+            console.error(`Error querying scene nodes: ${error.message}`);
+            throw error;
+        }
+    }
+    /**
+     * 处理场景结构哈希命令：哈希在场景脚本中计算，调用方已有的子树不再展开
+     */
+    async handleHashSceneNodes(params) {
+        try {
+            const result = await Editor.Message.request('scene', 'execute-scene-script', {
+                name: 'cocos-mcp',
+                method: 'hashNodes',
+                args: sceneScriptArgs('HASH_SCENE_NODES', params)
+            });
+            return result;
+        }
+        catch (error) {
+            console.error(`Error hashing scene nodes: ${error.message}`);
+            throw error;
+        }
+    }
+    /**
+     * 流式查询日志：按 page_size 分帧发送，增量模式下每帧都带有 epoch 和 next_seq
+     */
+    async streamQueryLogs(params, emit) {
+        const pageSize = Number(params.page_size) || DEFAULT_LOG_PAGE_SIZE;
+        const incremental = params.since !== undefined;
+        const { logs, since } = await this.readLogs(params);
+        const matches = logFilter(params);
+        let page = [];
+        let count = 0;
+        // 边过滤边分页，只保留当前一页，不先生成完整的结果
+        const flush = async () => {
+            const chunk = { logs: page };
+            if (incremental) {
+                chunk.epoch = this.logEpoch;
+                chunk.next_seq = page[page.length - 1].seq + 1;
+            }
+            count += page.length;
+            page = [];
+            await emit(chunk);
+        };
+        for (let index = since; index < logs.length; index++) {
+            if (!matches(logs[index])) {
+                continue;
+            }
+            page.push(incremental ? Object.assign(Object.assign({}, logs[index]), { seq: index }) : logs[index]);
+            if (page.length >= pageSize) {
+                await flush();
+            }
+        }
+        if (page.length > 0) {
+            await flush();
+        }
+        if (incremental) {
+            return { epoch: this.logEpoch, next_seq: logs.length, count };
+        }
+        return { count };
+    }
+    /**
+     * 流式列出场景节点：每页一次场景脚本调用，编辑器端同样不需要物化整棵树
+     */
+    async streamListSceneNodes(params, emit) {
+        const limit = Number(params.page_size) || DEFAULT_NODE_PAGE_SIZE;
+        let cursor = params.cursor || '';
+        let nodeCount = 0;
+        while (cursor !== null) {
+            const page = await this.handleListSceneNodes({ cursor, limit, format: params.format });
+            if (!page || !page.success) {
+                throw new Error((page && page.message) || 'Failed to list scene nodes');
+            }
+            const _a = page.data, { nextCursor } = _a, chunk = __rest(_a, ["nextCursor"]);
+            nodeCount += chunk.nodeCount;
+            await emit(chunk);
+            cursor = nextCursor;
+        }
+        return { success: true, data: { nodeCount } };
+    }
+    /**
+     * 流式返回场景结构哈希：子树哈希需要遍历整棵树，因此只调用一次场景脚本，再按 page_size 分帧发送节点
+     */
+    async streamHashSceneNodes(params, emit) {
+        const pageSize = Number(params.page_size) || DEFAULT_NODE_PAGE_SIZE;
+        const result = await this.handleHashSceneNodes(params);
+        if (!result || !result.success) {
+            throw new Error((result && result.message) || 'Failed to hash scene nodes');
+        }
+        const _a = result.data, { nodes } = _a, summary = __rest(_a, ["nodes"]);
+        for (let start = 0; start < nodes.length; start += pageSize) {
+            await emit({ nodes: nodes.slice(start, start + pageSize) });
+        }
+        return { success: true, data: summary };
+    }
+    /**
+     * 处理批量命令
+     * 在一次往返中执行多个命令，每个条目单独返回状态。
+     * 相邻的场景命令会合并为一次 execute-scene-script 调用。
+     */
+    async handleBatch(params) {
+        const commands = Array.isArray(params.commands) ? params.commands : [];
+        const parallel = params.parallel === true;
+        const results = new Array(commands.length);
+        const isSceneCommand = (command) => !!SCENE_SCRIPT_COMMANDS[command.type];
+        const runSingle = async (index) => {
+            const command = commands[index];
+            if (!command || typeof command.type !== 'string') {
+                results[index] = { status: 'error', error: 'Invalid batch item' };
+            }
+            else if (command.type === 'BATCH') {
+                results[index] = { status: 'error', error: 'Nested BATCH commands are not supported' };
+            }
+            else {
+                results[index] = await this.executeCommand(command);
+            }
+        };
+        if (parallel) {
+            // 所有场景命令合并为一次调用，其余命令并发执行
+            const sceneIndices = [];
+            const otherIndices = [];
+            commands.forEach((command, index) => {
+                (command && isSceneCommand(command) ? sceneIndices : otherIndices).push(index);
+            });
+            await Promise.all([
+                this.runSceneScriptGroup(commands, sceneIndices, results),
+                ...otherIndices.map(runSingle)
+            ]);
+        }
+        else {
+            // 按顺序执行，只合并相邻的场景命令以保持执行顺序
+            let index = 0;
+            while (index < commands.length) {
+                const group = [];
+                while (index < commands.length && commands[index] && isSceneCommand(commands[index])) {
+                    group.push(index++);
+                }
+                if (group.length > 0) {
+                    await this.runSceneScriptGroup(commands, group, results);
+                }
+                else {
+                    await runSingle(index++);
+                }
+            }
+        }
+        return { results };
+    }
+    /**
+     * 通过一次 execute-scene-script 调用执行一组场景命令
+     */
+    async runSceneScriptGroup(commands, indices, results) {
+        // 游标已过期的分页请求直接返回失败结果，其余命令照常合并
+        const generation = this.sceneGeneration;
+        const isListing = (index) => commands[index].type === 'LIST_SCENE_NODES';
+        indices = indices.filter((index) => {
+            const rejected = isListing(index) ? this.checkNodeCursor(commands[index].params) : null;
+            if (rejected) {
+                results[index] = { status: 'success', result: rejected };
+            }
+            return !rejected;
+        });
+        if (indices.length === 0) {
+            return;
+        }
+        if (indices.length === 1) {
+            results[indices[0]] = await this.executeCommand(commands[indices[0]]);
+            return;
+        }
+        const calls = indices.map((index) => ({
+            method: SCENE_SCRIPT_COMMANDS[commands[index].type],
+            args: sceneScriptArgs(commands[index].type, commands[index].params || {})
+        }));
+        try {
+            const outputs = await Editor.Message.request('scene', 'execute-scene-script', {
+                name: 'cocos-mcp',
+                method: 'runBatch',
+                args: [calls]
+            });
+            indices.forEach((commandIndex, n) => {
+                const output = outputs[n] || { error: 'Missing scene script result' };
+                results[commandIndex] = output.error !== undefined
+                    ? { status: 'error', error: output.error }
+                    : { status: 'success',
+                        result: isListing(commandIndex) ? stampNodeCursor(output.result, generation) : output.result };
+            });
+        }
+        catch (error) {
+            console.error(`Error running scene script batch: ${error.message}`);
+            for (const commandIndex of indices) {
+                results[commandIndex] = { status: 'error', error: error.message };
+            }
+        }
+    }
     destroy() {
+        for (const [message, listener] of this.broadcastListeners) {
+            Editor.Message.removeBroadcastListener(message, listener);
+        }
+        this.broadcastListeners = [];
+        this.subscribers.clear();
         if (this.server && this.isRunning) {
             this.server.close();
             this.isRunning = false;
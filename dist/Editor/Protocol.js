@@ -0,0 +1,159 @@
+"use strict";
+var __createBinding = (this && this.__createBinding) || (Object.create ? (function(o, m, k, k2) {
+    if (k2 === undefined) k2 = k;
+    var desc = Object.getOwnPropertyDescriptor(m, k);
+    if (!desc || ("get" in desc ? !m.__esModule : desc.writable || desc.configurable)) {
+      desc = { enumerable: true, get: function() { return m[k]; } };
+    }
+    Object.defineProperty(o, k2, desc);
+}) : (function(o, m, k, k2) {
+    if (k2 === undefined) k2 = k;
+    o[k2] = m[k];
+}));
+var __setModuleDefault = (this && this.__setModuleDefault) || (Object.create ? (function(o, v) {
+    Object.defineProperty(o, "default", { enumerable: true, value: v });
+}) : function(o, v) {
+    o["default"] = v;
+});
+var __importStar = (this && this.__importStar) || (function () {
+    var ownKeys = function(o) {
+        ownKeys = Object.getOwnPropertyNames || function (o) {
+            var ar = [];
+            for (var k in o) if (Object.prototype.hasOwnProperty.call(o, k)) ar[ar.length] = k;
+            return ar;
+        };
+        return ownKeys(o);
+    };
+    return function (mod) {
+        if (mod && mod.__esModule) return mod;
+        var result = {};
+        if (mod != null) for (var k = ownKeys(mod), i = 0; i < k.length; i++) if (k[i] !== "default") __createBinding(result, mod, k[i]);
+        __setModuleDefault(result, mod);
+        return result;
+    };
+})();
+Object.defineProperty(exports, "__esModule", { value: true });
+exports.FrameDecoder = exports.MAX_FRAME_SIZE = exports.FRAME_HEADER_SIZE = exports.FRAME_MAGIC = exports.DEFAULT_COMPRESSION_THRESHOLD = exports.COMPRESSION_ZLIB = exports.FLAG_COMPRESSED = exports.SUBSCRIBE_COMMAND = exports.HELLO_COMMAND = exports.PROTOCOL_VERSION = exports.LEGACY_PROTOCOL_VERSION = void 0;
+exports.encodeFrame = encodeFrame;
+exports.compressPayload = compressPayload;
+exports.decompressPayload = decompressPayload;
+/**
+ * TCP 桥的线协议
+ *
+ * 版本 0 为旧的裸 JSON 模式；版本 1 在每条消息前加上固定长度的帧头，
+ * 接收方可以一次性读取完整负载并只解析一次。
+ *
+ * 帧格式（大端序）：
+ *   magic(2B 'CM') | version(1B) | flags(1B) | length(4B uint32) | payload
+ *
+ * 压缩在 HELLO 中协商：客户端列出支持的算法和压缩阈值，桥接端选中后
+ * 双方都可以把不小于阈值的负载以 zlib 流发送并设置 FLAG_COMPRESSED，
+ * 小消息保持原样。帧头中的长度始终是线上的字节数。
+ */
+const zlib = __importStar(require("zlib"));
+exports.LEGACY_PROTOCOL_VERSION = 0;
+exports.PROTOCOL_VERSION = 1;
+exports.HELLO_COMMAND = 'HELLO';
+// 仅帧模式可用：订阅后桥接端会主动推送事件帧 { event, data, generation }，事件帧不带 id
+exports.SUBSCRIBE_COMMAND = 'SUBSCRIBE';
+// 帧标志位
+exports.FLAG_COMPRESSED = 0x01;
+const KNOWN_FLAGS = exports.FLAG_COMPRESSED;
+exports.COMPRESSION_ZLIB = 'zlib';
+// 客户端未给出阈值时使用
+exports.DEFAULT_COMPRESSION_THRESHOLD = 64 * 1024;
+exports.FRAME_MAGIC = 'CM';
+exports.FRAME_HEADER_SIZE = 8;
+exports.MAX_FRAME_SIZE = 256 * 1024 * 1024;
+/**
+ * 将负载编码为带帧头的 Buffer 列表，调用方可以直接依次写入 socket
+ */
+function encodeFrame(payload, flags = 0) {
+    const header = Buffer.alloc(exports.FRAME_HEADER_SIZE);
+    header.write(exports.FRAME_MAGIC, 0, 'ascii');
+    header.writeUInt8(exports.PROTOCOL_VERSION, 2);
+    header.writeUInt8(flags, 3);
+    header.writeUInt32BE(payload.length, 4);
+    return [header, payload];
+}
+/**
+ * 负载不小于阈值时压缩，返回 [负载, 帧标志]；阈值为 0 或压缩后没有变小时保持原样
+ */
+function compressPayload(payload, threshold) {
+    if (threshold <= 0 || payload.length < threshold) {
+        return [payload, 0];
+    }
+    // 级别 1 最快，重复度高的 JSON 仍有约 10 倍压缩率
+    const compressed = zlib.deflateSync(payload, { level: 1 });
+    if (compressed.length >= payload.length) {
+        return [payload, 0];
+    }
+    return [compressed, exports.FLAG_COMPRESSED];
+}
+/**
+ * 解压收到的负载，解压后的大小同样受 MAX_FRAME_SIZE 限制
+ */
+function decompressPayload(payload) {
+    return zlib.inflateSync(payload, { maxOutputLength: exports.MAX_FRAME_SIZE });
+}
+/**
+ * 增量帧解码器
+ * 缓存收到的数据块，只有在凑齐完整帧之后才拼接一次
+ */
+class FrameDecoder {
+    constructor() {
+        this.chunks = [];
+        this.buffered = 0;
+    }
+    push(data) {
+        this.chunks.push(data);
+        this.buffered += data.length;
+        const frames = [];
+        while (this.buffered >= exports.FRAME_HEADER_SIZE) {
+            const header = this.peek(exports.FRAME_HEADER_SIZE);
+            if (header.toString('ascii', 0, 2) !== exports.FRAME_MAGIC) {
+                throw new Error('Invalid frame magic');
+            }
+            const version = header.readUInt8(2);
+            const flags = header.readUInt8(3);
+            const length = header.readUInt32BE(4);
+            if (version < 1 || version > exports.PROTOCOL_VERSION) {
+                throw new Error(`Unsupported protocol version: ${version}`);
+            }
+            if (flags & ~KNOWN_FLAGS) {
+                throw new Error(`Unknown frame flags: ${flags}`);
+            }
+            if (length > exports.MAX_FRAME_SIZE) {
+                throw new Error(`Frame too large: ${length} bytes`);
+            }
+            if (this.buffered < exports.FRAME_HEADER_SIZE + length) {
+                break;
+            }
+            const frame = this.take(exports.FRAME_HEADER_SIZE + length);
+            frames.push({ version, flags, payload: frame.subarray(exports.FRAME_HEADER_SIZE) });
+        }
+        return frames;
+    }
+    peek(size) {
+        if (this.chunks[0].length < size) {
+            this.chunks = [Buffer.concat(this.chunks)];
+        }
+        return this.chunks[0].subarray(0, size);
+    }
+    take(size) {
+        if (this.chunks[0].length < size) {
+            this.chunks = [Buffer.concat(this.chunks)];
+        }
+        const head = this.chunks[0];
+        const frame = head.subarray(0, size);
+        if (head.length === size) {
+            this.chunks.shift();
+        }
+        else {
+            this.chunks[0] = head.subarray(size);
+        }
+        this.buffered -= size;
+        return frame;
+    }
+}
+exports.FrameDecoder = FrameDecoder;